@@ -80,6 +80,7 @@ def get_player_team_item_color(preset, player_id):
 
 # ========== 限购检查辅助函数 ==========
 
+# 品质顺序(ItemTierRegistry在导入时据此建立 物品 -> 等级 表)
 # 护甲品质顺序
 ORDERED_ARMOR_CHESTPLATE = [
     "minecraft:leather_chestplate",
@@ -108,31 +109,54 @@ ORDERED_SWORDS = [
     "minecraft:netherite_sword",
 ]
 
+# 函数限购检查(check_can_buy为lambda)依赖的玩家状态,商品配置中用depends_on声明
+# 商店UI只在这些状态变化时重新检查该商品(见ShopStateCache)
+DEPENDS_ARMOR_CHESTPLATE = "armor_chestplate"  # 胸甲槽位
+DEPENDS_ARMOR_LEGGINGS = "armor_leggings"  # 护腿槽位
+DEPENDS_SWORD = "sword"  # 剑购买记录 + 背包中的剑
+
+
+def _get_purchase_transaction(player_id):
+    """
+    获取玩家正在处理的购买事务(ShopServerSystem._buy_goods的限购检查期间)
+
+    限购检查在事务的背包快照上进行,不再单独读取背包;UI显示时没有事务,直接读取背包
+
+    Returns:
+        PurchaseTransaction|None: 购买事务
+    """
+    shop_system = serverApi.GetSystem(MOD_NAME, "ShopServerSystem")
+    if not shop_system or not hasattr(shop_system, 'get_purchase_transaction'):
+        return None
+    return shop_system.get_purchase_transaction(player_id)
+
 
 def is_player_chestplate_better_than(player_id, armor_item_name):
     """检查玩家穿戴的胸甲是否比指定护甲更好"""
-    comp = serverApi.GetEngineCompFactory().CreateItem(player_id)
-    chestplate = comp.GetPlayerItem(serverApi.GetMinecraftEnum().ItemPosType.ARMOR, 1)
+    from Script_NeteaseMod.systems.shop.ItemTierRegistry import get_item_tier_registry, FAMILY_CHESTPLATE
+    transaction = _get_purchase_transaction(player_id)
+    if transaction is not None:
+        chestplate = transaction.get_armor_item(1)
+    else:
+        comp = serverApi.GetEngineCompFactory().CreateItem(player_id)
+        chestplate = comp.GetPlayerItem(serverApi.GetMinecraftEnum().ItemPosType.ARMOR, 1)
     if chestplate is None:
         return False
-    if armor_item_name not in ORDERED_ARMOR_CHESTPLATE:
-        return False
-    current_index = ORDERED_ARMOR_CHESTPLATE.index(chestplate['newItemName'])
-    new_index = ORDERED_ARMOR_CHESTPLATE.index(armor_item_name)
-    return new_index <= current_index
+    return get_item_tier_registry().is_at_least(chestplate['newItemName'], armor_item_name, FAMILY_CHESTPLATE)
 
 
 def is_player_leggings_better_than(player_id, armor_item_name):
     """检查玩家穿戴的护腿是否比指定护腿更好"""
-    comp = serverApi.GetEngineCompFactory().CreateItem(player_id)
-    leggings = comp.GetPlayerItem(serverApi.GetMinecraftEnum().ItemPosType.ARMOR, 2)
+    from Script_NeteaseMod.systems.shop.ItemTierRegistry import get_item_tier_registry, FAMILY_LEGGINGS
+    transaction = _get_purchase_transaction(player_id)
+    if transaction is not None:
+        leggings = transaction.get_armor_item(2)
+    else:
+        comp = serverApi.GetEngineCompFactory().CreateItem(player_id)
+        leggings = comp.GetPlayerItem(serverApi.GetMinecraftEnum().ItemPosType.ARMOR, 2)
     if leggings is None:
         return False
-    if armor_item_name not in ORDERED_LEGGINGS:
-        return False
-    current_index = ORDERED_LEGGINGS.index(leggings['newItemName'])
-    new_index = ORDERED_LEGGINGS.index(armor_item_name)
-    return new_index <= current_index
+    return get_item_tier_registry().is_at_least(leggings['newItemName'], armor_item_name, FAMILY_LEGGINGS)
 
 
 def is_player_sword_better_than(preset, player_id, sword_item_name):
@@ -143,32 +167,30 @@ def is_player_sword_better_than(preset, player_id, sword_item_name):
     1. 检查购买记录(防止玩家丢剑绕过限制)
     2. 检查背包中实际拥有的剑
     """
+    from Script_NeteaseMod.systems.shop.ItemTierRegistry import get_item_tier_registry, FAMILY_SWORD
     # 新架构: 从BedWarsGameSystem获取购买记录
     game_system = serverApi.GetSystem(MOD_NAME, "BedWarsGameSystem")
     if not game_system or not hasattr(game_system, 'player_sword_record'):
         return False
 
-    if sword_item_name not in ORDERED_SWORDS:
+    registry = get_item_tier_registry()
+    new_sword_quality = registry.get_tier(sword_item_name, FAMILY_SWORD)
+    if new_sword_quality is None:
         return False
 
-    new_sword_quality = ORDERED_SWORDS.index(sword_item_name)
-
     # 方法1: 检查购买记录
     current_sword_record = game_system.player_sword_record.get(player_id, "minecraft:wooden_sword")
-    record_quality = 0
-    if current_sword_record in ORDERED_SWORDS:
-        record_quality = ORDERED_SWORDS.index(current_sword_record)
-
-    # 方法2: 检查背包中实际拥有的最高品质剑
-    comp = serverApi.GetEngineCompFactory().CreateItem(player_id)
-    inv_items = comp.GetPlayerAllItems(serverApi.GetMinecraftEnum().ItemPosType.INVENTORY)
+    record_quality = registry.get_tier(current_sword_record, FAMILY_SWORD) or 0
 
-    highest_inv_sword_quality = 0
-    for item in inv_items:
-        if item and item.get('newItemName') in ORDERED_SWORDS:
-            item_quality = ORDERED_SWORDS.index(item.get('newItemName'))
-            if item_quality > highest_inv_sword_quality:
-                highest_inv_sword_quality = item_quality
+    # 方法2: 检查背包中实际拥有的最高品质剑(购买时使用事务的背包快照)
+    transaction = _get_purchase_transaction(player_id)
+    if transaction is not None:
+        inv_items = [item for _, item in transaction.find_items(registry.get_family_items(FAMILY_SWORD))]
+    else:
+        comp = serverApi.GetEngineCompFactory().CreateItem(player_id)
+        inv_items = comp.GetPlayerAllItems(serverApi.GetMinecraftEnum().ItemPosType.INVENTORY)
+    highest_inv_sword_quality = registry.get_highest_tier(
+        FAMILY_SWORD, (item.get('newItemName') for item in inv_items if item), default=0)
 
     # 防刷机制: 背包无剑但记录更好 → 禁止购买
     if highest_inv_sword_quality == 0 and record_quality > new_sword_quality:
@@ -183,6 +205,8 @@ def is_player_sword_better_than(preset, player_id, sword_item_name):
 
 # ========== 商品池配置 ==========
 
+# 方块类商品的item为函数(按玩家生成,例如队伍颜色羊毛)时,用block_names声明会放置的方块名称
+# 爆炸抗性表(ExplosionResistanceRegistry)启动时据此登记抗性
 GOODS_POOL = [
     # ==================== 方块类 (13个) ====================
     {
@@ -196,6 +220,7 @@ GOODS_POOL = [
             "newAuxValue": get_player_team_item_color(preset, player_id),
             "count": 16
         },
+        "block_names": ["minecraft:wool"],
         "check_can_buy": None
     },
     {
@@ -218,6 +243,7 @@ GOODS_POOL = [
             "newAuxValue": get_player_team_item_color(preset, player_id),
             "count": 16
         },
+        "block_names": ["minecraft:stained_hardened_clay"],
         "check_can_buy": None
     },
     {
@@ -312,6 +338,7 @@ GOODS_POOL = [
             "newAuxValue": get_player_team_item_color(preset, player_id),
             "count": 8
         },
+        "block_names": ["minecraft:stained_glass"],
         "check_can_buy": None
     },
     {
@@ -344,7 +371,8 @@ GOODS_POOL = [
             {"newItemName": "minecraft:golden_chestplate", "count": 1},
             {"newItemName": "minecraft:golden_boots", "count": 1}
         ],
-        "check_can_buy": lambda preset, player_id: u"已拥有更好的护甲" if is_player_chestplate_better_than(player_id, "minecraft:golden_chestplate") else None
+        "check_can_buy": lambda preset, player_id: u"已拥有更好的护甲" if is_player_chestplate_better_than(player_id, "minecraft:golden_chestplate") else None,
+        "depends_on": [DEPENDS_ARMOR_CHESTPLATE]
     },
     {
         "id": "armor.chain",
@@ -356,7 +384,8 @@ GOODS_POOL = [
             {"newItemName": "minecraft:chainmail_chestplate", "count": 1},
             {"newItemName": "minecraft:chainmail_boots", "count": 1}
         ],
-        "check_can_buy": lambda preset, player_id: u"已拥有更好的护甲" if is_player_chestplate_better_than(player_id, "minecraft:chainmail_chestplate") else None
+        "check_can_buy": lambda preset, player_id: u"已拥有更好的护甲" if is_player_chestplate_better_than(player_id, "minecraft:chainmail_chestplate") else None,
+        "depends_on": [DEPENDS_ARMOR_CHESTPLATE]
     },
     {
         "id": "armor.iron",
@@ -368,7 +397,8 @@ GOODS_POOL = [
             {"newItemName": "minecraft:iron_chestplate", "count": 1},
             {"newItemName": "minecraft:iron_boots", "count": 1}
         ],
-        "check_can_buy": lambda preset, player_id: u"已拥有更好的护甲" if is_player_chestplate_better_than(player_id, "minecraft:iron_chestplate") else None
+        "check_can_buy": lambda preset, player_id: u"已拥有更好的护甲" if is_player_chestplate_better_than(player_id, "minecraft:iron_chestplate") else None,
+        "depends_on": [DEPENDS_ARMOR_CHESTPLATE]
     },
     {
         "id": "armor.diamond",
@@ -380,7 +410,8 @@ GOODS_POOL = [
             {"newItemName": "minecraft:diamond_chestplate", "count": 1},
             {"newItemName": "minecraft:diamond_boots", "count": 1}
         ],
-        "check_can_buy": lambda preset, player_id: u"已拥有更好的护甲" if is_player_chestplate_better_than(player_id, "minecraft:diamond_chestplate") else None
+        "check_can_buy": lambda preset, player_id: u"已拥有更好的护甲" if is_player_chestplate_better_than(player_id, "minecraft:diamond_chestplate") else None,
+        "depends_on": [DEPENDS_ARMOR_CHESTPLATE]
     },
     {
         "id": "armor.gold.r",
@@ -392,7 +423,8 @@ GOODS_POOL = [
             {"newItemName": "minecraft:golden_leggings", "count": 1},
             {"newItemName": "minecraft:golden_boots", "count": 1}
         ],
-        "check_can_buy": lambda preset, player_id: u"已拥有更好的护甲" if is_player_leggings_better_than(player_id, "minecraft:golden_leggings") else None
+        "check_can_buy": lambda preset, player_id: u"已拥有更好的护甲" if is_player_leggings_better_than(player_id, "minecraft:golden_leggings") else None,
+        "depends_on": [DEPENDS_ARMOR_LEGGINGS]
     },
     {
         "id": "armor.chain.r",
@@ -404,7 +436,8 @@ GOODS_POOL = [
             {"newItemName": "minecraft:chainmail_leggings", "count": 1},
             {"newItemName": "minecraft:chainmail_boots", "count": 1}
         ],
-        "check_can_buy": lambda preset, player_id: u"已拥有更好的护甲" if is_player_leggings_better_than(player_id, "minecraft:chainmail_leggings") else None
+        "check_can_buy": lambda preset, player_id: u"已拥有更好的护甲" if is_player_leggings_better_than(player_id, "minecraft:chainmail_leggings") else None,
+        "depends_on": [DEPENDS_ARMOR_LEGGINGS]
     },
     {
         "id": "armor.iron.r",
@@ -416,7 +449,8 @@ GOODS_POOL = [
             {"newItemName": "minecraft:iron_leggings", "count": 1},
             {"newItemName": "minecraft:iron_boots", "count": 1}
         ],
-        "check_can_buy": lambda preset, player_id: u"已拥有更好的护甲" if is_player_leggings_better_than(player_id, "minecraft:iron_leggings") else None
+        "check_can_buy": lambda preset, player_id: u"已拥有更好的护甲" if is_player_leggings_better_than(player_id, "minecraft:iron_leggings") else None,
+        "depends_on": [DEPENDS_ARMOR_LEGGINGS]
     },
     {
         "id": "armor.diamond.r",
@@ -428,7 +462,8 @@ GOODS_POOL = [
             {"newItemName": "minecraft:diamond_leggings", "count": 1},
             {"newItemName": "minecraft:diamond_boots", "count": 1}
         ],
-        "check_can_buy": lambda preset, player_id: u"已拥有更好的护甲" if is_player_leggings_better_than(player_id, "minecraft:diamond_leggings") else None
+        "check_can_buy": lambda preset, player_id: u"已拥有更好的护甲" if is_player_leggings_better_than(player_id, "minecraft:diamond_leggings") else None,
+        "depends_on": [DEPENDS_ARMOR_LEGGINGS]
     },
 
     # ==================== 武器类 (5个) ====================
@@ -439,7 +474,8 @@ GOODS_POOL = [
         "category": "weapons",
         "price": {"currency": "iron", "amount": 10},
         "item": {"newItemName": "minecraft:stone_sword", "count": 1},
-        "check_can_buy": lambda preset, player_id: u"已拥有高等级剑" if is_player_sword_better_than(preset, player_id, "minecraft:stone_sword") else None
+        "check_can_buy": lambda preset, player_id: u"已拥有高等级剑" if is_player_sword_better_than(preset, player_id, "minecraft:stone_sword") else None,
+        "depends_on": [DEPENDS_SWORD]
     },
     {
         "id": "sword.iron",
@@ -448,7 +484,8 @@ GOODS_POOL = [
         "category": "weapons",
         "price": {"currency": "gold", "amount": 7},
         "item": {"newItemName": "minecraft:iron_sword", "count": 1},
-        "check_can_buy": lambda preset, player_id: u"已拥有高等级剑" if is_player_sword_better_than(preset, player_id, "minecraft:iron_sword") else None
+        "check_can_buy": lambda preset, player_id: u"已拥有高等级剑" if is_player_sword_better_than(preset, player_id, "minecraft:iron_sword") else None,
+        "depends_on": [DEPENDS_SWORD]
     },
     {
         "id": "sword.diamond",
@@ -457,7 +494,8 @@ GOODS_POOL = [
         "category": "weapons",
         "price": {"currency": "emerald", "amount": 4},
         "item": {"newItemName": "minecraft:diamond_sword", "count": 1},
-        "check_can_buy": lambda preset, player_id: u"已拥有高等级剑" if is_player_sword_better_than(preset, player_id, "minecraft:diamond_sword") else None
+        "check_can_buy": lambda preset, player_id: u"已拥有高等级剑" if is_player_sword_better_than(preset, player_id, "minecraft:diamond_sword") else None,
+        "depends_on": [DEPENDS_SWORD]
     },
     {
         "id": "sword.knock",
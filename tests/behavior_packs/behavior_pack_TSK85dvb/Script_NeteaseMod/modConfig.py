@@ -37,6 +37,7 @@ CLIENT_SYSTEMS = [
     ("RoomManagementClientSystem", "Script_NeteaseMod.systems.RoomManagementClientSystem.RoomManagementClientSystem"),
     ("HUDSystem", "Script_NeteaseMod.systems.HUDSystem.HUDSystem"),
     ("ParticleClientSystem", "Script_NeteaseMod.systems.client.ParticleClientSystem.ParticleClientSystem"),
+    ("GeneratorTextClientSystem", "Script_NeteaseMod.systems.client.GeneratorTextClientSystem.GeneratorTextClientSystem"),
     ("ChangeDimensionAnimClient", "Script_NeteaseMod.systems.ChangeDimensionClientSystem.ChangeDimensionClientSystem"),
     ("CameraPreviewClientSystem", "Script_NeteaseMod.systems.CameraPreviewClientSystem.CameraPreviewClientSystem"),
     ("FocusHUDClientSystem", "Script_NeteaseMod.systems.FocusHUDClientSystem.FocusHUDClientSystem"),
@@ -88,4 +89,17 @@ CLIENT_PRESET_IMPORTS = [
 CLIENT_PRESET_TYPES = [
     (preset_type, class_name + "Client")
     for preset_type, class_name in PRESET_TYPE_DEFINITIONS
-]
\ No newline at end of file
+]
+
+# ========== 性能分析配置 ==========
+# Tick分析器(systems/util/TickProfiler.py)开关,默认关闭
+# 开启后包装GamingState.tick、服务端预设on_tick与服务端系统Update,关闭时无任何额外开销
+TICK_PROFILER_ENABLED = False
+# 自动输出Top-N报告的间隔(秒),0表示不自动输出
+TICK_PROFILER_REPORT_INTERVAL = 60
+# 自动报告时同时导出的collapsed-stack文件路径,None表示不导出
+TICK_PROFILER_DUMP_PATH = "tick_profile.folded"
+
+# 引擎API调用统计(systems/util/EngineApiAccounting.py)开关,默认关闭
+# 开启后代理GetEngineCompFactory(),由RoomManagementSystem的PerformanceMonitor定期输出报告
+ENGINE_API_ACCOUNTING_ENABLED = False
@@ -13,6 +13,7 @@ import mod.server.extraServerApi as serverApi
 # 避免在模块级别导入modConfig，防止引擎误将其识别为Mod类
 from modConfig import MOD_NAME, MOD_VERSION, SERVER_SYSTEMS, CLIENT_SYSTEMS
 from modConfig import CLIENT_PRESET_IMPORTS, CLIENT_PRESET_TYPES
+from modConfig import TICK_PROFILER_ENABLED, ENGINE_API_ACCOUNTING_ENABLED
 
 
 @Mod.Binding(name=MOD_NAME, version=MOD_VERSION)
@@ -69,6 +70,15 @@ class Script_NeteaseMod(object):
             import traceback
             traceback.print_exc()
 
+        # 引擎API调用统计(默认关闭,见modConfig.ENGINE_API_ACCOUNTING_ENABLED)
+        # 必须在注册系统之前安装,系统与模块级缓存的组件工厂才会被代理
+        if ENGINE_API_ACCOUNTING_ENABLED:
+            try:
+                from Script_NeteaseMod.systems.util.EngineApiAccounting import get_engine_api_accounting
+                get_engine_api_accounting().install(serverApi)
+            except Exception as e:
+                print("[ERROR] [EC起床战争] 安装引擎API调用统计失败 - {}".format(e))
+
         # 从配置文件注册服务端系统
         for system_name, system_path in SERVER_SYSTEMS:
             serverApi.RegisterSystem(
@@ -78,6 +88,14 @@ class Script_NeteaseMod(object):
             )
             print("[INFO] [EC起床战争] {} 已注册".format(system_name))
 
+        # Tick分析器(默认关闭,见modConfig.TICK_PROFILER_ENABLED)
+        if TICK_PROFILER_ENABLED:
+            try:
+                from Script_NeteaseMod.systems.util.TickProfiler import install_from_mod_config
+                install_from_mod_config()
+            except Exception as e:
+                print("[ERROR] [EC起床战争] 安装Tick分析器失败 - {}".format(e))
+
         print("[INFO] [EC起床战争] 服务端初始化完成")
 
     @Mod.DestroyServer()
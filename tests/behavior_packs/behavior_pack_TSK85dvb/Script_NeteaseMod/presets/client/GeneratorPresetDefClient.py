@@ -13,7 +13,7 @@
 重要注意事项:
 1. PresetDefinitionClient是单例，所有同类型预设共享同一个对象
 2. 实例级数据必须存储在instance.data中，不能存储在self中
-3. on_tick()方法签名必须为 on_tick(self, instance, dt)
+3. 浮空文字由GeneratorTextUpdater统一刷新（GeneratorTextClientSystem驱动），不使用on_tick
 4. 使用instance.get_config()读取位置，PresetInstanceClient没有get_position()方法
 """
 
@@ -30,7 +30,7 @@ class GeneratorPresetDefClient(PresetDefinitionClient):
     3. 资源类型标识显示 (铁、金、钻石、绿宝石)
     4. 循环粒子效果
     5. P1.1: 浮空物品指示器
-    6. P1.2: 浮空文字倒计时（每秒更新）
+    6. P1.2: 浮空文字倒计时（文字变化且在视距内时更新）
 
     架构说明:
     - 本类是PresetDefinitionClient的单例实例
@@ -39,8 +39,8 @@ class GeneratorPresetDefClient(PresetDefinitionClient):
     - 实例级数据（如floating_text_board_id）必须存储在instance.data中
     """
 
-    # 启用tick更新，使on_tick()被ECPreset框架每帧调用
-    enable_tick = True
+    # 浮空文字由GeneratorTextUpdater统一刷新，不需要ECPreset框架逐实例调用on_tick
+    enable_tick = False
 
     def __init__(self):
         super(GeneratorPresetDefClient, self).__init__()
@@ -59,8 +59,6 @@ class GeneratorPresetDefClient(PresetDefinitionClient):
         self._particle_loop_id = None
 
         # ========== P1.2功能数据成员 ==========
-        self.floating_text_board_id = None  # type: int | None  # 浮动文字面板ID
-        self.next_text_update = 0.0  # type: float  # 下次更新浮动文字的时间戳
         # 从服务端同步的数据
         self.team = None  # type: str | None  # 队伍ID
         self.next_generate = 0.0  # type: float  # 下次生成时间（时间戳）
@@ -96,7 +94,7 @@ class GeneratorPresetDefClient(PresetDefinitionClient):
         1. 创建资源类型标识特效
         2. 开始循环粒子效果
         3. 创建浮空物品指示器 (P1.1)
-        4. 注册事件监听
+        4. 注册到浮空文字更新器（补发已收到的服务端状态）
 
         Args:
             instance: PresetInstanceClient对象
@@ -110,29 +108,9 @@ class GeneratorPresetDefClient(PresetDefinitionClient):
         # 3. P1.1功能：创建浮空物品指示器
         self._create_floating_item_indicator(instance)
 
-    def on_tick(self, instance, dt):
-        """
-        每Tick更新
-
-        P1.2功能：每秒更新浮动文字倒计时
-
-        Args:
-            instance: PresetInstanceClient对象
-            dt: 时间增量（秒），ECPreset框架传入，默认0.05秒
-        """
-        import time
-        now = time.time()
-
-        # 从instance.data读取浮动文字板ID和下次更新时间
-        # 注意：所有产矿机预设共享同一个GeneratorPresetDefClient对象，
-        # 因此必须将实例级数据存储在instance.data中，而不是self中
-        floating_text_board_id = instance.get_data("floating_text_board_id")
-        next_text_update = instance.get_data("next_text_update", 0.0)
-
-        # 每秒更新一次浮动文字倒计时
-        if floating_text_board_id and now >= next_text_update:
-            instance.set_data("next_text_update", now + 1.0)
-            self._update_floating_text(instance)
+        # 4. 注册到浮空文字更新器
+        from Script_NeteaseMod.systems.util.GeneratorTextUpdater import get_generator_text_updater
+        get_generator_text_updater().register_instance(self, instance)
 
     def on_stop(self, instance):
         """
@@ -164,7 +142,7 @@ class GeneratorPresetDefClient(PresetDefinitionClient):
         self._stop_all_effects()
 
         # P1.2功能：清理浮动文字
-        self._cleanup_floating_text()
+        self._cleanup_floating_text(instance)
 
         # P1.1功能：清理浮空物品指示器
         self._cleanup_floating_item_indicator()
@@ -792,9 +770,9 @@ class GeneratorPresetDefClient(PresetDefinitionClient):
             if floating_text_board_id:
                 # 存储浮动文字板ID到instance.data（实例级数据）
                 instance.set_data("floating_text_board_id", floating_text_board_id)
-                # 立即设置下次更新时间为当前时间，以便立即更新
-                import time
-                instance.set_data("next_text_update", time.time())
+                # 登记到浮空文字更新器（文字变化时由更新器统一刷新）
+                from Script_NeteaseMod.systems.util.GeneratorTextUpdater import get_generator_text_updater
+                get_generator_text_updater().register_board(instance, floating_text_board_id, floating_pos, text)
             else:
                 print("[WARN] [产矿机-客户端] 创建浮动文字失败")
 
@@ -803,62 +781,41 @@ class GeneratorPresetDefClient(PresetDefinitionClient):
             import traceback
             traceback.print_exc()
 
-    def _update_floating_text(self, instance):
-        # type: (object) -> None
+    def get_floating_text(self, instance):
+        # type: (object) -> str
         """
-        更新浮动文字内容
-
-        每秒更新一次倒计时
-
-        P1.2功能核心逻辑
+        获取浮动文字当前应显示的内容（GeneratorTextUpdater调用）
 
         Args:
             instance: PresetInstanceClient对象
-        """
-        try:
-            from Script_NeteaseMod.systems.util.ClientAPIHelper import ClientAPIHelper
 
-            # ⚠️ 关键修复：从instance读取floating_text_board_id
-            floating_text_board_id = instance.get_data("floating_text_board_id")
-            if not floating_text_board_id:
-                return
-
-            # 格式化新文字（需要从instance读取next_generate等数据）
-            new_text = self._format_generator_text(instance)
-
-            # 更新文字
-            success = ClientAPIHelper.update_floating_text(
-                floating_text_board_id,
-                text=new_text
-            )
-
-            if not success:
-                print("[WARN] [产矿机-客户端] 更新浮动文字失败: instance_id={}, board_id={}".format(
-                    instance.instance_id, floating_text_board_id
-                ))
-
-        except Exception as e:
-            print("[ERROR] [产矿机-客户端] 更新浮动文字异常: {}".format(str(e)))
-            import traceback
-            traceback.print_exc()
+        Returns:
+            str: 格式化后的文字
+        """
+        return self._format_generator_text(instance)
 
-    def _cleanup_floating_text(self):
-        # type: () -> None
+    def _cleanup_floating_text(self, instance):
+        # type: (object) -> None
         """
         清理浮动文字
 
-        P1.2功能清理逻辑
+        P1.2功能清理逻辑：从浮空文字更新器注销，并销毁该实例的浮动文字
+
+        Args:
+            instance: PresetInstanceClient对象
         """
         try:
-            if self.floating_text_board_id is not None:
+            from Script_NeteaseMod.systems.util.GeneratorTextUpdater import get_generator_text_updater
+            floating_text_board_id = get_generator_text_updater().unregister_instance(instance)
+            if floating_text_board_id is not None:
                 from Script_NeteaseMod.systems.util.ClientAPIHelper import ClientAPIHelper
-                success = ClientAPIHelper.destroy_floating_text(self.floating_text_board_id)
+                success = ClientAPIHelper.destroy_floating_text(floating_text_board_id)
 
                 if success:
                     print("[INFO] [产矿机-客户端] 浮动文字已清理: board_id={}".format(
-                        self.floating_text_board_id
+                        floating_text_board_id
                     ))
-                self.floating_text_board_id = None
+                instance.set_data("floating_text_board_id", None)
 
         except Exception as e:
             print("[ERROR] [产矿机-客户端] 清理浮动文字异常: {}".format(str(e)))
@@ -8,6 +8,9 @@
 - 资源数量上限控制
 - 共享产出机制 (everybody模式)
 - 物品拾取白名单
+- 生成时间由GeneratorScheduler统一排期(不使用逐实例on_tick)
+- 状态变化由GeneratorSyncBatcher每Tick合并为一条消息同步到客户端
+- 掉落物由GeneratorItemLedger按拾取/实体移除事件记录(生成前不再逐个验证实体存在性)
 """
 
 from ECPresetServerScripts import PresetDefinitionServer
@@ -27,9 +30,9 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
     5. 物品拾取白名单 (队伍专属产矿机)
     """
 
-    # ===== [CRITICAL FIX] 启用Tick更新 =====
-    # 根据ECPreset框架要求,必须设置enable_tick=True才能让on_tick被调用
-    enable_tick = True
+    # 生成时间由GeneratorScheduler按next_generate统一唤醒(BedWarsGameSystem.Update驱动),
+    # 不需要ECPreset框架逐实例调用on_tick
+    enable_tick = False
 
     def __init__(self):
         super(GeneratorPresetDefServer, self).__init__()
@@ -47,7 +50,6 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
         self.resource_type = None  # type: dict | None  # 资源类型配置
         self.levels_config = None  # type: list | None  # 不同等级的配置列表
         self.item_pickup_whitelist = {}  # type: dict  # 物品拾取白名单 {entity_id: (timeout, player_id)}
-        self.generated_items = []  # type: list  # 已生成的物品实体ID列表
         self.max_items = 5  # type: int  # 最大物品数量
 
     def on_init(self, instance):
@@ -122,49 +124,41 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
         # 监听游戏运行事件 - 用于在游戏开始后通知客户端创建浮动文字
         instance.subscribe_event("BedWarsRunning", self._on_game_running)
 
-        # 5. 启动产矿
+        # 5. 启动产矿(注册到产矿机调度器)
         self._start_generator()
 
         # 6. 同步数据到客户端 (P1.2功能需要)
         self._sync_generator_data_to_client(instance)
 
-    def on_tick(self, instance, dt):
+    def on_generator_due(self, now):
         """
-        每Tick更新
-
-        检查是否到达生成时间,如果是则生成资源
+        到达生成时间(由GeneratorScheduler在游戏运行期间调用)
 
         Args:
-            instance: PresetInstance对象
-            dt: 距离上次tick的时间间隔(秒)
-        """
-        if self.levels_config is None:
-            return
+            now (float): 当前时间戳
 
-        # 检查游戏是否正在运行
-        if not self._is_game_running():
-            return
-
-        # 如果等级为0,暂停产矿
-        if self.level == 0:
-            return
+        Returns:
+            float: 下次生成时间,返回None表示暂停(等级为0或没有等级配置)
+        """
+        if self.levels_config is None or self.level == 0:
+            return None
 
-        now = time.time()
-        if now >= self.next_generate:
-            # 计算下次生成时间
-            current_config = self._get_current_level_config()
-            if current_config:
-                period_ms = current_config.get('period', 5000)  # 默认5秒
-                self.next_generate = now + (period_ms / 1000.0)
+        # 计算下次生成时间
+        current_config = self._get_current_level_config()
+        if not current_config:
+            return None
+        period_ms = current_config.get('period', 5000)  # 默认5秒
+        self.next_generate = now + (period_ms / 1000.0)
 
-                # 生成资源
-                self._generate_item(instance)
+        # 生成资源
+        self._generate_item(self.instance)
 
-                # ⚠️ 关键修复：同步新的next_generate到客户端，以便客户端倒计时正确更新
-                self._sync_generator_data_to_client(instance)
+        # ⚠️ 关键修复：同步新的next_generate到客户端，以便客户端倒计时正确更新
+        self._sync_generator_data_to_client(self.instance)
 
-            # 清理过期的白名单条目
-            self._cleanup_whitelist(now)
+        # 清理过期的白名单条目
+        self._cleanup_whitelist(now)
+        return self.next_generate
 
     def on_stop(self, instance):
         """
@@ -182,6 +176,10 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
         # EventBus事件会自动取消订阅
         # EventBus事件会自动取消订阅
 
+        # 停止排期,丢弃未发送的状态同步
+        self._get_scheduler().unregister(self)
+        self._get_sync_batcher().discard(self)
+
         # ⚠️ 关键修复：清理所有生成的物品实体（参考GuideGenerator实现）
         self._cleanup_generated_items(instance)
 
@@ -197,6 +195,9 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
         Args:
             instance: PresetInstance对象
         """
+        self._get_scheduler().unregister(self)
+        self._get_sync_batcher().discard(self)
+
         # ⚠️ 关键修复：清理所有生成的物品实体
         self._cleanup_generated_items(instance)
 
@@ -211,7 +212,7 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
         Args:
             instance: PresetInstance对象
         """
-        for entity_id in self.generated_items:
+        for entity_id in self._get_item_ledger().release_owner(self):
             try:
                 server_system = instance.manager.server_api
                 if server_system:
@@ -219,8 +220,6 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
             except Exception as e:
                 print("[ERROR] [产矿机] 清理物品异常: {}".format(e))
 
-        self.generated_items = []
-
     # ========== 事件处理方法 ==========
 
     def _on_player_try_pickup(self, event_data):
@@ -275,26 +274,40 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
         my_team = self.team.upper() if self.team else 'NONE'
 
         if my_resource_type in resource_types and my_team in teams:
-            old_level = self.level
+            self.set_level(new_level)
 
-            # 更新等级
-            self.level = new_level
+    def set_level(self, new_level):
+        """
+        设置产矿机等级(GeneratorLevelUp事件与队伍生成器升级共用)
+
+        新周期更短时提前下次生成时间,并在调度器中重新排期
+
+        Args:
+            new_level (int): 新等级
+        """
+        was_paused = self.level == 0
+
+        # 更新等级
+        self.level = new_level
 
-            # 获取新等级的配置
-            new_config = self._get_current_level_config()
-            if new_config:
-                # 计算新周期的下次生成时间
-                new_period_ms = new_config.get('period', 5000)
-                new_period_sec = new_period_ms / 1000.0
-                new_next_generate = time.time() + new_period_sec
+        # 获取新等级的配置
+        new_config = self._get_current_level_config() if new_level else None
+        if new_config:
+            # 计算新周期的下次生成时间
+            new_period_ms = new_config.get('period', 5000)
+            new_period_sec = new_period_ms / 1000.0
+            new_next_generate = time.time() + new_period_sec
 
-                # 如果新周期更短(等级提升),立即调整下次生成时间
-                # 这样可以让升级后的产矿速度立即生效
-                if new_next_generate < self.next_generate:
-                    self.next_generate = new_next_generate
+            # 如果新周期更短(等级提升)或从暂停恢复,立即调整下次生成时间
+            # 这样可以让升级后的产矿速度立即生效
+            if was_paused or new_next_generate < self.next_generate:
+                self.next_generate = new_next_generate
 
-            # 同步数据到客户端 (P1.2功能需要)
-            self._sync_generator_data_to_client(self.instance)
+        # 重新排期(O(log n))
+        self._get_scheduler().reschedule(self)
+
+        # 同步数据到客户端 (P1.2功能需要)
+        self._sync_generator_data_to_client(self.instance)
 
     def _on_game_running(self, event_name, event_data):
         """
@@ -414,9 +427,40 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
         """
         启动产矿机
 
-        设置下次生成时间为当前时间,立即开始产矿
+        设置下次生成时间为当前时间并注册到调度器,游戏运行后立即开始产矿
         """
         self.next_generate = time.time()
+        self._get_scheduler().register(self)
+
+    def _get_scheduler(self):
+        """
+        获取产矿机调度器
+
+        Returns:
+            GeneratorScheduler: 产矿机调度器
+        """
+        from Script_NeteaseMod.systems.util.GeneratorScheduler import get_generator_scheduler
+        return get_generator_scheduler()
+
+    def _get_sync_batcher(self):
+        """
+        获取产矿机状态同步合并器
+
+        Returns:
+            GeneratorSyncBatcher: 同步合并器
+        """
+        from Script_NeteaseMod.systems.util.GeneratorSyncBatcher import get_generator_sync_batcher
+        return get_generator_sync_batcher()
+
+    def _get_item_ledger(self):
+        """
+        获取产矿机掉落物账本
+
+        Returns:
+            GeneratorItemLedger: 掉落物账本
+        """
+        from Script_NeteaseMod.systems.util.GeneratorItemLedger import get_generator_item_ledger
+        return get_generator_item_ledger()
 
     def _get_current_level_config(self):
         """
@@ -440,32 +484,20 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
         生成资源物品
 
         步骤:
-        1. ⚠️ 关键优化：生成前验证队列中实体存在性（清理已被拾取的物品）
-        2. ⚠️ 关键修复：使用FIFO队列管理上限（参考GuideGenerator实现）
+        1. 按掉落物账本的物品数量计算地面掉落物的剩余容量(达到上限时停止生成,不销毁已有的掉落物)
+        2. 获取当前等级的生成数量
         3. 根据everybody模式决定生成方式:
            - True: 直接发到附近玩家背包
-           - False: 生成掉落物实体
-        4. 发送特效事件到客户端
+           - False: 生成掉落物实体(不超过剩余容量)
+        4. 发送特效事件到客户端(没有生成物品时跳过)
 
         Args:
             instance: PresetInstance对象
         """
-        # 1. ⚠️ 关键优化：生成前清理已被拾取/销毁的物品（验证实体存在性）
-        self._validate_and_cleanup_items()
-
-        # 2. 检查FIFO队列是否已达上限
+        # 1. 地面掉落物的剩余容量(账本由拾取/实体移除事件更新,只校准发生过事件的掉落物)
+        # 掉落物会合并成一个物品堆,销毁最早的实体会连同合并进去的物品一起销毁,因此达到上限时只停止生成
         top_count = self.resource_type.get('top_count', 64)
-        current_count = len(self.generated_items)
-
-        # 如果达到上限，删除最早的物品（FIFO）
-        if current_count >= top_count:
-            oldest_item = self.generated_items.pop(0)
-            try:
-                server_system = instance.manager.server_api
-                if server_system:
-                    server_system.DestroyEntity(oldest_item)
-            except Exception as e:
-                print("[ERROR] [产矿机] 清理旧物品异常: {}".format(e))
+        room = max(0, top_count - self._get_item_ledger().get_item_count(self))
 
         # 2. 获取生成数量
         current_config = self._get_current_level_config()
@@ -475,20 +507,17 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
         count = current_config.get('count', 1)
 
         # 3. 生成物品
-        if self.everybody:
-            # 共享产出模式: 获取附近玩家
-            nearby_players = self._get_nearby_players(instance, distance=2.0)
-            if nearby_players:
-                # 直接发到玩家背包
-                for player_id in nearby_players:
-                    for i in range(count):
-                        self._spawn_item_to_player(player_id)
-            else:
-                # 没有附近玩家,生成掉落物
+        nearby_players = self._get_nearby_players(instance, distance=2.0) if self.everybody else None
+        if nearby_players:
+            # 共享产出模式: 直接发到附近玩家背包
+            for player_id in nearby_players:
                 for i in range(count):
-                    self._spawn_entity_item(instance)
+                    self._spawn_item_to_player(player_id)
         else:
-            # 普通模式: 生成掉落物
+            # 普通模式(或共享产出模式没有附近玩家): 生成掉落物
+            count = min(count, room)
+            if count <= 0:
+                return
             for i in range(count):
                 self._spawn_entity_item(instance)
 
@@ -498,63 +527,6 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
         # 5. 发送粒子特效消息到客户端
         self._send_particle_effect_to_client(instance)
 
-    def _count_around_items(self, instance):
-        """
-        统计周围的资源物品数量
-
-        检测产矿机周围±1格范围内的物品掉落
-
-        Args:
-            instance: PresetInstance对象
-
-        Returns:
-            int: 周围物品总数量
-        """
-        try:
-            import mod.server.extraServerApi as serverApi
-            pos = instance.get_config("pos")
-            # ⚠️ 关键修复：使用与生成时相同的维度获取方式
-            dimension = self._get_current_dimension(instance)
-
-            # 获取游戏组件
-            comp_game = serverApi.GetEngineCompFactory().CreateGame(serverApi.GetLevelId())
-            comp_item = serverApi.GetEngineCompFactory().CreateItem(serverApi.GetLevelId())
-
-            # 获取周围±1格范围内的所有实体
-            # 注意: pos是列表格式[x, y, z],不是字典
-            entities = comp_game.GetEntitiesInSquareArea(
-                dimension,
-                (pos[0] - 1, pos[1] - 1, pos[2] - 1),
-                (pos[0] + 1, pos[1] + 2, pos[2] + 1)
-            )
-
-            count = 0
-            item_count_found = 0
-            for entity_id in entities:
-                # 检查是否是物品实体
-                comp_type = serverApi.GetEngineCompFactory().CreateEngineType(entity_id)
-                entity_type = comp_type.GetEngineType()
-
-                # 获取物品实体类型枚举
-                EntityTypeEnum = serverApi.GetMinecraftEnum().EntityType
-                if entity_type == EntityTypeEnum.ItemEntity:
-                    # 获取掉落物品信息
-                    item_info = comp_item.GetDroppedItem(entity_id)
-                    if item_info:
-                        item_name = item_info.get('itemName')
-                        item_stack_count = item_info.get('count', 0)
-                        if item_name == self.resource_type.get('item'):
-                            count += item_stack_count
-                            item_count_found += 1
-
-            return count
-
-        except Exception as e:
-            print("[ERROR] [产矿机] 统计周围物品失败: {}".format(str(e)))
-            import traceback
-            traceback.print_exc()
-            return 0
-
     def _get_nearby_players(self, instance, distance=2.0):
         """
         获取附近的玩家列表
@@ -568,11 +540,24 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
         """
         try:
             import mod.server.extraServerApi as serverApi
+            from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
+            from Script_NeteaseMod.modConfig import MOD_NAME
             pos = instance.get_config("pos")
+
+            # 优先使用BedWarsGameSystem的玩家空间索引(无需逐个实体查询类型)
+            game_system = serverApi.GetSystem(MOD_NAME, "BedWarsGameSystem")
+            player_index = getattr(game_system, 'player_index', None) if game_system else None
+            if player_index is not None:
+                return player_index.query_box(
+                    self._get_current_dimension(instance),
+                    (pos[0] - distance, pos[1] - distance, pos[2] - distance),
+                    (pos[0] + distance, pos[1] + distance, pos[2] + distance)
+                )
+
             dimension = instance.get_config("dimension_id", 0)
 
             # 获取游戏组件
-            comp_game = serverApi.GetEngineCompFactory().CreateGame(serverApi.GetLevelId())
+            comp_game = get_component_cache().CreateGame(serverApi.GetLevelId())
 
             # 获取附近范围内的所有实体
             # 注意: pos是列表格式[x, y, z],不是字典
@@ -585,7 +570,7 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
             players = []
             for entity_id in entities:
                 # 检查是否是玩家实体
-                comp_type = serverApi.GetEngineCompFactory().CreateEngineType(entity_id)
+                comp_type = get_component_cache().CreateEngineType(entity_id)
                 entity_type = comp_type.GetEngineType()
 
                 # 获取实体类型枚举
@@ -610,9 +595,10 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
         """
         try:
             import mod.server.extraServerApi as serverApi
+            from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
 
             # 获取物品组件
-            item_comp = serverApi.GetEngineCompFactory().CreateItem(player_id)
+            item_comp = get_component_cache().CreateItem(player_id)
 
             # 构造物品数据
             item_dict = {
@@ -671,8 +657,8 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
 
             # entity_id可能是None(失败)或实体ID字符串(成功)
             if entity_id:
-                # ⚠️ 关键修复：记录生成的物品ID到FIFO队列
-                self.generated_items.append(entity_id)
+                # 记录到掉落物账本(FIFO)
+                self._get_item_ledger().track(self, entity_id, item_dict['count'])
             else:
                 # 返回None表示失败，可能是区块未加载
                 print("[WARN] [产矿机] 生成掉落物失败（可能区块未加载）: type={}".format(
@@ -768,98 +754,23 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
         for entity_id in expired_ids:
             del self.item_pickup_whitelist[entity_id]
 
-    def _validate_and_cleanup_items(self):
-        """
-        ⚠️ 关键优化：验证队列中物品实体的存在性，清理已被拾取/销毁的物品
-
-        原理：
-        - 玩家拾取物品后，实体会被销毁，但entity_id仍在队列中
-        - 通过GetFootPos()验证实体是否存在（不存在会返回None或抛异常）
-        - 清理不存在的entity_id，确保队列准确反映实际物品数量
-
-        参考：用户建议 - "生成矿物之前获取一下当前队列中全部矿物的实体位置"
-        """
-        if not self.generated_items:
-            return
-
-        import mod.server.extraServerApi as serverApi
-
-        # 存储仍然存在的物品ID
-        valid_items = []
-        removed_count = 0
-
-        for entity_id in self.generated_items:
-            try:
-                # 尝试获取实体位置来验证存在性
-                pos_comp = serverApi.GetEngineCompFactory().CreatePos(entity_id)
-                pos = pos_comp.GetFootPos()
-
-                # 如果能成功获取位置，说明实体还存在
-                if pos is not None:
-                    valid_items.append(entity_id)
-                else:
-                    removed_count += 1
-            except:
-                # 获取位置失败，说明实体已被销毁（被拾取或其他原因）
-                removed_count += 1
-
-        # 更新队列
-        self.generated_items = valid_items
+    # ========== P1.2功能实现 ==========
 
-    def _is_game_running(self):
+    def _sync_generator_data_to_client(self, instance):
         """
-        检查游戏是否正在运行
+        同步产矿机数据到客户端
 
-        从BedWarsGameSystem获取当前游戏状态
+        只标记为待同步,由GeneratorSyncBatcher在本Tick结束时与其他产矿机合并为一条
+        GeneratorStateBatch消息发送(同一Tick多次变化只发送一次)
 
-        Returns:
-            bool: True表示游戏正在运行,False表示游戏未运行
+        Args:
+            instance: PresetInstance对象
         """
-        try:
-            import mod.server.extraServerApi as serverApi
-            from Script_NeteaseMod.modConfig import MOD_NAME
-
-            # 获取BedWarsGameSystem
-            game_system = serverApi.GetSystem(MOD_NAME, "BedWarsGameSystem")
-            if not game_system:
-                # 游戏系统不存在,默认暂停产矿
-                return False
-
-            # 检查游戏系统的root_state
-            if not hasattr(game_system, 'root_state') or not game_system.root_state:
-                return False
-
-            # ⚠️ 关键修复：优先检查current_sub_state
-            current_state = game_system.root_state.current_sub_state
-
-            if current_state:
-                # 正常情况：子状态已设置，检查是否为BedWarsRunningState
-                state_name = current_state.__class__.__name__
-                if state_name == "BedWarsRunningState":
-                    return True
-            else:
-                # ⚠️ 边界情况：current_sub_state尚未设置（_on_enter执行期间）
-                # 检查root_state是否已经在gaming状态
-                root_state = game_system.root_state
-                if hasattr(root_state, '__class__'):
-                    root_state_name = root_state.__class__.__name__
-                    # 如果root_state是RootGamingState，说明游戏已进入running阶段
-                    if 'Gaming' in root_state_name or 'Running' in root_state_name:
-                        return True
-
-            # 其他状态暂停产矿
-            return False
-
-        except Exception as e:
-            # 出错时默认允许产矿(保守策略)
-            print("[WARN] [产矿机] 检查游戏状态失败,默认允许产矿: {}".format(str(e)))
-            return True
-
-    # ========== P1.2功能实现 ==========
+        self._get_sync_batcher().mark_dirty(self)
 
-    def _sync_generator_data_to_client(self, instance):
+    def get_sync_data(self):
         """
-        同步产矿机数据到客户端
+        获取同步到客户端的产矿机数据
 
         P1.2功能需要：客户端需要这些数据来显示浮动文字和倒计时
 
@@ -870,40 +781,27 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
         - next_generate: 下次生成时间（时间戳）
         - resource_name: 资源名称（中文）
         - period_ms: 当前等级的生成周期（毫秒）
+        - display_floating: 是否显示浮空文字
 
-        Args:
-            instance: PresetInstance对象
+        Returns:
+            dict: 同步数据
         """
-        try:
-            # 获取当前等级配置
-            current_config = self._get_current_level_config()
-            period_ms = current_config.get('period', 5000) if current_config else 5000
-
-            # 获取资源名称
-            resource_name = self.resource_type.get('name', '资源') if self.resource_type else '资源'
-
-            # 构建同步数据
-            sync_data = {
-                'resource_type_id': self.resource_type_id,
-                'team': self.team,
-                'level': self.level,
-                'next_generate': self.next_generate,
-                'resource_name': resource_name,
-                'period_ms': period_ms,
-                'display_floating': self.display_floating  # 添加浮空文字显示配置
-            }
-
-            # 发送到客户端
-            instance.send_to_client("SyncGeneratorData", sync_data)
+        # 获取当前等级配置
+        current_config = self._get_current_level_config()
+        period_ms = current_config.get('period', 5000) if current_config else 5000
 
-            # print("[INFO] [产矿机-服务端] 同步数据到客户端: type={}, level={}, period={}ms, display_floating={}".format(
-            #     self.resource_type_id, self.level, period_ms, self.display_floating
-            # ))
+        # 获取资源名称
+        resource_name = self.resource_type.get('name', '资源') if self.resource_type else '资源'
 
-        except Exception as e:
-            print("[ERROR] [产矿机-服务端] 同步数据到客户端失败: {}".format(str(e)))
-            import traceback
-            traceback.print_exc()
+        return {
+            'resource_type_id': self.resource_type_id,
+            'team': self.team,
+            'level': self.level,
+            'next_generate': self.next_generate,
+            'resource_name': resource_name,
+            'period_ms': period_ms,
+            'display_floating': self.display_floating  # 添加浮空文字显示配置
+        }
 
     def _play_spawn_sound(self, instance):
         """
@@ -913,6 +811,7 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
         """
         try:
             import mod.server.extraServerApi as serverApi
+            from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
 
             pos = instance.get_config("pos")
 
@@ -928,7 +827,7 @@ class GeneratorPresetDefServer(PresetDefinitionServer):
             )
 
             # 使用命令组件执行命令
-            comp_command = serverApi.GetEngineCompFactory().CreateCommand(serverApi.GetLevelId())
+            comp_command = get_component_cache().CreateCommand(serverApi.GetLevelId())
             comp_command.SetCommand(command)
 
         except Exception as e:
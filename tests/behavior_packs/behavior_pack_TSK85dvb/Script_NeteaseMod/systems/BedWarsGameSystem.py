@@ -17,6 +17,10 @@ import time
 from .GamingStateSystem import GamingStateSystem
 
 
+# 复活定时器owner标识(与玩家ID组成元组,按玩家取消)
+RESPAWN_TIMER_OWNER = 'respawn'
+
+
 class BedWarsGameSystem(GamingStateSystem):
     """
     起床战争游戏逻辑系统(ServerSystem + 状态机)
@@ -79,6 +83,23 @@ class BedWarsGameSystem(GamingStateSystem):
         # ========== 虚空检测系统 ==========
         self.next_void_check_time = 0  # 下次虚空检测时间
 
+        # ========== 玩家状态快照 ==========
+        # 每Tick共享的玩家位置/维度/游戏模式/生命值,避免各子更新器重复查询引擎
+        from util.PlayerStateSnapshot import PlayerStateSnapshot
+        self.player_snapshot = PlayerStateSnapshot(self)
+
+        # 玩家空间索引(按区块分桶,快照版本变化后惰性重建)
+        from util.SpatialIndex import PlayerSpatialIndex
+        self.player_index = PlayerSpatialIndex(self)
+
+        # 产矿机调度器(按下次生成时间唤醒产矿机预设)
+        from Script_NeteaseMod.systems.util.GeneratorScheduler import get_generator_scheduler
+        self.generator_scheduler = get_generator_scheduler()
+
+        # 产矿机状态同步合并(每Tick一条GeneratorStateBatch消息)
+        from Script_NeteaseMod.systems.util.GeneratorSyncBatcher import get_generator_sync_batcher
+        self.generator_sync_batcher = get_generator_sync_batcher()
+
         # ========== 计分板系统 ==========
         self.scoreboard = None  # BedWarsScoreboard实例
 
@@ -118,6 +139,22 @@ class BedWarsGameSystem(GamingStateSystem):
         # 注册观战系统事件
         self.register_spectator_events()
 
+        # 注册背包镜像失效事件(货币检查与HUD资源显示共享)
+        from Script_NeteaseMod.systems.util.InventoryMirror import get_inventory_mirror
+        get_inventory_mirror().register_events(self)
+
+        # 注册组件句柄缓存淘汰事件(实体移除、玩家离开)
+        from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
+        get_component_cache().register_events(self)
+
+        # 注册产矿机调度器的游戏运行状态事件(BedWarsRunning/BedWarsEnding)
+        from Script_NeteaseMod.systems.util.GeneratorScheduler import get_generator_scheduler
+        get_generator_scheduler().register_events(self)
+
+        # 注册产矿机掉落物账本事件(拾取、实体移除)
+        from Script_NeteaseMod.systems.util.GeneratorItemLedger import get_generator_item_ledger
+        get_generator_item_ledger().register_events(self)
+
         # [FIX 2025-11-06] 初始化饰品系统（从_initialize_subsystems移至Create）
         # 原因：玩家在大厅等待阶段就需要使用装扮商店，但OrnamentSystem之前只在游戏开始时初始化
         # 解决：将初始化提前到Create阶段，确保整个系统生命周期都可用
@@ -135,6 +172,25 @@ class BedWarsGameSystem(GamingStateSystem):
         # 清理子系统
         self._cleanup_subsystems()
 
+        # 注销背包镜像事件
+        from Script_NeteaseMod.systems.util.InventoryMirror import get_inventory_mirror
+        get_inventory_mirror().unregister_events()
+
+        # 注销组件句柄缓存事件
+        from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
+        get_component_cache().unregister_events()
+
+        # 注销产矿机调度器事件
+        from Script_NeteaseMod.systems.util.GeneratorScheduler import get_generator_scheduler
+        get_generator_scheduler().unregister_events()
+
+        # 注销产矿机掉落物账本事件
+        from Script_NeteaseMod.systems.util.GeneratorItemLedger import get_generator_item_ledger
+        get_generator_item_ledger().unregister_events()
+
+        # 丢弃未发送的产矿机状态
+        self.generator_sync_batcher.clear()
+
         # 调用父类Destroy
         super(BedWarsGameSystem, self).Destroy()
 
@@ -142,20 +198,19 @@ class BedWarsGameSystem(GamingStateSystem):
 
     def Update(self):
         """系统每帧更新"""
-        # 调用父类Update(驱动状态机)
+        # 开始新的Tick快照(状态机和子更新器共享同一份玩家状态)
+        self.player_snapshot.begin_tick()
+
+        # 调用父类Update(驱动状态机和共享定时器,饰品/破坏床特效定时器挂载在scheduler上)
         super(BedWarsGameSystem, self).Update()
 
+        # 唤醒到期的产矿机,并把本Tick状态变化的产矿机合并同步到客户端
+        self.generator_scheduler.update()
+        self.generator_sync_batcher.flush(self)
+
         # 更新游戏逻辑
         self._update_game_logic()
 
-        # 更新饰品系统(主要用于特效定时器)
-        if self.ornament_system:
-            self.ornament_system.update()
-
-        # 更新破坏床特效系统(主要用于定时器)
-        if self.bed_destroy_effect_system:
-            self.bed_destroy_effect_system.on_tick()
-
     # ========== 游戏启动接口 ==========
 
     def start_game_directly(self, dimension, mode, stage_config):
@@ -214,6 +269,8 @@ class BedWarsGameSystem(GamingStateSystem):
         self.stage_config = stage_config
 
         # 重置游戏状态数据
+        for player_id in self.respawning:
+            self.scheduler.cancel_owner((RESPAWN_TIMER_OWNER, player_id))
         self.destroyed_beds = []
         self.eliminated_players = []
         self.respawning = {}
@@ -224,6 +281,10 @@ class BedWarsGameSystem(GamingStateSystem):
         self.inited_chests = []
         self.last_attacker_records = {}
         self.trap_immune_players = {}
+        self.player_snapshot.invalidate_all()
+        self.player_snapshot.reset_stats()
+        self.player_index.invalidate()
+        self.generator_scheduler.set_running(False)
 
         # 初始化子系统
         self._initialize_subsystems()
@@ -707,6 +768,7 @@ class BedWarsGameSystem(GamingStateSystem):
         # 注意：网易MODSDK的GameType枚举使用首字母大写的Spectator，不是全大写的SPECTATOR
         comp = self.comp_factory.CreatePlayer(player_id)
         comp.SetPlayerGameType(serverApi.GetMinecraftEnum().GameType.Spectator)
+        self.player_snapshot.invalidate(player_id)
 
         self.LogInfo("玩家{}已被淘汰".format(player_id))
 
@@ -723,6 +785,7 @@ class BedWarsGameSystem(GamingStateSystem):
         """
         respawn_time = time.time() + 5.0  # 5秒后复活
         self.respawning[player_id] = respawn_time
+        self._schedule_respawn(player_id, respawn_time)
 
         # 保存玩家装备
         self._save_respawn_contents(player_id)
@@ -838,7 +901,7 @@ class BedWarsGameSystem(GamingStateSystem):
         """
         应用物品降级逻辑
 
-        降级规则:
+        降级规则(death_item_demotion中的可升级商品,按升级路径降低一级):
         - 钻石镐 → 铁镐
         - 铁镐 → 石镐
         - 石镐 → 木镐
@@ -854,23 +917,10 @@ class BedWarsGameSystem(GamingStateSystem):
             contents (dict): 复活物品字典 {(ItemPosType, slot): item_dict}
             inv_items (list): 玩家背包物品列表
         """
-        # 定义降级映射表
-        demotion_map = {
-            # 镐子降级
-            'minecraft:diamond_pickaxe': 'minecraft:iron_pickaxe',
-            'minecraft:iron_pickaxe': 'minecraft:stone_pickaxe',
-            'minecraft:stone_pickaxe': 'minecraft:wooden_pickaxe',
-            'minecraft:wooden_pickaxe': 'minecraft:wooden_pickaxe',  # 木镐不降级
-
-            # 斧子降级
-            'minecraft:diamond_axe': 'minecraft:iron_axe',
-            'minecraft:iron_axe': 'minecraft:stone_axe',
-            'minecraft:stone_axe': 'minecraft:wooden_axe',
-            'minecraft:wooden_axe': 'minecraft:wooden_axe',  # 木斧不降级
-        }
+        from Script_NeteaseMod.systems.shop.ItemTierRegistry import get_item_tier_registry
 
-        # 检查配置中的降级物品类型
-        demotion_configs = self.config.get('death_item_demotion', [])
+        # 降级映射表(由ItemTierRegistry按商品升级路径预先建立)
+        demotion_map = get_item_tier_registry().get_demotion_map(self.config.get('death_item_demotion', []))
 
         for slot, item_dict in enumerate(inv_items):
             if not item_dict or item_dict.get('count', 0) <= 0:
@@ -1207,6 +1257,17 @@ class BedWarsGameSystem(GamingStateSystem):
         if self.room_system:
             self.room_system.record_block_to_backup(pos, self.dimension)
 
+    def on_player_destroy_block(self, pos):
+        """
+        玩家破坏方块
+
+        Args:
+            pos (tuple): 方块位置 (x, y, z)
+        """
+        # 通知RoomSystem记录到备份(快照模式下用于还原被破坏的方块)
+        if self.room_system:
+            self.room_system.record_block_break_to_backup(pos, self.dimension)
+
     # ========== 游戏逻辑更新 ==========
 
     def _update_game_logic(self):
@@ -1214,17 +1275,13 @@ class BedWarsGameSystem(GamingStateSystem):
         # 更新虚空检测系统（每0.1秒检查一次）
         self._update_void_detection()
 
-        # 更新复活系统
-        self._update_respawn_system()
-
         # 更新治疗池系统
         self._update_healing_pools()
 
         # 更新陷阱系统
         self._update_trap_managers()
 
-        # 更新陷阱免疫状态
-        self._update_trap_immunity()
+        # 复活倒计时和陷阱免疫到期由共享调度器(self.scheduler)驱动
 
     def _update_void_detection(self):
         """
@@ -1255,21 +1312,15 @@ class BedWarsGameSystem(GamingStateSystem):
         # 然后通过 get_better_player_obj() 获取玩家对象
         all_player_ids = self.team_module.get_all_players()
 
+        snapshot = self.player_snapshot
+
         for player_id in all_player_ids:
             # 跳过已在复活列表中的玩家（防止重复触发虚空伤害）
             if player_id in self.respawning:
                 continue
 
-            # 获取玩家对象
-            try:
-                player_obj = self.get_better_player_obj(player_id)
-                if not player_obj:
-                    continue
-            except Exception as e:
-                continue
-
-            # 获取玩家位置
-            pos = player_obj.GetPos()
+            # 获取玩家位置（读取本Tick快照）
+            pos = snapshot.get_foot_pos(player_id)
             if pos is None:
                 continue
 
@@ -1281,45 +1332,75 @@ class BedWarsGameSystem(GamingStateSystem):
                 comp_hurt = self.comp_factory.CreateHurt(player_id)
                 comp_hurt.Hurt(1000, serverApi.GetMinecraftEnum().ActorDamageCause.Void,
                               attackerId=None, childAttackerId=None, knocked=False)
+                snapshot.invalidate(player_id)
                 self.LogDebug("玩家 {} 坠入虚空 Y={:.1f}，造成虚空伤害".format(player_id, pos[1]))
 
-    def _update_respawn_system(self):
-        """更新复活系统"""
-        if not self.respawning:
+    def _schedule_respawn(self, player_id, respawn_time):
+        """
+        在共享调度器上挂载复活定时器(倒计时显示 + 到期复活)
+
+        Args:
+            player_id (str): 玩家ID
+            respawn_time (float): 复活时间戳
+        """
+        owner = (RESPAWN_TIMER_OWNER, player_id)
+        self.scheduler.cancel_owner(owner)
+
+        # 立即显示一次倒计时,之后对齐到整秒变化时刷新
+        self._show_respawn_countdown(player_id)
+        remaining = respawn_time - time.time()
+        self.scheduler.add_repeating(
+            1.0, self._show_respawn_countdown, player_id,
+            owner=owner, delay=remaining % 1.0 + 0.001
+        )
+        self.scheduler.add(remaining, self._on_respawn_timer, player_id, owner=owner)
+
+    def _show_respawn_countdown(self, player_id):
+        """
+        显示复活倒计时
+
+        Args:
+            player_id (str): 玩家ID
+        """
+        respawn_time = self.respawning.get(player_id)
+        if respawn_time is None:
+            # 复活队列已被清空(游戏结束等)
+            self.scheduler.cancel_owner((RESPAWN_TIMER_OWNER, player_id))
             return
 
-        current_time = time.time()
-        respawned_players = []
+        # 显示复活倒计时（使用底部堆叠消息，避免与ActionBar重叠）
+        # 参考: 老项目 BedWarsRunningState.py:1087
+        # 使用GamingStateSystem的update_stack_msg_bottom方法
+        remaining_seconds = max(0, int(respawn_time - time.time()))
 
-        for player_id, respawn_time in self.respawning.items():
-            if current_time >= respawn_time:
-                self._respawn_player(player_id)
-                respawned_players.append(player_id)
+        # 格式化消息：你死了！你将在 X 秒后重生
+        respawn_msg = u"\xa7l\xa7c你死了！\xa7r \xa77你将在 \xa7e{}\xa77 秒后重生".format(remaining_seconds)
 
-                # 清除复活倒计时消息
-                # 使用GamingStateSystem的clear_stack_msg_bottom方法
-                if self.room_system:
-                    self.room_system.clear_stack_msg_bottom(key='respawn_countdown', player_id=player_id)
-            else:
-                # 显示复活倒计时（使用底部堆叠消息，避免与ActionBar重叠）
-                # 参考: 老项目 BedWarsRunningState.py:1087
-                # 使用GamingStateSystem的update_stack_msg_bottom方法
-                remaining_seconds = int(respawn_time - current_time)
-
-                # 格式化消息：你死了！你将在 X 秒后重生
-                respawn_msg = u"\xa7l\xa7c你死了！\xa7r \xa77你将在 \xa7e{}\xa77 秒后重生".format(remaining_seconds)
-
-                # 只发送给正在复活的玩家
-                if self.room_system:
-                    self.room_system.update_stack_msg_bottom(
-                        key='respawn_countdown',
-                        value=respawn_msg,
-                        player_id=player_id
-                    )
+        # 只发送给正在复活的玩家
+        if self.room_system:
+            self.room_system.update_stack_msg_bottom(
+                key='respawn_countdown',
+                value=respawn_msg,
+                player_id=player_id
+            )
 
-        # 移除已复活的玩家
-        for player_id in respawned_players:
-            self.respawning.pop(player_id, None)
+    def _on_respawn_timer(self, player_id):
+        """
+        复活定时器到期
+
+        Args:
+            player_id (str): 玩家ID
+        """
+        self.scheduler.cancel_owner((RESPAWN_TIMER_OWNER, player_id))
+        if self.respawning.pop(player_id, None) is None:
+            return
+
+        self._respawn_player(player_id)
+
+        # 清除复活倒计时消息
+        # 使用GamingStateSystem的clear_stack_msg_bottom方法
+        if self.room_system:
+            self.room_system.clear_stack_msg_bottom(key='respawn_countdown', player_id=player_id)
 
     def _respawn_player(self, player_id):
         """
@@ -1402,6 +1483,7 @@ class BedWarsGameSystem(GamingStateSystem):
         try:
             pos_comp = self.comp_factory.CreatePos(player_id)
             pos_comp.SetFootPos(spawn_pos)
+            self.player_snapshot.invalidate(player_id)
 
             # 设置玩家朝向
             if spawn_rot:
@@ -1474,6 +1556,7 @@ class BedWarsGameSystem(GamingStateSystem):
         try:
             pos_comp = self.comp_factory.CreatePos(player_id)
             pos_comp.SetFootPos(spawn_pos)
+            self.player_snapshot.invalidate(player_id)
 
             # 恢复生命值
             attr_comp = self.comp_factory.CreateAttr(player_id)
@@ -1574,20 +1657,50 @@ class BedWarsGameSystem(GamingStateSystem):
             except Exception as e:
                 self.LogError("更新陷阱管理器 {} 失败: {}".format(team_id, str(e)))
 
-    def _update_trap_immunity(self):
-        """更新陷阱免疫状态"""
-        import time
-        current_time = time.time()
+    def _schedule_trap_immunity_expire(self, player_id, duration):
+        """
+        在共享调度器上挂载陷阱免疫到期定时器
 
-        # 移除过期的免疫状态
-        expired_players = []
-        for player_id, immunity_end_time in self.trap_immune_players.items():
-            if current_time >= immunity_end_time:
-                expired_players.append(player_id)
+        Args:
+            player_id (str): 玩家ID
+            duration (float): 免疫持续时间(秒)
+        """
+        self.scheduler.add(duration, self._on_trap_immunity_expired, player_id,
+                           self.trap_immune_players[player_id])
 
-        for player_id in expired_players:
+    def _on_trap_immunity_expired(self, player_id, immunity_end_time):
+        """
+        陷阱免疫到期,移除记录(期间被刷新过的免疫不受影响)
+
+        Args:
+            player_id (str): 玩家ID
+            immunity_end_time (float): 定时器对应的免疫结束时间戳
+        """
+        if self.trap_immune_players.get(player_id) == immunity_end_time:
             self.trap_immune_players.pop(player_id, None)
 
+    # ========== 玩家状态快照失效 ==========
+
+    def _on_del_server_player(self, args):
+        """
+        处理玩家离开事件(额外清理玩家状态快照)
+
+        Args:
+            args: 事件参数 {'id': player_id}
+        """
+        super(BedWarsGameSystem, self)._on_del_server_player(args)
+        self.player_snapshot.invalidate(args.get('id'))
+
+    def _on_dimension_change_finish(self, args):
+        """
+        处理玩家维度切换完成事件(额外使玩家状态快照失效)
+
+        Args:
+            args: 事件参数 {'playerId': str, 'fromDimensionId': int, 'toDimensionId': int, 'toPos': tuple}
+        """
+        self.player_snapshot.invalidate(args.get('playerId'))
+        super(BedWarsGameSystem, self)._on_dimension_change_finish(args)
+
     # ========== 预设查找方法 ==========
 
     def find_team_spawns(self):
@@ -1636,32 +1749,10 @@ class BedWarsGameSystem(GamingStateSystem):
             team_id (str): 队伍ID
 
         Returns:
-            list: GeneratorPreset实例列表
+            list: GeneratorPresetDefServer实例列表(已注册到产矿机调度器的产矿机)
         """
-        generators = []
-
-        try:
-            # 从预设管理器获取所有GeneratorPreset实例
-            from framework.server.PresetManager import PresetManager
-            preset_manager = PresetManager.get_instance()
-            if not preset_manager:
-                self.LogWarn("PresetManager未初始化")
-                return generators
-
-            # 遍历所有预设实例,查找属于指定队伍的GeneratorPreset
-            # 注意：get_all_presets()返回字典{instance_id: PresetInstance}
-            all_presets = preset_manager.get_all_presets()
-            for instance_id, instance in all_presets.items():
-                if instance.preset_type == "generator":
-                    gen_team = instance.data.get("team")
-                    if gen_team == team_id:
-                        generators.append(instance)
-
-            self.LogInfo("找到队伍 {} 的 {} 个生成器".format(team_id, len(generators)))
-
-        except Exception as e:
-            self.LogError("查找生成器失败: {}".format(str(e)))
-
+        generators = self.generator_scheduler.get_generators(team=team_id)
+        self.LogInfo("找到队伍 {} 的 {} 个生成器".format(team_id, len(generators)))
         return generators
 
     # ========== 跨系统引用初始化 ==========
@@ -1705,6 +1796,7 @@ class BedWarsGameSystem(GamingStateSystem):
         import time
         current_time = time.time()
         self.trap_immune_players[player_id] = current_time + duration
+        self._schedule_trap_immunity_expire(player_id, duration)
 
         self.LogInfo("玩家{}获得陷阱免疫 {}秒".format(player_id, duration))
 
@@ -2115,6 +2207,7 @@ class BedWarsGameSystem(GamingStateSystem):
         """
         import time
         self.trap_immune_players[player_id] = time.time() + duration
+        self._schedule_trap_immunity_expire(player_id, duration)
         self.LogDebug("玩家 {} 获得陷阱免疫状态，持续 {} 秒".format(player_id, duration))
 
     def is_player_trap_immune(self, player_id):
@@ -12,6 +12,9 @@ GamingStateSystem - 游戏状态机系统(服务端)
 """
 
 import mod.server.extraServerApi as serverApi
+from Script_NeteaseMod.systems.util.TextTemplate import compile_template
+from Script_NeteaseMod.systems.util.TickScheduler import TickScheduler
+from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
 if False:
     from state.RootGamingState import RootGamingState
 
@@ -54,12 +57,15 @@ class GamingStateSystem(serverApi.GetServerSystemCls()):
         # 待设置的朝向信息(维度切换后设置)
         self._pending_rotations = {}  # player_id -> rotation
 
-        # 组件工厂
-        self.comp_factory = serverApi.GetEngineCompFactory()
+        # 组件工厂(按目标缓存组件句柄,见ComponentCache)
+        self.comp_factory = get_component_cache()
 
         # 定时器管理
         self.timers = {}  # {timer_id: timer_callback}
 
+        # 共享Tick调度器(状态机、特效、陷阱、复活、AI、道具等定时逻辑统一挂载)
+        self.scheduler = TickScheduler()
+
         # 注意: 不在这里调用Create(),引擎会自动调用System的Create方法
         # 如果在__init__中调用Create(),会导致:
         # 1. 子类无法在super().__init__()之后注册事件(因为Create已经执行完了)
@@ -125,6 +131,9 @@ class GamingStateSystem(serverApi.GetServerSystemCls()):
                 self.LogError("停止状态机失败: {}".format(str(e)))
             self.root_state = None
 
+        # 清理定时器
+        self.scheduler.clear()
+
         # 清理缓存
         self.cached_better_players = {}
 
@@ -138,6 +147,9 @@ class GamingStateSystem(serverApi.GetServerSystemCls()):
                 import traceback
                 traceback.print_exc()
 
+        # 只弹出本Tick已到期的定时器
+        self.scheduler.update()
+
     # ========== 事件处理 ==========
 
     def _on_del_server_player(self, args):
@@ -459,6 +471,8 @@ class GamingStateSystem(serverApi.GetServerSystemCls()):
         """
         格式化文本,支持颜色代码和变量替换
 
+        颜色/图标占位符在模板编译时替换,变量在渲染时填充
+
         Args:
             raw_msg (str): 原始消息
             **args: 变量参数
@@ -466,164 +480,8 @@ class GamingStateSystem(serverApi.GetServerSystemCls()):
         Returns:
             str: 格式化后的消息
         """
-        replacements = {
-            # 基础格式
-            "enter": "\n",
-            # 颜色代码
-            "black": u"\u00A70",
-            "dark-blue": u"\u00A71",
-            "dark-green": u"\u00A72",
-            "dark-aqua": u"\u00A73",
-            "dark-red": u"\u00A74",
-            "dark-purple": u"\u00A75",
-            "gold": u"\u00A76",
-            "gray": u"\u00A77",
-            "dark-gray": u"\u00A78",
-            "blue": u"\u00A79",
-            "green": u"\u00A7a",
-            "aqua": u"\u00A7b",
-            "red": u"\u00A7c",
-            "light-purple": u"\u00A7d",
-            "yellow": u"\u00A7e",
-            "white": u"\u00A7f",
-            "obfuscated": u"\u00A7k",
-            "bold": u"\u00A7l",
-            "italic": u"\u00A7o",
-            "reset": u"\u00A7r",
-
-            # ========== 图标占位符映射 (从老项目迁移) ==========
-            # 通用图标
-            "icon-heart": u"\uE110",
-            # 游戏手柄图标
-            "icon-gamepad-a": u"\uE000",
-            "icon-gamepad-b": u"\uE001",
-            "icon-gamepad-x": u"\uE002",
-            "icon-gamepad-y": u"\uE003",
-            "icon-gamepad-lb": u"\uE004",
-            "icon-gamepad-rb": u"\uE005",
-            "icon-gamepad-lt": u"\uE006",
-            "icon-gamepad-rt": u"\uE007",
-            # EC系统图标
-            "icon-ec-lobby": u"\uE0B0",
-            "icon-ec-room": u"\uE0B1",
-            "icon-ec-buglet": u"\uE0B2",
-            "icon-ec-admin": u"\uE0B3",
-            "icon-ec-mission": u"\uE0B4",
-            "icon-ec-prefix-vip3": u"\uE0B6",
-            "icon-ec-prefix-vip4": u"\uE0B7",
-            "icon-ec-buglet-red": u"\uE0B8",
-            # EC UI图标
-            "icon-ec-players": u"\uE180",
-            "icon-ec-rooms": u"\uE181",
-            "icon-ec-time": u"\uE182",
-            "icon-ec-crystal-destroy": u"\uE183",
-            "icon-ec-sword0": u"\uE184",
-            "icon-ec-death": u"\uE185",
-            "icon-ec-sword1": u"\uE186",
-            "icon-ec-sword2": u"\uE187",
-            "icon-ec-heart": u"\uE188",
-            "icon-ec-mm-villager": u"\uE189",
-            "icon-ec-mm-killer": u"\uE18A",
-            "icon-ec-mm-spy": u"\uE18B",
-            "icon-ec-mm-bow": u"\uE18C",
-            # EC水晶图标（队伍标识-红黄绿蓝）
-            "icon-ec-crystal-red": u"\uE190",
-            "icon-ec-crystal-red-died": u"\uE1A0",
-            "icon-ec-crystal-yellow": u"\uE191",
-            "icon-ec-crystal-yellow-died": u"\uE1A1",
-            "icon-ec-crystal-green": u"\uE192",
-            "icon-ec-crystal-green-died": u"\uE1A2",
-            "icon-ec-crystal-blue": u"\uE193",
-            "icon-ec-crystal-blue-died": u"\uE1A3",
-            # EC羊毛图标（队伍标识-8色）
-            "icon-ec-wool-red": u"\uE194",
-            "icon-ec-wool-red-died": u"\uE1A4",
-            "icon-ec-wool-yellow": u"\uE195",
-            "icon-ec-wool-yellow-died": u"\uE1A5",
-            "icon-ec-wool-green": u"\uE196",
-            "icon-ec-wool-green-died": u"\uE1A6",
-            "icon-ec-wool-blue": u"\uE197",
-            "icon-ec-wool-blue-died": u"\uE1A7",
-            "icon-ec-wool-aqua": u"\uE1B4",
-            "icon-ec-wool-aqua-died": u"\uE1C4",
-            "icon-ec-wool-white": u"\uE1B5",
-            "icon-ec-wool-white-died": u"\uE1C5",
-            "icon-ec-wool-light-purple": u"\uE1B6",
-            "icon-ec-wool-light-purple-died": u"\uE1C6",
-            "icon-ec-wool-gray": u"\uE1B7",
-            "icon-ec-wool-gray-died": u"\uE1C7",
-            "icon-ec-wool-dark-purple": u"\uE1B8",
-            "icon-ec-wool-dark-purple-died": u"\uE1C8",
-            "icon-ec-wool-gold": u"\uE1B9",
-            "icon-ec-wool-gold-died": u"\uE1C9",
-            "icon-ec-wool-dark-green": u"\uE1BA",
-            "icon-ec-wool-dark-green-died": u"\uE1CA",
-            "icon-ec-wool-dark-blue": u"\uE1BB",
-            "icon-ec-wool-dark-blue-died": u"\uE1CB",
-            # EC游戏道具图标
-            "icon-ec-sword3": u"\uE198",
-            "icon-ec-chest": u"\uE199",
-            "icon-ec-potion": u"\uE19A",
-            "icon-ec-magnify": u"\uE19B",
-            "icon-ec-block": u"\uE19C",
-            "icon-ec-key": u"\uE19D",
-            "icon-ec-diamond": u"\uE19E",
-            # EC货币图标
-            "icon-ec-coin": u"\uE19F",
-            "icon-ec-coin-mw": u"\uE18D",
-            "icon-ec-coin-mm": u"\uE18E",
-            "icon-ec-coin-ruby": u"\uE18F",
-            # EC其他UI图标
-            "icon-ec-ball": u"\uE1A8",
-            "icon-ec-star": u"\uE1A9",
-            "icon-ec-star-empty": u"\uE1AA",
-            # EC资源图标
-            "icon-ec-res-copper": u"\uE1AB",
-            "icon-ec-res-iron": u"\uE1AC",
-            "icon-ec-res-gold": u"\uE1AD",
-            "icon-ec-res-diamond": u"\uE1AE",
-            "icon-ec-res-emerald": u"\uE1AF",
-            "icon-ec-res-snowflake": u"\uE1C0",
-            # EC资源图标别名（简化版）
-            "icon-ec-iron": u"\uE1AC",
-            "icon-ec-gold": u"\uE1AD",
-            "icon-ec-diamond": u"\uE1AE",
-            "icon-ec-emerald": u"\uE1AF",
-            # EC状态图标
-            "icon-ec-ok": u"\uE1B0",
-            "icon-ec-fail": u"\uE1B1",
-            "icon-ec-up": u"\uE1B2",
-            "icon-ec-credits": u"\uE1B3",
-            # EC数字图标
-            "icon-ec-0": u"\uE1F0",
-            "icon-ec-1": u"\uE1F1",
-            "icon-ec-2": u"\uE1F2",
-            "icon-ec-3": u"\uE1F3",
-            "icon-ec-4": u"\uE1F4",
-            "icon-ec-5": u"\uE1F5",
-            "icon-ec-6": u"\uE1F6",
-            "icon-ec-7": u"\uE1F7",
-            "icon-ec-8": u"\uE1F8",
-            "icon-ec-9": u"\uE1F9",
-            "icon-ec-percent": u"\uE1FA",
-            "icon-ec-percent-black": u"\uE1FB",
-            # 特殊字符
-            "|": u"\u00A6",
-            "»": u"\u226B",
-            "«": u"\u226A"
-        }
-
-        for arg in replacements:
-            replacement_str = replacements[arg]
-            raw_msg = raw_msg.replace("{" + arg + "}", replacement_str)
-
-        for arg in args:
-            arg_str = args[arg]
-            if not isinstance(arg_str, str):
-                arg_str = str(arg_str)
-            raw_msg = raw_msg.replace("{" + arg + "}", arg_str)
-
-        return raw_msg
+        # 模板只解析一次并缓存,占位符表见util/TextTemplate.PLACEHOLDERS
+        return compile_template(raw_msg).render(args)
 
     def broadcast_message(self, message, color='\xc2\xa7f'):
         """
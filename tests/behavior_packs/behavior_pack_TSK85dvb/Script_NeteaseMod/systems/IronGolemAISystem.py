@@ -14,14 +14,10 @@ IronGolemAISystem - 铁傀儡AI管理系统(服务端)
 """
 
 import mod.server.extraServerApi as serverApi
+from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
 import time
 
 
-def distance_squared(pos1, pos2):
-    """计算两点间距离的平方"""
-    return (pos1[0] - pos2[0]) ** 2 + (pos1[1] - pos2[1]) ** 2 + (pos1[2] - pos2[2]) ** 2
-
-
 class IronGolemAISystem(serverApi.GetServerSystemCls()):
     """
     铁傀儡AI管理系统(ServerSystem)
@@ -50,11 +46,11 @@ class IronGolemAISystem(serverApi.GetServerSystemCls()):
         # 铁傀儡追踪记录 {entity_id: {'last_find_target': float, 'name_updated': bool}}
         self.golem_records = {}
 
-        # 下次Tick时间
-        self.next_tick = 0
+        # AI更新定时器(挂载在BedWarsGameSystem的共享调度器上,无追踪实体时不存在)
+        self.ai_timer = None
 
-        # 组件工厂
-        self.comp_factory = serverApi.GetEngineCompFactory()
+        # 组件工厂(按目标缓存组件句柄,见ComponentCache)
+        self.comp_factory = get_component_cache()
 
         print("[INFO] [IronGolemAISystem] 初始化完成")
 
@@ -101,20 +97,41 @@ class IronGolemAISystem(serverApi.GetServerSystemCls()):
     def Destroy(self):
         """系统销毁时调用"""
         self.LogInfo("IronGolemAISystem.Destroy")
+        self._stop_ai_timer()
         self.golem_records.clear()
         print("[INFO] [IronGolemAISystem] Destroy完成")
 
-    def Update(self):
-        """系统每帧更新"""
-        now = time.time()
-        if now < self.next_tick:
+    # ========== AI定时器 ==========
+
+    def _start_ai_timer(self):
+        """开始AI更新定时器(每秒执行一次)"""
+        if self.ai_timer is not None and self.ai_timer.is_active():
+            return
+
+        game_system = self._get_game_system()
+        if not game_system:
             return
 
-        self.next_tick = now + 1  # 每秒执行一次
+        self.ai_timer = game_system.scheduler.add_repeating(1.0, self._on_ai_timer, owner=self)
+
+    def _stop_ai_timer(self):
+        """停止AI更新定时器"""
+        if self.ai_timer is None:
+            return
+
+        game_system = self._get_game_system()
+        if game_system:
+            game_system.scheduler.cancel(self.ai_timer)
+        self.ai_timer = None
 
-        # 更新所有铁傀儡的AI
+    def _on_ai_timer(self):
+        """AI更新定时器回调"""
         self._update_all_golems()
 
+        # 没有需要追踪的实体时停止定时器,下次生成时重新开始
+        if not self.golem_records:
+            self._stop_ai_timer()
+
     # ========== 铁傀儡AI更新 ==========
 
     def _update_all_golems(self):
@@ -439,36 +456,16 @@ class IronGolemAISystem(serverApi.GetServerSystemCls()):
             golem_pos = comp_pos.GetPos()
             golem_dimension = comp_pos.GetDimension()
 
-            # 获取所有敌对队伍的玩家
-            enemy_players = game_system.team_module.get_team_players_except(golem_team)
-            if not enemy_players:
+            # 通过空间索引从近到远查找敌对队伍玩家（排除观察者）
+            snapshot = game_system.player_snapshot
+            result = game_system.player_index.nearest(
+                golem_dimension, golem_pos, k=1,
+                exclude_tag=golem_team, predicate=lambda pid: not snapshot.is_spectator(pid)
+            )
+            if not result:
                 return None
 
-            # 寻找最近的敌人
-            nearest_enemy = None
-            min_distance = float('inf')
-
-            for player_obj in enemy_players:
-                player_id = player_obj.GetPlayerId()
-
-                # 排除不同维度的玩家
-                if player_obj.GetDimensionId() != golem_dimension:
-                    continue
-
-                # 排除观察者
-                comp_game = self.comp_factory.CreateGame(serverApi.GetLevelId())
-                game_type = comp_game.GetPlayerGameType(player_id)
-                if game_type == serverApi.GetMinecraftEnum().GameType.SPECTATOR:
-                    continue
-
-                # 计算距离
-                player_pos = player_obj.GetFootPos()
-                distance = distance_squared(golem_pos, player_pos)
-
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_enemy = player_id
-
+            nearest_enemy = result[0][0]
             return nearest_enemy
 
         except Exception as e:
@@ -543,6 +540,7 @@ class IronGolemAISystem(serverApi.GetServerSystemCls()):
                 'name_updated': False
             }
             self.LogInfo("检测到新铁傀儡生成: {}".format(entity_id))
+            self._start_ai_timer()
 
     # ========== 辅助方法 ==========
 
@@ -554,7 +552,8 @@ class IronGolemAISystem(serverApi.GetServerSystemCls()):
             BedWarsGameSystem: 游戏系统实例,未找到返回None
         """
         try:
-            return serverApi.GetSystem("Script_NeteaseMod", "BedWarsGameSystem")
+            from Script_NeteaseMod.modConfig import MOD_NAME
+            return serverApi.GetSystem(MOD_NAME, "BedWarsGameSystem")
         except:
             return None
 
@@ -44,6 +44,9 @@ class PropsManagementSystem(serverApi.GetServerSystemCls()):
         # 道具处理器字典 {prop_type: IPropHandler}
         self.prop_handlers = {}
 
+        # 爆炸合并队列(TNT/火球的爆炸每Tick统一结算)
+        self.explosion_queue = None
+
         # 跨系统引用
         self.bedwars_game_system = None  # BedWarsGameSystem实例引用
 
@@ -60,6 +63,17 @@ class PropsManagementSystem(serverApi.GetServerSystemCls()):
         """系统创建时调用"""
         self.LogInfo("PropsManagementSystem.Create")
 
+        # 建立爆炸抗性表(每次服务器启动一次)
+        from Script_NeteaseMod.systems.util.ExplosionResistanceRegistry import get_explosion_resistance_registry
+        try:
+            get_explosion_resistance_registry().build()
+        except Exception as e:
+            self.LogError("建立爆炸抗性表失败: {}".format(str(e)))
+
+        # 创建爆炸合并队列
+        from Script_NeteaseMod.systems.util.ExplosionQueue import ExplosionQueue
+        self.explosion_queue = ExplosionQueue(self)
+
         # 注册所有道具处理器
         self._register_all_props()
 
@@ -90,6 +104,13 @@ class PropsManagementSystem(serverApi.GetServerSystemCls()):
 
         self.prop_handlers = {}
 
+        if self.explosion_queue:
+            self.explosion_queue.clear()
+
+        # 保存对局中新解析的方块抗性
+        from Script_NeteaseMod.systems.util.ExplosionResistanceRegistry import get_explosion_resistance_registry
+        get_explosion_resistance_registry().save()
+
         print("[INFO] [PropsManagementSystem] Destroy完成")
 
     def Update(self):
@@ -102,6 +123,10 @@ class PropsManagementSystem(serverApi.GetServerSystemCls()):
                 except Exception as e:
                     self.LogError("道具处理器更新失败: {}".format(str(e)))
 
+        # 结算本Tick提交的爆炸
+        if self.explosion_queue:
+            self.explosion_queue.flush()
+
     # ========== 日志方法 ==========
 
     def LogInfo(self, message):
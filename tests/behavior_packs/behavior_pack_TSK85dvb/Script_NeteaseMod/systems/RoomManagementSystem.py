@@ -62,8 +62,7 @@ class RoomManagementSystem(GamingStateSystem):
         # ========== 地图配置 ==========
         self.stages = []  # 地图配置列表
         self.current_stage_config = None  # 当前选中的地图
-        self._maps_in_use = set()  # 正在使用中的地图ID集合
-        self.restoring_maps = set()  # 正在还原中的地图ID集合
+        self.dimension_pool = None  # DimensionPool实例(地图维度副本池)
         self.map_backup_handlers = {}  # dimension_id -> DimensionBackupHandler
 
         # ========== 玩家管理 ==========
@@ -98,6 +97,9 @@ class RoomManagementSystem(GamingStateSystem):
         # ========== 地图投票 ==========
         self.map_vote = None  # MapVoteInstance实例
 
+        # ========== 性能监控 ==========
+        self.performance_monitor = None  # 开启引擎API调用统计时创建
+
         # ========== 调用父类__init__ ==========
         super(RoomManagementSystem, self).__init__(namespace, systemName)
 
@@ -130,6 +132,9 @@ class RoomManagementSystem(GamingStateSystem):
         # 初始化配置加载器
         self._initialize_config_loader()
 
+        # 初始化性能监控(仅在开启引擎API调用统计时)
+        self._initialize_performance_monitor()
+
         # 从JSON加载房间配置
         self._load_room_config_from_json()
 
@@ -167,17 +172,29 @@ class RoomManagementSystem(GamingStateSystem):
             self.team_module.cleanup()
             self.team_module = None
 
+        # 停止副本池健康检查
+        if self.dimension_pool:
+            self.dimension_pool.stop()
+            self.dimension_pool = None
+
         # 调用父类Destroy
         super(RoomManagementSystem, self).Destroy()
 
     def Update(self):
         """系统每帧更新"""
+        monitor = self.performance_monitor
+        if monitor:
+            monitor.on_tick_start()
+
         # 调用父类Update(驱动状态机)
         super(RoomManagementSystem, self).Update()
 
         # 更新房间逻辑
         self._update_room_logic()
 
+        if monitor:
+            monitor.on_tick_end()
+
     # ========== 游戏控制接口 ==========
 
     def start_game(self):
@@ -220,16 +237,17 @@ class RoomManagementSystem(GamingStateSystem):
             self.LogError("start_game: 找不到地图配置 map_id={}".format(selected_map_id))
             return
 
-        dimension = self.current_stage_config.get("map_dimension")
+        # 从副本池取一个干净的维度副本(同一地图的其他副本可能正在后台还原)
+        dimension = self.dimension_pool.acquire(selected_map_id)
+        if dimension is None:
+            self.LogError("start_game: 地图没有可用的维度副本 map_id={}".format(selected_map_id))
+            return
         mode = self.current_stage_config.get("mode", "team2")
 
         self.LogInfo("选择地图: map_id={}, dimension={}, mode={}".format(
             selected_map_id, dimension, mode
         ))
 
-        # 将地图标记为使用中
-        self._maps_in_use.add(selected_map_id)
-
         # 重要: 在创建预设之前设置current_dimension
         # 因为预设在on_start时会从RoomManagementSystem.current_dimension获取维度ID
         self.current_dimension = dimension
@@ -282,7 +300,11 @@ class RoomManagementSystem(GamingStateSystem):
             backup_handler = self.get_backup_handler(dimension)
             load_range = self.get_map_backup_range(selected_map_id)
             if load_range:
-                backup_handler.restore_and_start_record(load_range, is_record=True)
+                # 地图配置snapshot_reset为True时使用快照模式(可恢复被破坏的方块)
+                # 快照由副本池在开局前抓取,这里只复用,对局中不抓取
+                use_snapshot = bool(self.current_stage_config and
+                                    self.current_stage_config.get('snapshot_reset', False))
+                backup_handler.restore_and_start_record(load_range, is_record=True, use_snapshot=use_snapshot)
                 self.LogInfo("地图备份管理器已初始化（延迟3秒） dimension={} range={}".format(
                     dimension, load_range
                 ))
@@ -310,10 +332,9 @@ class RoomManagementSystem(GamingStateSystem):
 
         # 记录当前地图信息
         current_map_id = None
-        current_dimension = None
+        current_dimension = self.current_dimension
         if self.current_stage_config:
             current_map_id = self.current_stage_config.get("id")
-            current_dimension = self.current_stage_config.get("map_dimension")
 
         # 清理地图预设
         self._destroy_all_presets()
@@ -336,31 +357,8 @@ class RoomManagementSystem(GamingStateSystem):
                 current_map_id, current_dimension
             ))
 
-            # 将地图从使用中移除,添加到还原中
-            if current_map_id in self._maps_in_use:
-                self._maps_in_use.remove(current_map_id)
-            self.restoring_maps.add(current_map_id)
-
-            # 获取备份管理器并开始还原
-            backup_handler = self.get_backup_handler(current_dimension)
-
-            def on_restore_complete():
-                """地图还原完成回调"""
-                self.LogInfo("地图还原完成 map_id={} dimension={}".format(
-                    current_map_id, current_dimension
-                ))
-
-                # 从还原列表移除
-                if current_map_id in self.restoring_maps:
-                    self.restoring_maps.remove(current_map_id)
-
-                # 刷新地图投票列表
-                if self.map_vote:
-                    self.map_vote.refresh_available_maps()
-                    self.LogInfo("地图投票列表已刷新")
-
-            # 执行还原
-            backup_handler.restore(on_restore_complete)
+            # 归还副本,由副本池在后台排队还原(完成后回调on_map_copy_restored)
+            self.dimension_pool.release(current_map_id, current_dimension)
         else:
             self.LogWarn("end_game: 无法还原地图,缺少地图信息")
 
@@ -1131,6 +1129,17 @@ class RoomManagementSystem(GamingStateSystem):
 
     # ========== 系统引用初始化 ==========
 
+    def _initialize_performance_monitor(self):
+        """引擎API调用统计已安装时,创建PerformanceMonitor并挂载统计,定期输出报告"""
+        from Script_NeteaseMod.systems.util.EngineApiAccounting import get_engine_api_accounting
+        accounting = get_engine_api_accounting()
+        if not accounting.installed:
+            return
+        from Script_NeteaseMod.systems.util.PerformanceMonitor import PerformanceMonitor
+        self.performance_monitor = PerformanceMonitor(self)
+        self.performance_monitor.attach_api_accounting(accounting)
+        self.performance_monitor.enable()
+
     def _initialize_bedwars_game_system_reference(self):
         """获取BedWarsGameSystem引用"""
         try:
@@ -1194,8 +1203,8 @@ class RoomManagementSystem(GamingStateSystem):
         npc_positions = room_config.get('broadcast_score_npc_positions', [])
         self.broadcast_score_npc_positions = npc_positions
 
-        # 加载地图列表
-        self.stages = room_config.get('stages', [])
+        # 加载地图列表(同时创建地图维度副本池)
+        self.set_stages(room_config.get('stages', []))
 
         self.LogInfo("房间配置加载完成:")
         self.LogInfo("  - 房间名称: {}".format(self.playing_method_name))
@@ -1204,6 +1213,21 @@ class RoomManagementSystem(GamingStateSystem):
         self.LogInfo("  - 倒计时: {}秒".format(self.countdown_time))
         self.LogInfo("  - 地图数量: {}".format(len(self.stages)))
 
+    def set_stages(self, stages):
+        """
+        设置地图列表并重建地图维度副本池
+
+        Args:
+            stages (list): 地图配置列表
+        """
+        from Script_NeteaseMod.systems.util.DimensionPool import DimensionPool
+
+        self.stages = stages
+        if self.dimension_pool:
+            self.dimension_pool.stop()
+        self.dimension_pool = DimensionPool(self, stages)
+        self.dimension_pool.start()
+
     def apply_game_rules(self, dimension_id=None):
         """
         应用游戏规则到指定维度
@@ -2087,17 +2111,16 @@ class RoomManagementSystem(GamingStateSystem):
             map_id (str): 地图ID
 
         Returns:
-            bool: 是否正在还原中
+            bool: 是否正在还原中(所有副本都在还原时为True)
         """
-        return map_id in self.restoring_maps
+        return self.dimension_pool.is_restoring(map_id)
 
     def get_available_maps_for_vote(self):
         """
         获取可以用于投票的地图列表
 
         排除规则:
-        1. 正在还原中的地图
-        2. 正在使用的地图(游戏进行中)
+        - 没有干净维度副本的地图(副本都在还原中、使用中或已停用)
 
         Returns:
             list: 可用地图列表
@@ -2106,27 +2129,38 @@ class RoomManagementSystem(GamingStateSystem):
 
         for stage in self.stages:
             map_id = stage['id']
-            map_name = stage.get('name', u'未知地图')
 
-            # 规则1: 排除还原中的地图
-            if map_id in self.restoring_maps:
-                continue
-
-            # 规则2: 排除正在被使用的地图
-            if map_id in self._maps_in_use:
+            # 排除没有干净副本的地图
+            if not self.dimension_pool.has_clean_copy(map_id):
                 continue
 
             # 通过所有检查,地图可用
             available_stages.append(stage)
 
-        self.LogInfo("可用地图数量: {}, 还原中: {}, 使用中: {}".format(
+        metrics = self.dimension_pool.get_metrics()
+        self.LogInfo("可用地图数量: {}, 还原积压: {}, 取副本失败: {}".format(
             len(available_stages),
-            len(self.restoring_maps),
-            len(self._maps_in_use)
+            metrics['restore_backlog'],
+            metrics['acquire_misses']
         ))
 
         return available_stages
 
+    def on_map_copy_restored(self, map_id, dimension):
+        """
+        地图副本还原完成(由DimensionPool调用)
+
+        Args:
+            map_id (str): 地图ID
+            dimension (int): 维度ID
+        """
+        self.LogInfo("地图还原完成 map_id={} dimension={}".format(map_id, dimension))
+
+        # 刷新地图投票列表
+        if self.map_vote:
+            self.map_vote.refresh_available_maps()
+            self.LogInfo("地图投票列表已刷新")
+
     def create_map_vote(self):
         """创建地图投票实例"""
         from Script_NeteaseMod.systems.util.MapVoteInstance import MapVoteInstance
@@ -2226,3 +2260,37 @@ class RoomManagementSystem(GamingStateSystem):
             self.LogError("记录方块变更失败 pos={} dimension={}: {}".format(
                 pos, dimension, str(e)
             ))
+
+    def record_block_breaks_to_backup(self, positions, dimension):
+        """
+        记录一批即将被爆炸破坏的方块到备份系统
+
+        由ExplosionQueue在写入方块前调用
+
+        Args:
+            positions (list): 方块位置列表
+            dimension (int): 维度ID
+        """
+        try:
+            self.get_backup_handler(dimension).record_block_breaks(positions)
+        except Exception as e:
+            self.LogError("记录爆炸破坏失败 count={} dimension={}: {}".format(
+                len(positions), dimension, str(e)
+            ))
+
+    def record_block_break_to_backup(self, pos, dimension):
+        """
+        记录被破坏的方块到备份系统(快照模式下还原时整段写回)
+
+        由BedWarsGameSystem调用,在玩家破坏方块时记录
+
+        Args:
+            pos (tuple): 方块位置 (x, y, z)
+            dimension (int): 维度ID
+        """
+        try:
+            self.get_backup_handler(dimension).record_block_break(pos)
+        except Exception as e:
+            self.LogError("记录方块破坏失败 pos={} dimension={}: {}".format(
+                pos, dimension, str(e)
+            ))
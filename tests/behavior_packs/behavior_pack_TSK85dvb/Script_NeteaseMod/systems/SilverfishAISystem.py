@@ -16,14 +16,10 @@ SilverfishAISystem - 蠹虫AI管理系统(服务端)
 """
 
 import mod.server.extraServerApi as serverApi
+from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
 import time
 
 
-def distance_squared(pos1, pos2):
-    """计算两点间距离的平方"""
-    return (pos1[0] - pos2[0]) ** 2 + (pos1[1] - pos2[1]) ** 2 + (pos1[2] - pos2[2]) ** 2
-
-
 class SilverfishAISystem(serverApi.GetServerSystemCls()):
     """
     蠹虫AI管理系统(ServerSystem)
@@ -52,11 +48,11 @@ class SilverfishAISystem(serverApi.GetServerSystemCls()):
         # 蠹虫追踪记录 {entity_id: {'last_find_target': float, 'name_updated': bool}}
         self.silverfish_records = {}
 
-        # 下次Tick时间
-        self.next_tick = 0
+        # AI更新定时器(挂载在BedWarsGameSystem的共享调度器上,无追踪实体时不存在)
+        self.ai_timer = None
 
-        # 组件工厂
-        self.comp_factory = serverApi.GetEngineCompFactory()
+        # 组件工厂(按目标缓存组件句柄,见ComponentCache)
+        self.comp_factory = get_component_cache()
 
         print("[INFO] [SilverfishAISystem] 初始化完成")
 
@@ -103,20 +99,41 @@ class SilverfishAISystem(serverApi.GetServerSystemCls()):
     def Destroy(self):
         """系统销毁时调用"""
         self.LogInfo("SilverfishAISystem.Destroy")
+        self._stop_ai_timer()
         self.silverfish_records.clear()
         print("[INFO] [SilverfishAISystem] Destroy完成")
 
-    def Update(self):
-        """系统每帧更新"""
-        now = time.time()
-        if now < self.next_tick:
+    # ========== AI定时器 ==========
+
+    def _start_ai_timer(self):
+        """开始AI更新定时器(每秒执行一次)"""
+        if self.ai_timer is not None and self.ai_timer.is_active():
+            return
+
+        game_system = self._get_game_system()
+        if not game_system:
             return
 
-        self.next_tick = now + 1  # 每秒执行一次
+        self.ai_timer = game_system.scheduler.add_repeating(1.0, self._on_ai_timer, owner=self)
+
+    def _stop_ai_timer(self):
+        """停止AI更新定时器"""
+        if self.ai_timer is None:
+            return
+
+        game_system = self._get_game_system()
+        if game_system:
+            game_system.scheduler.cancel(self.ai_timer)
+        self.ai_timer = None
 
-        # 更新所有蠹虫的AI
+    def _on_ai_timer(self):
+        """AI更新定时器回调"""
         self._update_all_silverfish()
 
+        # 没有需要追踪的实体时停止定时器,下次生成时重新开始
+        if not self.silverfish_records:
+            self._stop_ai_timer()
+
     # ========== 蠹虫AI更新 ==========
 
     def _update_all_silverfish(self):
@@ -441,36 +458,16 @@ class SilverfishAISystem(serverApi.GetServerSystemCls()):
             silverfish_pos = comp_pos.GetPos()
             silverfish_dimension = comp_pos.GetDimension()
 
-            # 获取所有敌对队伍的玩家
-            enemy_players = game_system.team_module.get_team_players_except(silverfish_team)
-            if not enemy_players:
+            # 通过空间索引从近到远查找敌对队伍玩家（排除观察者）
+            snapshot = game_system.player_snapshot
+            result = game_system.player_index.nearest(
+                silverfish_dimension, silverfish_pos, k=1,
+                exclude_tag=silverfish_team, predicate=lambda pid: not snapshot.is_spectator(pid)
+            )
+            if not result:
                 return None
 
-            # 寻找最近的敌人
-            nearest_enemy = None
-            min_distance = float('inf')
-
-            for player_obj in enemy_players:
-                player_id = player_obj.GetPlayerId()
-
-                # 排除不同维度的玩家
-                if player_obj.GetDimensionId() != silverfish_dimension:
-                    continue
-
-                # 排除观察者
-                comp_game = self.comp_factory.CreateGame(serverApi.GetLevelId())
-                game_type = comp_game.GetPlayerGameType(player_id)
-                if game_type == serverApi.GetMinecraftEnum().GameType.SPECTATOR:
-                    continue
-
-                # 计算距离
-                player_pos = player_obj.GetFootPos()
-                distance = distance_squared(silverfish_pos, player_pos)
-
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_enemy = player_id
-
+            nearest_enemy = result[0][0]
             return nearest_enemy
 
         except Exception as e:
@@ -545,6 +542,7 @@ class SilverfishAISystem(serverApi.GetServerSystemCls()):
                 'name_updated': False
             }
             self.LogInfo("检测到新蠹虫生成: {}".format(entity_id))
+            self._start_ai_timer()
 
     # ========== 辅助方法 ==========
 
@@ -556,7 +554,8 @@ class SilverfishAISystem(serverApi.GetServerSystemCls()):
             BedWarsGameSystem: 游戏系统实例,未找到返回None
         """
         try:
-            return serverApi.GetSystem("Script_NeteaseMod", "BedWarsGameSystem")
+            from Script_NeteaseMod.modConfig import MOD_NAME
+            return serverApi.GetSystem(MOD_NAME, "BedWarsGameSystem")
         except:
             return None
 
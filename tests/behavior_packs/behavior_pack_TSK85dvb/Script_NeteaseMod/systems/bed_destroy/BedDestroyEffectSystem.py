@@ -6,7 +6,7 @@ BedDestroyEffectSystem - 破坏床特效和消息系统
 - 从JSON配置文件加载破坏床特效
 - 播放多种类型的粒子特效
 - 支持多阶段特效
-- 支持定时器管理
+- 支持定时器管理(挂载在BedWarsGameSystem的共享TickScheduler上)
 - 广播破坏床消息
 
 配置文件路径: config/ornaments/bed_destroy.json
@@ -19,58 +19,7 @@ import os
 import math
 import random
 
-
-class EffectTimer(object):
-    """特效定时器管理器"""
-
-    def __init__(self):
-        self.timers = {}  # {timer_id: {'delay': float, 'callback': func, 'start_time': float}}
-        self.timer_counter = 0
-
-    def add_timer(self, timer_id, delay, callback):
-        """
-        添加定时器
-
-        Args:
-            timer_id (str): 定时器ID
-            delay (float): 延迟时间(秒)
-            callback (callable): 回调函数
-        """
-        import time
-        self.timers[timer_id] = {
-            'delay': delay,
-            'callback': callback,
-            'start_time': time.time()
-        }
-
-    def update(self):
-        """更新定时器（每Tick调用）"""
-        import time
-        current_time = time.time()
-        expired_timers = []
-
-        for timer_id, timer_data in self.timers.items():
-            elapsed = current_time - timer_data['start_time']
-            if elapsed >= timer_data['delay']:
-                # 执行回调
-                try:
-                    timer_data['callback'](timer_id)
-                except Exception as e:
-                    print("[ERROR] [EffectTimer] 定时器回调执行失败: {}".format(str(e)))
-                expired_timers.append(timer_id)
-
-        # 移除过期定时器
-        for timer_id in expired_timers:
-            del self.timers[timer_id]
-
-    def clear_all(self):
-        """清除所有定时器"""
-        self.timers.clear()
-
-    def get_next_timer_id(self):
-        """生成下一个定时器ID"""
-        self.timer_counter += 1
-        return "timer_{}".format(self.timer_counter)
+from Script_NeteaseMod.systems.util.TickScheduler import TimerGroup
 
 
 class BedDestroyEffectSystem(object):
@@ -95,7 +44,7 @@ class BedDestroyEffectSystem(object):
         self.config = None
         self.bed_destroy_effects = {}
         self.bed_destroy_messages = {}
-        self.timer_manager = EffectTimer()
+        self.timer_manager = TimerGroup(bedwars_game_system.scheduler, "bed_destroy")
         self.effect_counter = 0
         self.player_bed_destroy_counts = {}  # {player_id: count}
 
@@ -139,13 +88,6 @@ class BedDestroyEffectSystem(object):
         except Exception as e:
             print("[ERROR] [BedDestroyEffectSystem] 清理失败: {}".format(str(e)))
 
-    def on_tick(self):
-        """每Tick更新"""
-        try:
-            self.timer_manager.update()
-        except Exception as e:
-            print("[ERROR] [BedDestroyEffectSystem] Tick更新失败: {}".format(str(e)))
-
     def _load_config(self):
         """
         加载JSON配置文件
@@ -49,6 +49,9 @@ class BedWarsEndingState(GamingState):
         # 获取获胜队伍
         winning_team = getattr(system, '_winning_team', None)
 
+        # 通知预设游戏已结束(产矿机调度器据此暂停产矿)
+        system.broadcast_preset_event("BedWarsEnding", {"winner": winning_team})
+
         # 显示胜利信息
         self._display_victory(winning_team)
 
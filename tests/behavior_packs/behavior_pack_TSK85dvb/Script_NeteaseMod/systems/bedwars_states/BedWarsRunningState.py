@@ -15,6 +15,19 @@ BedWarsRunningState - 起床战争运行状态
 import mod.server.extraServerApi as serverApi
 import time
 from ..state.GamingState import GamingState
+from ..util.HUDShadowState import HUDShadowState
+
+
+# HUD资源显示顺序及图标 [(资源类型, 图标占位符)]
+HUD_RESOURCE_ICONS = [
+    ('iron', u"{icon-ec-iron}"),
+    ('gold', u"{icon-ec-gold}"),
+    ('diamond', u"{icon-ec-diamond}"),
+    ('emerald', u"{icon-ec-emerald}"),
+]
+
+# HUD兜底完整同步间隔(HUD更新次数,每秒1次)
+HUD_FULL_SYNC_INTERVAL = 10
 
 
 class BedWarsRunningState(GamingState):
@@ -32,6 +45,10 @@ class BedWarsRunningState(GamingState):
         # HUD更新定时器
         self.next_tick_hud = 0  # 下次HUD更新时间戳
 
+        # HUD影子状态(只向客户端发送变化的条目)
+        self.hud_shadow = HUDShadowState()
+        self.hud_tick_count = 0  # HUD更新次数(用于定期完整同步)
+
         # 注册生命周期回调
         self.with_enter(self._on_enter)
         self.with_exit(self._on_exit)
@@ -88,6 +105,9 @@ class BedWarsRunningState(GamingState):
         system = self.get_system()
         system.LogInfo("BedWarsRunningState exited")
 
+        # 离开运行状态后客户端HUD由其他状态接管
+        self.hud_shadow.reset()
+
     def _on_tick(self):
         """每帧更新"""
         # 状态机的tick由父类处理
@@ -385,7 +405,8 @@ class BedWarsRunningState(GamingState):
             args['cancel'] = True
             return
 
-        # 破坏允许通过,记录日志
+        # 破坏允许通过,记录到备份并输出日志
+        system.on_player_destroy_block(pos)
         system.LogInfo("玩家 {} 破坏方块: {}".format(player_id, pos))
 
     def _on_try_place_block(self, args):
@@ -608,6 +629,9 @@ class BedWarsRunningState(GamingState):
         system = self.get_system()
         player_id = args.get('playerId')
 
+        # 清理玩家HUD影子状态(重新进入时完整同步)
+        self.hud_shadow.reset(player_id)
+
         # 检查玩家是否在对局中
         if not system.team_module.is_player_alive(player_id):
             return
@@ -680,7 +704,7 @@ class BedWarsRunningState(GamingState):
         comp = serverApi.GetEngineCompFactory().CreateDimension(player_id)
         if comp:
             dimension = comp.GetPlayerDimensionId()
-            if dimension == system.config.get('map_dimension'):
+            if dimension == system.dimension:
                 args['cancel'] = True
 
     def _on_damage(self, args):
@@ -1424,6 +1448,9 @@ class BedWarsRunningState(GamingState):
                 system.LogError("[_initialize_hud_system] RoomManagementSystem引用未找到,无法发送HUD事件")
                 return
 
+            # 客户端面板即将被清空,影子状态同步清空
+            self.hud_shadow.reset()
+
             # 广播HUD清空事件(清空顶部队伍栏)
             system.room_system.forward_hud_event(None, {
                 'type': 'stack_msg_top',
@@ -1451,6 +1478,7 @@ class BedWarsRunningState(GamingState):
         - 更新顶部队伍状态栏(显示各队伍人数和床位状态)
         - 更新底部信息栏(显示游戏阶段倒计时、击杀数、床破坏数)
         - 区分存活玩家和观战者的显示
+        - 与HUD影子状态对比,每个玩家只发送一个包含变化条目的批量数据包
 
         参考: 老项目 BedWarsRunningState.py:1105-1196
         """
@@ -1484,66 +1512,61 @@ class BedWarsRunningState(GamingState):
             from .phase_states.BedWarsSubState import BedWarsSubState
             sub_state = self.current_sub_state
 
-            # 构建倒计时事件
+            # 构建倒计时文本
             if sub_state is not None and isinstance(sub_state, BedWarsSubState):
-                timer_event = {
-                    'event': 'add_or_set',
-                    'key': 'timer',
-                    'value': u"{icon} {state} {time}".format(
-                        icon=system.format_text(u"{icon-ec-time}"),
-                        state=unicode(sub_state.next_state_name),
-                        time=sub_state.get_formatted_time_left()
-                    ),
-                }
+                timer_value = u"{icon} {state} {time}".format(
+                    icon=system.format_text(u"{icon-ec-time}"),
+                    state=unicode(sub_state.next_state_name),
+                    time=sub_state.get_formatted_time_left()
+                )
             else:
-                timer_event = {
-                    'event': 'add_or_set',
-                    'key': 'timer',
-                    'value': u"Timer"
-                }
+                timer_value = u"Timer"
+
+            # 构建各队伍状态文本(与玩家无关,所有玩家共享)
+            team_values = []
+            all_teams = system.config.get('teams', ['RED', 'BLUE', 'GREEN', 'YELLOW'])
+            for t in all_teams:
+                # 判断该队伍的床是否被破坏
+                destroyed = t in system.destroyed_beds
+
+                # 获取队伍的玩家数量(如果队伍不存在则为0)
+                players_in_team = team_to_player.get(t, [])
+                player_count = len(players_in_team)
+
+                # 获取队伍的图标(根据床状态显示不同颜色)
+                team_icon = team_types[t].get_text_icon(destroyed)
+
+                team_values.append((t, u"{icon} {color}{count}".format(
+                    icon=system.format_text(team_icon),
+                    color=u"\xa77" if destroyed else u"\xa7f",  # 灰色或白色
+                    count=unicode(player_count)
+                )))
 
             # 遍历所有维度内玩家，更新各自的HUD
             player_ids = serverApi.GetPlayerList()
+            self.hud_shadow.retain_players(player_ids)
+
+            # 定期完整同步一次(客户端已有相同内容时不会产生UI调用)
+            self.hud_tick_count += 1
+            if self.hud_tick_count % HUD_FULL_SYNC_INTERVAL == 0:
+                self.hud_shadow.request_full_sync()
             for player_id in player_ids:
                 try:
                     # 获取玩家队伍
                     team = system.team_module.get_player_team(player_id)
 
+                    # 与影子状态对比,只记录变化的条目
+                    batch = self.hud_shadow.begin(player_id)
+
                     # === 构建顶部队伍状态栏 ===
                     # 重要: 遍历游戏模式中定义的所有队伍,而不是只遍历有玩家的队伍
                     # 这样即使某些队伍没有玩家,也会显示在HUD上(显示0人)
-                    events_top = []
-                    all_teams = system.config.get('teams', ['RED', 'BLUE', 'GREEN', 'YELLOW'])
-                    for t in all_teams:
-                        # 判断该队伍的床是否被破坏
-                        destroyed = t in system.destroyed_beds
-
-                        # 获取队伍的玩家数量(如果队伍不存在则为0)
-                        players_in_team = team_to_player.get(t, [])
-                        player_count = len(players_in_team)
-
-                        # 获取队伍的图标(根据床状态显示不同颜色)
-                        team_icon = team_types[t].get_text_icon(destroyed)
-
-                        events_top.append({
-                            'event': 'add_or_set',
-                            'key': 'team_' + t,
-                            'value': u"{icon} {color}{count}".format(
-                                icon=system.format_text(team_icon),
-                                color=u"\xa77" if destroyed else u"\xa7f",  # 灰色或白色
-                                count=unicode(player_count)
-                            ),
-                            'border': (team == t)  # 当前玩家的队伍显示边框
-                        })
-
-                    # 发送顶部HUD更新事件(通过RoomManagementSystem转发)
-                    system.room_system.forward_hud_event(player_id, {
-                        'type': 'stack_msg_top',
-                        'events': events_top
-                    })
+                    for t, value in team_values:
+                        # 当前玩家的队伍显示边框
+                        batch.set('stack_msg_top', 'team_' + t, value, border=(team == t))
 
                     # === 构建底部信息栏 ===
-                    events_bottom = [timer_event]
+                    batch.set('stack_msg_bottom', 'timer', timer_value)
 
                     if team is not None:
                         # 存活玩家：显示击杀数、床破坏数和资源数量
@@ -1554,110 +1577,44 @@ class BedWarsRunningState(GamingState):
 
                         # 显示资源（铁锭、金锭、钻石、绿宝石）
                         # 只显示数量大于0的资源
-                        if resource_counts['iron'] > 0:
-                            events_bottom.append({
-                                'event': 'add_or_set',
-                                'key': 'resource_iron',
-                                'value': u"{icon} {count}".format(
-                                    icon=system.format_text(u"{icon-ec-iron}"),
-                                    count=unicode(resource_counts['iron'])
-                                ),
-                            })
-                        else:
-                            events_bottom.append({
-                                'event': 'remove',
-                                'key': 'resource_iron'
-                            })
-
-                        if resource_counts['gold'] > 0:
-                            events_bottom.append({
-                                'event': 'add_or_set',
-                                'key': 'resource_gold',
-                                'value': u"{icon} {count}".format(
-                                    icon=system.format_text(u"{icon-ec-gold}"),
-                                    count=unicode(resource_counts['gold'])
-                                ),
-                            })
-                        else:
-                            events_bottom.append({
-                                'event': 'remove',
-                                'key': 'resource_gold'
-                            })
-
-                        if resource_counts['diamond'] > 0:
-                            events_bottom.append({
-                                'event': 'add_or_set',
-                                'key': 'resource_diamond',
-                                'value': u"{icon} {count}".format(
-                                    icon=system.format_text(u"{icon-ec-diamond}"),
-                                    count=unicode(resource_counts['diamond'])
-                                ),
-                            })
-                        else:
-                            events_bottom.append({
-                                'event': 'remove',
-                                'key': 'resource_diamond'
-                            })
-
-                        if resource_counts['emerald'] > 0:
-                            events_bottom.append({
-                                'event': 'add_or_set',
-                                'key': 'resource_emerald',
-                                'value': u"{icon} {count}".format(
-                                    icon=system.format_text(u"{icon-ec-emerald}"),
-                                    count=unicode(resource_counts['emerald'])
-                                ),
-                            })
-                        else:
-                            events_bottom.append({
-                                'event': 'remove',
-                                'key': 'resource_emerald'
-                            })
+                        for resource, icon in HUD_RESOURCE_ICONS:
+                            key = 'resource_' + resource
+                            if resource_counts[resource] > 0:
+                                batch.set('stack_msg_bottom', key, u"{icon} {count}".format(
+                                    icon=system.format_text(icon),
+                                    count=unicode(resource_counts[resource])
+                                ))
+                            else:
+                                batch.remove('stack_msg_bottom', key)
 
                         # 显示击杀数和床破坏数
-                        events_bottom.append({
-                            'event': 'add_or_set',
-                            'key': 'kill',
-                            'value': u"{icon} {count}".format(
-                                icon=system.format_text(u"{icon-ec-sword0}"),
-                                count=unicode(player_score.kills)
-                            ),
-                        })
-                        events_bottom.append({
-                            'event': 'add_or_set',
-                            'key': 'destroy',
-                            'value': u"{icon} {count}".format(
-                                icon=system.format_text(u"{icon-ec-crystal-destroy}"),
-                                count=unicode(player_score.destroys)
-                            ),
-                        })
+                        batch.set('stack_msg_bottom', 'kill', u"{icon} {count}".format(
+                            icon=system.format_text(u"{icon-ec-sword0}"),
+                            count=unicode(player_score.kills)
+                        ))
+                        batch.set('stack_msg_bottom', 'destroy', u"{icon} {count}".format(
+                            icon=system.format_text(u"{icon-ec-crystal-destroy}"),
+                            count=unicode(player_score.destroys)
+                        ))
                     else:
                         # 观战者：移除击杀和破坏数，显示观战提示
-                        events_bottom.append({
-                            'event': 'remove',
-                            'key': 'kill'
-                        })
-                        events_bottom.append({
-                            'event': 'remove',
-                            'key': 'destroy'
-                        })
-                        events_bottom.append({
-                            'event': 'add_or_set',
-                            'key': 'team',  # 修复: 老项目使用'team'作为key
-                            'value': u"\xa77当前为观战者，本局结束后将自动开始下一局"
-                        })
-
-                    # 发送底部HUD更新事件(通过RoomManagementSystem转发)
-                    system.room_system.forward_hud_event(player_id, {
-                        'type': 'stack_msg_bottom',
-                        'events': events_bottom
-                    })
+                        batch.remove('stack_msg_bottom', 'kill')
+                        batch.remove('stack_msg_bottom', 'destroy')
+                        # 修复: 老项目使用'team'作为key
+                        batch.set('stack_msg_bottom', 'team', u"\xa77当前为观战者，本局结束后将自动开始下一局")
+
+                    # 有变化时才发送(顶部和底部合并为一个数据包,通过RoomManagementSystem转发)
+                    packet = batch.build()
+                    if packet:
+                        system.room_system.forward_hud_event(player_id, packet)
 
                 except Exception as e:
                     system.LogError("[_on_tick_hud] 更新玩家{}的HUD失败: {}".format(
                         player_id, str(e)
                     ))
 
+            self.hud_shadow.end()
+
         except Exception as e:
             system.LogError("[_on_tick_hud] HUD更新失败: {}".format(str(e)))
             import traceback
@@ -1670,7 +1627,7 @@ class BedWarsRunningState(GamingState):
         获取玩家当前持有的资源数量
 
         功能:
-        - 遍历玩家背包，统计铁锭、金锭、钻石、绿宝石的数量
+        - 从背包镜像读取铁锭、金锭、钻石、绿宝石的数量
         - 用于HUD资源显示
 
         Args:
@@ -1687,32 +1644,14 @@ class BedWarsRunningState(GamingState):
         }
 
         try:
-            # 获取玩家背包物品
-            comp_item = serverApi.GetEngineCompFactory().CreateItem(player_id)
-            inv_items = comp_item.GetPlayerAllItems(
-                serverApi.GetMinecraftEnum().ItemPosType.INVENTORY
-            )
-
-            # 遍历背包，统计资源
-            for item_dict in inv_items:
-                if not item_dict or item_dict.get('count', 0) <= 0:
-                    continue
-
-                item_name = item_dict.get('newItemName', '')
-                item_count = item_dict.get('count', 0)
-
-                # 铁锭
-                if item_name == 'minecraft:iron_ingot':
-                    resource_counts['iron'] += item_count
-                # 金锭
-                elif item_name == 'minecraft:gold_ingot':
-                    resource_counts['gold'] += item_count
-                # 钻石
-                elif item_name == 'minecraft:diamond':
-                    resource_counts['diamond'] += item_count
-                # 绿宝石
-                elif item_name == 'minecraft:emerald':
-                    resource_counts['emerald'] += item_count
+            # 从背包镜像读取(背包未变化时不查询引擎)
+            from Script_NeteaseMod.systems.util.InventoryMirror import get_inventory_mirror
+            mirror = get_inventory_mirror()
+
+            resource_counts['iron'] = mirror.get_item_count(player_id, 'minecraft:iron_ingot')
+            resource_counts['gold'] = mirror.get_item_count(player_id, 'minecraft:gold_ingot')
+            resource_counts['diamond'] = mirror.get_item_count(player_id, 'minecraft:diamond')
+            resource_counts['emerald'] = mirror.get_item_count(player_id, 'minecraft:emerald')
 
         except Exception as e:
             system = self.get_system()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+GeneratorTextClientSystem - 产矿机状态与浮空文字客户端系统
+
+功能说明：
+    接收服务端每Tick合并发送的产矿机状态(GeneratorStateBatch),
+    并统一驱动所有产矿机的浮空文字刷新(GeneratorTextUpdater)。
+
+核心职责：
+    1. 监听BedWarsGameSystem的GeneratorStateBatch事件,分发到产矿机预设实例
+    2. 每Tick调用GeneratorTextUpdater.update(),只推送有变化且在视距内的浮空文字
+"""
+
+import mod.client.extraClientApi as clientApi
+
+from Script_NeteaseMod.systems.util.GeneratorSyncBatcher import BATCH_EVENT_NAME
+from Script_NeteaseMod.systems.util.GeneratorTextUpdater import get_generator_text_updater
+
+ClientSystem = clientApi.GetClientSystemCls()
+
+
+class GeneratorTextClientSystem(ClientSystem):
+    """产矿机状态与浮空文字客户端系统"""
+
+    def __init__(self, namespace, systemName):
+        super(GeneratorTextClientSystem, self).__init__(namespace, systemName)
+        self.text_updater = get_generator_text_updater()
+        print("[INFO] [GeneratorTextClientSystem] 产矿机文字客户端系统初始化")
+
+    def Create(self):
+        """系统创建时调用"""
+        from Script_NeteaseMod.modConfig import MOD_NAME
+        self.ListenForEvent(
+            MOD_NAME,             # 服务端namespace
+            "BedWarsGameSystem",  # 服务端systemName
+            BATCH_EVENT_NAME,
+            self,
+            self._on_generator_state_batch
+        )
+        print("[INFO] [GeneratorTextClientSystem] 事件监听注册完成")
+
+    def Destroy(self):
+        """系统销毁"""
+        self.text_updater.clear()
+        print("[INFO] [GeneratorTextClientSystem] 产矿机文字客户端系统销毁")
+        super(GeneratorTextClientSystem, self).Destroy()
+
+    def Update(self):
+        """系统Tick更新: 刷新视距内有变化的浮空文字"""
+        try:
+            self.text_updater.update()
+        except Exception as e:
+            print("[ERROR] [GeneratorTextClientSystem] 刷新浮空文字失败: {}".format(str(e)))
+
+    # ===== 事件处理 =====
+
+    def _on_generator_state_batch(self, args):
+        """
+        处理服务端合并的产矿机状态
+
+        Args:
+            args (dict): {'generators': [产矿机状态, ...]}
+        """
+        self.text_updater.apply_batch(args)
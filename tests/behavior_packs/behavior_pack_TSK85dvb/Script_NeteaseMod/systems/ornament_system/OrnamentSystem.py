@@ -491,18 +491,6 @@ class OrnamentSystem(object):
             import traceback
             traceback.print_exc()
 
-    # ========== 更新方法 ==========
-
-    def update(self):
-        """
-        更新饰品系统 - 需要在游戏主循环中调用
-        主要用于更新特效定时器
-        """
-        if self.victory_dance_manager:
-            self.victory_dance_manager.update()
-
-        # 床破坏特效管理器使用同一个定时器,不需要单独update
-
     # ========== 游戏事件处理 ==========
 
     def on_game_starting(self, dimension):
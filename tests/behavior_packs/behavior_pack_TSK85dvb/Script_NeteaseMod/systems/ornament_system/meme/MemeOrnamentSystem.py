@@ -13,6 +13,7 @@ MemeOrnamentSystem - 墓碑装饰系统
 """
 
 import mod.server.extraServerApi as serverApi
+from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
 import json
 import os
 
@@ -33,7 +34,7 @@ class MemeOrnamentSystem(object):
         """
         self.ornament_system = ornament_system
         self.game_system = ornament_system.game_system  # BedWarsGameSystem
-        self.comp_factory = serverApi.GetEngineCompFactory()
+        self.comp_factory = get_component_cache()
 
         # 墓碑配置数据 {meme_id: config_dict}
         self.meme_configs = {}
@@ -19,42 +19,7 @@ import random
 import os
 import json
 
-
-class EffectTimer(object):
-    """特效定时器管理器"""
-
-    def __init__(self):
-        self.active_timers = {}  # {timer_id: {'start_time': float, 'duration': float, 'callback': func}}
-
-    def add_timer(self, timer_id, duration, callback):
-        """添加定时器"""
-        self.active_timers[timer_id] = {
-            'start_time': time.time(),
-            'duration': duration,
-            'callback': callback
-        }
-
-    def update(self):
-        """更新定时器状态,调用到期的回调"""
-        current_time = time.time()
-        expired_timers = []
-
-        for timer_id, timer_info in self.active_timers.items():
-            if current_time - timer_info['start_time'] >= timer_info['duration']:
-                try:
-                    timer_info['callback'](timer_id)
-                except Exception as e:
-                    print("[ERROR] [EffectTimer] 回调执行失败: {}".format(str(e)))
-                expired_timers.append(timer_id)
-
-        # 清理过期定时器
-        for timer_id in expired_timers:
-            del self.active_timers[timer_id]
-
-    def clear_timer(self, timer_id):
-        """清除指定定时器"""
-        if timer_id in self.active_timers:
-            del self.active_timers[timer_id]
+from Script_NeteaseMod.systems.util.TickScheduler import TimerGroup
 
 
 class VictoryDanceManager(object):
@@ -76,7 +41,7 @@ class VictoryDanceManager(object):
         self.game_system = ornament_system.game_system
 
         # 定时器管理器
-        self.timer_manager = EffectTimer()
+        self.timer_manager = TimerGroup(self.game_system.scheduler, "victory_effect")
         self.effect_counter = 0  # 用于生成唯一的特效ID
 
         # 加载配置
@@ -132,15 +97,11 @@ class VictoryDanceManager(object):
     def cleanup(self):
         """清理胜利之舞管理器"""
         try:
-            self.timer_manager.active_timers = {}
+            self.timer_manager.clear_all()
             print("[INFO] [VictoryDanceManager] 清理完成")
         except Exception as e:
             print("[ERROR] [VictoryDanceManager] 清理失败: {}".format(str(e)))
 
-    def update(self):
-        """更新定时器 - 需要在游戏主循环中调用"""
-        self.timer_manager.update()
-
     def get_next_effect_id(self):
         """获取下一个特效ID"""
         self.effect_counter += 1
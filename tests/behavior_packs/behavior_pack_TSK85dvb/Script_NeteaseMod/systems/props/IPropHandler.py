@@ -83,3 +83,16 @@ class IPropHandler(object):
         if game_system:
             return getattr(game_system, 'team_module', None)
         return None
+
+    def submit_explosion(self, explosion):
+        """
+        提交爆炸到PropsManagementSystem的爆炸合并队列(本Tick统一结算)
+
+        Args:
+            explosion (BedWarsExplosion): 已配置好的爆炸实例
+        """
+        queue = getattr(self.system, 'explosion_queue', None) if self.system else None
+        if queue is not None:
+            queue.submit(explosion)
+        else:
+            explosion.explode()
@@ -153,7 +153,7 @@ class PropFireballHandler(IPropHandler):
             owner_id (str): 投掷者ID
         """
         # 导入爆炸系统
-        from systems.util.BedWarsExplosion import BedWarsExplosion
+        from Script_NeteaseMod.systems.util.BedWarsExplosion import BedWarsExplosion
 
         # 获取游戏系统
         game_system = self.get_game_system()
@@ -173,8 +173,8 @@ class PropFireballHandler(IPropHandler):
         # 配置爆炸参数
         self._configure_explosion(explosion, game_system)
 
-        # 执行爆炸
-        explosion.explode()
+        # 提交到爆炸合并队列(同一Tick的多次爆炸统一结算)
+        self.submit_explosion(explosion)
 
         print("[INFO] [PropFireballHandler] 火球爆炸: pos={} owner={}".format(entity_pos, owner_id))
 
@@ -186,10 +186,10 @@ class PropFireballHandler(IPropHandler):
             explosion: BedWarsExplosion实例
             game_system: BedWarsGameSystem实例
         """
-        # 配置1: 染色玻璃完全免疫爆炸
-        explosion.explosion_resistance_map = {
-            "minecraft:stained_glass": 6000
-        }
+        from Script_NeteaseMod.systems.util.ExplosionResistanceRegistry import get_explosion_resistance_registry
+
+        # 配置1: 启动时建立的爆炸抗性表(染色玻璃在表中标记为免疫爆炸)
+        explosion.resistance_registry = get_explosion_resistance_registry()
 
         # 配置2: 只破坏玩家放置的方块
         def check_valid_pos(pos):
@@ -25,13 +25,13 @@ class PropTNTHandler(IPropHandler):
     核心功能:
     - 监听ServerItemUseOnEvent事件
     - 生成TNT实体(2秒爆炸延时)
-    - Tick检测TNT实体爆炸时机
-    - 调用BedWarsExplosion执行爆炸
+    - 在共享调度器上为每个TNT挂载引爆定时器
+    - 爆炸提交到爆炸合并队列(ExplosionQueue),同一Tick统一结算
     """
 
     def __init__(self):
         super(PropTNTHandler, self).__init__()
-        self.enable_tick = True  # 启用Tick更新
+        self.enable_tick = False  # 引爆由共享调度器驱动,不需要Tick更新
         self.event_registered = False
 
         # TNT实体跟踪字典
@@ -40,8 +40,6 @@ class PropTNTHandler(IPropHandler):
 
         # 配置参数
         self.explode_time = 2.0  # 爆炸延时(秒)
-        self.tick_interval = 0.05  # Tick检查间隔(秒)
-        self.next_tick = 0  # 下次Tick执行时间
 
     def on_create(self, system):
         """
@@ -62,28 +60,15 @@ class PropTNTHandler(IPropHandler):
         # 取消事件监听
         self._unregister_item_use_event()
 
-        # 清理所有TNT实体记录
+        # 取消未引爆的定时器并清理所有TNT实体记录
+        game_system = self.get_game_system()
+        if game_system:
+            game_system.scheduler.cancel_owner(self)
         self.tnt_entities = {}
 
         super(PropTNTHandler, self).on_destroy()
         print("[INFO] [PropTNTHandler] 销毁完成")
 
-    def on_update(self):
-        """
-        每帧更新(由PropsManagementSystem.Update调用)
-
-        检测所有TNT实体的爆炸时机
-        """
-        now = time.time()
-
-        # 频率控制: 每0.05秒执行一次
-        if self.next_tick > now:
-            return
-        self.next_tick = now + self.tick_interval
-
-        # 检测所有TNT实体
-        self._check_tnt_explosions(now)
-
     def on_trigger(self, player_id, **kwargs):
         """
         道具触发(TNT不使用此接口,使用物品使用事件)
@@ -186,6 +171,10 @@ class PropTNTHandler(IPropHandler):
                     'dimension': dimension_id
                 }
 
+                # 挂载引爆定时器
+                game_system.scheduler.add(self.explode_time, self._trigger_explosion,
+                                          tnt_entity_id, owner=self)
+
                 # 减少物品数量
                 self._consume_tnt_item(entity_id)
 
@@ -274,27 +263,6 @@ class PropTNTHandler(IPropHandler):
 
     # ========== 爆炸检测 ==========
 
-    def _check_tnt_explosions(self, now):
-        """
-        检测所有TNT实体的爆炸时机
-
-        Args:
-            now (float): 当前时间戳
-        """
-        # 收集需要爆炸的TNT
-        entities_to_explode = []
-
-        for entity_id, data in self.tnt_entities.items():
-            spawn_time = data['spawn_time']
-
-            # 检查是否超时
-            if now - spawn_time >= self.explode_time:
-                entities_to_explode.append(entity_id)
-
-        # 执行爆炸
-        for entity_id in entities_to_explode:
-            self._trigger_explosion(entity_id)
-
     def _trigger_explosion(self, entity_id):
         """
         触发TNT爆炸
@@ -314,7 +282,7 @@ class PropTNTHandler(IPropHandler):
                 return
 
             # 导入爆炸系统
-            from systems.util.BedWarsExplosion import BedWarsExplosion
+            from Script_NeteaseMod.systems.util.BedWarsExplosion import BedWarsExplosion
 
             # 创建爆炸实例
             explosion = BedWarsExplosion(
@@ -328,8 +296,8 @@ class PropTNTHandler(IPropHandler):
             # 配置爆炸参数
             self._configure_explosion(explosion, game_system, data)
 
-            # 执行爆炸
-            explosion.explode()
+            # 提交到爆炸合并队列(同一Tick的多次爆炸统一结算)
+            self.submit_explosion(explosion)
 
             # 销毁TNT实体（先检查实体是否存在）
             comp_game = serverApi.GetEngineCompFactory().CreateGame(serverApi.GetLevelId())
@@ -361,10 +329,10 @@ class PropTNTHandler(IPropHandler):
             game_system: BedWarsGameSystem实例
             tnt_data: TNT实体数据
         """
-        # 配置1: 染色玻璃完全免疫爆炸
-        explosion.explosion_resistance_map = {
-            "minecraft:stained_glass": 6000
-        }
+        from Script_NeteaseMod.systems.util.ExplosionResistanceRegistry import get_explosion_resistance_registry
+
+        # 配置1: 启动时建立的爆炸抗性表(染色玻璃在表中标记为免疫爆炸)
+        explosion.resistance_registry = get_explosion_resistance_registry()
 
         # 配置2: 只破坏玩家放置的方块
         def check_valid_pos(pos):
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+ItemTierRegistry - 物品品质等级表
+
+功能:
+- 模块导入时从shop_config预先建立 物品名称 -> (品质系列, 等级) 的表,比较品质时不再对排序列表调用index
+- 品质系列: 胸甲/护腿/剑(shop_config.ORDERED_*),以及可升级商品的升级路径(系列名为商品ID,如tool.pickaxe-upgrade)
+- 升级路径系列同时建立降级表(重生时降低一级,最低一级保持不变)
+
+使用方法:
+    registry = get_item_tier_registry()
+
+    registry.get_tier(item_name, FAMILY_SWORD)  # 等级,不属于该系列时为None
+    registry.is_at_least(current_name, target_name, FAMILY_CHESTPLATE)  # current的品质不低于target
+    registry.get_highest_tier(FAMILY_SWORD, item_names)  # 一组物品中的最高等级
+    registry.get_demotion_map(["tool.pickaxe-upgrade"])  # {物品名称: 降级后的物品名称}
+
+说明:
+- 不属于系列的物品没有品质,比较结果为False(不抛出异常)
+- 同一物品可以属于多个系列,查询时总是指定系列
+"""
+
+from __future__ import print_function
+
+from Script_NeteaseMod.config.shop_config import GOODS_POOL, ORDERED_ARMOR_CHESTPLATE, ORDERED_LEGGINGS, ORDERED_SWORDS
+
+# 品质系列
+FAMILY_CHESTPLATE = "chestplate"
+FAMILY_LEGGINGS = "leggings"
+FAMILY_SWORD = "sword"
+
+
+class ItemTierRegistry(object):
+    """
+    物品品质等级表
+
+    数据结构:
+    - _tiers: {family: {item_name: tier}} 系列内的等级(0为最低)
+    - _families: {family: tuple(item_name)} 按等级排序的物品
+    - _lookup: {item_name: (family, tier)} 物品第一次登记的系列
+    - _demotions: {family: {item_name: demoted_name}} 可降级系列的降级表
+    """
+
+    def __init__(self):
+        self._tiers = {}
+        self._families = {}
+        self._lookup = {}
+        self._demotions = {}
+        self._demotion_maps = {}
+
+    def register_family(self, family, ordered_names, demotable=False):
+        """
+        登记品质系列
+
+        Args:
+            family (str): 系列名称
+            ordered_names (list): 按品质从低到高排序的物品名称
+            demotable (bool): 是否建立降级表
+        """
+        names = tuple(ordered_names)
+        tiers = {}
+        for tier, item_name in enumerate(names):
+            if item_name in tiers:
+                print("[WARN] [ItemTierRegistry] 系列中物品重复: family={}, item={}".format(family, item_name))
+                continue
+            tiers[item_name] = tier
+            self._lookup.setdefault(item_name, (family, tier))
+
+        self._tiers[family] = tiers
+        self._families[family] = names
+        if demotable:
+            self._demotions[family] = dict(
+                (item_name, names[max(0, tier - 1)]) for item_name, tier in tiers.items())
+        self._demotion_maps = {}
+
+    def lookup(self, item_name):
+        """
+        查询物品的品质系列与等级
+
+        Args:
+            item_name (str): 物品名称
+
+        Returns:
+            tuple: (family, tier),没有登记时为None
+        """
+        return self._lookup.get(item_name)
+
+    def get_tier(self, item_name, family):
+        """
+        查询物品在系列中的等级
+
+        Args:
+            item_name (str): 物品名称
+            family (str): 系列名称
+
+        Returns:
+            int: 等级(0为最低),不属于该系列时为None
+        """
+        tiers = self._tiers.get(family)
+        return tiers.get(item_name) if tiers is not None else None
+
+    def get_family_items(self, family):
+        """
+        获取系列中按等级排序的物品
+
+        Args:
+            family (str): 系列名称
+
+        Returns:
+            tuple: 物品名称,没有该系列时为空
+        """
+        return self._families.get(family, ())
+
+    def is_at_least(self, current_name, target_name, family):
+        """
+        current的品质是否不低于target
+
+        Args:
+            current_name (str): 当前物品名称
+            target_name (str): 比较的物品名称
+            family (str): 系列名称
+
+        Returns:
+            bool: 两者都属于该系列且current的等级不低于target时为True
+        """
+        tiers = self._tiers.get(family)
+        if tiers is None:
+            return False
+        current_tier = tiers.get(current_name)
+        target_tier = tiers.get(target_name)
+        if current_tier is None or target_tier is None:
+            return False
+        return target_tier <= current_tier
+
+    def get_highest_tier(self, family, item_names, default=-1):
+        """
+        获取一组物品在系列中的最高等级
+
+        Args:
+            family (str): 系列名称
+            item_names: 物品名称(可迭代)
+            default (int): 没有属于该系列的物品时的返回值
+
+        Returns:
+            int: 最高等级
+        """
+        get_tier = (self._tiers.get(family) or {}).get
+        highest = default
+        for item_name in item_names:
+            tier = get_tier(item_name, -1)
+            if tier > highest:
+                highest = tier
+        return highest
+
+    def get_demotion_map(self, families):
+        """
+        获取多个系列合并后的降级表(按系列组合缓存)
+
+        Args:
+            families (list): 系列名称(death_item_demotion中的商品ID)
+
+        Returns:
+            dict: {物品名称: 降级后的物品名称}
+        """
+        key = tuple(families)
+        demotion_map = self._demotion_maps.get(key)
+        if demotion_map is None:
+            demotion_map = {}
+            for family in key:
+                demotions = self._demotions.get(family)
+                if demotions is None:
+                    print("[WARN] [ItemTierRegistry] 没有可降级的系列: {}".format(family))
+                    continue
+                demotion_map.update(demotions)
+            self._demotion_maps[key] = demotion_map
+        return demotion_map
+
+
+def build_item_tier_registry():
+    """
+    从shop_config建立品质等级表
+
+    Returns:
+        ItemTierRegistry: 品质等级表
+    """
+    registry = ItemTierRegistry()
+    registry.register_family(FAMILY_CHESTPLATE, ORDERED_ARMOR_CHESTPLATE)
+    registry.register_family(FAMILY_LEGGINGS, ORDERED_LEGGINGS)
+    registry.register_family(FAMILY_SWORD, ORDERED_SWORDS)
+    for goods_config in GOODS_POOL:
+        if goods_config.get("type") == "item_upgrade" and goods_config.get("upgrade_path"):
+            registry.register_family(goods_config.get("id"), goods_config.get("upgrade_path"), demotable=True)
+    return registry
+
+
+# 全局单例(导入时建立)
+_item_tier_registry = build_item_tier_registry()
+
+
+def get_item_tier_registry():
+    """
+    获取品质等级表单例
+
+    Returns:
+        ItemTierRegistry: 品质等级表
+    """
+    return _item_tier_registry
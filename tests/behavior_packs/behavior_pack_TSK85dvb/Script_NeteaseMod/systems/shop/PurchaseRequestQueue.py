@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+商店购买请求队列(每玩家限速 + 每Tick处理预算)
+
+职责:
+- 每个玩家一个令牌桶: 每个购买请求消耗一个令牌,令牌按Tick补充,没有令牌时拒绝请求(连点器)
+- 每个玩家一个有界队列: 队列中待处理的购买次数达到上限时拒绝请求
+- 与队尾相同商品的请求、同一Tick内重复的请求(双击)合并为一个"购买N次"的条目
+- ShopServerSystem.Update按每Tick预算轮流取出各玩家的条目处理,处理完后每个玩家只刷新一次商店UI
+
+使用方法:
+    queue = PurchaseRequestQueue()
+    result = queue.push(player_id, goods_key)  # PUSH_QUEUED / PUSH_MERGED / PUSH_RATE_LIMITED / PUSH_QUEUE_FULL
+
+    queue.tick()  # 每Tick开始时调用
+    for player_id, goods_key, count in queue.pop_batch(PURCHASES_PER_TICK):
+        ...  # 购买count次
+
+说明:
+- 令牌补充按Tick计数计算(与引擎时钟无关),在玩家下一次请求时惰性补充
+- 跨Tick只与队尾合并,不改变购买顺序: A A B | A -> [A×2, B, A]
+- 同一Tick内的重复请求合并到本Tick该商品的条目(N+1): A B A -> [A×2, B]
+- 一个条目超出剩余预算时拆分,剩余次数留在队首下一Tick继续处理
+"""
+
+from __future__ import print_function
+
+from collections import deque
+
+# 令牌桶容量(允许连续点击的次数)
+BUCKET_CAPACITY = 8
+# 每Tick补充的令牌数(30Tick/秒时约为每秒6次)
+BUCKET_REFILL_PER_TICK = 0.2
+# 每个玩家队列中待处理的购买次数上限
+QUEUE_LIMIT = 16
+# 每Tick最多处理的购买次数(所有玩家合计)
+PURCHASES_PER_TICK = 32
+
+# push的结果
+PUSH_QUEUED = "queued"  # 新建条目
+PUSH_MERGED = "merged"  # 合并到队尾条目
+PUSH_RATE_LIMITED = "rate_limited"  # 令牌不足,已拒绝
+PUSH_QUEUE_FULL = "queue_full"  # 队列已满,已拒绝
+
+
+class PurchaseRequestQueue(object):
+    """
+    商店购买请求队列
+
+    数据结构:
+    - _buckets: {player_id: [tokens, last_tick]} 令牌桶
+    - _queues: {player_id: deque([[goods_key, count], ...])} 待处理条目
+    - _pending: {player_id: int} 队列中待处理的购买次数
+    - _order: deque([player_id, ...]) 有待处理条目的玩家(轮流处理)
+    - _tick_entries: {(player_id, goods_key): entry} 本Tick收到请求的条目(同一Tick内的重复请求合并到该条目)
+    """
+
+    def __init__(self, capacity=BUCKET_CAPACITY, refill_per_tick=BUCKET_REFILL_PER_TICK, queue_limit=QUEUE_LIMIT):
+        self.capacity = capacity
+        self.refill_per_tick = refill_per_tick
+        self.queue_limit = queue_limit
+        self.tick_index = 0
+        self._buckets = {}
+        self._queues = {}
+        self._pending = {}
+        self._order = deque()
+        self._tick_entries = {}
+
+        # 统计数据
+        self.request_count = 0  # 收到的请求数
+        self.merged_count = 0  # 合并到已有条目的请求数
+        self.folded_count = 0  # 其中同一Tick内重复、合并到本Tick条目的请求数
+        self.rate_limited_count = 0  # 令牌不足被拒绝的请求数
+        self.queue_full_count = 0  # 队列已满被拒绝的请求数
+        self.popped_count = 0  # 已取出处理的购买次数
+        self.max_pending = 0  # 单个玩家待处理购买次数的峰值
+
+    def tick(self):
+        """开始新的Tick(令牌按Tick计数补充)"""
+        self.tick_index += 1
+        if self._tick_entries:
+            self._tick_entries = {}
+
+    def _take_token(self, player_id):
+        bucket = self._buckets.get(player_id)
+        if bucket is None:
+            bucket = self._buckets[player_id] = [float(self.capacity), self.tick_index]
+        elif bucket[1] != self.tick_index:
+            bucket[0] = min(float(self.capacity), bucket[0] + (self.tick_index - bucket[1]) * self.refill_per_tick)
+            bucket[1] = self.tick_index
+        if bucket[0] < 1.0:
+            return False
+        bucket[0] -= 1.0
+        return True
+
+    def push(self, player_id, goods_key):
+        """
+        加入购买请求
+
+        Args:
+            player_id (str): 玩家ID
+            goods_key (str): 商品键
+
+        Returns:
+            str: PUSH_QUEUED / PUSH_MERGED / PUSH_RATE_LIMITED / PUSH_QUEUE_FULL
+        """
+        self.request_count += 1
+        pending = self._pending.get(player_id, 0)
+        if pending >= self.queue_limit:
+            self.queue_full_count += 1
+            return PUSH_QUEUE_FULL
+        if not self._take_token(player_id):
+            self.rate_limited_count += 1
+            return PUSH_RATE_LIMITED
+
+        queue = self._queues.get(player_id)
+        if queue is None:
+            queue = self._queues[player_id] = deque()
+        if not queue:
+            self._order.append(player_id)
+
+        self._pending[player_id] = pending + 1
+        if pending + 1 > self.max_pending:
+            self.max_pending = pending + 1
+        key = (player_id, goods_key)
+        entry = self._tick_entries.get(key)
+        if entry is not None and entry[1] > 0:
+            entry[1] += 1
+            self.merged_count += 1
+            self.folded_count += 1
+            return PUSH_MERGED
+        if queue and queue[-1][0] == goods_key:
+            queue[-1][1] += 1
+            self._tick_entries[key] = queue[-1]
+            self.merged_count += 1
+            return PUSH_MERGED
+        entry = [goods_key, 1]
+        queue.append(entry)
+        self._tick_entries[key] = entry
+        return PUSH_QUEUED
+
+    def pop_batch(self, budget):
+        """
+        按预算轮流取出各玩家的队首条目
+
+        Args:
+            budget (int): 本次最多取出的购买次数
+
+        Returns:
+            list: [(player_id, goods_key, count), ...] 按处理顺序
+        """
+        batch = []
+        while budget > 0 and self._order:
+            player_id = self._order.popleft()
+            queue = self._queues.get(player_id)
+            if not queue:
+                continue
+            entry = queue[0]
+            count = min(entry[1], budget)
+            entry[1] -= count
+            if entry[1] <= 0:
+                queue.popleft()
+            budget -= count
+            self._pending[player_id] -= count
+            self.popped_count += count
+            batch.append((player_id, entry[0], count))
+            if queue:
+                self._order.append(player_id)
+        return batch
+
+    def has_pending(self):
+        """
+        是否有待处理的条目
+
+        Returns:
+            bool: 是否有待处理的条目
+        """
+        return bool(self._order)
+
+    def remove_player(self, player_id):
+        """
+        移除玩家的令牌桶与待处理条目(玩家离开服务器时调用,未处理的购买不再执行)
+
+        Args:
+            player_id (str): 玩家ID
+        """
+        self._buckets.pop(player_id, None)
+        self._queues.pop(player_id, None)
+        self._pending.pop(player_id, None)
+        if player_id in self._order:
+            self._order.remove(player_id)
+        for key in [key for key in self._tick_entries if key[0] == player_id]:
+            del self._tick_entries[key]
+
+    def clear(self):
+        """清空全部队列与令牌桶"""
+        self._buckets = {}
+        self._queues = {}
+        self._pending = {}
+        self._order = deque()
+        self._tick_entries = {}
+
+    def get_stats(self):
+        """
+        获取统计信息
+
+        Returns:
+            dict: 统计信息
+        """
+        return {
+            'requests': self.request_count,
+            'merged': self.merged_count,
+            'folded': self.folded_count,
+            'rate_limited': self.rate_limited_count,
+            'queue_full': self.queue_full_count,
+            'popped': self.popped_count,
+            'pending': sum(self._pending.values()),
+            'max_pending': self.max_pending,
+        }
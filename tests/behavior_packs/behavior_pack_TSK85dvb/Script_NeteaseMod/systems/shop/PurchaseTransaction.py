@@ -0,0 +1,404 @@
+# -*- coding: utf-8 -*-
+"""
+商店购买事务
+
+职责:
+- 一次购买只读取一次背包(GetPlayerAllItems快照),余额检查、扣款槽位、发放槽位都基于快照计算
+- 扣除货币(支持多种货币同时扣除)与发放物品先在快照副本上规划,提交时一次SetPlayerAllItems写入
+- 提交失败或提交后的业务处理失败(队伍升级/陷阱)时回滚: 把改动过的槽位写回快照
+- 提交成功后用最终背包写穿InventoryMirror,刷新UI时无需重新读取背包
+
+使用方法:
+    transaction = PurchaseTransaction(player_id)
+    if not transaction.plan_payment(price):
+        return False, transaction.missing_currency
+    transaction.plan_give(item_dict)
+    if not transaction.commit():
+        ...
+    # 提交后业务处理失败
+    transaction.rollback()
+
+说明:
+- 价格格式: {'currency': 'iron', 'amount': 10},多种货币时为价格列表
+- 经验货币(exp)不占背包槽位,提交时通过SetPlayerLevel扣除,回滚时恢复
+- 事务只在一次购买请求内使用,不跨Tick保留
+"""
+
+from __future__ import print_function
+
+import copy
+
+import mod.server.extraServerApi as serverApi
+
+# 事务状态
+STATE_OPEN = "open"  # 规划中
+STATE_COMMITTED = "committed"  # 已提交
+STATE_ROLLED_BACK = "rolled_back"  # 已回滚
+STATE_FAILED = "failed"  # 提交失败(已写回快照)
+
+# 背包槽位数量(与InventoryMirror一致)
+INVENTORY_SLOT_COUNT = 36
+# 护甲槽位数量
+ARMOR_SLOT_COUNT = 4
+
+# 经验货币(不占背包槽位)
+EXP_CURRENCY = 'exp'
+
+# 物品最大堆叠数缓存 {item_name: max_stack}
+_max_stack_cache = {}
+
+
+def normalize_prices(price):
+    """
+    把价格整理为按货币合并的列表
+
+    Args:
+        price: 价格字典或价格列表
+
+    Returns:
+        list: [(currency, amount), ...] 按首次出现顺序,忽略数量<=0的项
+    """
+    if not price:
+        return []
+    entries = price if isinstance(price, (list, tuple)) else [price]
+    amounts = {}
+    order = []
+    for entry in entries:
+        currency = entry.get('currency')
+        amount = entry.get('amount', 0)
+        if not currency or amount <= 0:
+            continue
+        if currency not in amounts:
+            order.append(currency)
+            amounts[currency] = 0
+        amounts[currency] += amount
+    return [(currency, amounts[currency]) for currency in order]
+
+
+def get_max_stack(item_name):
+    """
+    获取物品最大堆叠数(按物品缓存)
+
+    Args:
+        item_name (str): 物品ID
+
+    Returns:
+        int: 最大堆叠数
+    """
+    max_stack = _max_stack_cache.get(item_name)
+    if max_stack is None:
+        max_stack = 1
+        try:
+            from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
+            info = get_component_cache().CreateItem(serverApi.GetLevelId()).GetItemBasicInfo(item_name)
+            if info:
+                max_stack = max(1, int(info.get('maxStackSize', 1)))
+        except Exception as e:
+            print("[ERROR] [PurchaseTransaction] 获取物品堆叠数失败: item={}, error={}".format(item_name, str(e)))
+        _max_stack_cache[item_name] = max_stack
+    return max_stack
+
+
+def _is_plain_item(item_dict):
+    """是否是没有附魔/自定义数据的普通物品(只有普通物品可以合并堆叠)"""
+    return not item_dict.get('enchantData') and not item_dict.get('customTips') and not item_dict.get('userData')
+
+
+def _can_stack(existing, item_dict):
+    """两个物品是否可以合并到同一堆叠"""
+    return existing.get('newItemName') == item_dict.get('newItemName') and \
+        existing.get('newAuxValue', 0) == item_dict.get('newAuxValue', 0) and \
+        _is_plain_item(existing) and _is_plain_item(item_dict)
+
+
+def _is_write_ok(result):
+    """SetPlayerAllItems返回值是否表示全部写入成功(返回{(posType, slot): bool}或bool)"""
+    if isinstance(result, dict):
+        return all(result.values())
+    return bool(result)
+
+
+class PurchaseTransaction(object):
+    """
+    商店购买事务
+
+    数据结构:
+    - _snapshot: {pos_type: [item_dict | None]} 第一次访问时读取的槽位快照(只读)
+    - _working: {pos_type: [item_dict | None]} 规划后的槽位
+    - _changed: {(pos_type, slot)} 规划中改动过的槽位
+    """
+
+    def __init__(self, player_id):
+        """
+        Args:
+            player_id (str): 玩家ID
+        """
+        from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
+
+        self.player_id = player_id
+        self.state = STATE_OPEN
+        self.missing_currency = None  # plan_payment失败时余额不足的货币
+
+        self._comps = get_component_cache()
+        self._item_comp = self._comps.CreateItem(player_id)
+        self._item_pos = serverApi.GetMinecraftEnum().ItemPosType
+        self._snapshot = {}
+        self._working = {}
+        self._changed = set()
+        self._exp_cost = 0
+        self._exp_level = None
+
+    # ========== 快照 ==========
+
+    def _slots(self, pos_type):
+        """获取规划中的槽位(第一次访问时读取快照)"""
+        working = self._working.get(pos_type)
+        if working is None:
+            size = ARMOR_SLOT_COUNT if pos_type == self._item_pos.ARMOR else INVENTORY_SLOT_COUNT
+            items = list(self._item_comp.GetPlayerAllItems(pos_type) or [])[:size]
+            items.extend([None] * (size - len(items)))
+            snapshot = [item if item and item.get('count', 0) > 0 else None for item in items]
+            self._snapshot[pos_type] = snapshot
+            working = [copy.deepcopy(item) for item in snapshot]
+            self._working[pos_type] = working
+        return working
+
+    def _set_slot(self, pos_type, slot, item_dict):
+        """规划写入槽位"""
+        self._slots(pos_type)[slot] = item_dict
+        self._changed.add((pos_type, slot))
+
+    def get_item_count(self, item_name):
+        """
+        获取规划后背包中指定物品的数量
+
+        Args:
+            item_name (str): 物品ID
+
+        Returns:
+            int: 物品数量
+        """
+        return sum(item['count'] for item in self._slots(self._item_pos.INVENTORY)
+                   if item and item.get('newItemName') == item_name)
+
+    def find_items(self, item_names):
+        """
+        查找规划后背包中属于指定物品集合的槽位
+
+        Args:
+            item_names (list): 物品ID列表
+
+        Returns:
+            list: [(slot, item_dict), ...] 按槽位升序
+        """
+        return [(slot, item) for slot, item in enumerate(self._slots(self._item_pos.INVENTORY))
+                if item and item.get('newItemName') in item_names]
+
+    def get_armor_item(self, slot):
+        """
+        获取规划后的护甲槽位物品
+
+        Args:
+            slot (int): 护甲槽位(0头盔 1胸甲 2护腿 3靴子)
+
+        Returns:
+            dict|None: 物品字典,空槽位返回None
+        """
+        return self._slots(self._item_pos.ARMOR)[slot]
+
+    # ========== 规划 ==========
+
+    def plan_payment(self, price):
+        """
+        规划扣除货币(任一货币不足时不做任何规划)
+
+        Args:
+            price: 价格字典或价格列表
+
+        Returns:
+            bool: 余额是否足够
+        """
+        from Script_NeteaseMod.systems.util.CurrencyManager import CurrencyManager
+
+        prices = normalize_prices(price)
+
+        # 1. 先检查全部货币,保证多货币扣除要么全部规划要么都不规划
+        for currency, amount in prices:
+            if currency == EXP_CURRENCY:
+                have = self._get_exp_level() - self._exp_cost
+            else:
+                item_id = CurrencyManager.CURRENCY_ITEMS.get(currency)
+                if not item_id:
+                    print("[ERROR] [PurchaseTransaction] 无效的货币类型: {}".format(currency))
+                    self.missing_currency = currency
+                    return False
+                have = self.get_item_count(item_id)
+            if have < amount:
+                self.missing_currency = currency
+                return False
+
+        # 2. 按槽位升序扣除(与CurrencyManager.pay_price一致)
+        inventory = self._slots(self._item_pos.INVENTORY)
+        for currency, amount in prices:
+            if currency == EXP_CURRENCY:
+                self._exp_cost += amount
+                continue
+            item_id = CurrencyManager.CURRENCY_ITEMS[currency]
+            remain = amount
+            for slot, item in enumerate(inventory):
+                if remain <= 0:
+                    break
+                if not item or item.get('newItemName') != item_id:
+                    continue
+                take = min(item['count'], remain)
+                remain -= take
+                if item['count'] > take:
+                    item = dict(item)
+                    item['count'] -= take
+                    self._set_slot(self._item_pos.INVENTORY, slot, item)
+                else:
+                    self._set_slot(self._item_pos.INVENTORY, slot, None)
+        return True
+
+    def plan_remove_slot(self, slot):
+        """
+        规划清空背包槽位
+
+        Args:
+            slot (int): 背包槽位
+        """
+        self._set_slot(self._item_pos.INVENTORY, slot, None)
+
+    def plan_give(self, item_dict):
+        """
+        规划把物品放入背包(先合并同类堆叠,再放入空槽位)
+
+        Args:
+            item_dict (dict): 物品字典(newItemName/newAuxValue/count/enchantData/customTips/userData)
+
+        Returns:
+            bool: 背包空间是否足够(不足时不做任何规划)
+        """
+        item_name = item_dict.get('newItemName')
+        remain = item_dict.get('count', 1)
+        if not item_name or remain <= 0:
+            return False
+
+        max_stack = get_max_stack(item_name)
+        inventory = self._slots(self._item_pos.INVENTORY)
+        placements = []
+
+        if max_stack > 1 and _is_plain_item(item_dict):
+            for slot, existing in enumerate(inventory):
+                if remain <= 0:
+                    break
+                if existing and existing['count'] < max_stack and _can_stack(existing, item_dict):
+                    add = min(max_stack - existing['count'], remain)
+                    placements.append((slot, existing['count'] + add))
+                    remain -= add
+        for slot, existing in enumerate(inventory):
+            if remain <= 0:
+                break
+            if existing is None:
+                add = min(max_stack, remain)
+                placements.append((slot, add))
+                remain -= add
+
+        if remain > 0:
+            return False
+
+        for slot, count in placements:
+            item = dict(inventory[slot] or item_dict)
+            item['count'] = count
+            self._set_slot(self._item_pos.INVENTORY, slot, item)
+        return True
+
+    def plan_equip(self, slot, item_dict):
+        """
+        规划穿戴护甲
+
+        Args:
+            slot (int): 护甲槽位(0头盔/1胸甲/2护腿/3靴子)
+            item_dict (dict): 护甲物品字典
+        """
+        self._set_slot(self._item_pos.ARMOR, slot, item_dict)
+
+    # ========== 提交/回滚 ==========
+
+    def commit(self):
+        """
+        一次写入全部规划的改动
+
+        Returns:
+            bool: 是否成功(失败时已写回快照)
+        """
+        if self.state != STATE_OPEN:
+            print("[WARN] [PurchaseTransaction] 事务已结束: player={}, state={}".format(self.player_id, self.state))
+            return False
+
+        if self._changed:
+            items_map = dict((key, self._working[key[0]][key[1]]) for key in self._changed)
+            try:
+                ok = _is_write_ok(self._item_comp.SetPlayerAllItems(items_map))
+            except Exception as e:
+                print("[ERROR] [PurchaseTransaction] 写入背包异常: player={}, error={}".format(self.player_id, str(e)))
+                ok = False
+            if not ok:
+                print("[ERROR] [PurchaseTransaction] 写入背包失败,写回快照: player={}".format(self.player_id))
+                self._restore_slots()
+                self.state = STATE_FAILED
+                return False
+
+        if self._exp_cost > 0:
+            self._comps.CreateExp(self.player_id).SetPlayerLevel(self._exp_level - self._exp_cost)
+
+        self._sync_mirror(self._working)
+        self.state = STATE_COMMITTED
+        return True
+
+    def rollback(self):
+        """
+        撤销已提交的改动(提交后的业务处理失败时调用)
+
+        Returns:
+            bool: 是否成功
+        """
+        if self.state != STATE_COMMITTED:
+            return False
+        ok = self._restore_slots()
+        if self._exp_cost > 0:
+            self._comps.CreateExp(self.player_id).SetPlayerLevel(self._exp_level)
+        self.state = STATE_ROLLED_BACK
+        return ok
+
+    # ========== 内部方法 ==========
+
+    def _get_exp_level(self):
+        """获取经验等级(只读取一次)"""
+        if self._exp_level is None:
+            self._exp_level = self._comps.CreateExp(self.player_id).GetPlayerLevel() or 0
+        return self._exp_level
+
+    def _restore_slots(self):
+        """把改动过的槽位写回快照"""
+        if not self._changed:
+            return True
+        items_map = dict((key, self._snapshot[key[0]][key[1]]) for key in self._changed)
+        try:
+            ok = _is_write_ok(self._item_comp.SetPlayerAllItems(items_map))
+        except Exception as e:
+            print("[ERROR] [PurchaseTransaction] 写回快照异常: player={}, error={}".format(self.player_id, str(e)))
+            ok = False
+        if ok:
+            self._sync_mirror(self._snapshot)
+        else:
+            from Script_NeteaseMod.systems.util.InventoryMirror import get_inventory_mirror
+            get_inventory_mirror().invalidate(self.player_id)
+        return ok
+
+    def _sync_mirror(self, slots):
+        """用写入后的背包写穿InventoryMirror"""
+        from Script_NeteaseMod.systems.util.InventoryMirror import get_inventory_mirror
+        inventory = slots.get(self._item_pos.INVENTORY)
+        if inventory is not None:
+            get_inventory_mirror().load_items(self.player_id, inventory)
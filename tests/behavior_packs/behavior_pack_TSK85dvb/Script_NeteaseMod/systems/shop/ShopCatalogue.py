@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+商店目录(静态骨架 + 玩家动态覆盖)
+
+职责:
+- 按shop_type从SHOP_CONFIG预先生成一次静态骨架: 分类、商品名称、介绍、levels_intro、
+  固定价格与固定显示物品
+- 记录每个商品需要按玩家计算的字段(动态字段),打开/刷新商店时只计算这些字段
+- 骨架带版本哈希,客户端按版本缓存骨架,打开商店时只在客户端没有该版本时发送
+- 刷新时只发送与上次相比变化的覆盖字段
+
+数据格式:
+- 骨架: {"type", "name", "intro", "categories": [{"name", "intro", "ui", "goods": [商品UI]}]}
+  (与generate_ui_dict的结构一致,只是缺少currencies和动态字段)
+- 覆盖: {"currencies": str, "goods": {goods_key: {动态字段: 值}}}
+
+说明:
+- 本模块不依赖引擎API,服务端(ShopServerSystem)与客户端(ShopClientSystem)共用
+- 动态字段: cannot_buy_msg(总是动态)、price(多级价格)、show_item_dict(函数物品/可升级物品)
+"""
+
+from __future__ import print_function
+
+import copy
+import hashlib
+import json
+
+# 覆盖中的商品动态字段
+FIELD_CANNOT_BUY = "cannot_buy_msg"
+FIELD_PRICE = "price"
+FIELD_SHOW_ITEM = "show_item_dict"
+
+# 找不到显示物品时使用的默认物品
+DEFAULT_SHOW_ITEM = {
+    "newItemName": "minecraft:barrier",
+    "newAuxValue": 0,
+    "count": 1
+}
+
+
+def is_multi_level_price(price_config):
+    """
+    是否是多级价格(按等级取价格,例如队伍升级)
+
+    Args:
+        price_config: 商品的price配置
+
+    Returns:
+        bool: 是否是多级价格
+    """
+    return isinstance(price_config, dict) and not price_config.get("currency")
+
+
+def get_static_show_item(goods_config):
+    """
+    获取与玩家无关的显示物品
+
+    Args:
+        goods_config (dict): 商品配置
+
+    Returns:
+        dict: 显示物品,需要按玩家计算时返回None
+    """
+    show_item = goods_config.get("show_item")
+    if show_item:
+        return None if callable(show_item) else show_item
+    if goods_config.get("type") == "item_upgrade" and goods_config.get("item_levels") and goods_config.get("upgrade_path"):
+        return None
+    item = goods_config.get("item")
+    if item:
+        if callable(item):
+            return None
+        if isinstance(item, list) and len(item) > 0:
+            return item[0]
+        return item
+    return DEFAULT_SHOW_ITEM
+
+
+def compute_version(skeleton):
+    """
+    计算骨架的版本哈希
+
+    Args:
+        skeleton (dict): 静态骨架
+
+    Returns:
+        str: 版本哈希
+    """
+    data = json.dumps(skeleton, sort_keys=True, ensure_ascii=True)
+    return hashlib.md5(data.encode('utf-8') if not isinstance(data, bytes) else data).hexdigest()[:16]
+
+
+class ShopCatalogue(object):
+    """
+    单个shop_type的商店目录
+
+    数据结构:
+    - skeleton: dict 静态骨架(发送到客户端缓存)
+    - version: str 骨架版本哈希
+    - dynamic_goods: [(goods_config, fields), ...] 需要按玩家计算的商品(按goods_key去重,按出现顺序)
+    """
+
+    def __init__(self, shop_type, skeleton, dynamic_goods):
+        self.shop_type = shop_type
+        self.skeleton = skeleton
+        self.version = compute_version(skeleton)
+        self.dynamic_goods = dynamic_goods
+
+    @classmethod
+    def build(cls, shop_type, shop_config, goods_pool, format_price):
+        """
+        从商店配置生成目录
+
+        Args:
+            shop_type (str): 商店类型
+            shop_config (dict): 商店配置(SHOP_CONFIG/UPGRADE_SHOP_CONFIG)
+            goods_pool (dict): {goods_id: goods_config}
+            format_price (callable): format_price(price) -> str 固定价格的格式化函数
+
+        Returns:
+            ShopCatalogue: 商店目录
+        """
+        skeleton = {
+            "type": shop_config.get("type", "default"),
+            "name": shop_config.get("name", u"商店"),
+            "intro": shop_config.get("intro", u""),
+            "categories": []
+        }
+        dynamic_goods = []
+        seen = set()
+
+        for category_config in shop_config.get("categories", []):
+            category_ui = {
+                "name": category_config.get("name", ""),
+                "intro": category_config.get("intro", ""),
+                "ui": category_config.get("ui", {}),
+                "goods": []
+            }
+            for goods_id in category_config.get("goods_ids", []):
+                goods_config = goods_pool.get(goods_id)
+                if not goods_config:
+                    print("[WARN] [ShopCatalogue] 商品ID未找到: {}".format(goods_id))
+                    continue
+
+                goods_ui = {
+                    "key": goods_config.get("id"),
+                    "name": goods_config.get("name", goods_config.get("id")),
+                    "intro": goods_config.get("intro", ""),
+                    "upgrade_type": goods_config.get("upgrade_type", False),
+                    "levels_intro": goods_config.get("levels_intro", []),
+                    "detail_intros": goods_config.get("detail_intros", ""),
+                    FIELD_CANNOT_BUY: None
+                }
+                fields = [FIELD_CANNOT_BUY]
+
+                show_item = get_static_show_item(goods_config)
+                if show_item is None:
+                    fields.append(FIELD_SHOW_ITEM)
+                else:
+                    goods_ui[FIELD_SHOW_ITEM] = show_item
+
+                price_config = goods_config.get("price")
+                if not price_config:
+                    goods_ui[FIELD_PRICE] = u"免费"
+                elif is_multi_level_price(price_config):
+                    fields.append(FIELD_PRICE)
+                else:
+                    goods_ui[FIELD_PRICE] = format_price(price_config)
+
+                category_ui["goods"].append(goods_ui)
+                if goods_ui["key"] not in seen:
+                    seen.add(goods_ui["key"])
+                    dynamic_goods.append((goods_config, tuple(fields)))
+
+            if category_ui["goods"]:
+                skeleton["categories"].append(category_ui)
+
+        return cls(shop_type, skeleton, dynamic_goods)
+
+    def build_overlay(self, currencies, compute_field):
+        """
+        计算玩家的动态覆盖
+
+        Args:
+            currencies (str): 格式化后的货币字符串
+            compute_field (callable): compute_field(goods_config, field) -> 字段值
+
+        Returns:
+            dict: {"currencies": str, "goods": {goods_key: {字段: 值}}}
+        """
+        goods = {}
+        for goods_config, fields in self.dynamic_goods:
+            goods[goods_config.get("id")] = dict((field, compute_field(goods_config, field)) for field in fields)
+        return {"currencies": currencies, "goods": goods}
+
+
+def diff_overlay(old_overlay, new_overlay):
+    """
+    计算覆盖的变化部分
+
+    Args:
+        old_overlay (dict): 上次发送的覆盖(None表示没有)
+        new_overlay (dict): 新覆盖
+
+    Returns:
+        dict: 变化的部分(格式与覆盖相同),没有变化时返回None
+    """
+    if old_overlay is None:
+        return new_overlay
+    diff = {}
+    if new_overlay.get("currencies") != old_overlay.get("currencies"):
+        diff["currencies"] = new_overlay.get("currencies")
+    old_goods = old_overlay.get("goods", {})
+    goods_diff = {}
+    for goods_key, fields in new_overlay.get("goods", {}).items():
+        old_fields = old_goods.get(goods_key) or {}
+        changed = dict((field, value) for field, value in fields.items()
+                       if field not in old_fields or old_fields[field] != value)
+        if changed:
+            goods_diff[goods_key] = changed
+    if goods_diff:
+        diff["goods"] = goods_diff
+    return diff or None
+
+
+def merge_overlay(overlay, diff):
+    """
+    把覆盖的变化部分合并到覆盖(原地修改)
+
+    Args:
+        overlay (dict): 当前覆盖
+        diff (dict): 变化部分
+
+    Returns:
+        dict: 合并后的覆盖
+    """
+    if "currencies" in diff:
+        overlay["currencies"] = diff["currencies"]
+    goods = overlay.setdefault("goods", {})
+    for goods_key, fields in (diff.get("goods") or {}).items():
+        goods.setdefault(goods_key, {}).update(fields)
+    return overlay
+
+
+def apply_overlay(skeleton, overlay):
+    """
+    用覆盖生成完整的UI数据(骨架不会被修改)
+
+    Args:
+        skeleton (dict): 静态骨架
+        overlay (dict): 玩家覆盖
+
+    Returns:
+        dict: 与generate_ui_dict结构一致的UI数据
+    """
+    ui_dict = dict(skeleton)
+    ui_dict["currencies"] = overlay.get("currencies", "")
+    goods_overlay = overlay.get("goods", {})
+    categories = []
+    for category in skeleton.get("categories", []):
+        category_ui = dict(category)
+        goods_list = []
+        for goods_ui in category.get("goods", []):
+            fields = goods_overlay.get(goods_ui.get("key"))
+            if fields:
+                goods_ui = dict(goods_ui)
+                goods_ui.update(copy.deepcopy(fields))
+            goods_list.append(goods_ui)
+        category_ui["goods"] = goods_list
+        categories.append(category_ui)
+    ui_dict["categories"] = categories
+    return ui_dict
@@ -6,6 +6,7 @@
 - 监听商店打开事件
 - 注册商店UI
 - 显示商店界面
+- 按版本缓存商店静态骨架,打开/刷新时与服务端发送的动态覆盖合并
 """
 
 from __future__ import print_function
@@ -20,11 +21,20 @@ class ShopClientSystem(clientApi.GetClientSystemCls()):
     1. 注册BedWarsShopScreenNode UI
     2. 监听服务端商店打开事件
     3. 显示商店UI界面
+    4. 缓存商店静态骨架(ShopCatalogue),合并动态覆盖生成UI数据
     """
 
     def __init__(self, namespace, systemName):
         super(ShopClientSystem, self).__init__(namespace, systemName)
 
+        # 商店静态骨架缓存
+        self.skeletons = {}  # dict[shop_type, (version, skeleton)]
+
+        # 当前打开的商店
+        self.current_shop_type = None
+        self.current_version = None
+        self.current_overlay = None  # 当前商店的动态覆盖
+
         print("[ShopClientSystem] 手动调用Create()完成系统初始化")
         self.Create()
 
@@ -100,17 +110,47 @@ class ShopClientSystem(clientApi.GetClientSystemCls()):
 
         Args:
             args: {
-                'ui_dict': {...},  # 商店UI数据
-                'player_id': str   # 玩家ID
+                'player_id': str,   # 玩家ID
+                'shop_type': str,   # 商店类型
+                'version': str,     # 骨架版本
+                'overlay': {...},   # 玩家的动态覆盖
+                'skeleton': {...}   # 静态骨架(客户端没有该版本时才附带)
             }
         """
         print("[ShopClientSystem] 收到商店打开事件")
 
-        ui_dict = args.get('ui_dict')
-        if not ui_dict:
-            print("[ShopClientSystem] [错误] ui_dict为空")
+        shop_type = args.get('shop_type')
+        version = args.get('version')
+        overlay = args.get('overlay')
+        if overlay is None:
+            print("[ShopClientSystem] [错误] overlay为空")
             return
 
+        # 1. 缓存骨架
+        if args.get('skeleton') is not None:
+            self.skeletons[shop_type] = (version, args['skeleton'])
+
+        cached = self.skeletons.get(shop_type)
+        if not cached or cached[0] != version:
+            # 缓存中没有该版本骨架(例如重新连接),请求服务端重新发送
+            print("[ShopClientSystem] [警告] 骨架缓存未命中: shop_type={}, version={}".format(shop_type, version))
+            self.NotifyToServer(
+                "BedWarsShopRequestSkeleton",
+                {
+                    'player_id': clientApi.GetLocalPlayerId(),
+                    'shop_type': shop_type
+                }
+            )
+            return
+
+        self.current_shop_type = shop_type
+        self.current_version = version
+        self.current_overlay = overlay
+
+        # 2. 合并骨架与动态覆盖
+        from Script_NeteaseMod.systems.shop.ShopCatalogue import apply_overlay
+        ui_dict = apply_overlay(cached[1], overlay)
+
         from Script_NeteaseMod.modConfig import MOD_NAME
 
         # 显示商店UI
@@ -131,16 +171,29 @@ class ShopClientSystem(clientApi.GetClientSystemCls()):
 
         Args:
             args: {
-                'ui_dict': {...}  # 更新后的商店UI数据
+                'shop_type': str,       # 商店类型
+                'version': str,         # 骨架版本
+                'overlay_diff': {...}   # 与上次相比变化的覆盖字段
             }
         """
         print("[ShopClientSystem] 收到商店刷新事件")
 
-        ui_dict = args.get('ui_dict')
-        if not ui_dict:
-            print("[ShopClientSystem] [错误] ui_dict为空，无法刷新")
+        overlay_diff = args.get('overlay_diff')
+        if not overlay_diff:
+            print("[ShopClientSystem] [错误] overlay_diff为空，无法刷新")
+            return
+
+        shop_type = args.get('shop_type')
+        cached = self.skeletons.get(shop_type)
+        if (self.current_overlay is None or shop_type != self.current_shop_type or
+                not cached or cached[0] != args.get('version')):
+            print("[ShopClientSystem] [警告] 刷新的商店与当前商店不一致，忽略: shop_type={}".format(shop_type))
             return
 
+        # 合并变化的字段
+        from Script_NeteaseMod.systems.shop.ShopCatalogue import apply_overlay, merge_overlay
+        merge_overlay(self.current_overlay, overlay_diff)
+
         # 获取当前栈顶的ScreenNode
         from Script_NeteaseMod.systems.ui.BedWarsShopScreenNode import BedWarsShopScreenNode
 
@@ -151,7 +204,7 @@ class ShopClientSystem(clientApi.GetClientSystemCls()):
             print("[ShopClientSystem] 找到商店UI，开始刷新")
 
             # 更新UI数据
-            current_screen.ui_data = ui_dict
+            current_screen.ui_data = apply_overlay(cached[1], self.current_overlay)
 
             # 调用UpdateScreen刷新UI
             current_screen.UpdateScreen()
@@ -1,3 +1,4 @@
+# -*- coding: utf-8 -*-
 # 测试PostToolUse修复-最终版
 # 测试atomic_update诊断
 # Phase
@@ -21,9 +22,46 @@
 from __future__ import print_function
 import mod.server.extraServerApi as serverApi
 
+from Script_NeteaseMod.systems.shop.ShopCatalogue import (
+    ShopCatalogue,
+    FIELD_CANNOT_BUY,
+    FIELD_PRICE,
+    FIELD_SHOW_ITEM,
+    apply_overlay,
+    diff_overlay
+)
+from Script_NeteaseMod.systems.shop.ShopStateCache import ShopStateCache
+from Script_NeteaseMod.systems.shop.PurchaseTransaction import PurchaseTransaction
+from Script_NeteaseMod.systems.shop.PurchaseRequestQueue import PurchaseRequestQueue, PURCHASES_PER_TICK
+from Script_NeteaseMod.systems.shop.ItemTierRegistry import get_item_tier_registry, FAMILY_SWORD
+
 # 获取ServerSystem基类
 ServerSystem = serverApi.GetServerSystemCls()
 
+# 货币图标
+CURRENCY_ICONS = {
+    "iron": u"\uE1AC",
+    "gold": u"\uE1AD",
+    "diamond": u"\uE1AE",
+    "emerald": u"\uE1AF"
+}
+
+# 货币颜色
+CURRENCY_COLORS = {
+    "iron": u"§f",     # 白色
+    "gold": u"§e",     # 黄色
+    "diamond": u"§b",  # 青色
+    "emerald": u"§a"   # 绿色
+}
+
+# 货币名称
+CURRENCY_NAMES = {
+    "iron": u"铁锭",
+    "gold": u"金锭",
+    "diamond": u"钻石",
+    "emerald": u"绿宝石"
+}
+
 
 class ShopServerSystem(ServerSystem):
     """
@@ -61,6 +99,24 @@ class ShopServerSystem(ServerSystem):
         # 玩家当前打开的商店类型 (用于刷新UI)
         self.player_shop_types = {}  # dict[player_id, shop_type]
 
+        # 商店目录 (按shop_type预先生成的静态骨架,见ShopCatalogue)
+        self.catalogues = {}  # dict[shop_type, ShopCatalogue]
+
+        # 玩家上次发送的动态覆盖 (刷新时只发送变化的字段)
+        self.player_shop_overlays = {}  # dict[player_id, (shop_type, version, overlay)]
+
+        # 已发送给玩家客户端的骨架版本 (客户端按版本缓存骨架)
+        self.player_skeleton_versions = {}  # dict[player_id, set(version)]
+
+        # 限购检查结果缓存 (依赖状态未变化的商品不重新检查,见ShopStateCache)
+        self.shop_state_cache = ShopStateCache(self)
+
+        # 购买请求队列 (每玩家令牌桶限速,Update中按每Tick预算处理,见PurchaseRequestQueue)
+        self.purchase_queue = PurchaseRequestQueue()
+
+        # 限购检查期间的购买事务 (shop_config中的限购函数读取其背包快照,不再单独读取背包)
+        self.purchase_transaction = None  # PurchaseTransaction
+
         # ========== ⚠️ 重要：手动调用Create() ==========
         # 说明：网易引擎设计上只自动触发Destroy()，不自动触发Create()
         # 因此需要在__init__中手动调用Create()完成系统初始化
@@ -76,6 +132,7 @@ class ShopServerSystem(ServerSystem):
         1. 加载商品配置
         2. 监听购买事件
         3. 监听队伍更新事件(用于刷新UI)
+        4. 监听玩家离开服务器事件(清除玩家的商店状态)
         """
         print("[ShopServerSystem] Create() 被调用")
 
@@ -93,9 +150,27 @@ class ShopServerSystem(ServerSystem):
         )
         print("[ShopServerSystem] 已注册购买事件监听: BedWarsShopTryBuy")
 
+        # 客户端缓存中没有骨架时重新请求
+        self.ListenForEvent(
+            MOD_NAME,
+            "ShopClientSystem",
+            "BedWarsShopRequestSkeleton",
+            self,
+            self.handle_request_skeleton
+        )
+
         # 3. 监听队伍更新事件 (用于刷新UI)
         # TODO: 监听TeamModuleUpdateTeamPlayers事件
 
+        # 4. 玩家离开服务器时清除其商店状态
+        self.ListenForEvent(
+            serverApi.GetEngineNamespace(),
+            serverApi.GetEngineSystemName(),
+            "DelServerPlayerEvent",
+            self,
+            self._on_del_server_player
+        )
+
     def Destroy(self):
         """
         系统销毁时自动被引擎调用
@@ -108,6 +183,33 @@ class ShopServerSystem(ServerSystem):
         self.goods_pool = {}
         self.shop_configs = {}
         self.player_purchase_records = {}
+        self.catalogues = {}
+        self.player_shop_overlays = {}
+        self.player_skeleton_versions = {}
+        self.shop_state_cache.clear()
+        self.purchase_queue.clear()
+
+    def _on_del_server_player(self, args):
+        """
+        玩家离开服务器: 清除该玩家的UI覆盖/骨架版本/检查结果缓存与未处理的购买请求
+
+        Args:
+            args (dict): 事件参数 {'id': player_id, ...}
+        """
+        player_id = args.get('id')
+        if not player_id:
+            return
+        self.player_shop_types.pop(player_id, None)
+        self.player_shop_overlays.pop(player_id, None)
+        self.player_skeleton_versions.pop(player_id, None)
+        self.shop_state_cache.clear_player(player_id)
+        self.purchase_queue.remove_player(player_id)
+
+    def Update(self):
+        """系统每帧更新: 开始新的Tick,按预算处理购买队列"""
+        self.purchase_queue.tick()
+        if self.purchase_queue.has_pending():
+            self._drain_purchase_queue()
 
     # ========== 配置加载 ==========
 
@@ -138,6 +240,27 @@ class ShopServerSystem(ServerSystem):
         print("[ShopServerSystem] 加载了{}个商品配置".format(len(self.goods_pool)))
         print("[ShopServerSystem] 加载了{}个商店类型配置".format(len(self.shop_configs)))
 
+        self._build_catalogues()
+
+    def _build_catalogues(self):
+        """
+        为每个shop_type生成一次静态骨架(名称、介绍、固定价格、固定显示物品)
+
+        打开/刷新商店时只计算动态字段(货币、cannot_buy_msg、多级价格、函数物品)
+        """
+        self.catalogues = {}
+        for shop_type, shop_config in self.shop_configs.items():
+            try:
+                catalogue = ShopCatalogue.build(shop_type, shop_config, self.goods_pool, self._format_fixed_price)
+            except Exception as e:
+                print("[ERROR] [ShopServerSystem] 商店目录生成异常: shop_type={}, error={}".format(shop_type, str(e)))
+                import traceback
+                traceback.print_exc()
+                continue
+            self.catalogues[shop_type] = catalogue
+            print("[ShopServerSystem] 商店目录已生成: shop_type={}, version={}, 动态商品={}".format(
+                shop_type, catalogue.version, len(catalogue.dynamic_goods)))
+
     # ========== 打开商店UI ==========
 
     def handle_player_open_shop(self, player_id, team, shop_type):
@@ -157,22 +280,61 @@ class ShopServerSystem(ServerSystem):
         # 记录玩家当前打开的商店类型（用于购买后刷新UI）
         self.player_shop_types[player_id] = shop_type
 
-        # 1. 生成UI数据
-        ui_dict = self.generate_ui_dict(player_id, shop_type)
+        catalogue = self.catalogues.get(shop_type)
+        if not catalogue:
+            print("[ERROR] [ShopServerSystem] shop_type={}配置不存在".format(shop_type))
+            return
+
+        # 1. 计算玩家的动态覆盖
+        overlay = self._build_overlay(player_id, catalogue)
+        self.player_shop_overlays[player_id] = (shop_type, catalogue.version, overlay)
+
+        # 2. 发送到客户端(客户端没有该版本骨架时附带骨架)
+        self._send_shop_open(player_id, catalogue, overlay)
+
+    def _send_shop_open(self, player_id, catalogue, overlay):
+        """
+        发送商店打开消息
+
+        Args:
+            player_id (str): 玩家ID
+            catalogue (ShopCatalogue): 商店目录
+            overlay (dict): 玩家的动态覆盖
+        """
+        event_data = {
+            'player_id': player_id,
+            'shop_type': catalogue.shop_type,
+            'version': catalogue.version,
+            'overlay': overlay
+        }
+        known_versions = self.player_skeleton_versions.setdefault(player_id, set())
+        if catalogue.version not in known_versions:
+            event_data['skeleton'] = catalogue.skeleton
+            known_versions.add(catalogue.version)
 
-        # 2. 发送到客户端
         # 使用NotifyToClient通信而非GetSystem获取客户端系统
         # 原因：网易引擎的双端隔离原则（开发规范.md:1075 - 客户端组件不能在服务端使用）
         # 参考：商店系统.md:148 正确的双端通信方式
-        self.NotifyToClient(
-            player_id,
-            "BedWarsShopTryOpen",
-            {
-                'ui_dict': ui_dict,
-                'player_id': player_id
-            }
-        )
-        print("[ShopServerSystem] 已发送UI数据到客户端: player={}".format(player_id))
+        self.NotifyToClient(player_id, "BedWarsShopTryOpen", event_data)
+        print("[ShopServerSystem] 已发送UI数据到客户端: player={}, version={}, skeleton={}".format(
+            player_id, catalogue.version, 'skeleton' in event_data))
+
+    def handle_request_skeleton(self, event_data):
+        """
+        客户端缓存中没有骨架(例如重新连接)时重新发送商店打开消息
+
+        Args:
+            event_data (dict): {'player_id': str, 'shop_type': str}
+        """
+        player_id = event_data.get('player_id')
+        shop_type = event_data.get('shop_type')
+        catalogue = self.catalogues.get(shop_type)
+        if not catalogue:
+            return
+        self.player_skeleton_versions.pop(player_id, None)
+        overlay = self._build_overlay(player_id, catalogue)
+        self.player_shop_overlays[player_id] = (shop_type, catalogue.version, overlay)
+        self._send_shop_open(player_id, catalogue, overlay)
 
     def generate_ui_dict(self, player_id, shop_type):
         """
@@ -188,9 +350,8 @@ class ShopServerSystem(ServerSystem):
             dict: UI数据字典
         """
         try:
-            # 获取商店配置
-            shop_config = self.shop_configs.get(shop_type)
-            if not shop_config:
+            catalogue = self.catalogues.get(shop_type)
+            if not catalogue:
                 print("[ERROR] [ShopServerSystem] shop_type={}配置不存在".format(shop_type))
                 return {
                     "type": "default",
@@ -200,21 +361,8 @@ class ShopServerSystem(ServerSystem):
                     "categories": []
                 }
 
-            # 1. 基础信息
-            ui_dict = {
-                "type": shop_config.get("type", "default"),
-                "name": shop_config.get("name", u"商店"),
-                "intro": shop_config.get("intro", u""),
-                "currencies": self._format_currencies(player_id),
-                "categories": []
-            }
-
-            # 2. 生成分类列表
-            categories = shop_config.get("categories", [])
-            for category_config in categories:
-                category_ui = self._generate_category_ui(player_id, category_config)
-                if category_ui:
-                    ui_dict["categories"].append(category_ui)
+            # 静态骨架 + 玩家动态覆盖
+            ui_dict = apply_overlay(catalogue.skeleton, self._build_overlay(player_id, catalogue))
 
             print("[ShopServerSystem] UI数据生成成功: player={}, categories={}".format(
                 player_id, len(ui_dict["categories"])))
@@ -235,91 +383,45 @@ class ShopServerSystem(ServerSystem):
                 "categories": []
             }
 
-    def _generate_category_ui(self, player_id, category_config):
+    def _build_overlay(self, player_id, catalogue):
         """
-        生成单个分类的UI数据
-
-        从ShopPresetDefServer._generate_category_ui_new()迁移
+        计算玩家的动态覆盖(货币与各商品的动态字段)
 
         Args:
             player_id (str): 玩家ID
-            category_config (dict): 分类配置
+            catalogue (ShopCatalogue): 商店目录
 
         Returns:
-            dict: 分类UI数据,如果无商品返回None
+            dict: {"currencies": str, "goods": {goods_key: {字段: 值}}}
         """
-        try:
-            # 1. 基础信息
-            category_ui = {
-                "name": category_config.get("name", ""),
-                "intro": category_config.get("intro", ""),
-                "ui": category_config.get("ui", {}),
-                "goods": []
-            }
-
-            # 2. 获取该分类的商品ID列表
-            goods_ids = category_config.get("goods_ids", [])
-
-            # 3. 生成每个商品的UI
-            for goods_id in goods_ids:
-                # 从goods_pool中查找商品配置
-                goods_config = self.goods_pool.get(goods_id)
-                if not goods_config:
-                    print("[WARN] [ShopServerSystem] 商品ID未找到: {}".format(goods_id))
-                    continue
-
-                goods_ui = self._generate_goods_ui(player_id, goods_config)
-                if goods_ui:
-                    category_ui["goods"].append(goods_ui)
-
-            # 4. 如果分类没有商品,返回None
-            if not category_ui["goods"]:
-                return None
-
-            return category_ui
-
-        except Exception as e:
-            print("[ERROR] [ShopServerSystem] 分类UI生成异常: category={}, error={}".format(
-                category_config.get("id"), str(e)))
-            import traceback
-            traceback.print_exc()
-            return None
+        snapshot = self.shop_state_cache.snapshot(player_id)
+        return catalogue.build_overlay(
+            self._format_currencies(player_id),
+            lambda goods_config, field: self._compute_goods_field(player_id, goods_config, field, snapshot)
+        )
 
-    def _generate_goods_ui(self, player_id, goods_config):
+    def _compute_goods_field(self, player_id, goods_config, field, snapshot=None):
         """
-        生成单个商品的UI数据
-
-        从ShopPresetDefServer._generate_goods_ui_new()迁移
+        计算商品的动态字段
 
         Args:
             player_id (str): 玩家ID
             goods_config (dict): 商品配置
+            field (str): 字段名(cannot_buy_msg / price / show_item_dict)
+            snapshot (ShopStateSnapshot): 本次生成的依赖状态快照(为None时不使用限购缓存)
 
         Returns:
-            dict: 商品UI数据
-        """
-        try:
-            # 1. 基础信息
-            goods_ui = {
-                "key": goods_config.get("id"),
-                "name": goods_config.get("name", goods_config.get("id")),
-                "intro": goods_config.get("intro", ""),
-                "upgrade_type": goods_config.get("upgrade_type", False),
-                "levels_intro": goods_config.get("levels_intro", []),
-                "show_item_dict": self._get_show_item(player_id, goods_config),
-                "cannot_buy_msg": self._check_cannot_buy(player_id, goods_config),
-                "price": self._format_price(player_id, goods_config),
-                "detail_intros": goods_config.get("detail_intros", "")
-            }
-
-            return goods_ui
-
-        except Exception as e:
-            print("[ERROR] [ShopServerSystem] 商品UI生成异常: goods={}, error={}".format(
-                goods_config.get("id"), str(e)))
-            import traceback
-            traceback.print_exc()
-            return None
+            字段值
+        """
+        if field == FIELD_CANNOT_BUY:
+            if snapshot is not None:
+                return self.shop_state_cache.get_cannot_buy(snapshot, goods_config)
+            return self._check_cannot_buy(player_id, goods_config)
+        if field == FIELD_PRICE:
+            return self._format_price(player_id, goods_config)
+        if field == FIELD_SHOW_ITEM:
+            return self._get_show_item(player_id, goods_config)
+        return None
 
     def _format_currencies(self, player_id):
         """
@@ -339,22 +441,6 @@ class ShopServerSystem(ServerSystem):
             from Script_NeteaseMod.systems.util.CurrencyManager import CurrencyManager
             from Script_NeteaseMod.config.shop_config import SHOP_CONFIG
 
-            # 货币图标
-            currency_icons = {
-                "iron": u"\uE1AC",
-                "gold": u"\uE1AD",
-                "diamond": u"\uE1AE",
-                "emerald": u"\uE1AF"
-            }
-
-            # 货币颜色
-            currency_colors = {
-                "iron": u"§f",     # 白色
-                "gold": u"§e",     # 黄色
-                "diamond": u"§b",  # 青色
-                "emerald": u"§a"   # 绿色
-            }
-
             # 获取商店支持的货币列表
             currencies = SHOP_CONFIG.get("currencies", ["iron", "gold", "diamond", "emerald"])
 
@@ -362,8 +448,8 @@ class ShopServerSystem(ServerSystem):
             parts = []
             for currency in currencies:
                 amount = CurrencyManager.get_player_currency_count(player_id, currency)
-                icon = currency_icons.get(currency, u"")
-                color = currency_colors.get(currency, u"§f")
+                icon = CURRENCY_ICONS.get(currency, u"")
+                color = CURRENCY_COLORS.get(currency, u"§f")
 
                 parts.append(u"{}{} {}".format(icon, amount, color))
 
@@ -392,30 +478,6 @@ class ShopServerSystem(ServerSystem):
             str: 格式化的价格字符串
         """
         try:
-            # 货币图标
-            currency_icons = {
-                "iron": u"\uE1AC",
-                "gold": u"\uE1AD",
-                "diamond": u"\uE1AE",
-                "emerald": u"\uE1AF"
-            }
-
-            # 货币颜色
-            currency_colors = {
-                "iron": u"§f",     # 白色
-                "gold": u"§e",     # 黄色
-                "diamond": u"§b",  # 青色
-                "emerald": u"§a"   # 绿色
-            }
-
-            # 货币名称
-            currency_names = {
-                "iron": u"铁锭",
-                "gold": u"金锭",
-                "diamond": u"钻石",
-                "emerald": u"绿宝石"
-            }
-
             # 1. 获取价格配置
             price_config = goods_config.get("price")
             if not price_config:
@@ -432,14 +494,7 @@ class ShopServerSystem(ServerSystem):
                 price = price_config
 
             # 3. 格式化价格
-            currency = price.get("currency", "iron")
-            amount = price.get("amount", 0)
-
-            icon = currency_icons.get(currency, u"")
-            color = currency_colors.get(currency, u"§f")
-            name = currency_names.get(currency, currency)
-
-            return u"{}{} {} {}".format(color, icon, amount, name)
+            return self._format_fixed_price(price)
 
         except Exception as e:
             print("[ERROR] [ShopServerSystem] 价格格式化异常: goods={}, error={}".format(
@@ -448,6 +503,25 @@ class ShopServerSystem(ServerSystem):
             traceback.print_exc()
             return u"价格错误"
 
+    def _format_fixed_price(self, price):
+        """
+        格式化单个价格
+
+        Args:
+            price (dict): {'currency': 'iron', 'amount': 4}
+
+        Returns:
+            str: 格式化的价格字符串,例如 "§f\uE1AC 4 铁锭"
+        """
+        currency = price.get("currency", "iron")
+        amount = price.get("amount", 0)
+
+        icon = CURRENCY_ICONS.get(currency, u"")
+        color = CURRENCY_COLORS.get(currency, u"§f")
+        name = CURRENCY_NAMES.get(currency, currency)
+
+        return u"{}{} {} {}".format(color, icon, amount, name)
+
     def _get_show_item(self, player_id, goods_config):
         """
         获取UI显示物品
@@ -489,20 +563,7 @@ class ShopServerSystem(ServerSystem):
 
                 if item_levels and upgrade_path:
                     # 查找当前等级
-                    item_comp = serverApi.GetEngineCompFactory().CreateItem(player_id)
-                    current_level = -1
-
-                    for slot in range(36):
-                        item_dict = item_comp.GetPlayerItem(
-                            serverApi.GetMinecraftEnum().ItemPosType.INVENTORY,
-                            slot
-                        )
-                        if item_dict:
-                            item_name = item_dict.get("newItemName")
-                            if item_name in upgrade_path:
-                                level = upgrade_path.index(item_name)
-                                if level > current_level:
-                                    current_level = level
+                    current_level = self._find_item_level(player_id, upgrade_path)
 
                     # 返回下一级物品图标
                     next_level = current_level + 1
@@ -573,20 +634,7 @@ class ShopServerSystem(ServerSystem):
                 if not upgrade_path:
                     return 0
 
-                item_comp = serverApi.GetEngineCompFactory().CreateItem(player_id)
-                current_level = -1  # -1表示未拥有任何等级
-
-                for slot in range(36):
-                    item_dict = item_comp.GetPlayerItem(
-                        serverApi.GetMinecraftEnum().ItemPosType.INVENTORY,
-                        slot
-                    )
-                    if item_dict:
-                        item_name = item_dict.get("newItemName")
-                        if item_name in upgrade_path:
-                            level = upgrade_path.index(item_name)
-                            if level > current_level:
-                                current_level = level
+                current_level = self._find_item_level(player_id, upgrade_path)  # -1表示未拥有任何等级
 
                 # 返回下一级等级(用于价格查询)
                 # 如果未拥有,返回0(购买第一级)
@@ -598,6 +646,27 @@ class ShopServerSystem(ServerSystem):
             print("[ERROR] [ShopServerSystem] 获取升级等级异常: {}".format(str(e)))
             return 0
 
+    def _find_item_level(self, player_id, upgrade_path):
+        """
+        查找玩家背包中升级路径物品的最高等级
+
+        从背包镜像读取,不逐槽位查询(与逐槽位扫描背包36格的结果一致)
+
+        Args:
+            player_id (str): 玩家ID
+            upgrade_path (list): 升级路径(物品ID按等级排序)
+
+        Returns:
+            int: 最高等级,未拥有任何等级时返回-1
+        """
+        from Script_NeteaseMod.systems.util.InventoryMirror import get_inventory_mirror
+        counts = get_inventory_mirror().get_counts(player_id, upgrade_path)
+        current_level = -1
+        for level, item_name in enumerate(upgrade_path):
+            if counts.get(item_name, 0) > 0:
+                current_level = level
+        return current_level
+
     def _get_bedwars_game_system(self):
         """
         获取BedWarsGameSystem实例
@@ -645,6 +714,7 @@ class ShopServerSystem(ServerSystem):
         处理玩家购买商品
 
         从ShopPresetDefServer._on_try_buy()和_buy_goods_new()迁移
+        请求只加入购买队列,在Update中按每Tick预算处理(_drain_purchase_queue)
 
         Args:
             event_data (dict): 事件数据
@@ -654,11 +724,39 @@ class ShopServerSystem(ServerSystem):
         """
         player_id = event_data.get('player_id')
         goods_key = event_data.get('goods_key')
-        category_index = event_data.get('category_index')
 
-        print("[ShopServerSystem] 收到购买请求: player={}, goods_key={}, category={}".format(
-            player_id, goods_key, category_index))
+        # 加入购买队列(令牌不足或队列已满时丢弃,计入队列统计)
+        # 与队尾相同商品的请求、同一Tick内重复的请求(双击)合并为购买N次,在Update中处理
+        self.purchase_queue.push(player_id, goods_key)
+
+    def _drain_purchase_queue(self):
+        """
+        按每Tick预算处理购买队列
 
+        每个条目购买N次并发送一次结果,全部处理完后每个玩家只刷新一次商店UI
+        """
+        refresh_players = []
+        for player_id, goods_key, count in self.purchase_queue.pop_batch(PURCHASES_PER_TICK):
+            self._process_purchase(player_id, goods_key, count)
+            if player_id not in refresh_players:
+                refresh_players.append(player_id)
+
+        # 刷新商店UI
+        # 购买成功：更新货币显示、刷新可购买商品状态
+        # 购买失败：刷新商品锁定状态（如果是因为余额不足）
+        # 参考老项目: BedWarsShopPart.server_on_bedwars_shop_try_buy() 第291行
+        for player_id in refresh_players:
+            self._refresh_shop_ui(player_id)
+
+    def _process_purchase(self, player_id, goods_key, count):
+        """
+        处理队列中的购买条目(同一商品购买count次,失败时停止,至少成功一次时按成功发送结果)
+
+        Args:
+            player_id (str): 玩家ID
+            goods_key (str): 商品键
+            count (int): 购买次数
+        """
         # 1. 查找商品配置
         goods_config = self.goods_pool.get(goods_key)
         if not goods_config:
@@ -667,16 +765,28 @@ class ShopServerSystem(ServerSystem):
             return
 
         # 2. 调用购买流程
-        success, message = self._buy_goods(player_id, goods_config)
+        # (购买事务提交/回滚时已写穿背包镜像)
+        bought = 0
+        success_message, failure_message = None, None
+        for _ in range(count):
+            success, message = self._buy_goods(player_id, goods_config)
+            if not success:
+                failure_message = message
+                break
+            bought += 1
+            success_message = message
 
         # 3. 发送结果到客户端（音效由客户端播放）
-        self._send_buy_result(player_id, success, message)
-
-        # 4. 刷新商店UI
-        # 购买成功：更新货币显示、刷新可购买商品状态
-        # 购买失败：刷新商品锁定状态（如果是因为余额不足）
-        # 参考老项目: BedWarsShopPart.server_on_bedwars_shop_try_buy() 第291行
-        self._refresh_shop_ui(player_id)
+        # 部分成功时按成功处理,附带成功次数与剩余次数停止的原因
+        if bought == 0:
+            self._send_buy_result(player_id, False, failure_message or u"购买失败")
+            return
+        message = success_message
+        if bought > 1 or failure_message:
+            message = u"{} x{}".format(message, bought)
+        if failure_message:
+            message = u"{} ({})".format(message, failure_message)
+        self._send_buy_result(player_id, True, message)
 
     def _buy_goods(self, player_id, goods_config):
         """
@@ -685,10 +795,10 @@ class ShopServerSystem(ServerSystem):
         从ShopPresetDefServer._buy_goods_new()迁移
 
         流程:
-        1. 限购检查
-        2. 货币检查
-        3. 扣除货币
-        4. 发放物品/效果
+        1. 创建购买事务(PurchaseTransaction),在其背包快照上做限购检查
+        2. 在同一份快照上规划扣除货币
+        3. 规划发放物品,一次写入背包 / 提交扣款后处理队伍升级、陷阱
+        4. 处理失败时回滚事务(写回快照)
         5. 广播事件
 
         Args:
@@ -703,14 +813,10 @@ class ShopServerSystem(ServerSystem):
             goods_name = goods_config.get("name", goods_id)
             goods_type = goods_config.get("type", "item")
 
-            print("[ShopServerSystem] 新架构购买: player={}, goods={}, type={}".format(
-                player_id, goods_id, goods_type))
-
-            # 1. 限购检查
-            cannot_buy_msg = self._check_cannot_buy(player_id, goods_config)
+            # 1. 限购检查 (基于事务的背包快照,余额由plan_payment检查)
+            transaction = PurchaseTransaction(player_id)
+            cannot_buy_msg = self._check_cannot_buy(player_id, goods_config, transaction)
             if cannot_buy_msg:
-                print("[WARN] [ShopServerSystem] 限购拦截: player={}, goods={}, reason={}".format(
-                    player_id, goods_id, cannot_buy_msg))
                 return False, cannot_buy_msg
 
             # 2. 获取价格 (处理多级价格)
@@ -724,59 +830,49 @@ class ShopServerSystem(ServerSystem):
             else:
                 price = price_config
 
-            # 3. 货币检查
-            from Script_NeteaseMod.systems.util.CurrencyManager import CurrencyManager
-            if not CurrencyManager.can_afford(player_id, price):
-                currency_name = self._get_currency_display_name(price.get("currency", "iron"))
+            # 3. 货币检查 + 规划扣款 (基于同一份背包快照)
+            if not transaction.plan_payment(price):
+                currency_name = self._get_currency_display_name(transaction.missing_currency or "iron")
                 return False, u"{}不足".format(currency_name)
 
-            # 4. 扣除货币
-            if not CurrencyManager.pay_price(player_id, price):
-                return False, u"货币扣除失败"
-
-            # 5. 根据商品类型发放
+            # 4. 根据商品类型规划发放并提交
             if goods_type == "item":
-                success = self._give_item(player_id, goods_config)
-                if not success:
-                    # 物品发放失败,退还货币
-                    CurrencyManager.refund_price(player_id, price)
+                if not self._plan_give_item(transaction, player_id, goods_config):
+                    return False, u"物品发放失败"
+                if not transaction.commit():
                     return False, u"物品发放失败"
 
-            elif goods_type == "team_upgrade":
-                success, msg = self._process_team_upgrade(player_id, goods_config)
-                if not success:
-                    # 升级失败,退还货币
-                    CurrencyManager.refund_price(player_id, price)
-                    return False, msg
-
-            elif goods_type == "trap":
-                success, msg = self._process_trap(player_id, goods_config)
+            elif goods_type == "item_upgrade":
+                success, msg = self._process_item_upgrade(player_id, goods_config, transaction)
                 if not success:
-                    # 陷阱购买失败,退还货币
-                    CurrencyManager.refund_price(player_id, price)
                     return False, msg
+                if not transaction.commit():
+                    return False, u"物品发放失败"
 
-            elif goods_type == "item_upgrade":
-                success, msg = self._process_item_upgrade(player_id, goods_config)
+            elif goods_type in ("team_upgrade", "trap"):
+                # 先扣款,业务处理失败时回滚
+                if not transaction.commit():
+                    return False, u"货币扣除失败"
+                if goods_type == "team_upgrade":
+                    success, msg = self._process_team_upgrade(player_id, goods_config)
+                else:
+                    success, msg = self._process_trap(player_id, goods_config)
                 if not success:
-                    # 可升级物品失败,退还货币
-                    CurrencyManager.refund_price(player_id, price)
+                    transaction.rollback()
                     return False, msg
 
             else:
-                # 未知类型
-                CurrencyManager.refund_price(player_id, price)
+                # 未知类型(未写入背包)
                 return False, u"未知商品类型: {}".format(goods_type)
 
-            # 6. 更新购买记录 (剑类和护甲类)
+            # 5. 更新购买记录 (剑类和护甲类)
             if goods_type == "item":
                 self._update_purchase_record(player_id, goods_config)
 
-            # 7. 广播购买事件
+            # 6. 广播购买事件
             self._broadcast_purchase_event(player_id, goods_config, price)
 
-            # 8. 成功
-            print("[ShopServerSystem] 购买成功: player={}, goods={}".format(player_id, goods_id))
+            # 7. 成功
             return True, u"购买成功: {}".format(goods_name)
 
         except Exception as e:
@@ -786,18 +882,19 @@ class ShopServerSystem(ServerSystem):
             traceback.print_exc()
             return False, u"购买失败"
 
-    def _give_item(self, player_id, goods_config):
+    def _plan_give_item(self, transaction, player_id, goods_config):
         """
-        给予玩家物品
+        规划给予玩家物品
 
         从ShopPresetDefServer._give_item_new()迁移
 
         Args:
+            transaction (PurchaseTransaction): 购买事务
             player_id (str): 玩家ID
             goods_config (dict): 商品配置
 
         Returns:
-            bool: 是否成功
+            bool: 是否成功(背包空间不足时失败)
         """
         try:
             item = goods_config.get("item")
@@ -813,12 +910,12 @@ class ShopServerSystem(ServerSystem):
             # 处理列表物品
             if isinstance(item, list):
                 for single_item in item:
-                    if not self._give_single_item(player_id, single_item):
+                    if not self._plan_give_single_item(transaction, player_id, single_item):
                         return False
                 return True
 
             # 处理单个物品
-            return self._give_single_item(player_id, item)
+            return self._plan_give_single_item(transaction, player_id, item)
 
         except Exception as e:
             print("[ERROR] [ShopServerSystem] 物品发放异常: player={}, error={}".format(
@@ -827,9 +924,9 @@ class ShopServerSystem(ServerSystem):
             traceback.print_exc()
             return False
 
-    def _give_single_item(self, player_id, item_dict):
+    def _plan_give_single_item(self, transaction, player_id, item_dict):
         """
-        发放单个物品
+        规划发放单个物品
 
         从ShopPresetDefServer._give_single_item_new()迁移
 
@@ -839,6 +936,7 @@ class ShopServerSystem(ServerSystem):
         - 应用队伍锋利附魔 (如果是剑类)
 
         Args:
+            transaction (PurchaseTransaction): 购买事务
             player_id (str): 玩家ID
             item_dict (dict): 物品字典
 
@@ -846,8 +944,6 @@ class ShopServerSystem(ServerSystem):
             bool: 是否成功
         """
         try:
-            item_comp = serverApi.GetEngineCompFactory().CreateItem(player_id)
-
             item_name = item_dict.get("newItemName")
             if not item_name:
                 print("[ERROR] [ShopServerSystem] 物品字典缺少newItemName")
@@ -906,8 +1002,6 @@ class ShopServerSystem(ServerSystem):
                             sharpness_level = team_upgrades.get_upgrade_level("sword")
                             if sharpness_level > 0:
                                 needs_sharpness = True
-                                print("[ShopServerSystem] 队伍锋利附魔: player={}, team={}, level={}".format(
-                                    player_id, player_team, sharpness_level))
 
             # ✅ 修复：如果需要附魔，深拷贝item_dict后再添加附魔
             if needs_sharpness:
@@ -934,43 +1028,28 @@ class ShopServerSystem(ServerSystem):
                     armor_item["userData"] = {}
                 armor_item["userData"]["minecraft:item_lock"] = {"__type__": 1, "__value__": True}
 
-                success = item_comp.SetEntityItem(
-                    serverApi.GetMinecraftEnum().ItemPosType.ARMOR,
-                    armor_item,
-                    slot
-                )
-                if success:
-                    print("[ShopServerSystem] 护甲穿戴成功: player={}, item={}, slot={}".format(
-                        player_id, item_name, slot))
-                else:
-                    print("[ERROR] [ShopServerSystem] 护甲穿戴失败: player={}, item={}".format(
-                        player_id, item_name))
-                return success
-
-            # 普通物品发放到背包
-            # ⚠️ CRITICAL: SpawnItemToPlayerInv不带slot参数时必须使用'itemName'字段
-            # 原因: 网易API要求，newItemName只用于带slot的调用
-            # 参考: BedWarsGameSystem.py:2219-2224, CurrencyManager.py:234-240
-            spawn_dict = {
-                'itemName': item_dict.get('newItemName'),
+                transaction.plan_equip(slot, armor_item)
+                return True
+
+            # 普通物品放入背包
+            # 事务一次写入槽位(SetPlayerAllItems),槽位物品字典使用newItemName/newAuxValue字段
+            slot_dict = {
+                'newItemName': item_name,
                 'count': item_dict.get('count', 1),
-                'auxValue': item_dict.get('newAuxValue', 0)
+                'newAuxValue': item_dict.get('newAuxValue', 0)
             }
 
             # 复制附魔数据(如果存在)
             if 'enchantData' in item_dict:
-                spawn_dict['enchantData'] = item_dict['enchantData']
+                slot_dict['enchantData'] = item_dict['enchantData']
 
             # 复制自定义提示(如果存在)
             if 'customTips' in item_dict:
-                spawn_dict['customTips'] = item_dict['customTips']
+                slot_dict['customTips'] = item_dict['customTips']
 
-            success = item_comp.SpawnItemToPlayerInv(spawn_dict, player_id)
-            if success:
-                print("[ShopServerSystem] 物品发放成功: player={}, item={}, count={}".format(
-                    player_id, item_name, item_dict.get("count", 1)))
-            else:
-                print("[ERROR] [ShopServerSystem] 物品发放失败: player={}, item={}".format(
+            success = transaction.plan_give(slot_dict)
+            if not success:
+                print("[ERROR] [ShopServerSystem] 背包空间不足,物品发放失败: player={}, item={}".format(
                     player_id, item_name))
             return success
 
@@ -1091,7 +1170,7 @@ class ShopServerSystem(ServerSystem):
             traceback.print_exc()
             return False, u"陷阱购买失败"
 
-    def _process_item_upgrade(self, player_id, goods_config):
+    def _process_item_upgrade(self, player_id, goods_config, transaction):
         """
         处理可升级物品购买 (镐子/斧子)
 
@@ -1103,16 +1182,17 @@ class ShopServerSystem(ServerSystem):
         3. 如果有当前等级物品,替换为下一级
         4. 如果没有,发放第一级(index=0)
 
+        替换旧物品与发放新物品只在事务中规划,由调用方提交
+
         Args:
             player_id (str): 玩家ID
             goods_config (dict): 商品配置
+            transaction (PurchaseTransaction): 购买事务(已规划扣款)
 
         Returns:
             tuple: (bool, str) - (是否成功, 消息)
         """
         try:
-            item_comp = serverApi.GetEngineCompFactory().CreateItem(player_id)
-
             # 1. 获取物品等级配置(用于查找当前等级并发放对应等级物品)
             item_levels = goods_config.get("item_levels")
             if not item_levels:
@@ -1125,22 +1205,18 @@ class ShopServerSystem(ServerSystem):
                 print("[ERROR] [ShopServerSystem] upgrade_path缺失: goods={}".format(goods_config.get("id")))
                 return False, u"配置错误: upgrade_path缺失"
 
-            # 3. 查找玩家背包中的当前物品等级
+            # 3. 查找玩家背包中的当前物品等级(基于事务的背包快照)
             # 参考老项目: CurrentItemFromSet.find_player_item_from_set()
+            # 升级路径在ItemTierRegistry中按商品ID登记为品质系列
+            registry = get_item_tier_registry()
+            family = goods_config.get("id")
             current_level = -1  # -1表示未拥有任何等级
             current_slot = None
-            for slot in range(36):
-                item_dict = item_comp.GetPlayerItem(
-                    serverApi.GetMinecraftEnum().ItemPosType.INVENTORY,
-                    slot
-                )
-                if item_dict:
-                    item_name = item_dict.get("newItemName")
-                    if item_name in upgrade_path:
-                        level = upgrade_path.index(item_name)
-                        if level > current_level:
-                            current_level = level
-                            current_slot = slot
+            for slot, item_dict in transaction.find_items(upgrade_path):
+                level = registry.get_tier(item_dict.get("newItemName"), family)
+                if level > current_level:
+                    current_level = level
+                    current_slot = slot
 
             # 4. 确定下一级物品
             # 如果玩家没有任何等级,给第一级(index=0)
@@ -1155,19 +1231,11 @@ class ShopServerSystem(ServerSystem):
 
             # 6. 删除旧物品(如果存在)
             if current_slot is not None:
-                item_comp.SetInvItemNum(current_slot, 0)
-                print("[ShopServerSystem] 删除旧物品: player={}, slot={}, level={} -> {}".format(
-                    player_id, current_slot, current_level, next_level))
-            else:
-                print("[ShopServerSystem] 首次购买: player={}, level={}".format(
-                    player_id, next_level))
+                transaction.plan_remove_slot(current_slot)
 
             # 7. 发放新等级的物品(从item_levels中获取完整配置)
-            success = self._give_single_item(player_id, next_item_dict)
+            success = self._plan_give_single_item(transaction, player_id, next_item_dict)
             if success:
-                item_name = next_item_dict.get("newItemName", "未知物品")
-                print("[ShopServerSystem] 可升级物品购买成功: player={}, goods={}, level={} -> {}, item={}".format(
-                    player_id, goods_config.get("id"), current_level, next_level, item_name))
                 return True, u"升级成功"
             else:
                 return False, u"物品发放失败"
@@ -1192,7 +1260,7 @@ class ShopServerSystem(ServerSystem):
             goods_config (dict): 商品配置
         """
         try:
-            from Script_NeteaseMod.config.shop_config import ORDERED_SWORDS
+            registry = get_item_tier_registry()
 
             # 获取BedWarsGameSystem
             game_system = self._get_bedwars_game_system()
@@ -1221,24 +1289,18 @@ class ShopServerSystem(ServerSystem):
                     continue
 
                 # 剑类记录
-                if item_name in ORDERED_SWORDS:
+                new_level = registry.get_tier(item_name, FAMILY_SWORD)
+                if new_level is not None:
                     if not hasattr(game_system, 'player_sword_record'):
                         game_system.player_sword_record = {}
 
                     # 获取当前记录的剑品质
                     current_record = game_system.player_sword_record.get(player_id, "minecraft:wooden_sword")
-                    current_level = 0
-                    if current_record in ORDERED_SWORDS:
-                        current_level = ORDERED_SWORDS.index(current_record)
-
-                    # 新购买的剑品质
-                    new_level = ORDERED_SWORDS.index(item_name)
+                    current_level = registry.get_tier(current_record, FAMILY_SWORD) or 0
 
                     # 只记录更高品质的剑
                     if new_level > current_level:
                         game_system.player_sword_record[player_id] = item_name
-                        print("[ShopServerSystem] 更新剑购买记录: player={}, old={}, new={}, level={}".format(
-                            player_id, current_record, item_name, new_level))
 
                 # 护甲类记录
                 elif "chestplate" in item_name or "leggings" in item_name or "boots" in item_name:
@@ -1259,8 +1321,6 @@ class ShopServerSystem(ServerSystem):
 
                     if armor_slot:
                         game_system.player_armor_record[player_id][armor_slot] = item_name
-                        print("[ShopServerSystem] 更新护甲购买记录: player={}, slot={}, item={}".format(
-                            player_id, armor_slot, item_name))
 
         except Exception as e:
             print("[ERROR] [ShopServerSystem] 更新购买记录异常: player={}, error={}".format(
@@ -1303,14 +1363,12 @@ class ShopServerSystem(ServerSystem):
                 'msg': message
             }
         )
-        print("[ShopServerSystem] 已发送购买结果: player={}, success={}, msg={}".format(
-            player_id, success, message))
 
     def _refresh_shop_ui(self, player_id):
         """
         刷新商店UI
 
-        购买成功后调用，重新生成UI数据并发送到客户端
+        购买成功后调用，重新计算动态覆盖，只把变化的字段发送到客户端
         这将更新：
         1. 货币显示（购买后余额变化）
         2. 商品锁定状态（余额不足时显示"余额不足"）
@@ -1327,22 +1385,49 @@ class ShopServerSystem(ServerSystem):
             print("[WARN] [ShopServerSystem] 刷新UI失败: 未找到玩家{}的商店类型".format(player_id))
             return
 
-        # 重新生成UI数据（会重新计算货币、cannot_buy_msg等）
-        ui_dict = self.generate_ui_dict(player_id, shop_type)
+        catalogue = self.catalogues.get(shop_type)
+        if not catalogue:
+            return
+
+        # 只重新计算动态覆盖,并且只发送与上次相比变化的字段
+        overlay = self._build_overlay(player_id, catalogue)
+        last = self.player_shop_overlays.get(player_id)
+        last_overlay = last[2] if last and last[0] == shop_type and last[1] == catalogue.version else None
+        self.player_shop_overlays[player_id] = (shop_type, catalogue.version, overlay)
+
+        overlay_diff = diff_overlay(last_overlay, overlay)
+        if not overlay_diff:
+            return
 
         # 发送刷新事件到客户端
         self.NotifyToClient(
             player_id,
             "BedWarsShopRefresh",
             {
-                'ui_dict': ui_dict
+                'shop_type': shop_type,
+                'version': catalogue.version,
+                'overlay_diff': overlay_diff
             }
         )
-        print("[ShopServerSystem] 已发送UI刷新: player={}, shop_type={}".format(player_id, shop_type))
 
     # ========== 限购检查 ==========
 
-    def _check_cannot_buy(self, player_id, goods_config):
+    def get_purchase_transaction(self, player_id):
+        """
+        获取玩家正在进行限购检查的购买事务
+
+        Args:
+            player_id (str): 玩家ID
+
+        Returns:
+            PurchaseTransaction|None: 购买事务,不在购买处理中时返回None
+        """
+        transaction = self.purchase_transaction
+        if transaction is not None and transaction.player_id == player_id:
+            return transaction
+        return None
+
+    def _check_cannot_buy(self, player_id, goods_config, transaction=None):
         """
         统一的限购检查入口
 
@@ -1352,15 +1437,17 @@ class ShopServerSystem(ServerSystem):
         - None → 无限购
         - Lambda函数 → 直接调用
         - 字符串 → 调用对应方法 (如"check_team_upgrade_limit")
-        - 余额检查 → 检查玩家是否有足够货币
+        - 余额检查 → 检查玩家是否有足够货币(有购买事务时跳过,由plan_payment检查)
 
         Args:
             player_id (str): 玩家ID
             goods_config (dict): 商品配置
+            transaction (PurchaseTransaction): 购买事务,限购函数读取其背包快照(UI显示时为None)
 
         Returns:
             str|None: 错误消息或None (None表示可以购买)
         """
+        self.purchase_transaction = transaction
         try:
             # 1. 首先执行自定义限购检查
             check_can_buy = goods_config.get("check_can_buy")
@@ -1383,6 +1470,8 @@ class ShopServerSystem(ServerSystem):
 
             # 2. 然后检查余额 (参考老项目ShopGoods.py第89-97行)
             # 这是关键修复:确保货币不足的道具显示"余额不足"并禁用购买按钮
+            if transaction is not None:
+                return None
             price = self._get_price_for_player(player_id, goods_config)
             if price:
                 from Script_NeteaseMod.systems.util.CurrencyManager import CurrencyManager
@@ -1398,6 +1487,9 @@ class ShopServerSystem(ServerSystem):
             traceback.print_exc()
             return None
 
+        finally:
+            self.purchase_transaction = None
+
     def _get_price_for_player(self, player_id, goods_config):
         """
         获取玩家购买该商品的实际价格
@@ -1690,26 +1782,13 @@ class ShopServerSystem(ServerSystem):
             str|None: 错误消息或None
         """
         try:
-            item_comp = serverApi.GetEngineCompFactory().CreateItem(player_id)
-
             # 1. 获取升级路径
             upgrade_path = goods_config.get("upgrade_path")
             if not upgrade_path:
                 return None
 
             # 2. 查找玩家背包中的当前物品等级
-            current_level = 0
-            for slot in range(36):
-                item_dict = item_comp.GetPlayerItem(
-                    serverApi.GetMinecraftEnum().ItemPosType.INVENTORY,
-                    slot
-                )
-                if item_dict:
-                    item_name = item_dict.get("newItemName")
-                    if item_name in upgrade_path:
-                        level = upgrade_path.index(item_name)
-                        if level > current_level:
-                            current_level = level
+            current_level = max(0, self._find_item_level(player_id, upgrade_path))
 
             # 3. 检查是否已达最高级
             if current_level >= len(upgrade_path) - 1:
@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+"""
+商店限购状态缓存
+
+职责:
+- 每个商品声明限购检查(cannot_buy_msg)依赖的玩家状态: 货币数量、护甲槽位、剑记录、
+  队伍升级等级、陷阱数量等
+- 每次生成UI时每项依赖状态只读取一次(依赖快照),商品的依赖状态与上次生成时相同就复用上次的结果
+- 购买后刷新只重新检查依赖状态发生变化的商品
+
+依赖的来源:
+- 价格: 固定价格依赖该货币;多级价格依赖所有等级的货币和当前等级(队伍升级等级/背包中的升级路径物品)
+- check_can_buy为方法名: 按CHECK_DEPENDENCIES推断
+- check_can_buy为函数: 需要在商品配置中声明depends_on(见shop_config.DEPENDS_*),
+  没有声明时无法推断,每次都重新检查
+
+说明:
+- 只用于UI显示;购买时的限购检查(_buy_goods)仍然直接调用_check_cannot_buy
+- 背包相关的依赖通过InventoryMirror读取(由背包变化事件失效),不逐槽位查询引擎
+"""
+
+from __future__ import print_function
+
+import mod.server.extraServerApi as serverApi
+from Script_NeteaseMod.systems.shop.ShopCatalogue import is_multi_level_price
+
+# 依赖状态
+DEP_TEAM = ('team',)  # 玩家所在队伍
+DEP_BED = ('bed',)  # 队伍床是否存在
+DEP_TRAP = ('trap',)  # 队伍陷阱数量
+DEP_SWORD = ('sword',)  # 剑购买记录 + 背包中的剑
+DEP_ARMOR_CHESTPLATE = ('armor', 1)  # 胸甲槽位
+DEP_ARMOR_LEGGINGS = ('armor', 2)  # 护腿槽位
+
+# 商品配置depends_on中可声明的依赖名称
+DECLARED_DEPENDENCIES = {
+    'team': DEP_TEAM,
+    'bed': DEP_BED,
+    'trap': DEP_TRAP,
+    'sword': DEP_SWORD,
+    'armor_chestplate': DEP_ARMOR_CHESTPLATE,
+    'armor_leggings': DEP_ARMOR_LEGGINGS,
+}
+
+
+def _team_upgrade_dependencies(goods_config):
+    deps = [DEP_TEAM, ('team_upgrade', goods_config.get("upgrade_key"))]
+    if goods_config.get("upgrade_type") == "trap":
+        deps.append(DEP_BED)
+    return deps
+
+
+def _item_upgrade_dependencies(goods_config):
+    return [('inventory', tuple(goods_config.get("upgrade_path") or ()))]
+
+
+# 方法名限购检查的依赖
+CHECK_DEPENDENCIES = {
+    "check_team_upgrade_limit": _team_upgrade_dependencies,
+    "check_trap_limit": lambda goods_config: [DEP_TEAM, DEP_BED, DEP_TRAP],
+    "check_item_upgrade_limit": _item_upgrade_dependencies,
+    "check_sword_limit": lambda goods_config: [DEP_SWORD],
+    "check_armor_limit": lambda goods_config: [DEP_ARMOR_CHESTPLATE, DEP_ARMOR_LEGGINGS],
+}
+
+# 多级价格当前等级的依赖(与ShopServerSystem._get_current_upgrade_level一致)
+LEVEL_DEPENDENCIES = {
+    "team_upgrade": lambda goods_config: [DEP_TEAM, ('team_upgrade', goods_config.get("upgrade_key"))],
+    "item_upgrade": _item_upgrade_dependencies,
+}
+
+
+def get_goods_dependencies(goods_config):
+    """
+    推断商品限购检查依赖的玩家状态
+
+    Args:
+        goods_config (dict): 商品配置
+
+    Returns:
+        tuple: 依赖状态列表,无法推断时返回None(每次重新检查)
+    """
+    deps = []
+
+    # 1. 价格(余额检查)
+    price_config = goods_config.get("price")
+    if price_config:
+        if is_multi_level_price(price_config):
+            currencies = set(price.get("currency") for price in price_config.values() if isinstance(price, dict))
+            deps.extend(('currency', currency) for currency in sorted(currencies))
+            level_deps = LEVEL_DEPENDENCIES.get(goods_config.get("type"))
+            if level_deps:
+                deps.extend(level_deps(goods_config))
+        else:
+            deps.append(('currency', price_config.get("currency")))
+
+    # 2. 自定义限购检查
+    check_can_buy = goods_config.get("check_can_buy")
+    declared = goods_config.get("depends_on")
+    if declared is not None:
+        for name in declared:
+            if name not in DECLARED_DEPENDENCIES:
+                print("[WARN] [ShopStateCache] 未知的依赖: goods={}, depends_on={}".format(goods_config.get("id"), name))
+                return None
+            deps.append(DECLARED_DEPENDENCIES[name])
+    elif check_can_buy is not None:
+        if isinstance(check_can_buy, str) and check_can_buy in CHECK_DEPENDENCIES:
+            deps.extend(CHECK_DEPENDENCIES[check_can_buy](goods_config))
+        else:
+            return None
+
+    unique = []
+    for dep in deps:
+        if dep not in unique:
+            unique.append(dep)
+    return tuple(unique)
+
+
+class ShopStateSnapshot(object):
+    """
+    一次UI生成期间的依赖状态快照(每项依赖只读取一次)
+    """
+
+    def __init__(self, cache, player_id):
+        self.cache = cache
+        self.player_id = player_id
+        self._values = {}
+        self._game_system = None
+        self._team = None
+        self._team_loaded = False
+
+    def get(self, dep):
+        """
+        读取依赖状态
+
+        Args:
+            dep (tuple): 依赖状态
+
+        Returns:
+            依赖状态的值(只用于比较是否变化)
+        """
+        if dep in self._values:
+            return self._values[dep]
+        try:
+            value = self._read(dep)
+        except Exception as e:
+            print("[ERROR] [ShopStateCache] 读取依赖状态失败: dep={}, error={}".format(dep, str(e)))
+            value = e  # 每次读取失败的值都不同,下次一定重新检查
+        self._values[dep] = value
+        self.cache.dep_read_count += 1
+        return value
+
+    def fingerprint(self, deps):
+        """
+        计算一组依赖状态的指纹
+
+        Args:
+            deps (tuple): 依赖状态列表
+
+        Returns:
+            tuple: 依赖状态的值
+        """
+        return tuple(self.get(dep) for dep in deps)
+
+    def _get_game_system(self):
+        if self._game_system is None:
+            self._game_system = self.cache.system._get_bedwars_game_system()
+        return self._game_system
+
+    def _get_team(self):
+        if not self._team_loaded:
+            self._team_loaded = True
+            game_system = self._get_game_system()
+            team_module = getattr(game_system, 'team_module', None) if game_system else None
+            self._team = team_module.get_player_team(self.player_id) if team_module else None
+        return self._team
+
+    def _read(self, dep):
+        kind = dep[0]
+        player_id = self.player_id
+
+        if kind == 'currency':
+            from Script_NeteaseMod.systems.util.CurrencyManager import CurrencyManager
+            return CurrencyManager.get_player_currency_count(player_id, dep[1])
+
+        if kind == 'inventory':
+            from Script_NeteaseMod.systems.util.InventoryMirror import get_inventory_mirror
+            counts = get_inventory_mirror().get_counts(player_id, dep[1])
+            return tuple(counts[name] for name in dep[1])
+
+        if kind == 'armor':
+            from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
+            item_dict = get_component_cache().CreateItem(player_id).GetPlayerItem(
+                serverApi.GetMinecraftEnum().ItemPosType.ARMOR, dep[1])
+            return item_dict.get('newItemName') if item_dict else None
+
+        if kind == 'sword':
+            from Script_NeteaseMod.systems.shop.ItemTierRegistry import get_item_tier_registry, FAMILY_SWORD
+            from Script_NeteaseMod.systems.util.InventoryMirror import get_inventory_mirror
+            game_system = self._get_game_system()
+            record = getattr(game_system, 'player_sword_record', {}).get(player_id) if game_system else None
+            swords = get_item_tier_registry().get_family_items(FAMILY_SWORD)
+            counts = get_inventory_mirror().get_counts(player_id, swords)
+            return (record, tuple(counts[name] for name in swords))
+
+        if kind == 'team':
+            return self._get_team()
+
+        team = self._get_team()
+        game_system = self._get_game_system()
+        if team is None or game_system is None:
+            return None
+
+        if kind == 'bed':
+            team_beds = getattr(game_system, 'team_beds', None)
+            return bool(team_beds.get(team)) if team_beds is not None else None
+
+        if kind == 'trap':
+            trap_manager = getattr(game_system, 'team_trap_managers', {}).get(team)
+            return trap_manager.get_trap_count() if trap_manager else None
+
+        if kind == 'team_upgrade':
+            team_upgrade_mgr = getattr(game_system, 'team_upgrades', {}).get(team)
+            return team_upgrade_mgr.get_upgrade_level(dep[1]) if team_upgrade_mgr else None
+
+        raise ValueError("unknown dependency: {}".format(dep))
+
+
+class ShopStateCache(object):
+    """
+    商店限购状态缓存
+
+    数据结构:
+    - _dependencies: {goods_id: tuple | None} 商品的依赖状态(None表示每次重新检查)
+    - _results: {player_id: {goods_id: (fingerprint, cannot_buy_msg)}} 上次生成UI时的检查结果
+    """
+
+    def __init__(self, system):
+        """
+        Args:
+            system: ShopServerSystem实例(提供_check_cannot_buy与_get_bedwars_game_system)
+        """
+        self.system = system
+        self._dependencies = {}
+        self._results = {}
+
+        # 一致性检查模式(测试用,命中缓存时仍然重新检查并对比)
+        self.check_mode = False
+        self.mismatch_count = 0
+
+        # 统计数据
+        self.hit_count = 0  # 复用上次结果的次数
+        self.recompute_count = 0  # 重新检查的次数
+        self.dep_read_count = 0  # 读取依赖状态的次数
+
+    def snapshot(self, player_id):
+        """
+        开始一次UI生成,创建依赖状态快照
+
+        Args:
+            player_id (str): 玩家ID
+
+        Returns:
+            ShopStateSnapshot: 依赖状态快照
+        """
+        return ShopStateSnapshot(self, player_id)
+
+    def get_dependencies(self, goods_config):
+        """
+        获取商品的依赖状态(按商品ID缓存)
+
+        Args:
+            goods_config (dict): 商品配置
+
+        Returns:
+            tuple: 依赖状态列表,None表示每次重新检查
+        """
+        goods_id = goods_config.get("id")
+        if goods_id not in self._dependencies:
+            self._dependencies[goods_id] = get_goods_dependencies(goods_config)
+        return self._dependencies[goods_id]
+
+    def get_cannot_buy(self, snapshot, goods_config):
+        """
+        获取商品的cannot_buy_msg,依赖状态未变化时复用上次的结果
+
+        Args:
+            snapshot (ShopStateSnapshot): 本次UI生成的依赖状态快照
+            goods_config (dict): 商品配置
+
+        Returns:
+            str|None: 错误消息或None
+        """
+        player_id = snapshot.player_id
+        goods_id = goods_config.get("id")
+        deps = self.get_dependencies(goods_config)
+        results = self._results.setdefault(player_id, {})
+
+        fingerprint = snapshot.fingerprint(deps) if deps is not None else None
+        cached = results.get(goods_id)
+        if fingerprint is not None and cached is not None and cached[0] == fingerprint:
+            self.hit_count += 1
+            if self.check_mode:
+                actual = self.system._check_cannot_buy(player_id, goods_config)
+                if actual != cached[1]:
+                    self.mismatch_count += 1
+                    print("[WARN] [ShopStateCache] 缓存不一致: player={}, goods={}, cached={}, actual={}".format(
+                        player_id, goods_id, cached[1], actual))
+            return cached[1]
+
+        self.recompute_count += 1
+        msg = self.system._check_cannot_buy(player_id, goods_config)
+        if fingerprint is not None:
+            results[goods_id] = (fingerprint, msg)
+        return msg
+
+    def clear_player(self, player_id):
+        """
+        清除玩家的检查结果
+
+        Args:
+            player_id (str): 玩家ID
+        """
+        self._results.pop(player_id, None)
+
+    def clear(self):
+        """清空全部检查结果"""
+        self._results = {}
+
+    def get_stats(self):
+        """
+        获取统计信息
+
+        Returns:
+            dict: 统计信息
+        """
+        always = sum(1 for deps in self._dependencies.values() if deps is None)
+        return {
+            'players': len(self._results),
+            'goods': len(self._dependencies),
+            'always_recheck': always,
+            'hits': self.hit_count,
+            'recomputes': self.recompute_count,
+            'dep_reads': self.dep_read_count,
+            'mismatches': self.mismatch_count,
+        }
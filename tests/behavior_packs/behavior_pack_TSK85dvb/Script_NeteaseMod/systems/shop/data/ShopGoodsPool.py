@@ -3,6 +3,7 @@ from mod.common.minecraftEnum import ItemColor, EnchantType
 
 from .ShopGoodsStaticConfig import ShopGoodsStaticConfig, add_item_to_player
 import mod.server.extraServerApi as serverApi
+from Script_NeteaseMod.systems.shop.ItemTierRegistry import get_item_tier_registry, FAMILY_CHESTPLATE, FAMILY_LEGGINGS, FAMILY_SWORD
 
 
 def get_player_team(part, player_id):
@@ -35,57 +36,30 @@ def get_player_team_item_color(part, player_id):
 	return team_types[team].item_color
 
 
-ordered_armor_chestplate = [
-	"minecraft:leather_chestplate",
-	"minecraft:chainmail_chestplate",
-	"minecraft:iron_chestplate",
-	"minecraft:gold_chestplate",
-	"minecraft:diamond_chestplate",
-	"minecraft:netherite_chestplate",
-]
-
-
 def is_player_chestplate_better_than(player_id, armor_item_name):
 	comp = serverApi.GetEngineCompFactory().CreateItem(player_id)
 	chestplate = comp.GetPlayerItem(serverApi.GetMinecraftEnum().ItemPosType.ARMOR, 1)
 	if chestplate is None:
 		return False
-	if armor_item_name not in ordered_armor_chestplate:
+	registry = get_item_tier_registry()
+	if registry.get_tier(armor_item_name, FAMILY_CHESTPLATE) is None:
 		print("ShopGoodsPool.is_player_chestplate_better_than: {} not in ordered_armor_chestplate".format(armor_item_name))
 		return False
-	index = ordered_armor_chestplate.index(chestplate['newItemName'])
-	return ordered_armor_chestplate.index(armor_item_name) <= index
-
+	return registry.is_at_least(chestplate['newItemName'], armor_item_name, FAMILY_CHESTPLATE)
 
-ordered_leggings = [
-	"minecraft:leather_leggings",
-	"minecraft:chainmail_leggings",
-	"minecraft:iron_leggings",
-	"minecraft:gold_leggings",
-	"minecraft:diamond_leggings",
-	"minecraft:netherite_leggings",
-]
 
 def is_player_leggings_better_than(player_id, armor_item_name):
 	comp = serverApi.GetEngineCompFactory().CreateItem(player_id)
 	leggings = comp.GetPlayerItem(serverApi.GetMinecraftEnum().ItemPosType.ARMOR, 2)
 	if leggings is None:
 		return False
-	if armor_item_name not in ordered_leggings:
+	registry = get_item_tier_registry()
+	if registry.get_tier(armor_item_name, FAMILY_LEGGINGS) is None:
 		print("ShopGoodsPool.is_player_leggings_better_than: {} not in ordered_leggings".format(armor_item_name))
 		return False
-	index = ordered_leggings.index(leggings['newItemName'])
-	return ordered_leggings.index(armor_item_name) <= index
+	return registry.is_at_least(leggings['newItemName'], armor_item_name, FAMILY_LEGGINGS)
 
 
-ordered_swords = [
-	"minecraft:wooden_sword",
-	"minecraft:stone_sword", 
-	"minecraft:iron_sword",
-	"minecraft:diamond_sword",
-	"minecraft:netherite_sword",
-]
-
 def is_player_sword_better_than(part, player_id, sword_item_name):
 	"""检查玩家是否已拥有比指定剑更好品质的剑（同时检查记录和背包）"""
 	from ...ECBedWars.ECBedWarsPartTool import try_get_bedwars_part
@@ -93,29 +67,21 @@ def is_player_sword_better_than(part, player_id, sword_item_name):
 	if not bedwars_part or not hasattr(bedwars_part, 'player_sword_record'):
 		return False
 	
-	if sword_item_name not in ordered_swords:
+	registry = get_item_tier_registry()
+	new_sword_quality = registry.get_tier(sword_item_name, FAMILY_SWORD)
+	if new_sword_quality is None:
 		print("ShopGoodsPool.is_player_sword_better_than: {} not in ordered_swords".format(sword_item_name))
 		return False
 	
-	new_sword_quality = ordered_swords.index(sword_item_name)
-	
 	# 方法1：检查玩家的剑类购买记录
 	current_sword_record = bedwars_part.player_sword_record.get(player_id, "minecraft:wooden_sword")
-	record_quality = 0
-	if current_sword_record in ordered_swords:
-		record_quality = ordered_swords.index(current_sword_record)
+	record_quality = registry.get_tier(current_sword_record, FAMILY_SWORD) or 0
 	
 	# 方法2：检查玩家背包中实际拥有的最高品质剑
-	import mod.server.extraServerApi as serverApi
 	comp = serverApi.GetEngineCompFactory().CreateItem(player_id)
 	inv_items = comp.GetPlayerAllItems(serverApi.GetMinecraftEnum().ItemPosType.INVENTORY)
-	
-	highest_inv_sword_quality = 0
-	for item in inv_items:
-		if item and item.get('newItemName') in ordered_swords:
-			item_quality = ordered_swords.index(item.get('newItemName'))
-			if item_quality > highest_inv_sword_quality:
-				highest_inv_sword_quality = item_quality
+	highest_inv_sword_quality = registry.get_highest_tier(
+		FAMILY_SWORD, (item.get('newItemName') for item in inv_items if item), default=0)
 	
 	# 使用记录和背包中的较高品质作为判断依据
 	# 但是背包检查有更高的优先级，因为这反映了玩家当前实际拥有的剑
@@ -116,6 +116,8 @@ class GamingState:
             self.get_system().UnListenSelfEvent(
                 listener.event_name, listener.instance, listener.func
             )
+        # 定时器
+        self.cancel_timers()
         # 回调
         for callback in self.callbacks_exit:
             try:
@@ -212,6 +214,81 @@ class GamingState:
             )
         # 会在enter时监听，exit时取消监听
 
+    def add_timer(self, delay, callback, *args):
+        """
+        @description 添加属于本状态的一次性定时器(由System的TickScheduler驱动，exit时自动取消)
+        :param delay: 延迟时间(秒)
+        :type delay: float
+        :param callback: 回调函数(*args)
+        :type callback: callable
+        :return: 定时器句柄，System未初始化时返回None
+        :rtype: TimerHandle | None
+        """
+        scheduler = self._get_scheduler()
+        if scheduler is None:
+            return None
+        return scheduler.add(delay, callback, *args, owner=self)
+
+    def add_repeating_timer(self, interval, callback, *args):
+        """
+        @description 添加属于本状态的重复定时器(exit时自动取消)
+        :param interval: 重复间隔(秒)
+        :type interval: float
+        :param callback: 回调函数(*args)
+        :type callback: callable
+        :return: 定时器句柄，System未初始化时返回None
+        :rtype: TimerHandle | None
+        """
+        scheduler = self._get_scheduler()
+        if scheduler is None:
+            return None
+        return scheduler.add_repeating(interval, callback, *args, owner=self)
+
+    def add_tick_timer(self, ticks, callback, *args):
+        """
+        @description 添加属于本状态的按Tick计数的一次性定时器(exit时自动取消)
+        :param ticks: 延迟Tick数(至少为1)
+        :type ticks: int
+        :param callback: 回调函数(*args)
+        :type callback: callable
+        :return: 定时器句柄，System未初始化时返回None
+        :rtype: TimerHandle | None
+        """
+        scheduler = self._get_scheduler()
+        if scheduler is None:
+            return None
+        return scheduler.add_tick_timer(ticks, callback, *args, owner=self)
+
+    def add_repeating_tick_timer(self, interval_ticks, callback, *args):
+        """
+        @description 添加属于本状态的按Tick计数的重复定时器(exit时自动取消)
+        :param interval_ticks: 重复间隔Tick数(至少为1)
+        :type interval_ticks: int
+        :param callback: 回调函数(*args)
+        :type callback: callable
+        :return: 定时器句柄，System未初始化时返回None
+        :rtype: TimerHandle | None
+        """
+        scheduler = self._get_scheduler()
+        if scheduler is None:
+            return None
+        return scheduler.add_repeating_tick_timer(interval_ticks, callback, *args, owner=self)
+
+    def cancel_timers(self):
+        """
+        @description 取消本状态的所有定时器
+        """
+        scheduler = self._get_scheduler()
+        if scheduler is not None:
+            scheduler.cancel_owner(self)
+
+    def _get_scheduler(self):
+        """
+        @description 获取System的共享Tick调度器
+        """
+        system = self.get_system()
+        return getattr(system, 'scheduler', None) if system is not None else None
+
     def notify_event(self, event_name, event_data=None):
         """
         广播状态事件(兼容老API)
@@ -54,29 +54,25 @@ class TeamHealingPool(object):
         检测范围内的队友并施加治疗效果
         """
         try:
-            # 获取队伍所有玩家
-            team_players = self.game_system.team_module.get_team_players(self.team)
-            if not team_players:
+            # 通过空间索引查询治疗范围内的本队玩家（包含边界）
+            nearby = self.game_system.player_index.query_radius(
+                self.game_system.dimension, self.origin_position, self.radius, tag=self.team
+            )
+            if not nearby:
                 return
 
             # 收集在治疗范围内的玩家
             players_in_range = []
 
-            for player_id in team_players:
+            for player_id, _ in nearby:
                 # 跳过正在重生的玩家
                 if player_id in self.game_system.respawning:
                     continue
 
-                # 获取玩家位置
-                comp_pos = serverApi.GetEngineCompFactory().CreatePos(player_id)
-                player_pos = comp_pos.GetFootPos()
-
-                # 检查是否在治疗范围内（使用平方距离避免开方）
-                if distance_squared(player_pos, self.origin_position) <= self.radius_squared:
-                    # 施加生命恢复效果（1秒，等级0，不显示粒子）
-                    comp_effect = serverApi.GetEngineCompFactory().CreateEffect(player_id)
-                    comp_effect.AddEffectToEntity(EffectType.REGENERATION, 1, 0, False)
-                    players_in_range.append(player_id)
+                # 施加生命恢复效果（1秒，等级0，不显示粒子）
+                comp_effect = serverApi.GetEngineCompFactory().CreateEffect(player_id)
+                comp_effect.AddEffectToEntity(EffectType.REGENERATION, 1, 0, False)
+                players_in_range.append(player_id)
 
             # 如果有玩家在范围内，显示治疗池粒子特效
             if len(players_in_range) > 0:
@@ -143,8 +139,7 @@ class TeamHealingPool(object):
         :return: True如果在范围内，否则False
         """
         try:
-            comp_pos = serverApi.GetEngineCompFactory().CreatePos(player_id)
-            player_pos = comp_pos.GetFootPos()
+            player_pos = self.game_system.player_snapshot.get_foot_pos(player_id)
             return distance_squared(player_pos, self.origin_position) <= self.radius_squared
         except:
             return False
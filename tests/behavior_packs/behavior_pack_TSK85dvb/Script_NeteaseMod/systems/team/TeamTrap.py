@@ -13,6 +13,7 @@ TeamTrap.py - 队伍陷阱模块
 """
 
 import mod.server.extraServerApi as serverApi
+from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
 
 EffectType = serverApi.GetMinecraftEnum().EffectType
 
@@ -64,41 +65,34 @@ class TeamTrap(object):
             if not game_system or not game_system.team_module:
                 return effective_players
 
-            # 获取所有非本队伍的玩家
-            all_teams = game_system.team_module.get_all_teams()
-            for team_id in all_teams:
-                if team_id == self.manager.team:
+            # 通过空间索引查询范围内的非本队伍玩家(严格小于生效范围)
+            nearby = game_system.player_index.query_radius(
+                game_system.dimension, self.pos, self.effective_range,
+                exclude_tag=self.manager.team, inclusive=False
+            )
+            for player_id, _ in nearby:
+                # 跳过已淘汰的玩家
+                if player_id in game_system.eliminated_players:
                     continue
 
-                team_players = game_system.team_module.get_team_players(team_id)
-                for player_id in team_players:
-                    # 跳过已淘汰的玩家
-                    if player_id in game_system.eliminated_players:
-                        continue
-
-                    # 跳过重生中的玩家
-                    if player_id in game_system.respawning:
-                        continue
+                # 跳过重生中的玩家
+                if player_id in game_system.respawning:
+                    continue
 
-                    # 检查距离
-                    try:
-                        comp_pos = serverApi.GetEngineCompFactory().CreatePos(player_id)
-                        player_pos = comp_pos.GetFootPos()
-
-                        if distance_squared(player_pos, self.pos) < self.effective_range ** 2:
-                            # 检查玩家是否具有陷阱免疫状态
-                            if game_system.is_player_trap_immune(player_id):
-                                # 发送免疫提示
-                                comp_msg = serverApi.GetEngineCompFactory().CreateMsg(player_id)
-                                comp_msg.NotifyOneMessage(
-                                    player_id,
-                                    u"§b陷阱免疫状态保护了你！",
-                                    u"§b"
-                                )
-                            else:
-                                effective_players.append(player_id)
-                    except:
-                        pass
+                try:
+                    # 检查玩家是否具有陷阱免疫状态
+                    if game_system.is_player_trap_immune(player_id):
+                        # 发送免疫提示
+                        comp_msg = get_component_cache().CreateMsg(player_id)
+                        comp_msg.NotifyOneMessage(
+                            player_id,
+                            u"§b陷阱免疫状态保护了你！",
+                            u"§b"
+                        )
+                    else:
+                        effective_players.append(player_id)
+                except:
+                    pass
 
         except Exception as e:
             print("[ERROR] [TeamTrap] get_effective_players() 出错: {}".format(str(e)))
@@ -133,11 +127,11 @@ class TeamTrap(object):
             for player_id in team_players:
                 try:
                     # 发送消息
-                    comp_msg = serverApi.GetEngineCompFactory().CreateMsg(player_id)
+                    comp_msg = get_component_cache().CreateMsg(player_id)
                     comp_msg.NotifyOneMessage(player_id, message, u"§c")
 
                     # 播放音效
-                    comp_cmd = serverApi.GetEngineCompFactory().CreateCommand(serverApi.GetLevelId())
+                    comp_cmd = get_component_cache().CreateCommand(serverApi.GetLevelId())
                     comp_cmd.SetCommand("/playsound note.harp @a[name=\"{}\"] ~ ~ ~ 1 0.5".format(player_id))
 
                     # 发送标题（如果支持）
@@ -167,7 +161,7 @@ class TeamTrapSlowness(TeamTrap):
         players = self.get_effective_players()
         for player_id in players:
             try:
-                comp_effect = serverApi.GetEngineCompFactory().CreateEffect(player_id)
+                comp_effect = get_component_cache().CreateEffect(player_id)
                 comp_effect.AddEffectToEntity(EffectType.MOVEMENT_SLOWDOWN, 8, 0, True)
                 comp_effect.AddEffectToEntity(EffectType.BLINDNESS, 8, 0, True)
             except Exception as e:
@@ -199,11 +193,12 @@ class TeamTrapBeatBack(TeamTrap):
 
                 try:
                     # 检查玩家是否在合理范围内（255格内）
-                    comp_pos = serverApi.GetEngineCompFactory().CreatePos(player_id)
-                    player_pos = comp_pos.GetFootPos()
+                    player_pos = game_system.player_snapshot.get_foot_pos(player_id)
+                    if player_pos is None:
+                        continue
 
                     if distance_squared(player_pos, self.pos) < 255 * 255:
-                        comp_effect = serverApi.GetEngineCompFactory().CreateEffect(player_id)
+                        comp_effect = get_component_cache().CreateEffect(player_id)
                         comp_effect.AddEffectToEntity(EffectType.MOVEMENT_SPEED, 15, 1, True)
                         comp_effect.AddEffectToEntity(EffectType.JUMP, 15, 1, True)
                 except:
@@ -224,12 +219,12 @@ class TeamTrapAlert(TeamTrap):
         players = self.get_effective_players()
         for player_id in players:
             try:
-                comp_effect = serverApi.GetEngineCompFactory().CreateEffect(player_id)
+                comp_effect = get_component_cache().CreateEffect(player_id)
 
                 # 尝试移除隐身效果
                 if comp_effect.RemoveEffectFromEntity(EffectType.INVISIBILITY):
                     # 发送提示消息
-                    comp_msg = serverApi.GetEngineCompFactory().CreateMsg(player_id)
+                    comp_msg = get_component_cache().CreateMsg(player_id)
                     message = u"§e你触发了 §l§c警报陷阱§r§e， 你的隐身效果失效了！"
                     comp_msg.NotifyOneMessage(player_id, message, u"§e")
 
@@ -250,7 +245,7 @@ class TeamTrapFatigue(TeamTrap):
         players = self.get_effective_players()
         for player_id in players:
             try:
-                comp_effect = serverApi.GetEngineCompFactory().CreateEffect(player_id)
+                comp_effect = get_component_cache().CreateEffect(player_id)
                 comp_effect.AddEffectToEntity(EffectType.DIG_SLOWDOWN, 10, 0, True)
             except Exception as e:
                 print("[ERROR] [TeamTrapFatigue] 应用效果失败: {}".format(str(e)))
\ No newline at end of file
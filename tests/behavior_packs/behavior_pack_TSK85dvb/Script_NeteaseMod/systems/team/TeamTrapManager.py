@@ -52,6 +52,7 @@ class TeamTrapManager(object):
         self.bed_pos = bed_pos  # tuple - 床的位置
         self.traps = []  # list[TeamTrap] - 陷阱队列（最多3个）
         self.cooldown = 0.0  # float - 冷却结束时间戳
+        self.cooldown_timer = None  # TimerHandle - 冷却定时器(挂载在游戏系统的共享调度器上)
 
     def add_trap(self, trap_type):
         """
@@ -105,15 +106,14 @@ class TeamTrapManager(object):
         检测敌人进入范围并触发陷阱
         """
         try:
-            # 检查冷却时间
-            now = time.time()
-            if now < self.cooldown:
-                return
-
             # 检查是否有陷阱
             if len(self.traps) == 0:
                 return
 
+            # 检查冷却(冷却结束由调度器定时器清除)
+            if self.cooldown_timer is not None:
+                return
+
             # 获取第一个陷阱
             trap = self.traps[0]
 
@@ -127,7 +127,7 @@ class TeamTrapManager(object):
                 self.traps.pop(0)
 
                 # 设置冷却时间
-                self.cooldown = now + self.COOLDOWN
+                self._start_cooldown()
 
                 print("[INFO] [TeamTrapManager] 陷阱触发: team={}, trap={}, cooldown={}s".format(
                     self.team, trap.name, self.COOLDOWN))
@@ -156,6 +156,39 @@ class TeamTrapManager(object):
         清空所有陷阱（用于游戏重置）
         """
         self.traps = []
+        self._cancel_cooldown()
+
+    def is_in_cooldown(self):
+        """
+        检查陷阱是否处于触发冷却中
+
+        :return: True如果冷却中，否则False
+        """
+        return self.cooldown_timer is not None
+
+    def _start_cooldown(self):
+        """
+        开始触发冷却（由共享调度器在COOLDOWN秒后结束）
+        """
+        self._cancel_cooldown()
+        self.cooldown = time.time() + self.COOLDOWN
+        self.cooldown_timer = self.game_system.scheduler.add(
+            self.COOLDOWN, self._on_cooldown_end, owner=self)
+
+    def _cancel_cooldown(self):
+        """
+        取消触发冷却
+        """
+        if self.cooldown_timer is not None:
+            self.game_system.scheduler.cancel(self.cooldown_timer)
+            self.cooldown_timer = None
+        self.cooldown = 0.0
+
+    def _on_cooldown_end(self):
+        """
+        冷却结束回调
+        """
+        self.cooldown_timer = None
         self.cooldown = 0.0
 
     def set_bed_position(self, bed_pos):
@@ -178,6 +211,7 @@ class TeamTrapManager(object):
         """
         try:
             import mod.server.extraServerApi as serverApi
+            from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
 
             if not self.game_system or not self.game_system.team_module:
                 return
@@ -187,7 +221,7 @@ class TeamTrapManager(object):
             team_players = self.game_system.team_module.get_team_players(self.team)
             for player_id in team_players:
                 try:
-                    comp_msg = serverApi.GetEngineCompFactory().CreateMsg(player_id)
+                    comp_msg = get_component_cache().CreateMsg(player_id)
                     comp_msg.NotifyOneMessage(player_id, message, u"§7")
                 except:
                     pass
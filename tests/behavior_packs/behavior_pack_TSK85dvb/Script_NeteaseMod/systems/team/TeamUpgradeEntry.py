@@ -406,23 +406,24 @@ class TeamUpgradeEntryHomeGenerator(TeamUpgradeEntry):
         try:
             generators = self.manager.game_system.find_generators(self.manager.team)
             for generator in generators:
+                resource_type_id = (generator.resource_type_id or "").lower()
                 if self.level == 1:
-                    if generator.resource_type_id == "iron":
+                    if resource_type_id == "iron":
                         generator.set_level(2)
                 elif self.level == 2:
-                    if generator.resource_type_id == "iron":
+                    if resource_type_id == "iron":
                         generator.set_level(2)
-                    elif generator.resource_type_id == "gold":
+                    elif resource_type_id == "gold":
                         generator.set_level(2)
                 elif self.level == 3:
-                    if generator.resource_type_id == "iron":
+                    if resource_type_id == "iron":
                         generator.set_level(2)
-                    elif generator.resource_type_id == "gold":
+                    elif resource_type_id == "gold":
                         generator.set_level(2)
                 elif self.level == 4:
-                    if generator.resource_type_id == "iron":
+                    if resource_type_id == "iron":
                         generator.set_level(3)
-                    elif generator.resource_type_id == "gold":
+                    elif resource_type_id == "gold":
                         generator.set_level(2)
         except Exception as e:
             print("[TeamUpgradeEntryHomeGenerator] apply() 出错: {}".format(str(e)))
@@ -64,9 +64,12 @@ class ECHUDScreenNode(ScreenNode):
 
         Args:
             args: {
-                'type': 'stack_msg_top' | 'stack_msg_bottom' | 'scoreboard',
+                'type': 'stack_msg_top' | 'stack_msg_bottom' | 'stack_msg_batch' | 'scoreboard',
                 'events': [...] 或其他字段
             }
+
+            stack_msg_batch为服务端合并后的增量数据包:
+                {'type': 'stack_msg_batch', 'panels': {'stack_msg_top': [...], 'stack_msg_bottom': [...]}}
         """
         hud_type = args.get('type')
         # print("[DEBUG] [ECHUDScreenNode] 收到HUD控制事件 type={}".format(hud_type))
@@ -80,6 +83,15 @@ class ECHUDScreenNode(ScreenNode):
             if self.stack_msg_bottom:
                 self.stack_msg_bottom.handle_control(args)
 
+        elif hud_type == 'stack_msg_batch':
+            panels = args.get('panels', {})
+            top_events = panels.get('stack_msg_top')
+            if top_events and self.stack_msg_top:
+                self.stack_msg_top.handle_control({'events': top_events})
+            bottom_events = panels.get('stack_msg_bottom')
+            if bottom_events and self.stack_msg_bottom:
+                self.stack_msg_bottom.handle_control({'events': bottom_events})
+
         elif hud_type == 'scoreboard':
             if self.scoreboard:
                 self.scoreboard.handle_control(args)
@@ -120,6 +132,13 @@ class StackMsgController(object):
         self.stack_path = stack_path
         self.entries = OrderedDict()  # {key: value}
 
+        # 控件句柄缓存,避免每次更新重新解析UI路径
+        self.parent_node = None
+        self.label_nodes = {}  # {key: 文本Label控件}
+
+        # 统计数据
+        self.skipped_updates = 0  # 文本未变化而跳过的更新次数
+
         print("[INFO] [StackMsgController] 初始化 path={}".format(stack_path))
 
     def handle_control(self, args):
@@ -170,33 +189,45 @@ class StackMsgController(object):
         """
         添加或更新消息条目
 
+        文本未变化时直接返回,不产生任何UI调用
+
         Args:
             key (str): 唯一标识
             value (str): 显示文本(支持颜色代码)
             border (bool): 是否显示边框
         """
-        parent_node = self.screen.GetBaseUIControl(self.stack_path)
-        if not parent_node:
-            print("[ERROR] [StackMsgController] 父节点不存在: {}".format(self.stack_path))
+        if key in self.entries and self.entries[key] == value:
+            self.skipped_updates += 1
             return
 
-        node_name = "stack_msg_" + key
+        label = self.label_nodes.get(key)
+        if label is None:
+            parent_node = self._get_parent_node()
+            if not parent_node:
+                print("[ERROR] [StackMsgController] 父节点不存在: {}".format(self.stack_path))
+                return
 
-        # 获取或创建节点
-        node = self.screen.GetBaseUIControl(self.stack_path + "/" + node_name)
-        if node is None:
-            # 如果已有其他条目,先添加间距
-            if len(self.entries) >= 1:
-                space_name = node_name + "_space"
-                self.screen.CreateChildControl("ec_hud.space_w4", space_name, parent_node)
+            node_name = "stack_msg_" + key
+
+            # 获取或创建节点
+            node = self.screen.GetBaseUIControl(self.stack_path + "/" + node_name)
+            if node is None:
+                # 如果已有其他条目,先添加间距
+                if len(self.entries) >= 1:
+                    space_name = node_name + "_space"
+                    self.screen.CreateChildControl("ec_hud.space_w4", space_name, parent_node)
 
-            # 创建消息条目
-            node = self.screen.CreateChildControl("ec_hud.stack_msg", node_name, parent_node)
+                # 创建消息条目
+                node = self.screen.CreateChildControl("ec_hud.stack_msg", node_name, parent_node)
+
+            text_node = node.GetChildByPath("/stack_msg_text") if node else None
+            if text_node:
+                label = text_node.asLabel()
+                self.label_nodes[key] = label
 
         # 设置文本
-        text_node = node.GetChildByPath("/stack_msg_text")
-        if text_node:
-            text_node.asLabel().SetText(value)
+        if label:
+            label.SetText(value)
 
         # 存储条目
         self.entries[key] = value
@@ -210,6 +241,10 @@ class StackMsgController(object):
         Args:
             key (str): 唯一标识
         """
+        # 条目不存在时无需任何UI调用
+        if key not in self.entries:
+            return
+
         node_name = "stack_msg_" + key
 
         # 移除消息节点
@@ -223,8 +258,8 @@ class StackMsgController(object):
             self.screen.RemoveChildControl(space_node)
 
         # 从字典移除
-        if key in self.entries:
-            self.entries.pop(key)
+        self.entries.pop(key)
+        self.label_nodes.pop(key, None)
 
         # print("[DEBUG] [StackMsgController] 移除条目 key={}".format(key))  # 调试日志已禁用
 
@@ -237,6 +272,17 @@ class StackMsgController(object):
 
         # print("[DEBUG] [StackMsgController] 清空所有条目 path={}".format(self.stack_path))  # 调试日志已禁用
 
+    def _get_parent_node(self):
+        """
+        获取面板父节点(缓存句柄)
+
+        Returns:
+            面板控件,不存在返回None
+        """
+        if self.parent_node is None:
+            self.parent_node = self.screen.GetBaseUIControl(self.stack_path)
+        return self.parent_node
+
 
 class ScoreboardController(object):
     """
@@ -8,6 +8,8 @@ BedWarsExplosion - 起床战争爆炸系统
 - 智能伤害(友军保护)
 - 方块破坏(只破坏玩家放置的方块)
 - 防爆机制(染色玻璃免疫)
+- 射线方向预计算,方块状态按整数坐标缓存(每个坐标只读取一次引擎)
+- 方块爆炸抗性与免疫标记来自启动时建立的ExplosionResistanceRegistry
 
 参考老项目: Parts/ECBedWars/BedWarsExplosion.py
 重构为: systems/util/BedWarsExplosion.py
@@ -17,6 +19,18 @@ from __future__ import print_function
 import math
 import random
 import mod.server.extraServerApi as serverApi
+from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
+
+# 射线推进步长
+STEP_LEN = 0.3
+# 空气中每步消耗的爆炸力
+AIR_STEP_COST = STEP_LEN * 0.75
+# 射线数量(8x8x8立方体表面)
+RAYS_PER_AXIS = 8
+# 方块不消耗爆炸力(染色玻璃)的标记
+IMMUNE_COST = object()
+# 空气(及未返回方块名的位置)
+AIR_NAME = 'minecraft:air'
 
 
 class Vector3(object):
@@ -130,6 +144,133 @@ def check_tiny_hurt(entity_id):
     return False
 
 
+def _build_ray_steps():
+    """
+    预计算射线步进向量: 从中心指向8x8x8立方体表面各点,归一化后乘以步长
+
+    Returns:
+        tuple: ((dx, dy, dz), ...) 共296条,顺序与逐条发射时一致
+    """
+    m_rays = RAYS_PER_AXIS - 1
+    vector = Vector3(0, 0, 0)
+    steps = []
+    for i in range(RAYS_PER_AXIS):
+        for j in range(RAYS_PER_AXIS):
+            for k in range(RAYS_PER_AXIS):
+                # 只处理立方体表面的点
+                if i == 0 or i == m_rays or j == 0 or j == m_rays or k == 0 or k == m_rays:
+                    vector.set_components(
+                        float(i) / float(m_rays) * 2 - 1,
+                        float(j) / float(m_rays) * 2 - 1,
+                        float(k) / float(m_rays) * 2 - 1
+                    )
+                    length = vector.length()
+                    steps.append((
+                        (vector.x / length) * STEP_LEN,
+                        (vector.y / length) * STEP_LEN,
+                        (vector.z / length) * STEP_LEN
+                    ))
+    return tuple(steps)
+
+
+# 射线步进向量(模块加载时计算一次)
+RAY_STEPS = _build_ray_steps()
+
+
+def march_rays(source_pos, forces, cost_at):
+    """
+    沿全部射线推进,计算受影响的方块(每个坐标只调用一次cost_at)
+
+    Args:
+        source_pos (tuple): 爆炸中心位置 (x, y, z)
+        forces (list): 每条射线的初始爆炸力(与RAY_STEPS一一对应)
+        cost_at (function): cost_at((x, y, z)) -> 每步消耗的爆炸力;
+            空气返回None,不消耗爆炸力的方块返回IMMUNE_COST
+
+    Returns:
+        tuple: (受影响方块列表(按首次命中顺序), 受影响方块集合)
+    """
+    affected = []
+    affected_set = set()
+    costs = {}  # (x, y, z) -> cost_at结果
+    origin_x, origin_y, origin_z = source_pos
+    for (step_x, step_y, step_z), blast_force in zip(RAY_STEPS, forces):
+        pointer_x, pointer_y, pointer_z = origin_x, origin_y, origin_z
+        while blast_force > 0:
+            pos = (int(pointer_x), int(pointer_y), int(pointer_z))
+            if pos in costs:
+                cost = costs[pos]
+            else:
+                cost = costs[pos] = cost_at(pos)
+            if cost is not None and cost is not IMMUNE_COST:
+                blast_force -= cost
+                if blast_force > 0 and pos not in affected_set:
+                    affected_set.add(pos)
+                    affected.append(pos)
+
+            pointer_x += step_x
+            pointer_y += step_y
+            pointer_z += step_z
+            blast_force -= AIR_STEP_COST
+    return affected, affected_set
+
+
+class ExplosionBlockCache(object):
+    """
+    爆炸方块状态缓存
+
+    按整数坐标缓存方块名称,同一坐标只调用一次GetBlockNew;
+    同一Tick的多次爆炸可以共享一个缓存(爆炸破坏方块后由set_air同步)
+    """
+
+    def __init__(self, dimension):
+        """
+        初始化缓存
+
+        Args:
+            dimension (int): 维度ID
+        """
+        self.dimension = dimension
+        self._names = {}  # (x, y, z) -> 方块名称
+        self.lookups = 0  # 查询次数
+        self.misses = 0  # 实际读取引擎的次数
+        self._comp_block_info = None
+
+    def get_name(self, pos):
+        """
+        获取方块名称
+
+        Args:
+            pos (tuple): 整数方块坐标 (x, y, z)
+
+        Returns:
+            str: 方块名称,没有方块时为'minecraft:air'
+        """
+        self.lookups += 1
+        name = self._names.get(pos)
+        if name is None:
+            self.misses += 1
+            if self._comp_block_info is None:
+                self._comp_block_info = get_component_cache().CreateBlockInfo(serverApi.GetLevelId())
+            block_dict = self._comp_block_info.GetBlockNew(pos, self.dimension)
+            name = block_dict.get('name', AIR_NAME) if block_dict else AIR_NAME
+            self._names[pos] = name
+        return name
+
+    def set_air(self, pos):
+        """
+        记录方块已被破坏
+
+        Args:
+            pos (tuple): 整数方块坐标 (x, y, z)
+        """
+        self._names[pos] = AIR_NAME
+
+    def clear(self):
+        """清空缓存"""
+        self._names.clear()
+
+
 class BedWarsExplosion(object):
     """
     起床战争爆炸系统
@@ -137,7 +278,8 @@ class BedWarsExplosion(object):
     使用射线追踪算法计算爆炸影响范围
     """
 
-    def __init__(self, dimension, source_pos, size, entity_id, source_entity_id=None):
+    def __init__(self, dimension, source_pos, size, entity_id, source_entity_id=None, block_cache=None,
+                 resistance_registry=None):
         """
         初始化爆炸
 
@@ -147,6 +289,8 @@ class BedWarsExplosion(object):
             size (float): 爆炸半径
             entity_id (str): 爆炸源实体ID
             source_entity_id (str): 爆炸发起者ID(可选)
+            block_cache (ExplosionBlockCache): 共享的方块状态缓存(可选,默认每次爆炸单独创建)
+            resistance_registry (ExplosionResistanceRegistry): 爆炸抗性表(可选,默认使用全局抗性表)
         """
         assert source_pos is not None, "source_pos is None"
 
@@ -156,13 +300,20 @@ class BedWarsExplosion(object):
         self.entity_id = entity_id  # type: str
         self.source_entity_id = source_entity_id  # type: str
         self.affected_blocks = []  # type: list
+        self.affected_block_set = set()  # type: set
 
         # 配置函数(可被外部覆盖)
-        self.explosion_resistance_map = {}  # type: dict
+        self.resistance_registry = resistance_registry
+        self.explosion_resistance_map = {}  # type: dict  # 单次爆炸覆盖的抗性
         self.check_valid_pos = check_valid_pos  # type: callable
         self.check_valid_hurt_target = check_valid_hurt_target  # type: callable
         self.check_tiny_hurt = check_tiny_hurt  # type: callable
 
+        # 方块状态缓存
+        if block_cache is None or block_cache.dimension != dimension:
+            block_cache = ExplosionBlockCache(dimension)
+        self.block_cache = block_cache
+
         # 组件缓存
         self._comp_block_info = None
         self._comp_game = None
@@ -170,15 +321,22 @@ class BedWarsExplosion(object):
     def _get_comp_block_info(self):
         """获取方块信息组件"""
         if self._comp_block_info is None:
-            self._comp_block_info = serverApi.GetEngineCompFactory().CreateBlockInfo(serverApi.GetLevelId())
+            self._comp_block_info = get_component_cache().CreateBlockInfo(serverApi.GetLevelId())
         return self._comp_block_info
 
     def _get_comp_game(self):
         """获取游戏组件"""
         if self._comp_game is None:
-            self._comp_game = serverApi.GetEngineCompFactory().CreateGame(serverApi.GetLevelId())
+            self._comp_game = get_component_cache().CreateGame(serverApi.GetLevelId())
         return self._comp_game
 
+    def _get_resistance_registry(self):
+        """获取爆炸抗性表"""
+        if self.resistance_registry is None:
+            from Script_NeteaseMod.systems.util.ExplosionResistanceRegistry import get_explosion_resistance_registry
+            self.resistance_registry = get_explosion_resistance_registry()
+        return self.resistance_registry
+
     def explode(self):
         """
         执行爆炸
@@ -195,111 +353,103 @@ class BedWarsExplosion(object):
         """
         爆炸阶段A: 使用射线追踪计算受影响的方块
 
+        射线方向预计算(RAY_STEPS),每条射线的初始爆炸力按发射顺序抽取随机数,
+        方块状态与每步消耗按整数坐标缓存,结果与逐步调用GetBlockNew的实现一致
+
         Returns:
             bool: 是否继续执行爆炸阶段B
         """
         if self.size < 0.1:
             return False
 
-        comp_block_info = self._get_comp_block_info()
-
-        # 射线数量(8x8x8立方体表面)
-        rays = 8
-        m_rays = rays - 1
-        vector = Vector3(0, 0, 0)
-
-        # 从爆炸中心向8x8x8立方体表面发射射线
-        for i in range(rays):
-            for j in range(rays):
-                for k in range(rays):
-                    # 只处理立方体表面的点
-                    if i == 0 or i == m_rays or j == 0 or j == m_rays or k == 0 or k == m_rays:
-                        # 计算射线方向向量
-                        vector.set_components(
-                            float(i) / float(m_rays) * 2 - 1,
-                            float(j) / float(m_rays) * 2 - 1,
-                            float(k) / float(m_rays) * 2 - 1
-                        )
-
-                        # 归一化并乘以步长
-                        length = vector.length()
-                        step_len = 0.3
-                        vector.set_components(
-                            (vector.x / length) * step_len,
-                            (vector.y / length) * step_len,
-                            (vector.z / length) * step_len
-                        )
-
-                        # 射线起点
-                        pointer_x, pointer_y, pointer_z = self.source_pos
-
-                        # 初始爆炸力(带随机性)
-                        blast_force = self.size * (random.randint(700, 1301) / 1000.0)
-
-                        # 沿射线推进
-                        while blast_force > 0:
-                            x, y, z = int(pointer_x), int(pointer_y), int(pointer_z)
-
-                            # 获取当前位置的方块
-                            block_dict = comp_block_info.GetBlockNew((x, y, z), self.dimension)
-
-                            if 'name' in block_dict and block_dict['name'] != 'minecraft:air':
-                                # 染色玻璃完全免疫爆炸
-                                if 'stained_glass' in block_dict['name']:
-                                    # 跳过,但不消耗爆炸力
-                                    pass
-                                else:
-                                    # 获取方块爆炸抗性
-                                    if block_dict['name'] in self.explosion_resistance_map:
-                                        explosion_resistance = self.explosion_resistance_map[block_dict['name']]
-                                    else:
-                                        block_info = comp_block_info.GetBlockBasicInfo(block_dict['name'])
-                                        explosion_resistance = block_info.get('explosionResistance', 0)
-
-                                    # 消耗爆炸力
-                                    blast_force -= (explosion_resistance / 5 + 0.3) * step_len
-
-                                    # 如果爆炸力足够,标记此方块为受影响
-                                    if blast_force > 0 and (x, y, z) not in self.affected_blocks:
-                                        self.affected_blocks.append((x, y, z))
-
-                            # 推进射线
-                            pointer_x += vector.x
-                            pointer_y += vector.y
-                            pointer_z += vector.z
-
-                            # 空气中也会消耗爆炸力
-                            blast_force -= step_len * 0.75
-
+        get_name = self.block_cache.get_name
+        registry = self._get_resistance_registry()
+        get_cost = registry.get_cost
+        resistance_map = self.explosion_resistance_map
+
+        if resistance_map:
+            immune = registry.immune
+
+            def cost_at(pos):
+                name = get_name(pos)
+                if name in resistance_map and name not in immune:
+                    return (resistance_map[name] / 5 + 0.3) * STEP_LEN
+                # 空气为None,染色玻璃为IMMUNE_COST(完全免疫爆炸,不消耗爆炸力)
+                return get_cost(name)
+        else:
+            def cost_at(pos):
+                return get_cost(get_name(pos))
+
+        # 初始爆炸力(带随机性)
+        forces = [self.size * (random.randint(700, 1301) / 1000.0) for _ in RAY_STEPS]
+        self.affected_blocks, self.affected_block_set = march_rays(self.source_pos, forces, cost_at)
         return True
 
     def explode_b(self):
         """
         爆炸阶段B: 破坏方块并造成伤害
         """
-        comp_block_info = self._get_comp_block_info()
-        comp_game = self._get_comp_game()
+        # 破坏受影响的方块
+        self.destroy_blocks(self.collect_destroyed_blocks())
 
+        # 对周围实体造成伤害
+        for entity_id in self.query_entities():
+            # 检查是否可以造成伤害
+            if not self.check_valid_hurt_target(entity_id):
+                continue
+
+            # 获取实体位置
+            comp_pos = get_component_cache().CreatePos(entity_id)
+            impact = self.compute_impact(entity_id, comp_pos.GetFootPos())
+            if impact is not None:
+                self.apply_impact(entity_id, impact[0], impact[1])
+
+        # 播放爆炸效果和音效
+        self._play_explosion_effects()
+
+    def collect_destroyed_blocks(self, exclude=None):
+        """
+        筛选要破坏的方块并决定是否掉落(按受影响顺序抽取掉落随机数)
+
+        Args:
+            exclude (set): 已由其他爆炸破坏的方块(合并爆炸时去重)
+
+        Returns:
+            list: [(block_pos, old_block_handling), ...]
+        """
         # 掉落概率
         yield0 = (1.0 / self.size) * 100.0
 
-        # 破坏受影响的方块
+        is_immune = self._get_resistance_registry().is_immune
+        destroyed = []
         for block_pos in self.affected_blocks:
+            if exclude is not None and block_pos in exclude:
+                continue
+
             # 检查位置是否有效(只破坏玩家放置的方块)
             if not self.check_valid_pos(block_pos):
                 continue
 
             # 再次检查是否为染色玻璃
-            block_dict = comp_block_info.GetBlockNew(block_pos, self.dimension)
-            if 'name' in block_dict and 'stained_glass' in block_dict['name']:
+            if is_immune(self.block_cache.get_name(block_pos)):
                 continue
 
             # 是否掉落物品(基于概率)
             old_block_handling = 0
             if random.random() * 100 < yield0:
                 old_block_handling = 1
+            destroyed.append((block_pos, old_block_handling))
+        return destroyed
 
-            # 设置为空气
+    def destroy_blocks(self, destroyed):
+        """
+        把方块设置为空气
+
+        Args:
+            destroyed (list): [(block_pos, old_block_handling), ...]
+        """
+        comp_block_info = self._get_comp_block_info()
+        for block_pos, old_block_handling in destroyed:
             comp_block_info.SetBlockNew(
                 block_pos,
                 {'name': 'minecraft:air', 'aux': 0},
@@ -307,65 +457,98 @@ class BedWarsExplosion(object):
                 self.dimension,
                 False
             )
+            self.block_cache.set_air(block_pos)
 
-        # 对周围实体造成伤害
-        entities = comp_game.GetEntitiesInSquareArea(
-            None,
+    def get_damage_area(self):
+        """
+        获取伤害范围
+
+        Returns:
+            tuple: ((min_x, min_y, min_z), (max_x, max_y, max_z))
+        """
+        return (
             (self.source_pos[0] - self.size, self.source_pos[1] - self.size, self.source_pos[2] - self.size),
-            (self.source_pos[0] + self.size, self.source_pos[1] + self.size, self.source_pos[2] + self.size),
-            self.dimension
+            (self.source_pos[0] + self.size, self.source_pos[1] + self.size, self.source_pos[2] + self.size)
         )
 
-        explosion_size = self.size * 2
+    def query_entities(self):
+        """
+        查询伤害范围内的实体
 
-        for entity_id in entities:
-            # 检查是否可以造成伤害
-            if not self.check_valid_hurt_target(entity_id):
-                continue
+        Returns:
+            list: 实体ID列表
+        """
+        start_pos, end_pos = self.get_damage_area()
+        entities = self._get_comp_game().GetEntitiesInSquareArea(None, start_pos, end_pos, self.dimension)
+        return entities or []
 
-            # 获取实体位置
-            comp_pos = serverApi.GetEngineCompFactory().CreatePos(entity_id)
-            entity_pos = comp_pos.GetFootPos()
-
-            # 计算距离
-            distance = calculate_distance(self.source_pos, entity_pos) / explosion_size
-
-            if distance <= 1:
-                # 曝光度(简化为1)
-                exposure = 1
-                impact = (1 - distance) * exposure
-
-                # 施加击退效果
-                comp_motion = serverApi.GetEngineCompFactory().CreateActorMotion(entity_id)
-
-                motion = Vector3(
-                    entity_pos[0] - self.source_pos[0],
-                    entity_pos[1] - self.source_pos[1],
-                    entity_pos[2] - self.source_pos[2]
-                ).normalize()
-
-                comp_motion.SetPlayerMotion(motion.multiply(impact * 2.5).to_tuple())
-
-                # 计算伤害
-                if self.check_tiny_hurt(entity_id):
-                    # 友军只造成2点伤害
-                    damage = 2
-                else:
-                    # 敌军造成正常伤害
-                    damage = int(((impact * impact + impact) / 2) * 2 * explosion_size + 1)
-
-                # 造成伤害
-                hurt_comp = serverApi.GetEngineCompFactory().CreateHurt(entity_id)
-                hurt_comp.Hurt(
-                    damage,
-                    serverApi.GetMinecraftEnum().ActorDamageCause.EntityExplosion,
-                    self.entity_id,
-                    self.source_entity_id,
-                    False
-                )
+    def compute_impact(self, entity_id, entity_pos):
+        """
+        计算对实体的击退与伤害
 
-        # 播放爆炸效果和音效
-        self._play_explosion_effects()
+        Args:
+            entity_id (str): 实体ID
+            entity_pos (tuple): 实体脚底位置
+
+        Returns:
+            tuple: (击退向量Vector3, 伤害值),不在范围内时返回None
+        """
+        if entity_pos is None:
+            return None
+
+        explosion_size = self.size * 2
+
+        # 计算距离
+        distance = calculate_distance(self.source_pos, entity_pos) / explosion_size
+        if distance > 1:
+            return None
+
+        # 曝光度(简化为1)
+        exposure = 1
+        impact = (1 - distance) * exposure
+
+        motion = Vector3(
+            entity_pos[0] - self.source_pos[0],
+            entity_pos[1] - self.source_pos[1],
+            entity_pos[2] - self.source_pos[2]
+        ).normalize().multiply(impact * 2.5)
+
+        # 计算伤害
+        if self.check_tiny_hurt(entity_id):
+            # 友军只造成2点伤害
+            damage = 2
+        else:
+            # 敌军造成正常伤害
+            damage = int(((impact * impact + impact) / 2) * 2 * explosion_size + 1)
+        return motion, damage
+
+    def apply_impact(self, entity_id, motion, damage, source_alive=True):
+        """
+        施加击退并造成伤害
+
+        Args:
+            entity_id (str): 实体ID
+            motion (Vector3): 击退向量
+            damage (int): 伤害值
+            source_alive (bool): 爆炸源实体是否仍存在(ExplosionQueue在Tick末结算时已被销毁)
+        """
+        # 施加击退效果
+        comp_motion = get_component_cache().CreateActorMotion(entity_id)
+        comp_motion.SetPlayerMotion(motion.to_tuple())
+
+        # 造成伤害(爆炸源实体已销毁时以使用者为攻击者)
+        if source_alive:
+            attacker_id, child_attacker_id = self.entity_id, self.source_entity_id
+        else:
+            attacker_id, child_attacker_id = self.source_entity_id, None
+        hurt_comp = get_component_cache().CreateHurt(entity_id)
+        hurt_comp.Hurt(
+            damage,
+            serverApi.GetMinecraftEnum().ActorDamageCause.EntityExplosion,
+            attacker_id,
+            child_attacker_id,
+            False
+        )
 
     def _play_explosion_effects(self):
         """播放爆炸效果和音效"""
@@ -15,6 +15,7 @@ BetterPlayerObject - 玩家对象封装类
 
 import math
 import mod.server.extraServerApi as serverApi
+from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
 
 
 class BetterPlayerObject(object):
@@ -30,7 +31,7 @@ class BetterPlayerObject(object):
         """
         self.system = system
         self.player_id = player_id
-        self.comp_factory = serverApi.GetEngineCompFactory()
+        self.comp_factory = get_component_cache()
         self.level_id = serverApi.GetLevelId()
 
     def GetPlayerId(self):
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+BlockChangeJournal - 紧凑的方块变更记录
+
+功能:
+- 替代DimensionBackup原先的{(x,y,z): {"old": {...}, "new": {...}}}结构
+- 坐标按load_range打包为整数(相对原点的线性下标)
+- 方块状态(name, aux)存入调色板,只记录调色板下标
+- 槽位数据存放在平行的array缓冲区中,按打包后的整数O(1)查找槽位
+- 每个变更位置只占一个int键与三个数组元素,不再为每次记录创建两个字典
+
+使用方法:
+    journal = BlockChangeJournal()
+    journal.set_frame(((min_x, min_y, min_z), (max_x, max_y, max_z)))
+
+    journal.record(pos, 'minecraft:wool', 14)  # 首次记录同时作为初始状态
+    journal.get_old(pos)  # {'name': ..., 'aux': ...}
+    journal.mark_restored(pos)  # 还原后清除最新状态
+
+说明:
+- 兼容原字典接口: len(journal)、pos in journal、for pos in journal、
+  journal[pos]返回{'old': {...}, 'new': {...}}(按需生成,已还原的记录没有'new')
+- load_range之外的坐标(或范围未设置时)退回到小字典记录,仍然可用
+"""
+
+from array import array
+
+# 最新状态为空(已还原)
+NO_STATE = 0xFFFF
+# 打包下标上限(array('l')在Windows上为32位)
+MAX_PACKED_KEY = 0x7FFFFFFF
+
+
+class BlockChangeJournal(object):
+    """
+    方块变更记录
+
+    数据结构:
+    - _keys: array('l') 槽位 -> 打包坐标(范围外的坐标为-1)
+    - _old: array('H') 槽位 -> 初始状态调色板下标
+    - _new: array('H') 槽位 -> 最新状态调色板下标(NO_STATE表示已还原)
+    - _slots: {打包坐标: 槽位}
+    - _outside: {(x, y, z): 槽位}  范围外坐标
+    - _palette: [(name, aux), ...] / _palette_index: {(name, aux): 下标}
+    """
+
+    def __init__(self):
+        """初始化变更记录"""
+        self._origin = None
+        self._size_y = 0
+        self._size_z = 0
+        self._size_x = 0
+        self._palette = []
+        self._palette_index = {}
+        self.clear()
+
+    # ========== 坐标打包 ==========
+
+    def set_frame(self, load_range):
+        """
+        设置打包坐标的范围(范围变化时重新打包已有记录)
+
+        Args:
+            load_range (tuple): ((min_x, min_y, min_z), (max_x, max_y, max_z))
+        """
+        min_pos, max_pos = load_range
+        origin = (int(min_pos[0]), int(min_pos[1]), int(min_pos[2]))
+        sizes = (int(max_pos[0]) - origin[0] + 1, int(max_pos[1]) - origin[1] + 1, int(max_pos[2]) - origin[2] + 1)
+        if origin == self._origin and sizes == (self._size_x, self._size_y, self._size_z):
+            return
+
+        positions = list(self) if len(self._keys) else []
+        if min(sizes) <= 0 or sizes[0] * sizes[1] * sizes[2] > MAX_PACKED_KEY:
+            self._origin = None
+            self._size_x = self._size_y = self._size_z = 0
+        else:
+            self._origin = origin
+            self._size_x, self._size_y, self._size_z = sizes
+
+        if positions:
+            self._repack(positions)
+
+    def _repack(self, positions):
+        """按新范围重建键与索引(槽位顺序不变)"""
+        self._slots = {}
+        self._outside = {}
+        self._outside_by_slot = {}
+        for slot, pos in enumerate(positions):
+            key = self.pack(pos)
+            if key is None:
+                self._keys[slot] = -1
+                self._outside[pos] = slot
+                self._outside_by_slot[slot] = pos
+            else:
+                self._keys[slot] = key
+                self._slots[key] = slot
+
+    def pack(self, pos):
+        """
+        打包坐标
+
+        Args:
+            pos (tuple): 方块坐标 (x, y, z)
+
+        Returns:
+            int: 打包后的下标,不在范围内时返回None
+        """
+        origin = self._origin
+        if origin is None:
+            return None
+        dx = int(pos[0]) - origin[0]
+        dy = int(pos[1]) - origin[1]
+        dz = int(pos[2]) - origin[2]
+        if 0 <= dx < self._size_x and 0 <= dy < self._size_y and 0 <= dz < self._size_z:
+            return (dx * self._size_y + dy) * self._size_z + dz
+        return None
+
+    def unpack(self, key):
+        """
+        解包坐标
+
+        Args:
+            key (int): 打包后的下标
+
+        Returns:
+            tuple: 方块坐标 (x, y, z)
+        """
+        rest, dz = divmod(key, self._size_z)
+        dx, dy = divmod(rest, self._size_y)
+        origin = self._origin
+        return (origin[0] + dx, origin[1] + dy, origin[2] + dz)
+
+    def _find_slot(self, pos):
+        key = self.pack(pos)
+        if key is None:
+            return self._outside.get(tuple(pos))
+        return self._slots.get(key)
+
+    # ========== 调色板 ==========
+
+    def _intern(self, name, aux):
+        state = (name, aux)
+        index = self._palette_index.get(state)
+        if index is None:
+            index = len(self._palette)
+            if index >= NO_STATE:
+                raise ValueError("BlockChangeJournal palette overflow")
+            self._palette.append(state)
+            self._palette_index[state] = index
+        return index
+
+    def _state_dict(self, index):
+        name, aux = self._palette[index]
+        return {'name': name, 'aux': aux}
+
+    # ========== 记录 ==========
+
+    def record(self, pos, name, aux=0):
+        """
+        记录方块状态: 首次记录的位置同时写入初始状态,之后只更新最新状态
+
+        Args:
+            pos (tuple): 方块坐标
+            name (str): 方块名称
+            aux (int): 方块附加值
+        """
+        state = self._intern(name, aux)
+        slot = self._find_slot(pos)
+        if slot is not None:
+            self._new[slot] = state
+            return
+
+        slot = len(self._keys)
+        key = self.pack(pos)
+        if key is None:
+            pos = tuple(pos)
+            self._keys.append(-1)
+            self._outside[pos] = slot
+            self._outside_by_slot[slot] = pos
+        else:
+            self._keys.append(key)
+            self._slots[key] = slot
+        self._old.append(state)
+        self._new.append(state)
+
+    def get_old(self, pos):
+        """
+        获取初始状态
+
+        Returns:
+            dict: {'name': str, 'aux': int},没有记录时返回None
+        """
+        slot = self._find_slot(pos)
+        if slot is None:
+            return None
+        return self._state_dict(self._old[slot])
+
+    def get_new(self, pos):
+        """
+        获取最新状态
+
+        Returns:
+            dict: {'name': str, 'aux': int},没有记录或已还原时返回None
+        """
+        slot = self._find_slot(pos)
+        if slot is None or self._new[slot] == NO_STATE:
+            return None
+        return self._state_dict(self._new[slot])
+
+    def is_pending(self, pos):
+        """
+        位置是否有待还原的最新状态
+
+        Returns:
+            bool: 已记录且尚未还原
+        """
+        slot = self._find_slot(pos)
+        return slot is not None and self._new[slot] != NO_STATE
+
+    def mark_restored(self, pos):
+        """清除最新状态(对应原结构中删除'new')"""
+        slot = self._find_slot(pos)
+        if slot is not None:
+            self._new[slot] = NO_STATE
+
+    def iter_pending(self):
+        """
+        遍历尚未还原的位置
+
+        Yields:
+            tuple: 方块坐标 (x, y, z)
+        """
+        keys = self._keys
+        new = self._new
+        for slot in range(len(keys)):
+            if new[slot] == NO_STATE:
+                continue
+            key = keys[slot]
+            yield self.unpack(key) if key >= 0 else self._outside_by_slot[slot]
+
+    def clear(self):
+        """清空全部记录(保留范围与调色板)"""
+        self._keys = array('l')
+        self._old = array('H')
+        self._new = array('H')
+        self._slots = {}
+        self._outside = {}
+        self._outside_by_slot = {}
+
+    # ========== 兼容原字典接口 ==========
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, pos):
+        return self._find_slot(pos) is not None
+
+    def __iter__(self):
+        keys = self._keys
+        for slot in range(len(keys)):
+            key = keys[slot]
+            yield self.unpack(key) if key >= 0 else self._outside_by_slot[slot]
+
+    def __getitem__(self, pos):
+        slot = self._find_slot(pos)
+        if slot is None:
+            raise KeyError(pos)
+        change = {'old': self._state_dict(self._old[slot])}
+        if self._new[slot] != NO_STATE:
+            change['new'] = self._state_dict(self._new[slot])
+        return change
+
+    def get_memory_info(self):
+        """
+        获取缓冲区占用信息
+
+        Returns:
+            dict: {'entries', 'palette_size', 'buffer_bytes', 'outside_entries'}
+        """
+        return {
+            'entries': len(self._keys),
+            'palette_size': len(self._palette),
+            'buffer_bytes': (len(self._keys) * self._keys.itemsize + len(self._old) * self._old.itemsize +
+                             len(self._new) * self._new.itemsize),
+            'outside_entries': len(self._outside),
+        }
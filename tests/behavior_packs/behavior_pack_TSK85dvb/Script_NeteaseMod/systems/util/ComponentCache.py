@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+ComponentCache - 组件句柄缓存
+
+功能:
+- 按(组件类型, 目标ID)缓存GetEngineCompFactory().CreateX(target)返回的组件句柄
+- 关卡组件(目标为LevelId)常驻,不会被淘汰
+- 实体组件在RemoveEntityServerEvent与玩家离开(PlayerIntendLeaveServerEvent/DelServerPlayerEvent)时淘汰
+- 统计命中/创建/淘汰次数,供基准测试量化节省的组件创建
+
+使用方法:
+    from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
+
+    comps = get_component_cache()
+    pos = comps.CreatePos(entity_id).GetFootPos()  # 与组件工厂同名的CreateX接口
+    block_comp = comps.get('CreateBlockInfo', serverApi.GetLevelId())
+
+    # BedWarsGameSystem.Create中注册淘汰事件
+    comps.register_events(system)
+
+说明:
+- 组件工厂在第一次使用时获取,开启EngineApiAccounting时缓存的是代理组件
+- 缓存的句柄与直接创建的组件行为一致,调用方不应修改句柄上的属性
+- 实现了CreateX接口,可直接替换各系统的self.comp_factory
+"""
+
+from __future__ import print_function
+
+import mod.server.extraServerApi as serverApi
+
+
+class ComponentCache(object):
+    """
+    组件句柄缓存
+
+    数据结构:
+    - _level: {comp_name: component}  关卡组件,常驻
+    - _entities: {target_id: {comp_name: component}}  实体组件,按目标整体淘汰
+    """
+
+    def __init__(self):
+        """初始化组件缓存"""
+        self._factory = None
+        self._level_id = None
+        self._level = {}
+        self._entities = {}
+
+        # 已注册事件的系统
+        self._system = None
+
+        # 统计数据
+        self.hit_count = 0  # 命中缓存次数
+        self.create_count = 0  # 实际创建组件次数
+        self.evict_count = 0  # 淘汰的目标数
+
+    def __getattr__(self, name):
+        """
+        CreateX(target_id): 与组件工厂接口一致的缓存版本
+
+        带额外参数的工厂方法(例如CreateComponent)不缓存,直接转发给组件工厂
+        """
+        if not name.startswith("Create"):
+            raise AttributeError(name)
+
+        def create(target_id, *args, **kwargs):
+            if args or kwargs:
+                return getattr(self._get_factory(), name)(target_id, *args, **kwargs)
+            return self.get(name, target_id)
+        create.__name__ = name
+        self.__dict__[name] = create
+        return create
+
+    # ========== 查询 ==========
+
+    def get(self, comp_name, target_id):
+        """
+        获取组件句柄,未缓存时创建
+
+        Args:
+            comp_name (str): 工厂方法名,例如'CreatePos'
+            target_id (str): 实体ID或LevelId
+
+        Returns:
+            组件句柄,创建失败返回None(不缓存)
+        """
+        if self._level_id is None:
+            self._level_id = serverApi.GetLevelId()
+        if target_id == self._level_id:
+            comps = self._level
+        else:
+            comps = self._entities.get(target_id)
+
+        if comps is not None:
+            comp = comps.get(comp_name)
+            if comp is not None:
+                self.hit_count += 1
+                return comp
+
+        comp = getattr(self._get_factory(), comp_name)(target_id)
+        self.create_count += 1
+        if comp is not None and target_id is not None:
+            if comps is None:
+                comps = self._entities[target_id] = {}
+            comps[comp_name] = comp
+        return comp
+
+    def _get_factory(self):
+        if self._factory is None:
+            self._factory = serverApi.GetEngineCompFactory()
+        return self._factory
+
+    # ========== 淘汰 ==========
+
+    def evict(self, target_id):
+        """
+        淘汰目标的全部组件句柄(关卡组件不受影响)
+
+        Args:
+            target_id (str): 实体ID
+        """
+        if self._entities.pop(target_id, None) is not None:
+            self.evict_count += 1
+
+    def clear(self, include_level=False):
+        """
+        清空缓存
+
+        Args:
+            include_level (bool): 是否同时清空常驻的关卡组件
+        """
+        self._entities = {}
+        if include_level:
+            self._level = {}
+            self._factory = None
+            self._level_id = None
+
+    def register_events(self, system):
+        """
+        在指定ServerSystem上注册淘汰事件
+
+        Args:
+            system: ServerSystem实例(BedWarsGameSystem)
+        """
+        if self._system is not None:
+            return
+        self._system = system
+        for event_name, callback in self._get_event_handlers():
+            system.ListenForEvent(
+                serverApi.GetEngineNamespace(),
+                serverApi.GetEngineSystemName(),
+                event_name,
+                self,
+                callback
+            )
+        print("[INFO] [ComponentCache] 已注册组件缓存淘汰事件")
+
+    def unregister_events(self):
+        """注销淘汰事件并清空实体组件"""
+        if self._system is None:
+            return
+        for event_name, callback in self._get_event_handlers():
+            try:
+                self._system.UnListenForEvent(
+                    serverApi.GetEngineNamespace(),
+                    serverApi.GetEngineSystemName(),
+                    event_name,
+                    self,
+                    callback
+                )
+            except Exception as e:
+                print("[WARN] [ComponentCache] 注销事件{}失败: {}".format(event_name, str(e)))
+        self._system = None
+        self.clear()
+
+    def _get_event_handlers(self):
+        return [
+            ('RemoveEntityServerEvent', self._on_remove_entity),
+            ('PlayerIntendLeaveServerEvent', self._on_player_leave),
+            ('DelServerPlayerEvent', self._on_del_player),
+        ]
+
+    def _on_remove_entity(self, args):
+        self.evict(args.get('id'))
+
+    def _on_player_leave(self, args):
+        self.evict(args.get('playerId'))
+
+    def _on_del_player(self, args):
+        self.evict(args.get('id'))
+
+    # ========== 统计 ==========
+
+    def get_stats(self):
+        """
+        获取统计信息
+
+        Returns:
+            dict: 统计数据
+        """
+        total = self.hit_count + self.create_count
+        return {
+            'hit_count': self.hit_count,
+            'create_count': self.create_count,
+            'evict_count': self.evict_count,
+            'hit_rate': float(self.hit_count) / total if total else 0.0,
+            'cached_targets': len(self._entities),
+            'cached_level_components': len(self._level),
+        }
+
+
+# 全局组件缓存(工具函数与静态方法调用方共享)
+_component_cache = ComponentCache()
+
+
+def get_component_cache():
+    """
+    获取全局组件缓存
+
+    Returns:
+        ComponentCache: 组件缓存实例
+    """
+    return _component_cache
@@ -6,6 +6,7 @@
 - 检查玩家拥有的货币数量
 - 扣除玩家货币
 - 支持多种货币类型（铁锭、金锭、钻石、绿宝石、铜锭、经验）
+- 物品货币数量读取自InventoryMirror背包镜像
 
 参考老项目:
 - Parts/BedWarsShop/data/ShopCurrency.py
@@ -47,10 +48,11 @@ class CurrencyManager(object):
         """
         try:
             import mod.server.extraServerApi as serverApi
+            from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
 
             # 特殊处理：经验货币
             if currency_type == 'exp':
-                exp_comp = serverApi.GetEngineCompFactory().CreateExp(player_id)
+                exp_comp = get_component_cache().CreateExp(player_id)
                 player_level = exp_comp.GetPlayerLevel()
                 return player_level
 
@@ -60,21 +62,9 @@ class CurrencyManager(object):
                 print("[ERROR] [CurrencyManager] 无效的货币类型: {}".format(currency_type))
                 return 0
 
-            # 获取物品组件
-            item_comp = serverApi.GetEngineCompFactory().CreateItem(player_id)
-
-            # 遍历背包统计物品数量
-            total_count = 0
-            for slot in range(36):  # 背包有36个格子
-                item_dict = item_comp.GetPlayerItem(
-                    serverApi.GetMinecraftEnum().ItemPosType.INVENTORY,
-                    slot
-                )
-
-                if item_dict and item_dict.get('itemName') == item_id:
-                    total_count += item_dict.get('count', 0)
-
-            return total_count
+            # 从背包镜像读取(镜像未缓存时一次性加载整个背包)
+            from Script_NeteaseMod.systems.util.InventoryMirror import get_inventory_mirror
+            return get_inventory_mirror().get_item_count(player_id, item_id)
 
         except Exception as e:
             print("[ERROR] [CurrencyManager] 获取玩家货币失败: player={}, currency={}, error={}".format(
@@ -132,10 +122,11 @@ class CurrencyManager(object):
                 return False
 
             import mod.server.extraServerApi as serverApi
+            from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
 
             # 特殊处理：经验货币
             if currency_type == 'exp':
-                exp_comp = serverApi.GetEngineCompFactory().CreateExp(player_id)
+                exp_comp = get_component_cache().CreateExp(player_id)
                 current_level = exp_comp.GetPlayerLevel()
                 if current_level < amount:
                     print("[WARN] [CurrencyManager] 经验等级不足: player={}, need={}, have={}".format(
@@ -153,32 +144,31 @@ class CurrencyManager(object):
                 print("[ERROR] [CurrencyManager] 无效的货币类型: {}".format(currency_type))
                 return False
 
-            item_comp = serverApi.GetEngineCompFactory().CreateItem(player_id)
+            from Script_NeteaseMod.systems.util.InventoryMirror import get_inventory_mirror
+            mirror = get_inventory_mirror()
+            item_comp = get_component_cache().CreateItem(player_id)
 
-            # 扣除货币
+            # 扣除货币(槽位信息来自背包镜像,扣除后写穿更新镜像)
             remain_amount = amount
-            for slot in range(36):
+            for slot, item_count in mirror.get_item_slots(player_id, item_id):
                 if remain_amount <= 0:
                     break
 
-                item_dict = item_comp.GetPlayerItem(
-                    serverApi.GetMinecraftEnum().ItemPosType.INVENTORY,
-                    slot
-                )
+                if item_count >= remain_amount:
+                    # 这个槽位足够扣除
+                    new_count = item_count - remain_amount
+                    remain_amount = 0
+                else:
+                    # 这个槽位不够，全部扣除
+                    new_count = 0
+                    remain_amount -= item_count
 
-                if item_dict and item_dict.get('itemName') == item_id:
-                    item_count = item_dict.get('count', 0)
-
-                    if item_count >= remain_amount:
-                        # 这个槽位足够扣除
-                        item_comp.SetInvItemNum(slot, item_count - remain_amount)
-                        remain_amount = 0
-                    else:
-                        # 这个槽位不够，全部扣除
-                        item_comp.SetInvItemNum(slot, 0)
-                        remain_amount -= item_count
+                item_comp.SetInvItemNum(slot, new_count)
+                mirror.update_slot(player_id, slot, new_count)
 
             if remain_amount > 0:
+                # 镜像与实际背包不一致,丢弃镜像
+                mirror.invalidate(player_id)
                 print("[ERROR] [CurrencyManager] 货币扣除未完成: player={}, currency={}, remain={}".format(
                     player_id, currency_type, remain_amount))
                 return False
@@ -212,10 +202,11 @@ class CurrencyManager(object):
                 return True
 
             import mod.server.extraServerApi as serverApi
+            from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
 
             # 特殊处理：经验货币
             if currency_type == 'exp':
-                exp_comp = serverApi.GetEngineCompFactory().CreateExp(player_id)
+                exp_comp = get_component_cache().CreateExp(player_id)
                 current_level = exp_comp.GetPlayerLevel()
                 exp_comp.SetPlayerLevel(current_level + amount)
                 print("[INFO] [CurrencyManager] 经验给予成功: player={}, amount={}, new_level={}".format(
@@ -228,7 +219,7 @@ class CurrencyManager(object):
                 print("[ERROR] [CurrencyManager] 无效的货币类型: {}".format(currency_type))
                 return False
 
-            item_comp = serverApi.GetEngineCompFactory().CreateItem(player_id)
+            item_comp = get_component_cache().CreateItem(player_id)
 
             # 给予物品
             item_dict = {
@@ -239,6 +230,10 @@ class CurrencyManager(object):
 
             success = item_comp.SpawnItemToPlayerInv(item_dict, player_id)
 
+            # 物品放入的槽位无法预知,使背包镜像失效
+            from Script_NeteaseMod.systems.util.InventoryMirror import get_inventory_mirror
+            get_inventory_mirror().invalidate(player_id)
+
             if success:
                 print("[INFO] [CurrencyManager] 货币给予成功: player={}, currency={}, amount={}".format(
                     player_id, currency_type, amount))
@@ -3,10 +3,11 @@
 DimensionBackup - 地图备份还原系统
 
 功能:
-- 动态记录方块变更
+- 动态记录方块变更(BlockChangeJournal紧凑存储)
 - 通过SetBlock还原方块为空气
-- 支持协程分批还原
-- 循环定时器处理未加载区块
+- 按区块分组、分批加载区块,协程按每Tick预算(毫秒/方块数)分片还原
+- 循环定时器处理加载超时的区块
+- 提供还原进度与预计剩余时间(由DimensionBackupHandler输出)
 
 新方案说明:
 - 只记录方块变更,不备份调色板
@@ -18,7 +19,132 @@ DimensionBackup - 地图备份还原系统
 """
 
 import time
+import timeit
 import mod.server.extraServerApi as serverApi
+from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
+from Script_NeteaseMod.systems.util.BlockChangeJournal import BlockChangeJournal
+
+# 高精度时钟(Python 2没有perf_counter)
+_clock = getattr(time, 'perf_counter', None) or timeit.default_timer
+
+# 区块边长(方块)
+CHUNK_SIZE = 16
+# 每批加载的区域边长(区块数),一批最多WAVE_CHUNKS x WAVE_CHUNKS个区块
+WAVE_CHUNKS = 4
+# 每Tick还原预算: 耗时(毫秒)与方块数,任一用完即让出到下一Tick
+RESTORE_BUDGET_MS = 4.0
+RESTORE_BUDGET_BLOCKS = 512
+# 区块加载等待上限(Tick),超时的区块转入循环定时器
+CHUNK_LOAD_TIMEOUT_TICKS = 150
+
+
+def group_by_wave(positions):
+    """
+    按批次与区块分组坐标
+
+    Args:
+        positions (iterable): 方块坐标(或区段原点)
+
+    Returns:
+        list: [(wave_key, [(chunk_key, [pos, ...]), ...]), ...] 按批次坐标排序
+    """
+    waves = {}
+    for pos in positions:
+        chunk_x = int(pos[0]) >> 4
+        chunk_z = int(pos[2]) >> 4
+        wave_key = (chunk_x // WAVE_CHUNKS, chunk_z // WAVE_CHUNKS)
+        chunks = waves.get(wave_key)
+        if chunks is None:
+            chunks = waves[wave_key] = {}
+        items = chunks.get((chunk_x, chunk_z))
+        if items is None:
+            items = chunks[(chunk_x, chunk_z)] = []
+        items.append(pos)
+    return [(wave_key, sorted(waves[wave_key].items())) for wave_key in sorted(waves)]
+
+
+class RestoreTask(object):
+    """
+    一次地图还原任务的状态与进度
+
+    waves: [(wave_key, [(chunk_key, [item, ...]), ...]), ...]
+    item为方块坐标(逐方块还原)或区段原点(快照还原),由restore_item/defer_item处理
+    """
+
+    def __init__(self, waves, callback, progress_callback, restore_item, defer_item, budget_ms, budget_items):
+        self.waves = waves
+        self.callback = callback
+        self.progress_callback = progress_callback
+        self.restore_item = restore_item  # restore_item(item, task)
+        self.defer_item = defer_item  # defer_item(item, task) 区块加载超时
+        self.budget_ms = budget_ms  # 每Tick耗时预算(毫秒),<=0表示不限
+        self.budget_items = budget_items  # 每Tick处理条目预算,<=0表示不限
+
+        self.total = 0
+        self.chunk_count = 0
+        for _, chunks in waves:
+            self.chunk_count += len(chunks)
+            for _, positions in chunks:
+                self.total += len(positions)
+
+        self.wave = 0  # 当前批次序号(从1开始)
+        self.restored = 0  # 已处理条目数(含转入兜底流程的)
+        self.deferred = 0  # 转入兜底流程的条目数
+        self.tick_count = 0  # 协程执行过的Tick数
+        self.started_at = time.time()
+
+        # 当前Tick的预算消耗
+        self.tick_started_at = 0.0
+        self.tick_items = 0
+
+    def begin_tick(self):
+        """新的Tick开始,重置预算"""
+        self.tick_count += 1
+        self.tick_started_at = _clock()
+        self.tick_items = 0
+
+    def is_budget_exhausted(self):
+        """
+        当前Tick预算是否已用完
+
+        Returns:
+            bool: 是否应让出到下一Tick
+        """
+        if self.budget_items > 0 and self.tick_items >= self.budget_items:
+            return True
+        if self.budget_ms > 0 and (_clock() - self.tick_started_at) * 1000.0 >= self.budget_ms:
+            return True
+        return False
+
+    def defer(self):
+        """条目转入兜底流程"""
+        self.restored += 1
+        self.deferred += 1
+
+    def get_progress(self):
+        """
+        获取进度信息
+
+        Returns:
+            dict: 见DimensionBackup.get_restore_progress
+        """
+        elapsed = time.time() - self.started_at
+        percent = float(self.restored) / self.total if self.total else 1.0
+        eta = None
+        if self.restored >= self.total:
+            eta = 0.0
+        elif self.restored > 0 and elapsed > 0:
+            eta = elapsed * (self.total - self.restored) / self.restored
+        return {
+            'total': self.total,
+            'restored': self.restored,
+            'deferred': self.deferred,
+            'wave': self.wave,
+            'wave_count': len(self.waves),
+            'percent': percent,
+            'elapsed': elapsed,
+            'eta': eta,
+        }
 
 
 class DimensionBackup(object):
@@ -26,8 +152,8 @@ class DimensionBackup(object):
     地图备份还原类
 
     核心数据结构:
-    - block_changes: dict[tuple, dict] - 记录方块变更
-      格式: {(x,y,z): {"old": 初始方块信息, "new": 最新方块信息}}
+    - block_changes: BlockChangeJournal - 记录方块变更
+      按坐标查询得到{"old": 初始方块信息, "new": 最新方块信息}(已还原的没有"new")
     """
 
     def __init__(self, dimension):
@@ -38,11 +164,16 @@ class DimensionBackup(object):
             dimension (int): 维度ID
         """
         self.dimension = dimension
-        self.block_changes = {}  # 方块变更记录
+        self.block_changes = BlockChangeJournal()  # 方块变更记录
         self.load_range = ()  # 备份范围
         self.store_block_dict = {}  # 待还原的方块(还原失败的)
         self.restoration_timer_id = None  # 循环还原定时器ID
         self.restoration_callback = None  # 还原完成回调
+        self.is_restoring = False  # 是否正在还原
+        self.budget_ms = RESTORE_BUDGET_MS  # 每Tick还原耗时预算(毫秒)
+        self.budget_blocks = RESTORE_BUDGET_BLOCKS  # 每Tick还原方块预算
+        self._restore_task = None  # 当前还原任务(RestoreTask)
+        self._area_serial = 0  # 常加载区域名称序号
 
     def backup_initial_state(self, load_range, callback=None):
         """
@@ -54,6 +185,7 @@ class DimensionBackup(object):
         """
         # 设置备份范围,用于方块放置区域限制
         self.load_range = (tuple(load_range[0]), tuple(load_range[1]))
+        self.block_changes.set_frame(self.load_range)
         print("[INFO] [DimensionBackup] 设置地图范围 dimension={} range={}".format(
             self.dimension, load_range
         ))
@@ -73,27 +205,15 @@ class DimensionBackup(object):
         Args:
             pos (tuple): 方块位置 (x, y, z)
         """
-        comp_block = serverApi.GetEngineCompFactory().CreateBlockInfo(serverApi.GetLevelId())
+        comp_block = get_component_cache().CreateBlockInfo(serverApi.GetLevelId())
 
         # 获取当前方块状态
         current_block = comp_block.GetBlockNew(pos, self.dimension)
         if not current_block:
             return
 
-        current_block_info = {
-            'name': current_block['name'],
-            'aux': current_block.get('aux', 0)
-        }
-
-        # 如果该位置还没有记录,说明是第一次变更,记录初始状态
-        if pos not in self.block_changes:
-            self.block_changes[pos] = {
-                'old': dict(current_block_info),  # 保存初始状态
-                'new': dict(current_block_info)   # 当前状态
-            }
-        else:
-            # 如果已经有记录,只更新new状态,保持old不变
-            self.block_changes[pos]['new'] = dict(current_block_info)
+        # 第一次变更同时记录初始状态,之后只更新最新状态
+        self.block_changes.record(pos, current_block['name'], current_block.get('aux', 0))
 
     def get_change_count(self):
         """
@@ -104,88 +224,237 @@ class DimensionBackup(object):
         """
         return len(self.block_changes)
 
-    def restore_map_by_set_block(self, callback=None):
+    def restore_map_by_set_block(self, callback=None, progress_callback=None):
         """
         通过协程 + SetBlock的方式还原地图
 
+        流程:
+        1. 按区块分组待还原方块,再把相邻区块合并为批次(WAVE_CHUNKS x WAVE_CHUNKS个区块)
+        2. 逐批注册常加载区域,区块加载后在每Tick预算内还原,预算用完让出到下一Tick
+        3. 超时仍未加载的区块转入循环定时器兜底
+
         Args:
             callback (function): 还原完成回调函数
+            progress_callback (function): 进度回调,参数为get_restore_progress()的结果
+        """
+        task = RestoreTask(
+            group_by_wave(self.block_changes.iter_pending()), callback, progress_callback,
+            self._restore_block, self._defer_block, self.budget_ms, self.budget_blocks
+        )
+        print("[INFO] [DimensionBackup] 地图还原任务启动 dimension={} 待还原方块数: {} 区块数: {} 批次数: {}".format(
+            self.dimension, task.total, task.chunk_count, len(task.waves)
+        ))
+        self.start_task(task, self._on_restore_end)
+
+    def start_task(self, task, on_end):
+        """
+        启动按批次执行的协程任务(逐方块还原、快照抓取与还原共用)
+
+        任务执行期间is_restoring为True,玩家放置方块会被拦截
+
+        Args:
+            task (RestoreTask): 还原任务
+            on_end (function): 协程结束回调on_end(task)
+        """
+        self._restore_task = task
+        self.is_restoring = True
+        serverApi.StartCoroutine(lambda: self._restore_coroutine(task), lambda: on_end(task))
+
+    def get_restore_progress(self):
+        """
+        获取当前还原进度
+
+        Returns:
+            dict: 进度信息,未在还原时返回None
+                - total (int): 待还原方块总数
+                - restored (int): 已处理方块数(还原成功或转入循环定时器)
+                - deferred (int): 转入循环定时器的方块数
+                - wave (int): 当前批次序号(从1开始)
+                - wave_count (int): 批次总数
+                - percent (float): 完成比例(0~1)
+                - elapsed (float): 已用时间(秒)
+                - eta (float): 预计剩余时间(秒),尚无法估计时为None
+        """
+        task = self._restore_task
+        if task is None:
+            return None
+        return task.get_progress()
+
+    def get_restore_task(self):
+        """
+        获取正在执行的批次任务
+
+        Returns:
+            RestoreTask: 当前任务,没有时返回None
+        """
+        return self._restore_task
+
+    def _get_wave_area(self, wave_key):
+        """
+        获取批次的常加载区域
+
+        Args:
+            wave_key (tuple): 批次坐标
+
+        Returns:
+            tuple: (min_pos, max_pos)
+        """
+        size = WAVE_CHUNKS * CHUNK_SIZE
+        min_x = wave_key[0] * size
+        min_z = wave_key[1] * size
+        if self.load_range:
+            min_y, max_y = self.load_range[0][1], self.load_range[1][1]
+        else:
+            min_y, max_y = 0, 255
+        return (min_x, min_y, min_z), (min_x + size - 1, max_y, min_z + size - 1)
+
+    def _restore_coroutine(self, task):
+        """
+        协程:按批次还原,每Tick最多消耗task.budget_ms毫秒或task.budget_items个条目
+
+        Args:
+            task (RestoreTask): 还原任务
         """
         level_id = serverApi.GetLevelId()
-        chunk_comp = serverApi.GetEngineCompFactory().CreateChunkSource(level_id)
+        chunk_comp = get_component_cache().CreateChunkSource(level_id)
+        # 每个任务使用独立的区域名称,被中断的旧任务删除区域时不会影响新任务
+        self._area_serial += 1
+        area_name = 'restore_area_{}_{}'.format(self.dimension, self._area_serial)
+
+        task.begin_tick()
+        for wave_index, (wave_key, chunks) in enumerate(task.waves):
+            task.wave = wave_index + 1
+            min_pos, max_pos = self._get_wave_area(wave_key)
+            area_added = chunk_comp.SetAddArea(area_name, self.dimension, min_pos, max_pos)
+            if not area_added:
+                print("[WARN] [DimensionBackup] 批次{}常加载区域注册失败,等待区块自然加载".format(task.wave))
+
+            try:
+                pending = chunks
+                wait_ticks = 0
+                while pending:
+                    not_loaded = []
+                    for chunk_key, items in pending:
+                        # 每个区块只检测一次加载状态
+                        if not chunk_comp.CheckChunkState(self.dimension, items[0]):
+                            not_loaded.append((chunk_key, items))
+                            continue
+                        for item in items:
+                            if task.is_budget_exhausted():
+                                self._report_progress(task)
+                                yield
+                                if self._restore_task is not task:
+                                    return
+                                task.begin_tick()
+                            task.restore_item(item, task)
+                            task.tick_items += 1
+
+                    pending = not_loaded
+                    if not pending:
+                        break
+                    wait_ticks += 1
+                    if wait_ticks > CHUNK_LOAD_TIMEOUT_TICKS:
+                        # 区块迟迟未加载,交给兜底流程
+                        for _, items in pending:
+                            for item in items:
+                                task.defer_item(item, task)
+                        print("[WARN] [DimensionBackup] 批次{}有{}个区块加载超时,转入兜底流程".format(
+                            task.wave, len(pending)
+                        ))
+                        break
+                    self._report_progress(task)
+                    yield
+                    if self._restore_task is not task:
+                        return
+                    task.begin_tick()
+            finally:
+                # 任务被中断(return)或协程被关闭时也删除常加载区域
+                if area_added:
+                    chunk_comp.DeleteArea(area_name)
+
+        self._report_progress(task)
+
+    def _restore_block(self, pos, task):
+        """
+        还原任务中还原单个方块
 
-        # 1. 注册常加载区域(扩大100格范围)
-        print("[INFO] [DimensionBackup] 地图还原任务启动,注册常加载区域")
-        res = chunk_comp.SetAddArea(
-            'restore_area_{}'.format(self.dimension),
-            self.dimension,
-            (self.load_range[0][0] - 100, self.load_range[0][1], self.load_range[0][2] - 100),
-            (self.load_range[1][0] + 100, self.load_range[1][1], self.load_range[1][2] + 100)
-        )
+        Args:
+            pos (tuple): 方块位置
+            task (RestoreTask): 还原任务
+        """
+        journal = self.block_changes
+        if not journal.is_pending(pos):
+            task.restored += 1
+            return
 
-        def _start_restore():
-            """协程:批量还原方块"""
-            print("[INFO] [DimensionBackup] 还原程序启动,待还原方块数: {}".format(
-                len(self.block_changes)
-        ))
-            over_pos_list = []
-
-            for pos in self.block_changes:
-                # 尝试立即还原方块
-                restore_res = self.set_block(pos)
-                if not restore_res and pos not in self.store_block_dict:
-                    # 还原失败的方块加入队列中等待定时器恢复
-                    self.store_block_dict[pos] = self.block_changes[pos]['old']
-                    continue
-
-                if restore_res:
-                    over_pos_list.append(pos)
-
-            # 清理已还原的方块
-            for pos in over_pos_list:
-                if 'new' in self.block_changes[pos]:
-                    del self.block_changes[pos]['new']
-
-            yield
-
-        def on_restore_end():
-            """还原结束回调"""
-            if not self.store_block_dict:
-                # 全部还原完成
-                self.reset()
-                print("[INFO] [DimensionBackup] 地图还原程序结束,全部方块已还原")
-                chunk_comp.DeleteArea('restore_area_{}'.format(self.dimension))
-                if callback:
-                    callback()
-            else:
-                # 存在未还原的方块,启动循环定时器
-                block_count = len(self.store_block_dict)
-                print("[WARN] [DimensionBackup] 存在未还原的方块,启动循环定时器,待还原数量: {}".format(
-                    block_count
-        ))
-                self.set_loop_restore_timer(callback)
-
-        def _on_timer_end():
-            """定时器回调:启动协程"""
-            print("[INFO] [DimensionBackup] 协程启动")
-            serverApi.StartCoroutine(_start_restore, lambda: on_restore_end())
-
-        if res:
-            # 2. 定时器延迟1秒执行协程
-            print("[INFO] [DimensionBackup] 常加载区域注册成功")
-            comp = serverApi.GetEngineCompFactory().CreateGame(serverApi.GetLevelId())
-            comp.AddTimer(1.0, _on_timer_end)
+        # 区块已按组检测过;还原目标固定为空气,无需再读取当前方块
+        if self.set_block(pos, check_chunk=False, check_current=False):
+            journal.mark_restored(pos)
+            task.restored += 1
         else:
-            print("[ERROR] [DimensionBackup] 常加载区域注册失败")
+            self._defer_block(pos, task)
+
+    def _defer_block(self, pos, task):
+        """方块转入循环定时器"""
+        self.store_block_dict[pos] = self.block_changes.get_old(pos)
+        task.defer()
+
+    def _report_progress(self, task):
+        if task.progress_callback:
+            try:
+                task.progress_callback(task.get_progress())
+            except Exception as e:
+                print("[ERROR] [DimensionBackup] 还原进度回调失败: {}".format(str(e)))
+
+    def _on_restore_end(self, task):
+        """
+        还原协程结束回调
+
+        Args:
+            task (RestoreTask): 还原任务
+        """
+        if self._restore_task is not task:
+            return
+
+        callback = task.callback
+        if not self.store_block_dict:
+            # 全部还原完成
+            print("[INFO] [DimensionBackup] 地图还原程序结束,全部方块已还原 用时{:.1f}秒 共{}个Tick".format(
+                task.get_progress()['elapsed'], task.tick_count
+            ))
+            self.finish_task()
             if callback:
                 callback()
+            return
 
-    def set_block(self, pos):
+        # 存在未还原的方块,注册整图常加载区域后启动循环定时器
+        print("[WARN] [DimensionBackup] 存在未还原的方块,启动循环定时器,待还原数量: {}".format(
+            len(self.store_block_dict)
+        ))
+        if self.load_range:
+            chunk_comp = get_component_cache().CreateChunkSource(serverApi.GetLevelId())
+            chunk_comp.SetAddArea(
+                'restore_area_{}'.format(self.dimension),
+                self.dimension,
+                (self.load_range[0][0] - 100, self.load_range[0][1], self.load_range[0][2] - 100),
+                (self.load_range[1][0] + 100, self.load_range[1][1], self.load_range[1][2] + 100)
+            )
+        self.set_loop_restore_timer(callback)
+
+    def finish_task(self):
+        """结束当前任务,退出还原状态"""
+        self.reset()
+        self._restore_task = None
+        self.is_restoring = False
+
+    def set_block(self, pos, check_chunk=True, check_current=True):
         """
         还原单个方块(设置为空气)
 
         Args:
             pos (tuple): 方块位置 (x, y, z)
+            check_chunk (bool): 是否检测区块加载状态(调用方已按区块检测时传False)
+            check_current (bool): 是否先读取当前方块,已是空气时跳过写入
 
         Returns:
             bool: 是否还原成功
@@ -193,22 +462,25 @@ class DimensionBackup(object):
         level_id = serverApi.GetLevelId()
 
         # 1. 检测区块是否已加载
-        chunk_comp = serverApi.GetEngineCompFactory().CreateChunkSource(level_id)
-        is_chunk_loaded = chunk_comp.CheckChunkState(self.dimension, pos)
-        if not is_chunk_loaded:
-            return False
+        if check_chunk:
+            chunk_comp = get_component_cache().CreateChunkSource(level_id)
+            is_chunk_loaded = chunk_comp.CheckChunkState(self.dimension, pos)
+            if not is_chunk_loaded:
+                return False
+
+        block_comp = get_component_cache().CreateBlockInfo(level_id)
 
         # 2. 获取该位置方块
-        block_comp = serverApi.GetEngineCompFactory().CreateBlockInfo(level_id)
-        block_data = block_comp.GetBlockNew(pos, self.dimension)
+        if check_current:
+            block_data = block_comp.GetBlockNew(pos, self.dimension)
 
-        # 获取不到,直接返回失败
-        if not block_data:
-            return False
+            # 获取不到,直接返回失败
+            if not block_data:
+                return False
 
-        # 已经是空气,不需要还原
-        if block_data['name'] == "minecraft:air":
-            return True
+            # 已经是空气,不需要还原
+            if block_data['name'] == "minecraft:air":
+                return True
 
         # 3. 尝试还原(设置为空气)
         res = block_comp.SetBlockNew(
@@ -229,7 +501,7 @@ class DimensionBackup(object):
             callback (function): 还原完成回调函数
         """
         level_id = serverApi.GetLevelId()
-        timer_comp = serverApi.GetEngineCompFactory().CreateGame(level_id)
+        timer_comp = get_component_cache().CreateGame(level_id)
 
         # 1. 终止旧定时器
         if self.restoration_timer_id:
@@ -251,7 +523,7 @@ class DimensionBackup(object):
             callback (function): 还原完成回调函数
         """
         level_id = serverApi.GetLevelId()
-        timer_comp = serverApi.GetEngineCompFactory().CreateGame(level_id)
+        timer_comp = get_component_cache().CreateGame(level_id)
 
         # 尝试还原失败队列中的方块
         over_pos_list = []
@@ -272,8 +544,9 @@ class DimensionBackup(object):
                 self.restoration_timer_id = None
 
             # 清理常加载区域
-            chunk_comp = serverApi.GetEngineCompFactory().CreateChunkSource(level_id)
+            chunk_comp = get_component_cache().CreateChunkSource(level_id)
             chunk_comp.DeleteArea('restore_area_{}'.format(self.dimension))
+            self.finish_task()
 
             # 调用回调
             if callback:
@@ -285,13 +558,15 @@ class DimensionBackup(object):
 
     def clear_all(self):
         """清除所有备份数据"""
-        self.block_changes = {}
+        self.block_changes.clear()
         self.store_block_dict = {}
         self.restoration_callback = None
+        self._restore_task = None  # 运行中的还原协程在下一Tick自行退出
+        self.is_restoring = False
 
         # 取消定时器
         if self.restoration_timer_id:
             level_id = serverApi.GetLevelId()
-            timer_comp = serverApi.GetEngineCompFactory().CreateGame(level_id)
+            timer_comp = get_component_cache().CreateGame(level_id)
             timer_comp.CancelTimer(self.restoration_timer_id)
             self.restoration_timer_id = None
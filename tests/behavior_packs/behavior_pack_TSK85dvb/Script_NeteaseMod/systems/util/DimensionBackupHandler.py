@@ -6,12 +6,18 @@ DimensionBackupHandler - 地图备份还原管理器
 - 管理DimensionBackup实例
 - 提供简化的备份/还原接口
 - 跟踪备份状态
+- 输出地图还原进度与预计剩余时间
+- 可选快照模式: 开局前抓取一次地图快照,之后按区段整段还原(可恢复被破坏的方块)
 
 原文件: Parts/ECStage/DimensionBackupHandler.py
 重构为: systems/util/DimensionBackupHandler.py
 """
 
 from .DimensionBackup import DimensionBackup
+from .MapSnapshot import MapSnapshot
+
+# 还原进度日志间隔(完成比例)
+PROGRESS_LOG_STEP = 0.25
 
 
 class DimensionBackupHandler(object):
@@ -33,20 +39,24 @@ class DimensionBackupHandler(object):
         self.dimension = dimension
         self.backup = DimensionBackup(dimension)
         self.backup_map_identifier = None  # 备份时的地图标识
+        self.restore_progress = None  # 最近一次还原进度(见DimensionBackup.get_restore_progress)
+        self.snapshot = None  # 快照模式下的MapSnapshot
+        self._next_progress_log = 0.0
 
-    def restore_and_start_record(self, load_range, is_record=True):
+    def restore_and_start_record(self, load_range, is_record=True, use_snapshot=False):
         """
         还原地图并开始记录
 
         Args:
             load_range (tuple): 加载范围
             is_record (bool): 是否进行备份记录
+            use_snapshot (bool): 是否使用快照模式
         """
         if is_record:
             print("[INFO] [BackupHandler] 维度{}第一次调用,备份初始地图状态".format(
                 self.dimension
         ))
-            self.save_initial_state(load_range)
+            self.save_initial_state(load_range, use_snapshot=use_snapshot)
         else:
             print("[INFO] [BackupHandler] 维度{}只清理方块记录,不进行备份".format(
                 self.dimension
@@ -55,28 +65,138 @@ class DimensionBackupHandler(object):
         # 清理方块变更记录
         self.backup.reset()
 
-    def save_initial_state(self, load_range, callback=None):
+    def save_initial_state(self, load_range, callback=None, use_snapshot=False):
         """
         保存初始地图状态
 
+        快照模式只复用开局前抓取好的快照(见capture_snapshot),对局中不抓取:
+        抓取期间会拦截方块放置,且抓取前已被破坏的区段会以破坏后的状态永久保存。
+        没有可用快照时本局退回逐方块还原
+
         Args:
             load_range (tuple): 备份范围
             callback (function): 完成回调
+            use_snapshot (bool): 是否使用快照模式
         """
         # 使用维度ID作为地图标识
         self.backup_map_identifier = "dim_{}".format(self.dimension)
+        self.backup.backup_initial_state(load_range)
+
+        if use_snapshot:
+            snapshot = self._get_snapshot(load_range)
+            if snapshot.ready or snapshot.load_meta():
+                print("[INFO] [BackupHandler] 维度{}复用已保存的地图快照".format(self.dimension))
+            else:
+                print("[WARN] [BackupHandler] 维度{}没有可用的地图快照,本局使用逐方块还原".format(self.dimension))
+                self.snapshot = None
+        else:
+            self.snapshot = None
+
+        if callback:
+            callback()
+
+    def capture_snapshot(self, load_range, callback=None):
+        """
+        抓取地图快照(快照模式,在副本开局前、维度中没有玩家时调用)
+
+        ExtraData中已有可用快照时直接复用,否则协程分批抓取
+
+        Args:
+            load_range (tuple): 备份范围
+            callback (function): 完成回调callback(success)
+        """
+        self.backup_map_identifier = "dim_{}".format(self.dimension)
+        snapshot = self._get_snapshot(load_range)
+        if snapshot.ready or snapshot.load_meta():
+            if callback:
+                callback(True)
+            return
+        snapshot.capture(self.backup, callback)
+
+    def _get_snapshot(self, load_range):
+        """获取load_range对应的MapSnapshot(范围变化时重新创建)"""
+        snapshot = self.snapshot
+        if snapshot is None or snapshot.load_range != (tuple(load_range[0]), tuple(load_range[1])):
+            snapshot = self.snapshot = MapSnapshot(self.dimension, "dim_{}".format(self.dimension), load_range)
+        return snapshot
+
+    def record_block_break(self, pos):
+        """
+        记录被破坏的方块(仅快照模式可还原)
+
+        Args:
+            pos (tuple): 方块位置 (x, y, z)
+        """
+        if self.snapshot is not None:
+            self.snapshot.mark_dirty(pos)
+
+    def record_block_breaks(self, positions):
+        """
+        记录一批即将被破坏的方块(爆炸)
 
-        # 备份初始地图状态
-        self.backup.backup_initial_state(load_range, callback)
+        尚未记录过的位置先记录原状态;快照模式下同时标记脏区段
 
-    def restore(self, callback):
+        Args:
+            positions (list): 方块位置列表
+        """
+        block_changes = self.backup.block_changes
+        for pos in positions:
+            if pos not in block_changes:
+                self.backup.record(pos)
+            if self.snapshot is not None:
+                self.snapshot.mark_dirty(pos)
+
+    def restore(self, callback, progress_callback=None):
         """
         还原地图
 
         Args:
             callback (function): 还原完成回调
+            progress_callback (function): 进度回调,参数为进度字典
+        """
+        self.restore_progress = None
+        self._next_progress_log = PROGRESS_LOG_STEP
+
+        def on_progress(progress):
+            self._on_restore_progress(progress)
+            if progress_callback:
+                progress_callback(progress)
+
+        if self.snapshot is not None and self.snapshot.ready:
+            self.snapshot.restore(self.backup, callback, on_progress)
+        else:
+            self.backup.restore_map_by_set_block(callback, on_progress)
+
+    def _on_restore_progress(self, progress):
+        """
+        记录还原进度,每完成PROGRESS_LOG_STEP输出一次日志
+
+        Args:
+            progress (dict): 进度字典
+        """
+        self.restore_progress = progress
+        if progress['percent'] < self._next_progress_log:
+            return
+        while self._next_progress_log <= progress['percent']:
+            self._next_progress_log += PROGRESS_LOG_STEP
+        eta = progress['eta']
+        print("[INFO] [BackupHandler] 维度{}还原进度 {}/{} ({:.0%}) 批次{}/{} 已用{:.1f}秒 预计剩余{}".format(
+            self.dimension, progress['restored'], progress['total'], progress['percent'],
+            progress['wave'], progress['wave_count'], progress['elapsed'],
+            "{:.1f}秒".format(eta) if eta is not None else "未知"
+        ))
+
+    def get_restore_progress(self):
+        """
+        获取还原进度
+
+        Returns:
+            dict: 正在还原时返回实时进度,否则返回最近一次还原的进度(没有时为None)
         """
-        self.backup.restore_map_by_set_block(callback)
+        progress = self.backup.get_restore_progress()
+        if progress is not None:
+            return progress
+        return self.restore_progress
 
     def has_backup(self):
         """
@@ -98,7 +218,10 @@ class DimensionBackupHandler(object):
             "dimension": self.dimension,
             "has_backup": self.has_backup(),
             "backup_identifier": self.backup_map_identifier,
-            "change_count": self.backup.get_change_count()
+            "change_count": self.backup.get_change_count(),
+            "is_restoring": self.backup.is_restoring,
+            "restore_progress": self.get_restore_progress(),
+            "snapshot": self.snapshot.get_info() if self.snapshot is not None else None
         }
 
     def clear_backup(self):
@@ -106,6 +229,8 @@ class DimensionBackupHandler(object):
         try:
             self.backup_map_identifier = None
             self.backup.clear_all()
+            if self.snapshot is not None:
+                self.snapshot.dirty_sections.clear()
             print("[INFO] [BackupHandler] 维度{}备份数据已清除".format(self.dimension))
         except Exception as e:
             print("[ERROR] [BackupHandler] 维度{}清除备份失败: {}".format(
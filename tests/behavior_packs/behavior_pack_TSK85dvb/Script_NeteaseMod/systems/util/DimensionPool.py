@@ -0,0 +1,459 @@
+# -*- coding: utf-8 -*-
+"""
+DimensionPool - 地图维度副本池
+
+功能:
+- 每张地图可以对应多个可互换的维度副本(地图配置map_dimensions,未配置时只有map_dimension一个)
+- 开局时取一个干净副本,结束后把副本退回池中,在后台排队还原
+- 还原期间下一局直接使用其他干净副本,不必等待还原完成
+- 健康检查: 还原回调丢失时重试,超时或重试用尽的副本停用
+- 快照模式的地图(snapshot_reset): 启动时先在后台抓取地图快照(与还原共用队列),抓取完成前副本不能开局
+- 统计池深度(各地图干净副本数)、还原积压、取副本失败次数与还原耗时
+
+副本状态:
+- clean: 已还原,可以开局
+- in_use: 对局进行中
+- queued: 等待还原或抓取快照(受同时还原数限制)
+- restoring: 正在还原或抓取快照
+- disabled: 还原失败,已停用
+
+使用方法:
+    pool = DimensionPool(room_system, stages)
+    pool.start()
+
+    dimension = pool.acquire(map_id)  # 开局
+    pool.release(map_id, dimension)  # 结束,后台还原
+
+说明:
+- 只有一个副本的地图与原先行为一致: 还原完成前不能投票
+- 副本维度需要预先放置同样的地图(各副本单独备份/还原,快照标识按维度区分)
+"""
+
+import time
+
+# 同时还原的副本数上限(各副本的还原共享服务器Tick时间)
+MAX_CONCURRENT_RESTORES = 1
+# 健康检查间隔(秒)
+HEALTH_CHECK_INTERVAL = 5.0
+# 还原进度停滞多久视为卡住(秒)
+RESTORE_STALL_TIMEOUT = 30.0
+# 单次还原最长时间(秒),超过后停用副本
+RESTORE_TIMEOUT = 300.0
+# 还原回调丢失后的最大重试次数
+MAX_RESTORE_RETRIES = 2
+# 还原耗时统计保留的样本数
+DURATION_SAMPLES = 20
+
+STATE_CLEAN = "clean"
+STATE_IN_USE = "in_use"
+STATE_QUEUED = "queued"
+STATE_RESTORING = "restoring"
+STATE_DISABLED = "disabled"
+
+
+class DimensionCopy(object):
+    """
+    地图的一个维度副本
+    """
+
+    def __init__(self, map_id, dimension):
+        """
+        初始化维度副本
+
+        Args:
+            map_id (str): 地图ID
+            dimension (int): 维度ID
+        """
+        self.map_id = map_id
+        self.dimension = dimension
+        self.state = STATE_CLEAN
+        self.last_used = 0.0  # 最近一次开局时间
+        self.generation = 0  # 还原批次号,用于忽略过期回调
+        self.retries = 0  # 本次还原已重试次数
+        self.restore_started = None  # 本次还原开始时间
+        self.last_progress = None  # 最近一次观察到的已还原数
+        self.last_progress_time = None  # 最近一次进度变化时间
+        self.needs_capture = False  # 开局前需要抓取地图快照
+
+
+class DimensionPool(object):
+    """
+    地图维度副本池
+
+    数据结构:
+    - _copies: {map_id: [DimensionCopy, ...]}
+    - _by_dimension: {dimension: DimensionCopy}
+    - _restore_queue: [DimensionCopy, ...] 等待还原的副本(先进先出)
+    """
+
+    def __init__(self, room_system, stages):
+        """
+        初始化副本池
+
+        Args:
+            room_system: RoomManagementSystem实例(提供get_backup_handler与scheduler)
+            stages (list): 地图配置列表
+        """
+        self.room_system = room_system
+        self._copies = {}
+        self._by_dimension = {}
+        self._restore_queue = []
+        self._health_handle = None
+        self._snapshot_maps = set()  # 快照模式的地图ID
+
+        # 统计数据
+        self.acquire_count = 0
+        self.acquire_misses = 0  # 没有干净副本导致取副本失败的次数
+        self.restore_count = 0
+        self.restore_failures = 0
+        self.restore_durations = []
+
+        for stage in stages:
+            map_id = stage.get('id')
+            if stage.get('snapshot_reset', False):
+                self._snapshot_maps.add(map_id)
+            for dimension in get_stage_dimensions(stage):
+                if dimension in self._by_dimension:
+                    print("[WARN] [DimensionPool] 维度{}被多张地图重复使用,忽略地图{}".format(dimension, map_id))
+                    continue
+                copy = DimensionCopy(map_id, dimension)
+                self._copies.setdefault(map_id, []).append(copy)
+                self._by_dimension[dimension] = copy
+
+        print("[INFO] [DimensionPool] 初始化完成 地图数={} 副本数={}".format(
+            len(self._copies), len(self._by_dimension)
+        ))
+
+    # ========== 生命周期 ==========
+
+    def start(self):
+        """启动健康检查,快照模式地图的副本排队抓取快照"""
+        if self._health_handle is None:
+            self._health_handle = self.room_system.scheduler.add_repeating(
+                HEALTH_CHECK_INTERVAL, self._health_check, owner=self
+            )
+        for map_id in sorted(self._snapshot_maps):
+            for copy in self._copies.get(map_id, []):
+                if copy.state == STATE_CLEAN:
+                    copy.state = STATE_QUEUED
+                    copy.needs_capture = True
+                    self._restore_queue.append(copy)
+        self._pump_restores()
+
+    def stop(self):
+        """停止健康检查"""
+        self.room_system.scheduler.cancel_owner(self)
+        self._health_handle = None
+
+    # ========== 取用/归还 ==========
+
+    def acquire(self, map_id):
+        """
+        取一个干净副本用于开局(优先最久未使用的副本)
+
+        Args:
+            map_id (str): 地图ID
+
+        Returns:
+            int: 维度ID,没有干净副本时返回None
+        """
+        clean = [copy for copy in self._copies.get(map_id, []) if copy.state == STATE_CLEAN]
+        if not clean:
+            self.acquire_misses += 1
+            print("[WARN] [DimensionPool] 地图{}没有干净副本 {}".format(map_id, self.get_map_metrics(map_id)))
+            return None
+
+        copy = min(clean, key=lambda item: item.last_used)
+        copy.state = STATE_IN_USE
+        copy.last_used = time.time()
+        self.acquire_count += 1
+        print("[INFO] [DimensionPool] 地图{}使用副本 dimension={} 剩余干净副本={}".format(
+            map_id, copy.dimension, len(clean) - 1
+        ))
+        return copy.dimension
+
+    def release(self, map_id, dimension):
+        """
+        对局结束后归还副本,排队在后台还原
+
+        Args:
+            map_id (str): 地图ID
+            dimension (int): 维度ID
+        """
+        copy = self._by_dimension.get(dimension)
+        if copy is None or copy.map_id != map_id:
+            print("[WARN] [DimensionPool] 归还未知副本 map_id={} dimension={}".format(map_id, dimension))
+            return
+        if copy.state != STATE_IN_USE:
+            print("[WARN] [DimensionPool] 副本dimension={}状态为{},忽略归还".format(dimension, copy.state))
+            return
+
+        copy.state = STATE_QUEUED
+        copy.retries = 0
+        self._restore_queue.append(copy)
+        self._pump_restores()
+
+    # ========== 查询 ==========
+
+    def has_clean_copy(self, map_id):
+        """
+        地图是否有可以开局的干净副本
+
+        Args:
+            map_id (str): 地图ID
+
+        Returns:
+            bool: 是否有干净副本
+        """
+        for copy in self._copies.get(map_id, []):
+            if copy.state == STATE_CLEAN:
+                return True
+        return False
+
+    def is_restoring(self, map_id):
+        """
+        地图是否因为副本都在还原而暂时不可用
+
+        Args:
+            map_id (str): 地图ID
+
+        Returns:
+            bool: 没有干净副本且有副本正在还原或排队
+        """
+        if self.has_clean_copy(map_id):
+            return False
+        for copy in self._copies.get(map_id, []):
+            if copy.state in (STATE_QUEUED, STATE_RESTORING):
+                return True
+        return False
+
+    def is_in_use(self, map_id):
+        """
+        地图是否有副本正在对局中
+
+        Args:
+            map_id (str): 地图ID
+
+        Returns:
+            bool: 是否有副本正在使用
+        """
+        for copy in self._copies.get(map_id, []):
+            if copy.state == STATE_IN_USE:
+                return True
+        return False
+
+    def get_map_id(self, dimension):
+        """
+        获取维度所属的地图ID
+
+        Args:
+            dimension (int): 维度ID
+
+        Returns:
+            str: 地图ID,不是池中副本时返回None
+        """
+        copy = self._by_dimension.get(dimension)
+        return copy.map_id if copy is not None else None
+
+    # ========== 后台还原 ==========
+
+    def _pump_restores(self):
+        """在同时还原数限制内启动排队的还原"""
+        restoring = sum(1 for copy in self._by_dimension.values() if copy.state == STATE_RESTORING)
+        while self._restore_queue and restoring < MAX_CONCURRENT_RESTORES:
+            copy = self._restore_queue.pop(0)
+            if copy.state != STATE_QUEUED:
+                continue
+            self._start_restore(copy)
+            restoring += 1
+
+    def _start_restore(self, copy):
+        """
+        启动副本还原
+
+        Args:
+            copy (DimensionCopy): 副本
+        """
+        copy.state = STATE_RESTORING
+        copy.generation += 1
+        now = time.time()
+        if copy.retries == 0:
+            copy.restore_started = now
+        copy.last_progress = None
+        copy.last_progress_time = now
+
+        generation = copy.generation
+        print("[INFO] [DimensionPool] 开始{} map_id={} dimension={} 排队={} 重试={}".format(
+            "抓取快照" if copy.needs_capture else "还原",
+            copy.map_id, copy.dimension, len(self._restore_queue), copy.retries
+        ))
+        try:
+            backup_handler = self.room_system.get_backup_handler(copy.dimension)
+            if copy.needs_capture:
+                # 副本还没有开局,维度中没有玩家,抓取期间不会有方块变更
+                backup_handler.capture_snapshot(self.room_system.get_map_backup_range(copy.map_id),
+                                                lambda success: self._on_restore_complete(copy, generation))
+            else:
+                backup_handler.restore(lambda: self._on_restore_complete(copy, generation))
+        except Exception as e:
+            print("[ERROR] [DimensionPool] 启动还原失败 dimension={}: {}".format(copy.dimension, e))
+            import traceback
+            traceback.print_exc()
+            # 由健康检查重试
+            copy.last_progress_time = None
+
+    def _on_restore_complete(self, copy, generation):
+        """
+        还原(或抓取快照)完成回调
+
+        Args:
+            copy (DimensionCopy): 副本
+            generation (int): 启动还原时的批次号
+        """
+        if generation != copy.generation or copy.state not in (STATE_RESTORING, STATE_DISABLED):
+            return
+
+        if copy.needs_capture:
+            # 抓取失败时快照不可用,该副本退回逐方块还原
+            copy.needs_capture = False
+            copy.state = STATE_CLEAN
+            copy.restore_started = None
+            print("[INFO] [DimensionPool] 快照抓取结束 map_id={} dimension={} {}".format(
+                copy.map_id, copy.dimension, self.get_map_metrics(copy.map_id)
+            ))
+            self._pump_restores()
+            self.room_system.on_map_copy_restored(copy.map_id, copy.dimension)
+            return
+
+        duration = time.time() - copy.restore_started
+        self.restore_durations.append(duration)
+        if len(self.restore_durations) > DURATION_SAMPLES:
+            self.restore_durations.pop(0)
+        self.restore_count += 1
+        if copy.state == STATE_DISABLED:
+            print("[INFO] [DimensionPool] 已停用的副本还原完成,重新启用 dimension={}".format(copy.dimension))
+        copy.state = STATE_CLEAN
+        copy.restore_started = None
+
+        print("[INFO] [DimensionPool] 还原完成 map_id={} dimension={} 耗时{:.1f}秒 {}".format(
+            copy.map_id, copy.dimension, duration, self.get_map_metrics(copy.map_id)
+        ))
+        self._pump_restores()
+        self.room_system.on_map_copy_restored(copy.map_id, copy.dimension)
+
+    # ========== 健康检查 ==========
+
+    def _health_check(self):
+        """检查正在还原的副本: 进度停滞时重试,超时停用"""
+        now = time.time()
+        for copy in list(self._by_dimension.values()):
+            if copy.state != STATE_RESTORING:
+                continue
+
+            backup_handler = self.room_system.get_backup_handler(copy.dimension)
+            running = backup_handler.backup.is_restoring
+            progress = backup_handler.get_restore_progress()
+            restored = progress['restored'] if progress else None
+            if restored != copy.last_progress:
+                copy.last_progress = restored
+                copy.last_progress_time = now
+
+            if running:
+                # 协程仍在执行,无法安全地重新启动,只在总时间超时时停用
+                if now - copy.restore_started > RESTORE_TIMEOUT:
+                    self._disable(copy, "还原超时{:.0f}秒".format(now - copy.restore_started))
+                continue
+
+            # 协程已结束但没有收到完成回调(或启动失败)
+            if copy.last_progress_time is not None and now - copy.last_progress_time < RESTORE_STALL_TIMEOUT:
+                continue
+            if copy.retries >= MAX_RESTORE_RETRIES:
+                self._disable(copy, "重试{}次仍未完成".format(copy.retries))
+                continue
+            copy.retries += 1
+            self.restore_failures += 1
+            print("[WARN] [DimensionPool] 还原未完成,重试 map_id={} dimension={} 第{}次".format(
+                copy.map_id, copy.dimension, copy.retries
+            ))
+            self._start_restore(copy)
+
+    def _disable(self, copy, reason):
+        """
+        停用副本(迟到的完成回调仍可重新启用)
+
+        Args:
+            copy (DimensionCopy): 副本
+            reason (str): 停用原因
+        """
+        copy.state = STATE_DISABLED
+        self.restore_failures += 1
+        print("[ERROR] [DimensionPool] 停用副本 map_id={} dimension={}: {}".format(
+            copy.map_id, copy.dimension, reason
+        ))
+        self._pump_restores()
+
+    # ========== 统计 ==========
+
+    def get_map_metrics(self, map_id):
+        """
+        获取单张地图的池深度
+
+        Args:
+            map_id (str): 地图ID
+
+        Returns:
+            dict: {'total', 'clean', 'in_use', 'queued', 'restoring', 'disabled'}
+        """
+        metrics = {'total': 0, STATE_CLEAN: 0, STATE_IN_USE: 0, STATE_QUEUED: 0,
+                   STATE_RESTORING: 0, STATE_DISABLED: 0}
+        for copy in self._copies.get(map_id, []):
+            metrics['total'] += 1
+            metrics[copy.state] += 1
+        return metrics
+
+    def get_metrics(self):
+        """
+        获取副本池统计
+
+        Returns:
+            dict: 统计信息
+                - maps (dict): {map_id: get_map_metrics(map_id)}
+                - restore_backlog (int): 排队与正在还原的副本数
+                - acquire_count (int): 取副本次数
+                - acquire_misses (int): 没有干净副本的次数
+                - restore_count (int): 完成的还原次数
+                - restore_failures (int): 重试与停用次数
+                - avg_restore_seconds (float): 最近还原的平均耗时
+                - max_restore_seconds (float): 最近还原的最长耗时
+        """
+        durations = self.restore_durations
+        return {
+            'maps': dict((map_id, self.get_map_metrics(map_id)) for map_id in self._copies),
+            'restore_backlog': sum(1 for copy in self._by_dimension.values()
+                                   if copy.state in (STATE_QUEUED, STATE_RESTORING)),
+            'acquire_count': self.acquire_count,
+            'acquire_misses': self.acquire_misses,
+            'restore_count': self.restore_count,
+            'restore_failures': self.restore_failures,
+            'avg_restore_seconds': sum(durations) / len(durations) if durations else 0.0,
+            'max_restore_seconds': max(durations) if durations else 0.0,
+        }
+
+
+def get_stage_dimensions(stage):
+    """
+    获取地图配置的全部维度副本
+
+    Args:
+        stage (dict): 地图配置
+
+    Returns:
+        list: 维度ID列表(map_dimension在前,其后为map_dimensions中的其他副本)
+    """
+    dimensions = []
+    if stage.get('map_dimension') is not None:
+        dimensions.append(stage['map_dimension'])
+    for dimension in stage.get('map_dimensions') or []:
+        if dimension not in dimensions:
+            dimensions.append(dimension)
+    return dimensions
@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+EngineApiAccounting - 引擎API调用统计
+
+功能:
+- 透明代理serverApi.GetEngineCompFactory()返回的工厂与组件
+- 按API("CreatePos.GetFootPos")统计调用次数、总耗时与延迟直方图
+- 按调用点(模块:行号)统计调用次数与耗时
+- 标记在循环中调用的调用点(调用指令位于函数内某个循环体中),并记录单Tick最大调用次数
+- 由PerformanceMonitor定期输出报告,用于决定下一个需要批量化的子系统
+
+使用方法:
+    from Script_NeteaseMod.systems.util.EngineApiAccounting import get_engine_api_accounting
+
+    accounting = get_engine_api_accounting()
+    accounting.install(serverApi)  # 在注册系统之前调用,使模块级/实例级缓存的工厂也被代理
+    ...
+    monitor.attach_api_accounting(accounting)  # PerformanceMonitor定期报告
+
+说明:
+- 默认不安装,由modConfig.ENGINE_API_ACCOUNTING_ENABLED开启;未安装时没有任何额外开销
+- 循环判定为静态判定: 调用指令处于某条向后跳转指令的范围内(每个代码对象只分析一次)
+- 延迟直方图按2的幂划分微秒区间,分位数取区间上界(近似值)
+"""
+
+from __future__ import print_function
+
+import dis
+import sys
+import time
+import timeit
+
+# 高精度时钟(Python 2没有perf_counter)
+_clock = getattr(time, 'perf_counter', None) or timeit.default_timer
+
+# 直方图区间数: 第i个区间为[2^(i-1), 2^i)微秒,最后一个区间收纳所有更慢的调用
+HISTOGRAM_BUCKETS = 21
+
+# {code对象: [(循环起始偏移, 向后跳转指令偏移)]}
+_loop_ranges_cache = {}
+
+
+class ApiStat(object):
+    """单个API的统计"""
+
+    __slots__ = ('api', 'calls', 'total_time', 'max_time', 'histogram')
+
+    def __init__(self, api):
+        self.api = api
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+
+    def record(self, elapsed):
+        self.calls += 1
+        self.total_time += elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+        bucket = int(elapsed * 1000000).bit_length()
+        if bucket >= HISTOGRAM_BUCKETS:
+            bucket = HISTOGRAM_BUCKETS - 1
+        self.histogram[bucket] += 1
+
+    def percentile_us(self, ratio):
+        """按直方图估算分位数(区间上界,微秒)"""
+        if not self.calls:
+            return 0
+        threshold = ratio * self.calls
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if seen >= threshold:
+                return 1 << bucket
+        return 1 << (HISTOGRAM_BUCKETS - 1)
+
+
+class CallSiteStat(object):
+    """单个调用点的统计"""
+
+    __slots__ = ('module', 'line', 'function', 'api', 'in_loop', 'calls', 'total_time',
+                 'last_tick', 'tick_calls', 'max_tick_calls')
+
+    def __init__(self, module, line, function, api, in_loop):
+        self.module = module
+        self.line = line
+        self.function = function
+        self.api = api
+        self.in_loop = in_loop
+        self.calls = 0
+        self.total_time = 0.0
+        self.last_tick = -1
+        self.tick_calls = 0
+        self.max_tick_calls = 0
+
+    def record(self, elapsed, tick):
+        self.calls += 1
+        self.total_time += elapsed
+        if tick != self.last_tick:
+            self.last_tick = tick
+            self.tick_calls = 0
+        self.tick_calls += 1
+        if self.tick_calls > self.max_tick_calls:
+            self.max_tick_calls = self.tick_calls
+
+
+class AccountingComponent(object):
+    """组件代理: 方法调用计入统计,其余属性透传"""
+
+    def __init__(self, accounting, component, comp_name):
+        self._accounting = accounting
+        self._component = component
+        self._comp_name = comp_name
+
+    def __getattr__(self, name):
+        target = getattr(self._component, name)
+        if not callable(target):
+            return target
+        wrapper = self._accounting.wrap(self._comp_name + "." + name, target)
+        self.__dict__[name] = wrapper  # 之后直接命中实例属性,不再进入__getattr__
+        return wrapper
+
+
+class AccountingCompFactory(object):
+    """组件工厂代理: CreateX返回AccountingComponent"""
+
+    def __init__(self, accounting, factory):
+        self._accounting = accounting
+        self._factory = factory
+
+    def __getattr__(self, name):
+        target = getattr(self._factory, name)
+        if not name.startswith("Create") or not callable(target):
+            return target
+        accounting = self._accounting
+        create = accounting.wrap("Factory." + name, target, depth=2)
+
+        def create_component(*args, **kwargs):
+            component = create(*args, **kwargs)
+            if component is None:
+                return None
+            return AccountingComponent(accounting, component, name)
+        self.__dict__[name] = create_component
+        return create_component
+
+
+class EngineApiAccounting(object):
+    """引擎API调用统计"""
+
+    def __init__(self):
+        self.api_stats = {}  # {api: ApiStat}
+        self.site_stats = {}  # {(module, line, api): CallSiteStat}
+        self.tick = 0
+        self.installed = False
+        self.started_at = time.time()
+
+        self._server_api = None
+        self._original_factory_getter = None
+        self._factory_proxy = None
+
+    # ========== 安装/卸载 ==========
+
+    def install(self, server_api):
+        """
+        替换server_api.GetEngineCompFactory,返回同一个工厂代理
+
+        Args:
+            server_api: mod.server.extraServerApi模块
+        """
+        if self.installed:
+            return
+        original = server_api.GetEngineCompFactory
+        self._server_api = server_api
+        self._original_factory_getter = original
+        self._factory_proxy = AccountingCompFactory(self, original())
+        proxy = self._factory_proxy
+
+        def GetEngineCompFactory():
+            return proxy
+        server_api.GetEngineCompFactory = GetEngineCompFactory
+        self.installed = True
+        self.reset()
+        print("[INFO] [EngineApiAccounting] 已安装")
+
+    def uninstall(self):
+        """还原GetEngineCompFactory(已缓存代理的调用方仍会继续计数)"""
+        if not self.installed:
+            return
+        self._server_api.GetEngineCompFactory = self._original_factory_getter
+        self._server_api = None
+        self._original_factory_getter = None
+        self.installed = False
+        print("[INFO] [EngineApiAccounting] 已卸载")
+
+    # ========== 统计 ==========
+
+    def wrap(self, api, func, depth=1):
+        """
+        包装可调用对象,调用时按API与调用点计数计时
+
+        Args:
+            api (str): API名称
+            func (callable): 原始可调用对象
+            depth (int): 调用点相对包装函数的栈深度(被其他包装函数调用时大于1)
+
+        Returns:
+            callable: 包装后的函数
+        """
+        api_stat = self.api_stats.get(api)
+        if api_stat is None:
+            api_stat = self.api_stats[api] = ApiStat(api)
+        site_stats = self.site_stats
+        accounting = self
+
+        def wrapper(*args, **kwargs):
+            start = _clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = _clock() - start
+                api_stat.record(elapsed)
+                caller = sys._getframe(depth)
+                code = caller.f_code
+                key = (caller.f_globals.get('__name__', code.co_filename), caller.f_lineno, api)
+                site = site_stats.get(key)
+                if site is None:
+                    site = site_stats[key] = CallSiteStat(
+                        key[0], key[1], code.co_name, api, is_in_loop(code, caller.f_lasti))
+                site.record(elapsed, accounting.tick)
+        return wrapper
+
+    def next_tick(self):
+        """Tick边界(由PerformanceMonitor.on_tick_end调用)"""
+        self.tick += 1
+
+    def reset(self):
+        """清空统计(已创建的包装器继续有效)"""
+        for stat in self.api_stats.values():
+            stat.__init__(stat.api)
+        self.site_stats.clear()
+        self.started_at = time.time()
+
+    # ========== 报告 ==========
+
+    def build_report(self, top_n=10):
+        """
+        生成统计报告
+
+        Args:
+            top_n (int): 每个列表的条目数
+
+        Returns:
+            dict: {total_calls, apis, sites, loop_sites}
+        """
+        api_rows = []
+        total_calls = 0
+        for stat in self.api_stats.values():
+            if not stat.calls:
+                continue
+            total_calls += stat.calls
+            api_rows.append({
+                'api': stat.api,
+                'calls': stat.calls,
+                'total_ms': stat.total_time * 1000.0,
+                'mean_us': stat.total_time * 1000000.0 / stat.calls,
+                'p50_us': stat.percentile_us(0.50),
+                'p99_us': stat.percentile_us(0.99),
+                'max_us': stat.max_time * 1000000.0,
+                'histogram': list(stat.histogram),
+            })
+        api_rows.sort(key=lambda row: row['total_ms'], reverse=True)
+
+        site_rows = []
+        for site in self.site_stats.values():
+            site_rows.append({
+                'site': "{}:{}".format(site.module, site.line),
+                'function': site.function,
+                'api': site.api,
+                'calls': site.calls,
+                'total_ms': site.total_time * 1000.0,
+                'in_loop': site.in_loop,
+                'max_tick_calls': site.max_tick_calls,
+            })
+        site_rows.sort(key=lambda row: row['calls'], reverse=True)
+        loop_rows = [row for row in site_rows if row['in_loop']]
+        loop_rows.sort(key=lambda row: (row['max_tick_calls'], row['calls']), reverse=True)
+
+        return {
+            'elapsed_seconds': time.time() - self.started_at,
+            'total_calls': total_calls,
+            'apis': api_rows[:top_n],
+            'sites': site_rows[:top_n],
+            'loop_sites': loop_rows[:top_n],
+        }
+
+
+# ========== 循环判定 ==========
+
+def is_in_loop(code, offset):
+    """
+    调用指令是否位于循环体中
+
+    Args:
+        code: 调用方代码对象
+        offset (int): 调用指令偏移(frame.f_lasti)
+
+    Returns:
+        bool: 是否处于某条向后跳转指令覆盖的范围内
+    """
+    ranges = _loop_ranges_cache.get(code)
+    if ranges is None:
+        ranges = _loop_ranges_cache[code] = _backward_jump_ranges(code)
+    for start, end in ranges:
+        if start <= offset <= end:
+            return True
+    return False
+
+
+def _backward_jump_ranges(code):
+    """找出代码对象中所有向后跳转(循环)覆盖的偏移范围"""
+    ranges = []
+    if hasattr(dis, 'get_instructions'):
+        jump_ops = set(dis.hasjabs) | set(dis.hasjrel)
+        for instruction in dis.get_instructions(code):
+            target = instruction.argval
+            if instruction.opcode in jump_ops and isinstance(target, int) and target <= instruction.offset:
+                ranges.append((target, instruction.offset))
+        return ranges
+
+    # Python 2: 手动解析字节码(向后跳转只有绝对跳转)
+    co_code = code.co_code
+    absolute_jumps = set(dis.hasjabs)
+    index = 0
+    extended_arg = 0
+    while index < len(co_code):
+        offset = index
+        opcode = ord(co_code[index])
+        index += 1
+        if opcode < dis.HAVE_ARGUMENT:
+            continue
+        arg = ord(co_code[index]) | (ord(co_code[index + 1]) << 8) | extended_arg
+        index += 2
+        extended_arg = 0
+        if opcode == dis.EXTENDED_ARG:
+            extended_arg = arg << 16
+        elif opcode in absolute_jumps and arg <= offset:
+            ranges.append((arg, offset))
+    return ranges
+
+
+# ========== 全局实例 ==========
+
+_accounting = None
+
+
+def get_engine_api_accounting():
+    """
+    获取全局EngineApiAccounting实例
+
+    Returns:
+        EngineApiAccounting: 全局实例(首次调用时创建,不会自动安装)
+    """
+    global _accounting
+    if _accounting is None:
+        _accounting = EngineApiAccounting()
+    return _accounting
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+ExplosionQueue - 爆炸合并队列
+
+功能:
+- TNT与火球的爆炸先提交到队列,每Tick统一结算一次
+- 同一Tick同一维度的多次爆炸共享方块缓存(ExplosionBlockCache)
+- 伤害范围重叠的爆炸共享实体查询(合并后的查询范围不超过各自查询范围之和)
+- 受影响方块去重,被破坏的方块一次性写入并同步到地图备份(DimensionBackup)
+- 每个实体只计算一次合并后的击退与伤害(一次SetPlayerMotion + 一次Hurt)
+
+使用方法:
+    queue = ExplosionQueue(props_system)
+    queue.submit(explosion)  # 代替explosion.explode()
+    queue.flush()  # 每Tick调用一次
+
+说明:
+- 每次爆炸仍按自己的配置(友军保护、只破坏玩家放置的方块等)计算
+- 合并伤害的攻击者记为伤害最高的那次爆炸的使用者(爆炸源实体在结算前已被销毁)
+"""
+
+from __future__ import print_function
+
+from collections import OrderedDict
+
+import mod.server.extraServerApi as serverApi
+from Script_NeteaseMod.systems.util.BedWarsExplosion import ExplosionBlockCache, Vector3
+from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
+
+
+def _in_area(pos, area):
+    """
+    位置是否在范围内
+
+    Args:
+        pos (tuple): 位置 (x, y, z)
+        area (tuple): ((min_x, min_y, min_z), (max_x, max_y, max_z))
+
+    Returns:
+        bool: 是否在范围内
+    """
+    start_pos, end_pos = area
+    return (start_pos[0] <= pos[0] <= end_pos[0] and start_pos[1] <= pos[1] <= end_pos[1] and
+            start_pos[2] <= pos[2] <= end_pos[2])
+
+
+def _area_volume(area):
+    """
+    范围的体积
+
+    Args:
+        area (tuple): ((min_x, min_y, min_z), (max_x, max_y, max_z))
+
+    Returns:
+        float: 体积
+    """
+    start_pos, end_pos = area
+    volume = 1.0
+    for axis in range(3):
+        volume *= max(0.0, end_pos[axis] - start_pos[axis])
+    return volume
+
+
+def _areas_overlap(area_a, area_b):
+    """
+    两个范围是否重叠
+
+    Args:
+        area_a (tuple): ((min_x, min_y, min_z), (max_x, max_y, max_z))
+        area_b (tuple): ((min_x, min_y, min_z), (max_x, max_y, max_z))
+
+    Returns:
+        bool: 是否重叠
+    """
+    for axis in range(3):
+        if area_a[1][axis] < area_b[0][axis] or area_b[1][axis] < area_a[0][axis]:
+            return False
+    return True
+
+
+def group_query_areas(areas):
+    """
+    把伤害范围分组为实体查询范围
+
+    两组范围重叠,且合并后的包围盒体积不超过两组原本查询体积之和时,合并为一次查询;
+    因此合并后的查询范围总体积不会超过逐个爆炸查询的体积之和
+
+    Args:
+        areas (list): 伤害范围列表
+
+    Returns:
+        list: [(查询范围, [爆炸下标, ...]), ...]
+    """
+    # [包围盒, 原本查询体积之和, 爆炸下标]
+    groups = [[area, _area_volume(area), [index]] for index, area in enumerate(areas)]
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(groups)):
+            for j in range(i + 1, len(groups)):
+                group_a, group_b = groups[i], groups[j]
+                if not _areas_overlap(group_a[0], group_b[0]):
+                    continue
+                box = (tuple(min(group_a[0][0][axis], group_b[0][0][axis]) for axis in range(3)),
+                       tuple(max(group_a[0][1][axis], group_b[0][1][axis]) for axis in range(3)))
+                budget = group_a[1] + group_b[1]
+                if _area_volume(box) > budget:
+                    continue
+                groups[i] = [box, budget, group_a[2] + group_b[2]]
+                del groups[j]
+                merged = True
+                break
+            if merged:
+                break
+    return [(group[0], group[2]) for group in groups]
+
+
+class ExplosionQueue(object):
+    """
+    爆炸合并队列
+
+    数据结构:
+    - _pending: [BedWarsExplosion, ...] 本Tick提交的爆炸(按提交顺序结算)
+    """
+
+    def __init__(self, system):
+        """
+        初始化爆炸队列
+
+        Args:
+            system: PropsManagementSystem实例(提供get_bedwars_game_system)
+        """
+        self.system = system
+        self._pending = []
+
+        # 统计数据
+        self.submitted_count = 0  # 提交的爆炸数
+        self.flush_count = 0  # 结算的批次数(按维度)
+        self.merged_count = 0  # 与其他爆炸合并结算的爆炸数
+        self.deduped_blocks = 0  # 被多次爆炸命中、去重的方块数
+        self.destroyed_blocks = 0  # 破坏的方块数
+        self.hurt_count = 0  # 造成伤害的次数(每实体每批次一次)
+        self.entity_query_count = 0  # 实体查询次数
+
+    def submit(self, explosion):
+        """
+        提交爆炸,在本Tick结算时执行
+
+        Args:
+            explosion (BedWarsExplosion): 已配置好的爆炸实例
+        """
+        self._pending.append(explosion)
+        self.submitted_count += 1
+
+    def has_pending(self):
+        """
+        是否有待结算的爆炸
+
+        Returns:
+            bool: 是否有待结算的爆炸
+        """
+        return bool(self._pending)
+
+    def clear(self):
+        """丢弃待结算的爆炸"""
+        self._pending = []
+
+    def flush(self):
+        """结算本Tick提交的全部爆炸(按维度分批)"""
+        if not self._pending:
+            return
+        pending = self._pending
+        self._pending = []
+
+        batches = OrderedDict()
+        for explosion in pending:
+            batches.setdefault(explosion.dimension, []).append(explosion)
+
+        for dimension, explosions in batches.items():
+            try:
+                self._flush_batch(dimension, explosions)
+            except Exception as e:
+                print("[ERROR] [ExplosionQueue] 结算爆炸失败 dimension={}: {}".format(dimension, str(e)))
+                import traceback
+                traceback.print_exc()
+
+    def _flush_batch(self, dimension, explosions):
+        """
+        结算同一维度的一批爆炸
+
+        Args:
+            dimension (int): 维度ID
+            explosions (list): BedWarsExplosion列表
+        """
+        self.flush_count += 1
+        if len(explosions) > 1:
+            self.merged_count += len(explosions)
+
+        # 1. 计算影响范围(共享方块缓存)
+        block_cache = ExplosionBlockCache(dimension)
+        active = []
+        for explosion in explosions:
+            explosion.block_cache = block_cache
+            if explosion.explode_a():
+                active.append(explosion)
+        if not active:
+            return
+
+        # 2. 汇总要破坏的方块(去重,先提交的爆炸优先)
+        destroyed = []
+        claimed = set()
+        for explosion in active:
+            for block_pos, old_block_handling in explosion.collect_destroyed_blocks(claimed):
+                claimed.add(block_pos)
+                destroyed.append((block_pos, old_block_handling))
+        self.deduped_blocks += sum(len(explosion.affected_block_set) for explosion in active) - len(
+            set().union(*[explosion.affected_block_set for explosion in active]))
+
+        # 3. 先同步到地图备份(需要读取破坏前的方块),再一次性写入
+        if destroyed:
+            self._record_to_backup([block_pos for block_pos, _ in destroyed], dimension)
+            active[0].destroy_blocks(destroyed)
+            self.destroyed_blocks += len(destroyed)
+
+        # 4. 合并伤害: 重叠的爆炸共享实体查询,每个实体一次击退与伤害
+        self._apply_impacts(active, dimension)
+
+        # 5. 播放爆炸效果和音效
+        for explosion in active:
+            explosion._play_explosion_effects()
+
+    def _apply_impacts(self, explosions, dimension):
+        """
+        合并计算并施加击退与伤害
+
+        Args:
+            explosions (list): BedWarsExplosion列表
+            dimension (int): 维度ID
+        """
+        areas = [explosion.get_damage_area() for explosion in explosions]
+        entities = []
+        seen = set()
+        comp_game = None
+        for query_area, indexes in group_query_areas(areas):
+            self.entity_query_count += 1
+            if len(indexes) == 1:
+                found = explosions[indexes[0]].query_entities()
+            else:
+                if comp_game is None:
+                    comp_game = get_component_cache().CreateGame(serverApi.GetLevelId())
+                found = comp_game.GetEntitiesInSquareArea(None, query_area[0], query_area[1], dimension) or []
+            for entity_id in found:
+                if entity_id not in seen:
+                    seen.add(entity_id)
+                    entities.append(entity_id)
+
+        for entity_id in entities:
+            entity_pos = None
+            motion = None
+            damage = 0
+            lead_explosion = None
+            lead_damage = -1
+            for explosion, area in zip(explosions, areas):
+                # 检查是否可以造成伤害
+                if not explosion.check_valid_hurt_target(entity_id):
+                    continue
+                if entity_pos is None:
+                    entity_pos = get_component_cache().CreatePos(entity_id).GetFootPos()
+                    if entity_pos is None:
+                        break
+                # 查询范围可能包含其他爆炸的范围,只计算在该次爆炸自身范围内的实体
+                if not _in_area(entity_pos, area):
+                    continue
+                impact = explosion.compute_impact(entity_id, entity_pos)
+                if impact is None:
+                    continue
+                motion = impact[0] if motion is None else motion.add(impact[0])
+                damage += impact[1]
+                if impact[1] > lead_damage:
+                    lead_explosion, lead_damage = explosion, impact[1]
+
+            if lead_explosion is not None:
+                # TNT实体在提交后即被销毁,攻击者记为使用者
+                lead_explosion.apply_impact(entity_id, motion or Vector3(0, 0, 0), damage, source_alive=False)
+                self.hurt_count += 1
+
+    def _record_to_backup(self, positions, dimension):
+        """
+        把被破坏的方块同步到地图备份
+
+        Args:
+            positions (list): 方块位置列表
+            dimension (int): 维度ID
+        """
+        game_system = self.system.get_bedwars_game_system() if self.system else None
+        room_system = getattr(game_system, 'room_system', None) if game_system else None
+        if room_system:
+            room_system.record_block_breaks_to_backup(positions, dimension)
+
+    def get_stats(self):
+        """
+        获取统计信息
+
+        Returns:
+            dict: 统计信息
+        """
+        return {
+            'submitted': self.submitted_count,
+            'flushes': self.flush_count,
+            'merged': self.merged_count,
+            'deduped_blocks': self.deduped_blocks,
+            'destroyed_blocks': self.destroyed_blocks,
+            'hurts': self.hurt_count,
+            'entity_queries': self.entity_query_count,
+            'pending': len(self._pending),
+        }
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""
+ExplosionResistanceRegistry - 方块爆炸抗性表
+
+功能:
+- 服务器启动时预先建立 方块名称 -> 爆炸抗性 的表,爆炸射线追踪时不再调用GetBlockBasicInfo
+- 方块名称来源: 商店配置(shop_config方块类商品)、地图快照调色板、内置原版抗性表
+- 引擎返回的抗性写入关卡ExtraData,重启后直接读取
+- 染色玻璃等免疫爆炸的方块在登记时标记,射线追踪时只需查表
+- 表中同时保存每步消耗的爆炸力,射线追踪的内层循环只做一次字典查询
+
+使用方法:
+    registry = get_explosion_resistance_registry()
+    registry.build()  # PropsManagementSystem.Create中调用一次
+
+    cost = registry.get_cost(block_name)  # None(空气) / IMMUNE_COST(免疫) / 每步消耗
+    registry.register_block_names(names)  # 地图快照抓取/读取后登记调色板中的方块
+    registry.save()  # 有新解析的方块时写回ExtraData
+
+说明:
+- 未登记的方块在第一次查询时解析并登记,之后同样随存档保存
+- 引擎没有返回抗性的方块使用原版抗性表,都没有时为0
+"""
+
+from __future__ import print_function
+
+import mod.server.extraServerApi as serverApi
+from Script_NeteaseMod.systems.util.BedWarsExplosion import AIR_NAME, IMMUNE_COST, STEP_LEN
+from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
+
+# 关卡ExtraData键
+REGISTRY_KEY = "bedwars_explosion_resistance"
+# 存储格式版本(格式变化时旧数据自动失效)
+REGISTRY_VERSION = 1
+# 名称包含这些关键字的方块免疫爆炸(防爆玻璃)
+IMMUNE_KEYWORDS = ('stained_glass',)
+# 商店中会被放置的商品分类
+SHOP_BLOCK_CATEGORIES = ('blocks',)
+
+# 原版方块爆炸抗性(引擎未返回时使用)
+VANILLA_EXPLOSION_RESISTANCE = {
+    'minecraft:wool': 0.8,
+    'minecraft:hay_block': 0.5,
+    'minecraft:hardened_clay': 4.2,
+    'minecraft:stained_hardened_clay': 4.2,
+    'minecraft:sandstone': 0.8,
+    'minecraft:red_sandstone': 0.8,
+    'minecraft:planks': 3.0,
+    'minecraft:log': 2.0,
+    'minecraft:log2': 2.0,
+    'minecraft:end_stone': 9.0,
+    'minecraft:end_bricks': 9.0,
+    'minecraft:purpur_block': 6.0,
+    'minecraft:ladder': 0.4,
+    'minecraft:obsidian': 1200.0,
+    'minecraft:glass': 0.3,
+    'minecraft:stained_glass': 0.3,
+    'minecraft:chest': 2.5,
+    'minecraft:web': 4.0,
+    'minecraft:bed': 0.2,
+    'minecraft:stone': 6.0,
+    'minecraft:cobblestone': 6.0,
+    'minecraft:stonebrick': 6.0,
+    'minecraft:grass': 0.6,
+    'minecraft:dirt': 0.5,
+    'minecraft:sand': 0.5,
+    'minecraft:gravel': 0.6,
+    'minecraft:clay': 0.6,
+    'minecraft:concrete': 1.8,
+    'minecraft:quartz_block': 0.8,
+    'minecraft:glowstone': 0.3,
+    'minecraft:sea_lantern': 0.3,
+    'minecraft:leaves': 0.2,
+    'minecraft:leaves2': 0.2,
+    'minecraft:iron_block': 6.0,
+    'minecraft:gold_block': 6.0,
+    'minecraft:diamond_block': 6.0,
+    'minecraft:emerald_block': 6.0,
+    'minecraft:slime': 0.0,
+    'minecraft:water': 100.0,
+    'minecraft:lava': 100.0,
+    'minecraft:barrier': 3600000.0,
+    'minecraft:bedrock': 3600000.0,
+}
+
+
+def is_immune_block(block_name):
+    """
+    方块是否免疫爆炸
+
+    Args:
+        block_name (str): 方块名称
+
+    Returns:
+        bool: 是否免疫爆炸
+    """
+    for keyword in IMMUNE_KEYWORDS:
+        if keyword in block_name:
+            return True
+    return False
+
+
+def get_step_cost(resistance):
+    """
+    射线穿过方块时每步消耗的爆炸力
+
+    Args:
+        resistance (float): 爆炸抗性
+
+    Returns:
+        float: 每步消耗
+    """
+    return (resistance / 5 + 0.3) * STEP_LEN
+
+
+def get_shop_block_names():
+    """
+    收集商店配置中方块类商品的方块名称
+
+    固定物品直接读取newItemName,按玩家生成物品的函数(例如队伍颜色羊毛)读取商品声明的block_names
+
+    Returns:
+        set: 方块名称集合
+    """
+    from Script_NeteaseMod.config.shop_config import GOODS_POOL
+
+    names = set()
+    for goods in GOODS_POOL:
+        if goods.get('category') not in SHOP_BLOCK_CATEGORIES:
+            continue
+        item = goods.get('item')
+        if isinstance(item, dict) and item.get('newItemName'):
+            names.add(item['newItemName'])
+        names.update(goods.get('block_names') or ())
+        if callable(item) and not goods.get('block_names'):
+            print("[WARN] [ExplosionResistanceRegistry] 商品没有声明block_names: {}".format(goods.get('id')))
+    return names
+
+
+class ExplosionResistanceRegistry(object):
+    """
+    方块爆炸抗性表
+
+    数据结构:
+    - resistance: {block_name: float} 已登记方块的爆炸抗性
+    - costs: {block_name: None | IMMUNE_COST | float} 射线追踪使用的每步消耗
+    - immune: set(block_name) 免疫爆炸的方块
+    - _resolved: {block_name: float} 引擎返回的抗性(写入ExtraData的部分)
+    """
+
+    def __init__(self):
+        """初始化抗性表"""
+        self.resistance = {}
+        self.costs = {AIR_NAME: None}
+        self.immune = set()
+        self._resolved = {}
+        self._dirty = False
+        self.built = False
+
+        # 统计数据
+        self.loaded_count = 0  # 从ExtraData读取的方块数
+        self.resolve_count = 0  # 调用GetBlockBasicInfo的次数
+        self.miss_count = 0  # 射线追踪时遇到未登记方块的次数
+
+    def reset(self):
+        """清空抗性表(基准测试使用)"""
+        self.__init__()
+
+    def build(self, extra_names=None):
+        """
+        建立抗性表: 读取ExtraData,登记商店方块与原版方块,有新解析的方块时写回
+
+        Args:
+            extra_names (iterable): 额外登记的方块名称(可选)
+        """
+        self._load()
+        names = set(VANILLA_EXPLOSION_RESISTANCE)
+        try:
+            names.update(get_shop_block_names())
+        except Exception as e:
+            print("[WARN] [ExplosionResistanceRegistry] 读取商店方块失败: {}".format(str(e)))
+        if extra_names:
+            names.update(extra_names)
+        self.register_block_names(names)
+        self.built = True
+        self.save()
+        print("[INFO] [ExplosionResistanceRegistry] 抗性表已建立 方块数: {} (存档读取{}, 引擎解析{})".format(
+            len(self.resistance), self.loaded_count, self.resolve_count
+        ))
+
+    def register_block_names(self, names):
+        """
+        登记方块(已登记的跳过)
+
+        Args:
+            names (iterable): 方块名称
+        """
+        for name in names:
+            if name and name not in self.costs:
+                self._register(name, self._resolve(name))
+
+    def get_cost(self, block_name):
+        """
+        射线穿过方块时每步消耗的爆炸力
+
+        Args:
+            block_name (str): 方块名称
+
+        Returns:
+            None | IMMUNE_COST | float: 空气为None,免疫爆炸为IMMUNE_COST
+        """
+        costs = self.costs
+        if block_name in costs:
+            return costs[block_name]
+        self.miss_count += 1
+        self._register(block_name, self._resolve(block_name))
+        return costs[block_name]
+
+    def is_immune(self, block_name):
+        """
+        方块是否免疫爆炸
+
+        Args:
+            block_name (str): 方块名称
+
+        Returns:
+            bool: 是否免疫爆炸
+        """
+        if block_name not in self.costs:
+            self.get_cost(block_name)
+        return block_name in self.immune
+
+    def _register(self, name, resistance):
+        self.resistance[name] = resistance
+        if is_immune_block(name):
+            self.immune.add(name)
+            self.costs[name] = IMMUNE_COST
+        else:
+            self.costs[name] = get_step_cost(resistance)
+
+    def _resolve(self, name):
+        """
+        解析方块的爆炸抗性: ExtraData读取值 > 引擎 > 原版抗性表 > 0
+        """
+        if name in self._resolved:
+            return self._resolved[name]
+        block_info = None
+        try:
+            self.resolve_count += 1
+            block_info = get_component_cache().CreateBlockInfo(serverApi.GetLevelId()).GetBlockBasicInfo(name)
+        except Exception as e:
+            print("[WARN] [ExplosionResistanceRegistry] 获取方块信息失败 {}: {}".format(name, str(e)))
+        if block_info and 'explosionResistance' in block_info:
+            resistance = float(block_info['explosionResistance'])
+            self._resolved[name] = resistance
+            self._dirty = True
+            return resistance
+        return VANILLA_EXPLOSION_RESISTANCE.get(name, 0.0)
+
+    # ========== 存储 ==========
+
+    def _load(self):
+        """读取ExtraData中保存的抗性"""
+        try:
+            extra_comp = get_component_cache().CreateExtraData(serverApi.GetLevelId())
+            data = extra_comp.GetExtraData(REGISTRY_KEY)
+        except Exception as e:
+            print("[WARN] [ExplosionResistanceRegistry] 读取抗性表失败: {}".format(str(e)))
+            return
+        if not data or data.get('version') != REGISTRY_VERSION:
+            return
+        for name, resistance in (data.get('resistance') or {}).items():
+            self._resolved[str(name)] = float(resistance)
+        self.loaded_count = len(self._resolved)
+
+    def save(self):
+        """
+        有新解析的方块时写回ExtraData
+
+        Returns:
+            bool: 是否写入
+        """
+        if not self._dirty:
+            return False
+        try:
+            extra_comp = get_component_cache().CreateExtraData(serverApi.GetLevelId())
+            extra_comp.SetExtraData(REGISTRY_KEY, {'version': REGISTRY_VERSION, 'resistance': dict(self._resolved)})
+            extra_comp.SaveExtraData()
+        except Exception as e:
+            print("[ERROR] [ExplosionResistanceRegistry] 保存抗性表失败: {}".format(str(e)))
+            return False
+        self._dirty = False
+        return True
+
+    def get_stats(self):
+        """
+        获取统计信息
+
+        Returns:
+            dict: 统计信息
+        """
+        return {
+            'blocks': len(self.resistance),
+            'immune': len(self.immune),
+            'loaded': self.loaded_count,
+            'resolved': self.resolve_count,
+            'misses': self.miss_count,
+        }
+
+
+_registry = ExplosionResistanceRegistry()
+
+
+def get_explosion_resistance_registry():
+    """
+    获取全局爆炸抗性表
+
+    Returns:
+        ExplosionResistanceRegistry: 抗性表
+    """
+    return _registry
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+GeneratorItemLedger - 产矿机掉落物账本
+
+功能:
+- 记录每台产矿机生成的掉落物实体(按生成顺序的deque)与物品数量
+- 由引擎事件更新: 玩家拾取(ServerPlayerTryTouchEvent)与实体移除(RemoveEntityServerEvent)
+- 产矿机生成前不再逐个GetFootPos验证物品是否还存在,上限检查O(1)
+- 产矿机按账本中的物品数量检查上限,达到上限时停止生成(不销毁已合并的物品堆)
+
+使用方法:
+    ledger = get_generator_item_ledger()
+    ledger.register_events(system)  # BedWarsGameSystem.Create中注册
+
+    ledger.track(generator, entity_id, count)  # 生成掉落物后记录
+    if ledger.get_item_count(generator) >= top_count:
+        return  # 达到上限,停止生成
+    entity_ids = ledger.release_owner(generator)  # 产矿机停止时取出全部掉落物
+
+说明:
+- 被移除前有未取消的拾取事件: 视为被拾取,扣除数量
+- 没有拾取事件就被移除: 扣除数量(合并/消失/被炸毁均如此),并标记该产矿机其余掉落物待校准
+  (若是合并,被合并的数量在校准时从幸存物品堆的实际数量中读回)
+- 被拾取但实体未移除(背包已满时只拾取一部分): 校准时读取实际数量
+- 待校准的掉落物在下次查询数量(get_item_count)时用GetDroppedItem读取实际数量,处理后清除拾取记录
+- 已移除的实体在deque中惰性删除,失效条目过多时压缩
+"""
+
+from __future__ import print_function
+
+from collections import deque
+
+import mod.server.extraServerApi as serverApi
+
+# deque中失效条目超过有效条目数 + 该值时压缩
+COMPACT_SLACK = 16
+
+
+class GeneratorItemLedger(object):
+    """
+    产矿机掉落物账本
+
+    数据结构:
+    - _owners: {entity_id: owner} 掉落物所属的产矿机
+    - _counts: {entity_id: int} 掉落物的物品数量
+    - _queues: {owner: deque([entity_id, ...])} 按生成顺序(含已移除的失效条目)
+    - _live: {owner: int} 有效掉落物数量
+    - _totals: {owner: int} 有效掉落物的物品总数
+    - _touches: {entity_id: args} 最近一次拾取事件的参数(移除时检查是否被取消,校准后清除)
+    - _pending: {owner: set(entity_id)} 待校准实际数量的掉落物
+    """
+
+    def __init__(self):
+        """初始化账本"""
+        self._owners = {}
+        self._counts = {}
+        self._queues = {}
+        self._live = {}
+        self._totals = {}
+        self._touches = {}
+        self._pending = {}
+        self._system = None
+
+        # 统计数据
+        self.tracked_count = 0  # 记录的掉落物数
+        self.pickup_count = 0  # 被拾取的掉落物数
+        self.merge_count = 0  # 校准时发现数量增加(被合并)的掉落物数
+        self.resync_count = 0  # 校准读取次数
+
+    # ========== 记录 ==========
+
+    def track(self, owner, entity_id, count=1):
+        """
+        记录产矿机生成的掉落物
+
+        Args:
+            owner: 产矿机(GeneratorPresetDefServer实例)
+            entity_id (str): 掉落物实体ID
+            count (int): 物品数量
+        """
+        if entity_id in self._owners:
+            return
+        self._owners[entity_id] = owner
+        self._counts[entity_id] = count
+        self._queues.setdefault(owner, deque()).append(entity_id)
+        self._live[owner] = self._live.get(owner, 0) + 1
+        self._totals[owner] = self._totals.get(owner, 0) + count
+        self.tracked_count += 1
+
+    def release_owner(self, owner):
+        """
+        取出产矿机的全部掉落物并清除记录(调用方负责销毁实体)
+
+        Args:
+            owner: 产矿机
+
+        Returns:
+            list: 实体ID列表(按生成顺序)
+        """
+        queue = self._queues.pop(owner, None) or ()
+        entity_ids = [entity_id for entity_id in queue if self._owners.get(entity_id) is owner]
+        for entity_id in entity_ids:
+            self._owners.pop(entity_id, None)
+            self._counts.pop(entity_id, None)
+            self._touches.pop(entity_id, None)
+        self._live.pop(owner, None)
+        self._totals.pop(owner, None)
+        self._pending.pop(owner, None)
+        return entity_ids
+
+    def get_item_count(self, owner):
+        """
+        获取产矿机现存掉落物的物品总数(有待校准的掉落物时先读取实际数量)
+
+        Returns:
+            int: 物品总数
+        """
+        if owner in self._pending:
+            self._resync(owner)
+        return self._totals.get(owner, 0)
+
+    def get_entity_count(self, owner):
+        """
+        获取产矿机现存掉落物的实体数
+
+        Returns:
+            int: 实体数
+        """
+        return self._live.get(owner, 0)
+
+    def is_tracked(self, entity_id):
+        """
+        实体是否是账本中的掉落物
+
+        Returns:
+            bool: 是否已记录
+        """
+        return entity_id in self._owners
+
+    def _forget(self, entity_id):
+        """
+        清除掉落物记录
+
+        Returns:
+            tuple: (owner, count)
+        """
+        owner = self._owners.pop(entity_id)
+        count = self._counts.pop(entity_id, 0)
+        self._touches.pop(entity_id, None)
+        self._live[owner] -= 1
+        self._totals[owner] -= count
+        queue = self._queues.get(owner)
+        if queue is not None and len(queue) > self._live[owner] * 2 + COMPACT_SLACK:
+            self._queues[owner] = deque(item for item in queue if self._owners.get(item) is owner)
+        return owner, count
+
+    def _mark_pending(self, owner, entity_id=None):
+        """
+        标记待校准的掉落物
+
+        Args:
+            owner: 产矿机
+            entity_id (str): 掉落物实体ID,为None时标记该产矿机全部现存掉落物
+        """
+        pending = self._pending.setdefault(owner, set())
+        if entity_id is not None:
+            pending.add(entity_id)
+            return
+        for item in self._queues.get(owner) or ():
+            if self._owners.get(item) is owner:
+                pending.add(item)
+
+    def _resync(self, owner):
+        """
+        读取待校准掉落物的实际数量并更新账本
+
+        Args:
+            owner: 产矿机
+        """
+        pending = self._pending.pop(owner, None)
+        if not pending:
+            return
+        from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
+        item_comp = get_component_cache().CreateItem(serverApi.GetLevelId())
+        for entity_id in pending:
+            self._touches.pop(entity_id, None)
+            if self._owners.get(entity_id) is not owner:
+                continue
+            self.resync_count += 1
+            item_dict = item_comp.GetDroppedItem(entity_id)
+            if not item_dict:
+                # 实体已不存在,等待移除事件
+                continue
+            count = item_dict.get('count', 0)
+            delta = count - self._counts[entity_id]
+            if delta > 0:
+                self.merge_count += 1
+            self._counts[entity_id] = count
+            self._totals[owner] += delta
+
+    # ========== 事件 ==========
+
+    def _get_event_handlers(self):
+        """事件列表 [(事件名, 回调)]"""
+        return [
+            ('ServerPlayerTryTouchEvent', self._on_try_touch),
+            ('RemoveEntityServerEvent', self._on_remove_entity),
+        ]
+
+    def register_events(self, system):
+        """
+        在指定ServerSystem上注册拾取与实体移除事件
+
+        Args:
+            system: ServerSystem实例(BedWarsGameSystem)
+        """
+        if self._system is not None:
+            return
+        self._system = system
+        for event_name, callback in self._get_event_handlers():
+            system.ListenForEvent(
+                serverApi.GetEngineNamespace(),
+                serverApi.GetEngineSystemName(),
+                event_name,
+                self,
+                callback
+            )
+        print("[INFO] [GeneratorItemLedger] 已注册掉落物账本事件")
+
+    def unregister_events(self):
+        """注销事件并清空账本"""
+        if self._system is None:
+            return
+        for event_name, callback in self._get_event_handlers():
+            try:
+                self._system.UnListenForEvent(
+                    serverApi.GetEngineNamespace(),
+                    serverApi.GetEngineSystemName(),
+                    event_name,
+                    self,
+                    callback
+                )
+            except Exception as e:
+                print("[WARN] [GeneratorItemLedger] 注销事件{}失败: {}".format(event_name, str(e)))
+        self._system = None
+        self.clear()
+
+    def _on_try_touch(self, args):
+        """玩家尝试拾取掉落物(是否被取消在实体移除时检查,未移除时校准实际数量)"""
+        entity_id = args.get('entityId')
+        owner = self._owners.get(entity_id)
+        if owner is not None:
+            self._touches[entity_id] = args
+            self._mark_pending(owner, entity_id)
+
+    def _on_remove_entity(self, args):
+        """掉落物实体被移除: 被拾取,或合并/消失(数量直接扣除,合并的数量在校准时读回)"""
+        entity_id = args.get('id')
+        if entity_id not in self._owners:
+            return
+        touch = self._touches.get(entity_id)
+        owner, count = self._forget(entity_id)
+        pending = self._pending.get(owner)
+        if pending is not None:
+            pending.discard(entity_id)
+        if touch is not None and not touch.get('cancel'):
+            self.pickup_count += 1
+            return
+        self._mark_pending(owner)
+
+    def clear(self):
+        """清空账本"""
+        self._owners = {}
+        self._counts = {}
+        self._queues = {}
+        self._live = {}
+        self._totals = {}
+        self._touches = {}
+        self._pending = {}
+
+    def get_stats(self):
+        """
+        获取统计信息
+
+        Returns:
+            dict: 统计信息
+        """
+        return {
+            'items': len(self._owners),
+            'generators': len(self._queues),
+            'tracked': self.tracked_count,
+            'pickups': self.pickup_count,
+            'merges': self.merge_count,
+            'resyncs': self.resync_count,
+        }
+
+
+_generator_item_ledger = GeneratorItemLedger()
+
+
+def get_generator_item_ledger():
+    """
+    获取全局产矿机掉落物账本
+
+    Returns:
+        GeneratorItemLedger: 掉落物账本
+    """
+    return _generator_item_ledger
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+"""
+GeneratorScheduler - 产矿机调度器
+
+功能:
+- 所有产矿机预设(GeneratorPresetDefServer)按下次生成时间(next_generate)放入同一个最小堆
+- 每Tick只弹出已到期的产矿机,未到期的产矿机不再每Tick检查游戏状态和时间
+- 游戏是否运行由BedWarsRunning/BedWarsEnding预设事件缓存,不再每Tick查询状态机
+- 升级(GeneratorLevelUp事件、队伍生成器升级)时O(log n)重新排期
+
+使用方法:
+    scheduler = get_generator_scheduler()
+    scheduler.register_events(system)  # BedWarsGameSystem.Create中注册
+
+    scheduler.register(generator)  # 产矿机启动
+    scheduler.reschedule(generator)  # 修改generator.next_generate后
+    scheduler.unregister(generator)  # 产矿机停止
+    scheduler.update()  # BedWarsGameSystem.Update中每Tick调用
+
+说明:
+- 产矿机需要实现on_generator_due(now),返回下次生成时间,返回None表示暂停(等级为0等),
+  之后需要调用reschedule恢复
+- 重新排期时旧条目只做失效标记(惰性删除),失效条目过多时整体重建堆
+"""
+
+from __future__ import print_function
+
+import heapq
+import time
+
+# 预设事件的系统命名空间(与GamingState.listen_preset_event一致)
+PRESET_EVENT_NAMESPACE = "Minecraft"
+PRESET_EVENT_SYSTEM = "preset"
+# 失效条目超过该数量且多于有效条目时重建堆
+COMPACT_THRESHOLD = 64
+
+# 堆条目下标: [next_generate, seq, generator, alive]
+_TIME, _SEQ, _GENERATOR, _ALIVE = range(4)
+
+
+class GeneratorScheduler(object):
+    """
+    产矿机调度器
+
+    数据结构:
+    - _heap: [[next_generate, seq, generator, alive], ...] 最小堆(seq保证同一时间按排期顺序弹出)
+    - _entries: {generator: 堆条目} 已排期产矿机当前有效的条目
+    - _generators: set(generator) 已注册的产矿机(包括暂停、没有排期的产矿机)
+    """
+
+    def __init__(self):
+        """初始化调度器"""
+        self._heap = []
+        self._entries = {}
+        self._generators = set()
+        self._seq = 0
+        self._stale = 0  # 堆中失效条目数
+        self._system = None
+        self.running = False  # 游戏是否正在运行(由预设事件更新)
+
+        # 统计数据
+        self.wake_count = 0  # 唤醒产矿机次数
+        self.reschedule_count = 0  # 重新排期次数
+        self.compact_count = 0  # 重建堆次数
+
+    # ========== 事件 ==========
+
+    def _get_event_handlers(self):
+        return (
+            ("BedWarsRunning", self._on_game_running),
+            ("BedWarsEnding", self._on_game_ending),
+        )
+
+    def register_events(self, system):
+        """
+        在指定ServerSystem上监听游戏运行/结束的预设事件
+
+        Args:
+            system: ServerSystem实例(BedWarsGameSystem)
+        """
+        if self._system is not None:
+            return
+        self._system = system
+        for event_name, callback in self._get_event_handlers():
+            system.ListenForEvent(PRESET_EVENT_NAMESPACE, PRESET_EVENT_SYSTEM, event_name, self, callback)
+        print("[INFO] [GeneratorScheduler] 已注册游戏运行状态事件")
+
+    def unregister_events(self):
+        """注销事件并清空调度器"""
+        if self._system is None:
+            return
+        for event_name, callback in self._get_event_handlers():
+            try:
+                self._system.UnListenForEvent(PRESET_EVENT_NAMESPACE, PRESET_EVENT_SYSTEM, event_name, self, callback)
+            except Exception as e:
+                print("[WARN] [GeneratorScheduler] 注销事件{}失败: {}".format(event_name, str(e)))
+        self._system = None
+        self.clear()
+
+    def _on_game_running(self, args):
+        self.set_running(True)
+
+    def _on_game_ending(self, args):
+        self.set_running(False)
+
+    def set_running(self, running):
+        """
+        设置游戏是否正在运行(暂停期间到期的产矿机在恢复后的第一Tick生成)
+
+        Args:
+            running (bool): 是否运行
+        """
+        if running != self.running:
+            self.running = running
+            print("[INFO] [GeneratorScheduler] 产矿{} (产矿机数: {})".format(
+                "开始" if running else "暂停", len(self._generators)
+            ))
+
+    # ========== 排期 ==========
+
+    def register(self, generator):
+        """
+        注册产矿机,按generator.next_generate排期
+
+        Args:
+            generator: GeneratorPresetDefServer实例
+        """
+        self._generators.add(generator)
+        self._push(generator, generator.next_generate)
+
+    def reschedule(self, generator):
+        """
+        产矿机的next_generate或等级变化后重新排期
+
+        Args:
+            generator: GeneratorPresetDefServer实例
+        """
+        if generator not in self._generators:
+            return
+        self.reschedule_count += 1
+        self._push(generator, generator.next_generate)
+
+    def unregister(self, generator):
+        """
+        注销产矿机
+
+        Args:
+            generator: GeneratorPresetDefServer实例
+        """
+        self._generators.discard(generator)
+        entry = self._entries.pop(generator, None)
+        if entry is not None:
+            entry[_ALIVE] = False
+            self._stale += 1
+
+    def is_registered(self, generator):
+        """
+        产矿机是否已注册
+
+        Returns:
+            bool: 是否已注册
+        """
+        return generator in self._generators
+
+    def _push(self, generator, next_generate):
+        old_entry = self._entries.get(generator)
+        if old_entry is not None:
+            old_entry[_ALIVE] = False
+            self._stale += 1
+        self._seq += 1
+        entry = [next_generate, self._seq, generator, True]
+        self._entries[generator] = entry
+        heapq.heappush(self._heap, entry)
+        if self._stale > COMPACT_THRESHOLD and self._stale > len(self._entries):
+            self._compact()
+
+    def _compact(self):
+        """移除失效条目并重建堆"""
+        self._heap = [entry for entry in self._heap if entry[_ALIVE]]
+        heapq.heapify(self._heap)
+        self._stale = 0
+        self.compact_count += 1
+
+    def update(self, now=None):
+        """
+        唤醒已到期的产矿机
+
+        Args:
+            now (float): 当前时间(默认time.time())
+
+        Returns:
+            int: 本次唤醒的产矿机数量
+        """
+        if not self.running or not self._heap:
+            return 0
+        if now is None:
+            now = time.time()
+
+        woken = 0
+        # 重新排期可能重建堆,每次循环重新读取self._heap
+        while self._heap and self._heap[0][_TIME] <= now:
+            entry = heapq.heappop(self._heap)
+            if not entry[_ALIVE]:
+                self._stale -= 1
+                continue
+            generator = entry[_GENERATOR]
+            del self._entries[generator]
+            woken += 1
+            try:
+                next_generate = generator.on_generator_due(now)
+            except Exception as e:
+                print("[ERROR] [GeneratorScheduler] 产矿机生成失败: {}".format(str(e)))
+                import traceback
+                traceback.print_exc()
+                next_generate = generator.next_generate if generator.next_generate > now else None
+            # 回调中已重新排期(例如升级)或注销时保留回调的结果
+            if next_generate is not None and generator in self._generators and generator not in self._entries:
+                self._push(generator, next_generate)
+
+        self.wake_count += woken
+        return woken
+
+    # ========== 查询 ==========
+
+    def get_generators(self, team=None, resource_type=None):
+        """
+        查找已注册的产矿机(包括暂停的产矿机)
+
+        Args:
+            team (str): 队伍ID(可选,不区分大小写)
+            resource_type (str): 资源类型ID(可选,不区分大小写)
+
+        Returns:
+            list: GeneratorPresetDefServer实例列表
+        """
+        generators = []
+        for generator in self._generators:
+            if team is not None and (generator.team or 'NONE').upper() != team.upper():
+                continue
+            if resource_type is not None and (generator.resource_type_id or '').upper() != resource_type.upper():
+                continue
+            generators.append(generator)
+        return generators
+
+    def get_next_due(self):
+        """
+        获取最近的生成时间
+
+        Returns:
+            float: 最近的生成时间,没有排期时返回None
+        """
+        while self._heap and not self._heap[0][_ALIVE]:
+            heapq.heappop(self._heap)
+            self._stale -= 1
+        return self._heap[0][_TIME] if self._heap else None
+
+    def clear(self):
+        """清空全部产矿机并暂停"""
+        self._heap = []
+        self._entries = {}
+        self._generators = set()
+        self._stale = 0
+        self.running = False
+
+    def get_stats(self):
+        """
+        获取统计信息
+
+        Returns:
+            dict: 统计信息
+        """
+        return {
+            'generators': len(self._generators),
+            'scheduled': len(self._entries),
+            'heap_size': len(self._heap),
+            'stale': self._stale,
+            'running': self.running,
+            'wakes': self.wake_count,
+            'reschedules': self.reschedule_count,
+            'compacts': self.compact_count,
+        }
+
+
+_generator_scheduler = GeneratorScheduler()
+
+
+def get_generator_scheduler():
+    """
+    获取全局产矿机调度器
+
+    Returns:
+        GeneratorScheduler: 产矿机调度器
+    """
+    return _generator_scheduler
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+GeneratorSyncBatcher - 产矿机状态同步合并(服务端)
+
+功能:
+- 产矿机状态变化(生成、升级、启动)时只标记为脏,不再逐实例send_to_client
+- 每Tick把全部脏产矿机的状态合并为一条GeneratorStateBatch消息广播到客户端
+- 同一Tick内同一产矿机多次变化只发送最后的状态
+
+使用方法:
+    batcher = get_generator_sync_batcher()
+    batcher.mark_dirty(generator)  # 产矿机状态变化时
+    batcher.flush(system)  # BedWarsGameSystem.Update中每Tick调用
+
+说明:
+- 产矿机需要实现get_sync_data(),返回同步数据字典
+- 客户端由GeneratorTextClientSystem接收,按instance_id分发到产矿机预设实例
+"""
+
+from __future__ import print_function
+
+from collections import OrderedDict
+
+# 合并同步消息的事件名(客户端GeneratorTextClientSystem监听)
+BATCH_EVENT_NAME = "GeneratorStateBatch"
+
+
+class GeneratorSyncBatcher(object):
+    """
+    产矿机状态同步合并器
+
+    数据结构:
+    - _dirty: OrderedDict{instance_id: generator} 本Tick状态变化的产矿机(按首次标记顺序)
+    """
+
+    def __init__(self):
+        """初始化合并器"""
+        self._dirty = OrderedDict()
+
+        # 统计数据
+        self.batch_count = 0  # 发送的合并消息数
+        self.state_count = 0  # 发送的产矿机状态数
+        self.coalesced_count = 0  # 同一Tick内被合并的重复标记数
+
+    def mark_dirty(self, generator):
+        """
+        标记产矿机状态已变化,在本Tick结束时同步
+
+        Args:
+            generator: GeneratorPresetDefServer实例
+        """
+        instance = getattr(generator, 'instance', None)
+        if instance is None:
+            return
+        instance_id = instance.instance_id
+        if instance_id in self._dirty:
+            self.coalesced_count += 1
+        self._dirty[instance_id] = generator
+
+    def discard(self, generator):
+        """
+        取消产矿机待同步的状态(产矿机停止时)
+
+        Args:
+            generator: GeneratorPresetDefServer实例
+        """
+        instance = getattr(generator, 'instance', None)
+        if instance is not None:
+            self._dirty.pop(instance.instance_id, None)
+
+    def has_pending(self):
+        """
+        是否有待同步的状态
+
+        Returns:
+            bool: 是否有待同步的状态
+        """
+        return bool(self._dirty)
+
+    def flush(self, system):
+        """
+        把本Tick状态变化的产矿机合并为一条消息广播到客户端
+
+        Args:
+            system: ServerSystem实例(BedWarsGameSystem)
+
+        Returns:
+            int: 同步的产矿机数量
+        """
+        if not self._dirty:
+            return 0
+        dirty = self._dirty
+        self._dirty = OrderedDict()
+
+        states = []
+        for instance_id, generator in dirty.items():
+            try:
+                state = generator.get_sync_data()
+            except Exception as e:
+                print("[ERROR] [GeneratorSyncBatcher] 获取产矿机状态失败 instance_id={}: {}".format(instance_id, str(e)))
+                continue
+            if state is None:
+                continue
+            state['instance_id'] = instance_id
+            states.append(state)
+        if not states:
+            return 0
+
+        try:
+            system.BroadcastToAllClient(None, BATCH_EVENT_NAME, {'generators': states})
+        except Exception as e:
+            print("[ERROR] [GeneratorSyncBatcher] 广播产矿机状态失败: {}".format(str(e)))
+            return 0
+        self.batch_count += 1
+        self.state_count += len(states)
+        return len(states)
+
+    def clear(self):
+        """丢弃待同步的状态"""
+        self._dirty = OrderedDict()
+
+    def get_stats(self):
+        """
+        获取统计信息
+
+        Returns:
+            dict: 统计信息
+        """
+        return {
+            'batches': self.batch_count,
+            'states': self.state_count,
+            'coalesced': self.coalesced_count,
+            'pending': len(self._dirty),
+        }
+
+
+_generator_sync_batcher = GeneratorSyncBatcher()
+
+
+def get_generator_sync_batcher():
+    """
+    获取全局产矿机状态同步合并器
+
+    Returns:
+        GeneratorSyncBatcher: 同步合并器
+    """
+    return _generator_sync_batcher
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+GeneratorTextUpdater - 产矿机浮空文字更新器(客户端)
+
+功能:
+- 所有产矿机的浮空文字由同一个更新器刷新,产矿机预设不再逐实例on_tick
+- 文字内容与上次推送的相同时不调用SetText(倒计时秒数、等级未变化)
+- 超出视距的产矿机浮空文字不更新,回到视距内时再按最新状态刷新
+- 接收服务端合并的GeneratorStateBatch消息,按instance_id分发到产矿机预设实例
+
+使用方法:
+    updater = get_generator_text_updater()
+    updater.register_instance(preset_def, instance)  # 产矿机预设on_start
+    updater.register_board(instance, board_id, pos, text)  # 创建浮空文字后
+    updater.unregister_instance(instance)  # 产矿机预设on_stop,返回浮空文字ID
+    updater.apply_batch(data)  # GeneratorTextClientSystem收到GeneratorStateBatch
+    updater.update()  # GeneratorTextClientSystem.Update中每Tick调用
+
+说明:
+- 预设实例注册前收到的状态会保留,注册时补发
+- 产矿机预设需要实现get_floating_text(instance)
+"""
+
+from __future__ import print_function
+
+import time
+
+import mod.client.extraClientApi as clientApi
+
+# 浮空文字检查间隔(秒),倒计时按秒显示
+TEXT_UPDATE_INTERVAL = 0.25
+# 视距(格),超出视距的浮空文字不更新
+VIEW_DISTANCE = 64.0
+# 服务端同步消息类型(与产矿机预设on_server_message一致)
+SYNC_MESSAGE_TYPE = "SyncGeneratorData"
+
+
+class GeneratorTextUpdater(object):
+    """
+    产矿机浮空文字更新器
+
+    数据结构:
+    - _instances: {instance_id: (preset_def, instance)} 已启动的产矿机预设实例
+    - _states: {instance_id: dict} 最近一次收到的产矿机状态
+    - _boards: {instance_id: [board_id, pos, last_text]} 已创建的浮空文字
+    """
+
+    def __init__(self):
+        """初始化更新器"""
+        self._instances = {}
+        self._states = {}
+        self._boards = {}
+        self._next_update = 0.0
+        self._pos_comp = None
+
+        # 统计数据
+        self.batch_count = 0  # 收到的合并消息数
+        self.push_count = 0  # SetText次数
+        self.unchanged_count = 0  # 文字未变化跳过次数
+        self.far_count = 0  # 超出视距跳过次数
+
+    # ========== 注册 ==========
+
+    def register_instance(self, preset_def, instance):
+        """
+        注册产矿机预设实例(已收到的状态立即应用)
+
+        Args:
+            preset_def: GeneratorPresetDefClient实例
+            instance: PresetInstanceClient对象
+        """
+        instance_id = instance.instance_id
+        self._instances[instance_id] = (preset_def, instance)
+        state = self._states.get(instance_id)
+        if state is not None:
+            preset_def.on_server_message(instance, SYNC_MESSAGE_TYPE, state)
+
+    def unregister_instance(self, instance):
+        """
+        注销产矿机预设实例
+
+        Args:
+            instance: PresetInstanceClient对象
+
+        Returns:
+            int: 该实例的浮空文字ID(调用方负责销毁),没有时返回None
+        """
+        instance_id = instance.instance_id
+        self._instances.pop(instance_id, None)
+        self._states.pop(instance_id, None)
+        board = self._boards.pop(instance_id, None)
+        return board[0] if board else None
+
+    def register_board(self, instance, board_id, pos, text=None):
+        """
+        登记产矿机的浮空文字
+
+        Args:
+            instance: PresetInstanceClient对象
+            board_id (int): 浮空文字ID
+            pos (tuple): 浮空文字位置 (x, y, z)
+            text (str): 创建时的文字(与之相同时不重复推送)
+        """
+        self._boards[instance.instance_id] = [board_id, pos, text]
+
+    # ========== 同步 ==========
+
+    def apply_batch(self, data):
+        """
+        应用服务端合并的产矿机状态
+
+        Args:
+            data (dict): {'generators': [{'instance_id': ..., 'level': ..., 'next_generate': ...}, ...]}
+        """
+        self.batch_count += 1
+        for state in data.get('generators') or ():
+            instance_id = state.get('instance_id')
+            self._states[instance_id] = state
+            entry = self._instances.get(instance_id)
+            if entry is None:
+                continue
+            try:
+                entry[0].on_server_message(entry[1], SYNC_MESSAGE_TYPE, state)
+            except Exception as e:
+                print("[ERROR] [GeneratorTextUpdater] 应用产矿机状态失败 instance_id={}: {}".format(instance_id, str(e)))
+
+    # ========== 刷新 ==========
+
+    def update(self, now=None):
+        """
+        刷新视距内文字有变化的浮空文字
+
+        Args:
+            now (float): 当前时间(默认time.time())
+
+        Returns:
+            int: 本次推送的浮空文字数量
+        """
+        if not self._boards:
+            return 0
+        if now is None:
+            now = time.time()
+        if now < self._next_update:
+            return 0
+        self._next_update = now + TEXT_UPDATE_INTERVAL
+
+        from Script_NeteaseMod.systems.util.ClientAPIHelper import ClientAPIHelper
+
+        player_pos = self._get_local_player_pos()
+        max_dist_sq = VIEW_DISTANCE * VIEW_DISTANCE
+        pushed = 0
+        for instance_id, board in self._boards.items():
+            board_pos = board[1]
+            if player_pos is not None:
+                dx = board_pos[0] - player_pos[0]
+                dy = board_pos[1] - player_pos[1]
+                dz = board_pos[2] - player_pos[2]
+                if dx * dx + dy * dy + dz * dz > max_dist_sq:
+                    self.far_count += 1
+                    continue
+            entry = self._instances.get(instance_id)
+            if entry is None:
+                continue
+            text = entry[0].get_floating_text(entry[1])
+            if text == board[2]:
+                self.unchanged_count += 1
+                continue
+            # 失败时同样记录,避免同一文字每次检查都重试(倒计时变化后会再次推送)
+            board[2] = text
+            if ClientAPIHelper.update_floating_text(board[0], text=text):
+                pushed += 1
+            else:
+                print("[WARN] [GeneratorTextUpdater] 更新浮动文字失败: instance_id={}, board_id={}".format(
+                    instance_id, board[0]
+                ))
+        self.push_count += pushed
+        return pushed
+
+    def _get_local_player_pos(self):
+        """获取本地玩家位置(获取失败时返回None,不做视距裁剪)"""
+        try:
+            if self._pos_comp is None:
+                self._pos_comp = clientApi.GetEngineCompFactory().CreatePos(clientApi.GetLocalPlayerId())
+            return self._pos_comp.GetFootPos()
+        except Exception:
+            self._pos_comp = None
+            return None
+
+    def clear(self):
+        """清空全部实例、状态与浮空文字登记"""
+        self._instances = {}
+        self._states = {}
+        self._boards = {}
+        self._next_update = 0.0
+        self._pos_comp = None
+
+    def get_stats(self):
+        """
+        获取统计信息
+
+        Returns:
+            dict: 统计信息
+        """
+        return {
+            'instances': len(self._instances),
+            'boards': len(self._boards),
+            'batches': self.batch_count,
+            'pushes': self.push_count,
+            'unchanged': self.unchanged_count,
+            'far': self.far_count,
+        }
+
+
+_generator_text_updater = GeneratorTextUpdater()
+
+
+def get_generator_text_updater():
+    """
+    获取全局产矿机浮空文字更新器
+
+    Returns:
+        GeneratorTextUpdater: 浮空文字更新器
+    """
+    return _generator_text_updater
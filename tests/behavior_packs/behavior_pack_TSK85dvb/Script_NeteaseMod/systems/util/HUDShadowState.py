@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+HUDShadowState - 服务端HUD影子状态
+
+功能:
+- 为每个玩家记录客户端堆叠消息面板(stack_msg_top/stack_msg_bottom)当前显示的内容
+- 过滤掉与客户端现状相同的add_or_set事件、以及针对不存在条目的remove事件
+- 把一个玩家本Tick所有面板的变化合并为一个批量数据包(stack_msg_batch)
+
+使用方法:
+    shadow = HUDShadowState()
+
+    batch = shadow.begin(player_id)
+    batch.set('stack_msg_top', 'team_RED', u"...", border=True)
+    batch.remove('stack_msg_bottom', 'resource_iron')
+    packet = batch.build()  # 无变化时返回None
+    if packet:
+        room_system.forward_hud_event(player_id, packet)
+
+    shadow.end()
+
+说明:
+- 影子状态假定客户端只通过本模块修改这些条目
+- 其他途径清空了客户端面板(clear_all)时,需调用reset()使影子状态重新同步
+- request_full_sync()使下一次构建不做过滤,用于定期兜底同步(客户端UI未就绪时会丢弃事件)
+"""
+
+from __future__ import print_function
+
+
+# 批量数据包类型(客户端ECHUDScreenNode.handle_hud_control识别)
+HUD_BATCH_TYPE = 'stack_msg_batch'
+
+
+class HUDShadowState(object):
+    """
+    HUD影子状态
+
+    数据结构:
+    - _shadow: {player_id: {panel: {key: (value, border)}}}
+    """
+
+    def __init__(self):
+        """初始化影子状态"""
+        self._shadow = {}
+        self._full_sync_all = False  # 下一次构建是否对所有玩家完整同步
+        self._full_sync_players = set()  # 下一次构建需要完整同步的玩家
+
+        # 统计数据
+        self.sent_events = 0  # 实际发送的事件数
+        self.suppressed_events = 0  # 被过滤的事件数
+        self.sent_packets = 0  # 实际发送的数据包数
+
+    def begin(self, player_id):
+        """
+        开始构建玩家本Tick的HUD变化
+
+        Args:
+            player_id (str): 玩家ID
+
+        Returns:
+            HUDBatch: 批量构建器
+        """
+        panels = self._shadow.get(player_id)
+        if panels is None:
+            panels = self._shadow[player_id] = {}
+
+        full = self._full_sync_all or player_id in self._full_sync_players
+        if full:
+            self._full_sync_players.discard(player_id)
+        return HUDBatch(self, panels, full)
+
+    def end(self):
+        """结束本轮构建(完整同步标记只生效一轮)"""
+        self._full_sync_all = False
+        self._full_sync_players.clear()
+
+    def request_full_sync(self, player_id=None):
+        """
+        下一次构建时不过滤,完整发送所有条目
+
+        Args:
+            player_id (str): 玩家ID,为None时所有玩家
+        """
+        if player_id is None:
+            self._full_sync_all = True
+        else:
+            self._full_sync_players.add(player_id)
+
+    def reset(self, player_id=None):
+        """
+        重置影子状态(客户端面板被外部清空后调用)
+
+        Args:
+            player_id (str): 玩家ID,为None时重置所有玩家
+        """
+        if player_id is None:
+            self._shadow = {}
+        else:
+            self._shadow.pop(player_id, None)
+
+    def retain_players(self, player_ids):
+        """
+        只保留指定玩家的影子状态(清理已离线玩家)
+
+        Args:
+            player_ids (list): 在线玩家ID列表
+        """
+        if len(self._shadow) <= len(player_ids):
+            return
+        online = set(player_ids)
+        for player_id in list(self._shadow.keys()):
+            if player_id not in online:
+                del self._shadow[player_id]
+
+    def get_stats(self):
+        """
+        获取统计信息
+
+        Returns:
+            dict: 统计数据
+        """
+        total = self.sent_events + self.suppressed_events
+        return {
+            "tracked_players": len(self._shadow),
+            "sent_packets": self.sent_packets,
+            "sent_events": self.sent_events,
+            "suppressed_events": self.suppressed_events,
+            "suppress_rate": float(self.suppressed_events) / total if total > 0 else 0.0
+        }
+
+
+class HUDBatch(object):
+    """
+    单个玩家单Tick的HUD变化构建器
+
+    set/remove时立即与影子状态对比,只记录真正的变化
+    """
+
+    def __init__(self, owner, panels, full=False):
+        """
+        初始化构建器
+
+        Args:
+            owner (HUDShadowState): 所属影子状态
+            panels (dict): 该玩家的面板影子 {panel: {key: (value, border)}}
+            full (bool): 是否完整同步(不过滤任何事件)
+        """
+        self.owner = owner
+        self.panels = panels
+        self.full = full
+        self.changes = {}  # {panel: [event, ...]}
+
+    def set(self, panel, key, value, border=False):
+        """
+        设置条目(等价于add_or_set事件)
+
+        Args:
+            panel (str): 面板类型 ('stack_msg_top' | 'stack_msg_bottom')
+            key (str): 条目键
+            value (unicode): 显示文本
+            border (bool): 是否显示边框
+        """
+        entries = self.panels.get(panel)
+        if entries is None:
+            entries = self.panels[panel] = {}
+
+        state = (value, border)
+        if not self.full and entries.get(key) == state:
+            self.owner.suppressed_events += 1
+            return
+
+        entries[key] = state
+        event = {'event': 'add_or_set', 'key': key, 'value': value}
+        if border:
+            event['border'] = True
+        self._append(panel, event)
+
+    def remove(self, panel, key):
+        """
+        移除条目(等价于remove事件)
+
+        Args:
+            panel (str): 面板类型
+            key (str): 条目键
+        """
+        entries = self.panels.get(panel)
+        if not entries or key not in entries:
+            if not self.full:
+                self.owner.suppressed_events += 1
+                return
+        else:
+            del entries[key]
+        self._append(panel, {'event': 'remove', 'key': key})
+
+    def build(self):
+        """
+        生成批量数据包
+
+        Returns:
+            dict: {'type': 'stack_msg_batch', 'panels': {panel: [event, ...]}},无变化时返回None
+        """
+        if not self.changes:
+            return None
+
+        self.owner.sent_packets += 1
+        return {
+            'type': HUD_BATCH_TYPE,
+            'panels': self.changes
+        }
+
+    def _append(self, panel, event):
+        """记录一个变化事件"""
+        self.owner.sent_events += 1
+        events = self.changes.get(panel)
+        if events is None:
+            events = self.changes[panel] = []
+        events.append(event)
@@ -0,0 +1,396 @@
+# -*- coding: utf-8 -*-
+"""
+InventoryMirror - 玩家背包镜像缓存
+
+功能:
+- 为每个玩家缓存背包物品数量(按物品统计 + 按槽位记录)
+- 第一次读取时通过一次GetPlayerAllItems懒加载,替代逐槽位GetPlayerItem
+- 由背包变化/拾取/购买/重生/离线事件驱动失效,不做轮询
+- 扣除货币时写穿(write-through)更新镜像,购买后无需重新读取
+  (写穿后引擎触发的背包变化事件与镜像槽位一致时不失效)
+- 一致性检查模式: 每次读取都与引擎实际背包对比,用于测试
+
+使用方法:
+    from Script_NeteaseMod.systems.util.InventoryMirror import get_inventory_mirror
+
+    mirror = get_inventory_mirror()
+    count = mirror.get_item_count(player_id, 'minecraft:iron_ingot')
+
+    # BedWarsGameSystem.Create中注册失效事件
+    mirror.register_events(system)
+
+说明:
+- 镜像只覆盖背包(INVENTORY)的36个槽位
+- 所有通过代码修改背包的地方,要么通过update_slot/load_items写穿,要么调用invalidate
+"""
+
+from __future__ import print_function
+
+import mod.server.extraServerApi as serverApi
+
+
+# 背包槽位数量
+INVENTORY_SLOT_COUNT = 36
+
+
+class InventoryMirror(object):
+    """
+    玩家背包镜像
+
+    数据结构:
+    - _counts: {player_id: {item_name: count}}
+    - _slots: {player_id: [(item_name, count), ...]}  槽位下标即背包槽位
+    """
+
+    def __init__(self):
+        """初始化背包镜像"""
+        self._counts = {}
+        self._slots = {}
+
+        # 一致性检查模式(测试用,每次读取都会额外查询引擎)
+        self.check_mode = False
+        self.mismatch_count = 0
+
+        # 已注册事件的系统
+        self._system = None
+
+        # 统计数据
+        self.load_count = 0  # 实际查询引擎的次数
+        self.hit_count = 0  # 命中镜像的次数
+        self.invalidate_count = 0  # 失效次数
+
+    # ========== 读取接口 ==========
+
+    def get_item_count(self, player_id, item_name):
+        """
+        获取玩家背包中指定物品的总数量
+
+        Args:
+            player_id (str): 玩家ID
+            item_name (str): 物品ID (如'minecraft:iron_ingot')
+
+        Returns:
+            int: 物品数量
+        """
+        return self._get_counts(player_id).get(item_name, 0)
+
+    def get_counts(self, player_id, item_names=None):
+        """
+        批量获取玩家背包物品数量
+
+        Args:
+            player_id (str): 玩家ID
+            item_names (list): 物品ID列表,为None时返回所有物品
+
+        Returns:
+            dict: {item_name: count}
+        """
+        counts = self._get_counts(player_id)
+        if item_names is None:
+            return dict(counts)
+        return dict((name, counts.get(name, 0)) for name in item_names)
+
+    def get_item_slots(self, player_id, item_name):
+        """
+        获取指定物品所在的槽位及数量
+
+        Args:
+            player_id (str): 玩家ID
+            item_name (str): 物品ID
+
+        Returns:
+            list: [(slot, count), ...] 按槽位升序
+        """
+        self._get_counts(player_id)
+        slots = self._slots.get(player_id, [])
+        return [(slot, count) for slot, (name, count) in enumerate(slots)
+                if name == item_name and count > 0]
+
+    # ========== 写入接口 ==========
+
+    def update_slot(self, player_id, slot, count):
+        """
+        写穿更新槽位数量(调用方已修改引擎背包)
+
+        Args:
+            player_id (str): 玩家ID
+            slot (int): 槽位
+            count (int): 新数量
+        """
+        slots = self._slots.get(player_id)
+        if slots is None or slot < 0 or slot >= len(slots):
+            return
+
+        item_name, old_count = slots[slot]
+        if item_name is None:
+            # 空槽位无法推断物品,直接失效
+            self.invalidate(player_id)
+            return
+
+        counts = self._counts[player_id]
+        counts[item_name] = counts.get(item_name, 0) - old_count + count
+        if counts[item_name] <= 0:
+            del counts[item_name]
+        slots[slot] = (item_name, count) if count > 0 else (None, 0)
+
+    def load_items(self, player_id, inv_items):
+        """
+        用调用方已读取/已写入的完整背包替换镜像(写穿,无需重新查询引擎)
+
+        Args:
+            player_id (str): 玩家ID
+            inv_items (list): 背包槽位物品字典列表(与GetPlayerAllItems格式一致)
+        """
+        counts, slots = self._build(inv_items)
+        self._counts[player_id] = counts
+        self._slots[player_id] = slots
+
+    def invalidate(self, player_id=None):
+        """
+        使镜像失效,下次读取时重新加载
+
+        Args:
+            player_id (str): 玩家ID,为None时使所有玩家失效
+        """
+        self.invalidate_count += 1
+        if player_id is None:
+            self._counts = {}
+            self._slots = {}
+            return
+        self._counts.pop(player_id, None)
+        self._slots.pop(player_id, None)
+
+    # ========== 一致性检查 ==========
+
+    def set_check_mode(self, enabled):
+        """
+        开启/关闭一致性检查模式
+
+        Args:
+            enabled (bool): 是否开启
+        """
+        self.check_mode = bool(enabled)
+        self.mismatch_count = 0
+
+    def verify(self, player_id):
+        """
+        对比镜像与引擎实际背包
+
+        Args:
+            player_id (str): 玩家ID
+
+        Returns:
+            dict: 不一致的物品 {item_name: (mirror_count, actual_count)},一致时为空
+        """
+        mirror_counts = self._counts.get(player_id)
+        if mirror_counts is None:
+            return {}
+
+        try:
+            actual_counts, _ = self._load(player_id)
+        except Exception as e:
+            print("[ERROR] [InventoryMirror] 一致性检查读取背包失败: player={}, error={}".format(
+                player_id, str(e)))
+            return {}
+        mismatches = {}
+        for item_name in set(mirror_counts.keys()) | set(actual_counts.keys()):
+            mirror_count = mirror_counts.get(item_name, 0)
+            actual_count = actual_counts.get(item_name, 0)
+            if mirror_count != actual_count:
+                mismatches[item_name] = (mirror_count, actual_count)
+        return mismatches
+
+    # ========== 事件注册 ==========
+
+    def register_events(self, system):
+        """
+        在指定ServerSystem上注册失效事件
+
+        Args:
+            system: ServerSystem实例(BedWarsGameSystem)
+        """
+        if self._system is not None:
+            return
+        self._system = system
+        for event_name, callback in self._get_event_handlers():
+            system.ListenForEvent(
+                serverApi.GetEngineNamespace(),
+                serverApi.GetEngineSystemName(),
+                event_name,
+                self,
+                callback
+            )
+        print("[INFO] [InventoryMirror] 已注册背包镜像失效事件")
+
+    def unregister_events(self):
+        """注销失效事件并清空镜像"""
+        if self._system is None:
+            return
+        for event_name, callback in self._get_event_handlers():
+            try:
+                self._system.UnListenForEvent(
+                    serverApi.GetEngineNamespace(),
+                    serverApi.GetEngineSystemName(),
+                    event_name,
+                    self,
+                    callback
+                )
+            except Exception as e:
+                print("[WARN] [InventoryMirror] 注销事件{}失败: {}".format(event_name, str(e)))
+        self._system = None
+        self.invalidate()
+
+    def get_stats(self):
+        """
+        获取统计信息
+
+        Returns:
+            dict: 统计数据
+        """
+        total = self.load_count + self.hit_count
+        return {
+            "cached_players": len(self._counts),
+            "load_count": self.load_count,
+            "hit_count": self.hit_count,
+            "invalidate_count": self.invalidate_count,
+            "mismatch_count": self.mismatch_count,
+            "hit_rate": float(self.hit_count) / total if total > 0 else 0.0
+        }
+
+    # ========== 事件处理 ==========
+
+    def _get_event_handlers(self):
+        """失效事件列表 [(事件名, 回调)]"""
+        return [
+            ('InventoryItemChangedServerEvent', self._on_inventory_changed),
+            ('ServerPlayerTryTouchEvent', self._on_try_touch),
+            ('PlayerRespawnFinishServerEvent', self._on_player_respawn),
+            ('DelServerPlayerEvent', self._on_del_server_player),
+        ]
+
+    def _on_inventory_changed(self, args):
+        """背包变化事件(变化后的槽位与镜像一致时不失效,例如购买写穿后的事件)"""
+        player_id = args.get('playerId')
+        slots = self._slots.get(player_id)
+        if slots is None:
+            return
+        slot = args.get('slot', -1)
+        if 0 <= slot < len(slots) and self._slot_entry(args.get('newItemDict')) == slots[slot]:
+            return
+        self.invalidate(player_id)
+
+    def _on_try_touch(self, args):
+        """拾取物品事件"""
+        self.invalidate(args.get('playerId'))
+
+    def _on_player_respawn(self, args):
+        """玩家重生事件"""
+        self.invalidate(args.get('playerId'))
+
+    def _on_del_server_player(self, args):
+        """玩家离线事件"""
+        self.invalidate(args.get('id'))
+
+    # ========== 内部方法 ==========
+
+    def _get_counts(self, player_id):
+        """
+        获取玩家物品统计,未缓存时从引擎加载
+
+        Args:
+            player_id (str): 玩家ID
+
+        Returns:
+            dict: {item_name: count}
+        """
+        counts = self._counts.get(player_id)
+        if counts is None:
+            try:
+                counts, slots = self._load(player_id)
+            except Exception as e:
+                # 读取失败不写入镜像,下次读取时重试
+                print("[ERROR] [InventoryMirror] 读取玩家背包失败: player={}, error={}".format(
+                    player_id, str(e)))
+                return {}
+            self._counts[player_id] = counts
+            self._slots[player_id] = slots
+            return counts
+
+        self.hit_count += 1
+        if self.check_mode:
+            mismatches = self.verify(player_id)
+            if mismatches:
+                self.mismatch_count += 1
+                print("[WARN] [InventoryMirror] 镜像与背包不一致: player={}, mismatches={}".format(
+                    player_id, mismatches))
+        return counts
+
+    def _load(self, player_id):
+        """
+        从引擎读取玩家背包
+
+        Args:
+            player_id (str): 玩家ID
+
+        Returns:
+            tuple: (counts, slots)
+        """
+        self.load_count += 1
+        comp_item = serverApi.GetEngineCompFactory().CreateItem(player_id)
+        inv_items = comp_item.GetPlayerAllItems(
+            serverApi.GetMinecraftEnum().ItemPosType.INVENTORY
+        ) or []
+        return self._build(inv_items)
+
+    def _slot_entry(self, item_dict):
+        """
+        物品字典转换为槽位记录
+
+        Args:
+            item_dict (dict): 物品字典,空槽位为None
+
+        Returns:
+            tuple: (item_name, count),空槽位为(None, 0)
+        """
+        if not item_dict or item_dict.get('count', 0) <= 0:
+            return (None, 0)
+        item_name = item_dict.get('newItemName') or item_dict.get('itemName')
+        if not item_name or item_name == 'minecraft:air':
+            return (None, 0)
+        return (item_name, item_dict['count'])
+
+    def _build(self, inv_items):
+        """
+        从背包槽位列表统计物品数量
+
+        Args:
+            inv_items (list): 背包槽位物品字典列表
+
+        Returns:
+            tuple: (counts, slots)
+        """
+        counts = {}
+        slots = [(None, 0)] * INVENTORY_SLOT_COUNT
+
+        for slot, item_dict in enumerate(inv_items[:INVENTORY_SLOT_COUNT]):
+            entry = self._slot_entry(item_dict)
+            if entry[0] is None:
+                continue
+            counts[entry[0]] = counts.get(entry[0], 0) + entry[1]
+            slots[slot] = entry
+
+        return counts, slots
+
+
+# 全局背包镜像(CurrencyManager为静态方法,需要模块级共享实例)
+_inventory_mirror = InventoryMirror()
+
+
+def get_inventory_mirror():
+    """
+    获取全局背包镜像
+
+    Returns:
+        InventoryMirror: 背包镜像实例
+    """
+    return _inventory_mirror
@@ -0,0 +1,411 @@
+# -*- coding: utf-8 -*-
+"""
+MapSnapshot - 地图快照(快照模式的地图重置)
+
+功能:
+- 在load_range内按区段(SECTION_SIZE立方)抓取方块调色板,每张地图只抓取一次
+- 快照经marshal序列化、zlib压缩后写入关卡ExtraData(随存档落盘),之后的对局直接复用
+- 重置时根据变更记录(放置)与破坏记录求出脏区段,用SetBlockByBlockPalette整段写回
+- 待还原数量超过FULL_RESET_THRESHOLD时直接重置全部区段,耗时与对局的破坏程度无关
+
+使用方法:
+    snapshot = MapSnapshot(dimension, "dim_9008", load_range)
+    if not snapshot.load_meta():
+        snapshot.capture(backup, callback)  # 开局前协程分批抓取,完成后写入ExtraData
+
+    snapshot.mark_dirty(pos)  # 玩家破坏方块
+    snapshot.restore(backup, callback, progress_callback)
+
+说明:
+- 抓取与还原复用DimensionBackup的批次协程(逐批加载区块、每Tick预算),期间is_restoring为True
+- 抓取在副本开局前进行(DimensionPool);抓取期间有区段在抓取前被破坏时不保存快照
+- 抓取失败的区段不会写入快照,此时快照不可用,DimensionBackupHandler退回逐方块还原
+- 还原失败的区段内的放置记录交给逐方块还原兜底
+- 快照中出现的方块名称随快照信息保存,并登记到爆炸抗性表(ExplosionResistanceRegistry)
+"""
+
+import base64
+import marshal
+import mod.server.extraServerApi as serverApi
+from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
+from Script_NeteaseMod.systems.util.DimensionBackup import RestoreTask, group_by_wave
+
+try:
+    import zlib
+except ImportError:
+    zlib = None
+
+# 区段边长(方块)
+SECTION_SIZE = 16
+# 快照格式版本(格式变化时旧快照自动失效并重新抓取)
+SNAPSHOT_VERSION = 1
+# 关卡ExtraData键前缀
+SNAPSHOT_KEY_PREFIX = "bedwars_map_snapshot_"
+# 每Tick抓取/还原的区段数
+CAPTURE_SECTIONS_PER_TICK = 8
+RESTORE_SECTIONS_PER_TICK = 8
+# 待还原方块数(放置+破坏)超过该值时重置全部区段
+FULL_RESET_THRESHOLD = 4096
+# zlib压缩等级
+COMPRESS_LEVEL = 6
+
+
+def get_palette_block_names(palette):
+    """
+    获取调色板中出现的方块名称
+
+    Args:
+        palette: GetBlockPaletteBetweenPos返回的调色板
+
+    Returns:
+        set: 方块名称集合
+    """
+    get_count_dict = getattr(palette, 'GetBlockCountDict', None)
+    if get_count_dict is None:
+        return set()
+    names = set()
+    for key in (get_count_dict() or {}):
+        name = key[0] if isinstance(key, tuple) else key
+        if name:
+            names.add(name)
+    return names
+
+
+def register_block_names(names):
+    """
+    把方块名称登记到爆炸抗性表
+
+    Args:
+        names (iterable): 方块名称
+    """
+    if not names:
+        return
+    try:
+        from Script_NeteaseMod.systems.util.ExplosionResistanceRegistry import get_explosion_resistance_registry
+        registry = get_explosion_resistance_registry()
+        registry.register_block_names(names)
+        registry.save()
+    except Exception as e:
+        print("[WARN] [MapSnapshot] 登记爆炸抗性失败: {}".format(str(e)))
+
+
+class MapSnapshot(object):
+    """
+    地图快照
+
+    数据结构:
+    - dirty_sections: set((x, y, z)) 有方块被破坏的区段原点
+    - _sections: {(x, y, z): 序列化的调色板} 仅在抓取/还原期间驻留内存
+    """
+
+    def __init__(self, dimension, identifier, load_range):
+        """
+        初始化地图快照
+
+        Args:
+            dimension (int): 维度ID
+            identifier (str): 地图标识(ExtraData键的一部分)
+            load_range (tuple): ((min_x, min_y, min_z), (max_x, max_y, max_z))
+        """
+        self.dimension = dimension
+        self.identifier = identifier
+        self.load_range = (tuple(load_range[0]), tuple(load_range[1]))
+        self.ready = False  # 快照是否可用
+        self.is_capturing = False
+        self.dirty_sections = set()
+        self.meta = None
+        self.last_restore_mode = None  # 'full' / 'dirty'
+
+        self._sections = None
+        self._failed_sections = []
+        self._tainted_sections = set()  # 抓取期间在抓取前被破坏的区段
+        self._block_names = set()
+
+    # ========== 区段 ==========
+
+    def get_section_origin(self, pos):
+        """
+        获取坐标所在区段的原点
+
+        Returns:
+            tuple: 区段原点,不在load_range内时返回None
+        """
+        min_pos, max_pos = self.load_range
+        origin = []
+        for axis in range(3):
+            value = int(pos[axis])
+            if value < min_pos[axis] or value > max_pos[axis]:
+                return None
+            origin.append(min_pos[axis] + (value - min_pos[axis]) // SECTION_SIZE * SECTION_SIZE)
+        return tuple(origin)
+
+    def get_all_sections(self):
+        """
+        获取load_range内全部区段原点
+
+        Returns:
+            list: [(x, y, z), ...]
+        """
+        min_pos, max_pos = self.load_range
+        return [(x, y, z)
+                for x in range(min_pos[0], max_pos[0] + 1, SECTION_SIZE)
+                for y in range(min_pos[1], max_pos[1] + 1, SECTION_SIZE)
+                for z in range(min_pos[2], max_pos[2] + 1, SECTION_SIZE)]
+
+    def _get_section_end(self, origin):
+        max_pos = self.load_range[1]
+        return tuple(min(origin[axis] + SECTION_SIZE - 1, max_pos[axis]) for axis in range(3))
+
+    def mark_dirty(self, pos):
+        """
+        记录被破坏的方块(逐方块还原无法恢复,快照还原时整段写回)
+
+        Args:
+            pos (tuple): 方块坐标
+        """
+        origin = self.get_section_origin(pos)
+        if origin is None:
+            return
+        self.dirty_sections.add(origin)
+        if self.is_capturing and self._sections is not None and origin not in self._sections:
+            self._tainted_sections.add(origin)
+
+    def get_restore_sections(self, journal):
+        """
+        计算需要还原的区段
+
+        Args:
+            journal (BlockChangeJournal): 方块变更记录
+
+        Returns:
+            tuple: (区段原点列表, 是否全部重置)
+        """
+        sections = set(self.dirty_sections)
+        pending = 0
+        for pos in journal.iter_pending():
+            pending += 1
+            origin = self.get_section_origin(pos)
+            if origin is not None:
+                sections.add(origin)
+        if pending + len(self.dirty_sections) >= FULL_RESET_THRESHOLD:
+            return self.get_all_sections(), True
+        return sorted(sections), False
+
+    # ========== 抓取 ==========
+
+    def capture(self, backup, callback=None):
+        """
+        协程分批抓取快照,完成后写入ExtraData
+
+        Args:
+            backup (DimensionBackup): 提供批次协程的备份实例
+            callback (function): 完成回调callback(success)
+        """
+        self.ready = False
+        self.is_capturing = True
+        self._sections = {}
+        self._failed_sections = []
+        self._tainted_sections = set()
+        self._block_names = set()
+        sections = self.get_all_sections()
+        print("[INFO] [MapSnapshot] 开始抓取地图快照 dimension={} 区段数: {}".format(self.dimension, len(sections)))
+
+        def on_end(task):
+            self.is_capturing = False
+            if backup.get_restore_task() is not task:
+                # 抓取被clear_all中断
+                self._sections = None
+                return
+            success = not self._failed_sections and not self._tainted_sections and self._save()
+            if not success:
+                print("[WARN] [MapSnapshot] 快照不可用 dimension={} 失败区段数: {} 抓取前被破坏的区段数: {}".format(
+                    self.dimension, len(self._failed_sections), len(self._tainted_sections)
+                ))
+            self._sections = None
+            backup.finish_task()
+            if callback:
+                callback(success)
+
+        task = RestoreTask(group_by_wave(sections), None, None, self._capture_section, self._on_section_failed,
+                           backup.budget_ms, CAPTURE_SECTIONS_PER_TICK)
+        backup.start_task(task, on_end)
+
+    def _capture_section(self, origin, task):
+        block_comp = get_component_cache().CreateBlock(serverApi.GetLevelId())
+        palette = block_comp.GetBlockPaletteBetweenPos(self.dimension, origin, self._get_section_end(origin))
+        if palette is None:
+            self._on_section_failed(origin, task)
+            return
+        self._sections[origin] = palette.SerializeBlockPalette()
+        self._block_names.update(get_palette_block_names(palette))
+        task.restored += 1
+
+    def _on_section_failed(self, origin, task):
+        self._failed_sections.append(origin)
+        task.defer()
+
+    # ========== 存储 ==========
+
+    def _get_keys(self):
+        prefix = SNAPSHOT_KEY_PREFIX + self.identifier
+        return prefix + "_meta", prefix + "_data"
+
+    def _save(self):
+        """
+        压缩并写入ExtraData
+
+        Returns:
+            bool: 是否成功
+        """
+        try:
+            blob = marshal.dumps(self._sections)
+            raw_size = len(blob)
+            if zlib is not None:
+                blob = zlib.compress(blob, COMPRESS_LEVEL)
+            meta = {
+                'version': SNAPSHOT_VERSION,
+                'range': [list(self.load_range[0]), list(self.load_range[1])],
+                'section_size': SECTION_SIZE,
+                'section_count': len(self._sections),
+                'compressed': zlib is not None,
+                'raw_bytes': raw_size,
+                'bytes': len(blob),
+                'block_names': sorted(self._block_names),
+            }
+            meta_key, data_key = self._get_keys()
+            extra_comp = get_component_cache().CreateExtraData(serverApi.GetLevelId())
+            extra_comp.SetExtraData(data_key, base64.b64encode(blob))
+            extra_comp.SetExtraData(meta_key, meta)
+            extra_comp.SaveExtraData()
+        except Exception as e:
+            print("[ERROR] [MapSnapshot] 保存快照失败: {}".format(str(e)))
+            return False
+
+        self.meta = meta
+        self.ready = True
+        register_block_names(self._block_names)
+        print("[INFO] [MapSnapshot] 快照已保存 dimension={} 区段数: {} 大小: {}KB (压缩前{}KB)".format(
+            self.dimension, meta['section_count'], meta['bytes'] // 1024, raw_size // 1024
+        ))
+        return True
+
+    def load_meta(self):
+        """
+        读取ExtraData中的快照信息,版本与范围一致时快照可用
+
+        Returns:
+            bool: 快照是否可用
+        """
+        meta_key, _ = self._get_keys()
+        extra_comp = get_component_cache().CreateExtraData(serverApi.GetLevelId())
+        meta = extra_comp.GetExtraData(meta_key)
+        expected_range = [list(self.load_range[0]), list(self.load_range[1])]
+        self.ready = bool(meta) and meta.get('version') == SNAPSHOT_VERSION and \
+            meta.get('section_size') == SECTION_SIZE and \
+            [list(pos) for pos in meta.get('range', [])] == expected_range
+        self.meta = meta if self.ready else None
+        if self.ready:
+            register_block_names(meta.get('block_names'))
+        return self.ready
+
+    def _load_sections(self):
+        """
+        读取并解压快照数据
+
+        Returns:
+            dict: {区段原点: 序列化的调色板},失败返回None
+        """
+        _, data_key = self._get_keys()
+        try:
+            extra_comp = get_component_cache().CreateExtraData(serverApi.GetLevelId())
+            blob = base64.b64decode(extra_comp.GetExtraData(data_key))
+            if self.meta.get('compressed'):
+                blob = zlib.decompress(blob)
+            return marshal.loads(blob)
+        except Exception as e:
+            print("[ERROR] [MapSnapshot] 读取快照失败: {}".format(str(e)))
+            return None
+
+    # ========== 还原 ==========
+
+    def restore(self, backup, callback=None, progress_callback=None):
+        """
+        按区段还原地图
+
+        Args:
+            backup (DimensionBackup): 备份实例(提供变更记录与批次协程)
+            callback (function): 还原完成回调
+            progress_callback (function): 进度回调
+        """
+        sections = self._load_sections() if self.ready else None
+        if sections is None:
+            print("[WARN] [MapSnapshot] 快照不可用,改为逐方块还原 dimension={}".format(self.dimension))
+            backup.restore_map_by_set_block(callback, progress_callback)
+            return
+
+        origins, is_full = self.get_restore_sections(backup.block_changes)
+        self.last_restore_mode = 'full' if is_full else 'dirty'
+        self._sections = sections
+        self._failed_sections = []
+        print("[INFO] [MapSnapshot] 快照还原启动 dimension={} 模式: {} 区段数: {}".format(
+            self.dimension, self.last_restore_mode, len(origins)
+        ))
+
+        task = RestoreTask(group_by_wave(origins), callback, progress_callback,
+                           self._restore_section, self._on_section_failed,
+                           backup.budget_ms, RESTORE_SECTIONS_PER_TICK)
+        backup.start_task(task, lambda finished_task: self._on_restore_end(backup, finished_task))
+
+    def _restore_section(self, origin, task):
+        data = self._sections.get(origin)
+        if data is None:
+            self._on_section_failed(origin, task)
+            return
+        block_comp = get_component_cache().CreateBlock(serverApi.GetLevelId())
+        palette = block_comp.GetBlankBlockPalette()
+        if palette is None or not palette.DeserializeBlockPalette(data) or \
+                not block_comp.SetBlockByBlockPalette(palette, self.dimension, origin, 0):
+            self._on_section_failed(origin, task)
+            return
+        task.restored += 1
+
+    def _on_restore_end(self, backup, task):
+        """快照还原结束: 清理记录,失败区段内的放置交给逐方块还原"""
+        if backup.get_restore_task() is not task:
+            return
+        self._sections = None
+        self.dirty_sections.clear()
+
+        journal = backup.block_changes
+        failed = set(self._failed_sections)
+        if not failed:
+            journal.clear()
+        else:
+            for pos in list(journal.iter_pending()):
+                if self.get_section_origin(pos) not in failed:
+                    journal.mark_restored(pos)
+
+        print("[INFO] [MapSnapshot] 快照还原结束 dimension={} 区段数: {} 失败: {} 用时{:.1f}秒".format(
+            self.dimension, task.total, len(failed), task.get_progress()['elapsed']
+        ))
+        backup.finish_task()
+        if failed:
+            backup.restore_map_by_set_block(task.callback, task.progress_callback)
+        elif task.callback:
+            task.callback()
+
+    def get_info(self):
+        """
+        获取快照信息
+
+        Returns:
+            dict: 快照状态
+        """
+        return {
+            'ready': self.ready,
+            'is_capturing': self.is_capturing,
+            'dirty_sections': len(self.dirty_sections),
+            'section_count': self.meta.get('section_count') if self.meta else 0,
+            'bytes': self.meta.get('bytes') if self.meta else 0,
+            'last_restore_mode': self.last_restore_mode,
+        }
@@ -7,6 +7,7 @@
 - Tick时间统计
 - 事件频率分析
 - 内存使用跟踪
+- 引擎API调用统计(挂载EngineApiAccounting后)
 - 自动生成性能报告
 """
 
@@ -24,6 +25,7 @@ class PerformanceMonitor:
     2. 启用监控: monitor.enable()
     3. 在Update中调用: monitor.on_tick_start() / monitor.on_tick_end()
     4. 记录事件: monitor.record_event(event_name, duration)
+    5. 引擎API统计: monitor.attach_api_accounting(get_engine_api_accounting())
     """
 
     def __init__(self, system):
@@ -59,6 +61,10 @@ class PerformanceMonitor:
         self.max_tick_time = 0
         self.min_tick_time = float('inf')
 
+        # ===== 引擎API统计 =====
+        self.api_accounting = None  # EngineApiAccounting实例
+        self.api_report_top_n = 10
+
     def enable(self):
         """启用性能监控"""
         self.enabled = True
@@ -71,6 +77,17 @@ class PerformanceMonitor:
         self.enabled = False
         print("[PerformanceMonitor] 性能监控已禁用")
 
+    def attach_api_accounting(self, accounting, top_n=10):
+        """
+        挂载引擎API调用统计,定期报告中输出API/调用点排行
+
+        Args:
+            accounting (EngineApiAccounting): 统计实例
+            top_n (int): 报告中每个排行的条目数
+        """
+        self.api_accounting = accounting
+        self.api_report_top_n = top_n
+
     def on_tick_start(self):
         """
         Tick开始时调用
@@ -94,6 +111,8 @@ class PerformanceMonitor:
         tick_duration = time.time() - self.tick_start_time
         self.tick_times.append(tick_duration)
         self.total_ticks += 1
+        if self.api_accounting is not None:
+            self.api_accounting.next_tick()
 
         # 更新最大最小值
         if tick_duration > self.max_tick_time:
@@ -251,6 +270,8 @@ class PerformanceMonitor:
             "memory": self._build_memory_report(),
             "health": self._evaluate_health(avg_tps)
         }
+        if self.api_accounting is not None:
+            report["engine_api"] = self.api_accounting.build_report(self.api_report_top_n)
 
         # 输出报告
         self._output_report(report)
@@ -373,11 +394,41 @@ class PerformanceMonitor:
                     i, event_name, data['count'], data['avg_time_ms']
                 ))
 
+        # 输出引擎API统计
+        if report.get('engine_api'):
+            self._output_api_report(report['engine_api'])
+
         print("=" * 60)
 
         # 保存到文件
         self._save_report_to_file(report)
 
+    def _output_api_report(self, api_report):
+        """
+        输出引擎API统计
+
+        Args:
+            api_report (dict): EngineApiAccounting.build_report()的结果
+        """
+        print("\n引擎API调用: 共{}次".format(api_report['total_calls']))
+        for row in api_report['apis']:
+            print("  {} - {}次 | 总计{:.2f}ms | 平均{:.1f}us | p99<{}us".format(
+                row['api'], row['calls'], row['total_ms'], row['mean_us'], row['p99_us']
+            ))
+        if api_report['sites']:
+            print("\n调用最多的调用点:")
+            for row in api_report['sites']:
+                print("  {} ({}) {} - {}次{}".format(
+                    row['site'], row['function'], row['api'], row['calls'],
+                    " [循环]" if row['in_loop'] else ""
+                ))
+        if api_report['loop_sites']:
+            print("\n循环内调用(按单Tick最大调用次数):")
+            for row in api_report['loop_sites']:
+                print("  {} ({}) {} - 单Tick最多{}次 | 共{}次".format(
+                    row['site'], row['function'], row['api'], row['max_tick_calls'], row['calls']
+                ))
+
     def _save_report_to_file(self, report):
         """
         保存报告到文件
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+PlayerStateSnapshot - 每Tick玩家状态快照
+
+功能:
+- 每Tick为每个玩家最多查询一次引擎(位置/维度/游戏模式/生命值)
+- 供BedWarsGameSystem的各个子更新器共享(虚空检测、治疗池、陷阱、AI系统)
+- 提供显式失效接口(传送、切换游戏模式、离线后调用)
+- 统计节省的引擎调用次数
+
+使用方法:
+    snapshot = PlayerStateSnapshot(game_system)
+
+    # 每Tick开始时(BedWarsGameSystem.Update)
+    snapshot.begin_tick()
+
+    # 各子系统读取
+    pos = snapshot.get_foot_pos(player_id)
+
+    # 玩家状态被主动修改后
+    snapshot.invalidate(player_id)
+
+说明:
+- 字段按需懒加载: 本Tick第一次读取时查询引擎,之后直接返回缓存值
+- 引擎查询失败时缓存None,本Tick内不会重复查询
+"""
+
+import mod.server.extraServerApi as serverApi
+from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
+
+
+# 快照字段名
+FIELD_FOOT_POS = 'foot_pos'
+FIELD_DIMENSION = 'dimension'
+FIELD_GAME_TYPE = 'game_type'
+FIELD_HEALTH = 'health'
+
+
+class PlayerStateSnapshot(object):
+    """
+    Tick级玩家状态快照
+
+    快照数据只在当前Tick有效,begin_tick()会清空所有缓存
+    """
+
+    def __init__(self, game_system):
+        """
+        初始化玩家状态快照
+
+        Args:
+            game_system: BedWarsGameSystem实例
+        """
+        self.game_system = game_system
+        self.comp_factory = get_component_cache()
+
+        # 当前Tick序号
+        self.tick_id = 0
+
+        # 快照版本号(每次新Tick或失效时递增,供派生缓存如空间索引判断是否需要重建)
+        self.version = 0
+
+        # 快照数据 {player_id: {field: value}}
+        self._states = {}
+
+        # 统计数据
+        self.engine_calls = 0  # 实际发生的引擎查询次数
+        self.saved_calls = 0  # 命中快照而节省的引擎查询次数
+
+        # 字段加载器 {field: loader(player_id)}
+        self._loaders = {
+            FIELD_FOOT_POS: self._load_foot_pos,
+            FIELD_DIMENSION: self._load_dimension,
+            FIELD_GAME_TYPE: self._load_game_type,
+            FIELD_HEALTH: self._load_health,
+        }
+
+    # ========== Tick生命周期 ==========
+
+    def begin_tick(self):
+        """开始新的Tick,丢弃上一Tick的全部快照"""
+        self.tick_id += 1
+        self.version += 1
+        if self._states:
+            self._states = {}
+
+    # ========== 失效接口 ==========
+
+    def invalidate(self, player_id=None, field=None):
+        """
+        使快照失效
+
+        Args:
+            player_id (str): 玩家ID,为None时使所有玩家失效
+            field (str): 字段名,为None时使该玩家的所有字段失效
+        """
+        self.version += 1
+        if player_id is None:
+            self._states = {}
+            return
+
+        state = self._states.get(player_id)
+        if state is None:
+            return
+
+        if field is None:
+            del self._states[player_id]
+        else:
+            state.pop(field, None)
+
+    def invalidate_all(self):
+        """使所有玩家快照失效"""
+        self.version += 1
+        self._states = {}
+
+    # ========== 读取接口 ==========
+
+    def get_foot_pos(self, player_id):
+        """
+        获取玩家脚部位置
+
+        Args:
+            player_id (str): 玩家ID
+
+        Returns:
+            tuple: 位置 (x, y, z),获取失败返回None
+        """
+        return self._get(player_id, FIELD_FOOT_POS)
+
+    def get_dimension(self, player_id):
+        """
+        获取玩家所在维度
+
+        Args:
+            player_id (str): 玩家ID
+
+        Returns:
+            int: 维度ID,获取失败返回None
+        """
+        return self._get(player_id, FIELD_DIMENSION)
+
+    def get_game_type(self, player_id):
+        """
+        获取玩家游戏模式
+
+        Args:
+            player_id (str): 玩家ID
+
+        Returns:
+            int: GameType枚举值,获取失败返回None
+        """
+        return self._get(player_id, FIELD_GAME_TYPE)
+
+    def get_health(self, player_id):
+        """
+        获取玩家生命值
+
+        Args:
+            player_id (str): 玩家ID
+
+        Returns:
+            float: 生命值,获取失败返回None
+        """
+        return self._get(player_id, FIELD_HEALTH)
+
+    def is_alive(self, player_id):
+        """
+        判断玩家是否存活(生命值大于0)
+
+        Args:
+            player_id (str): 玩家ID
+
+        Returns:
+            bool: 是否存活
+        """
+        health = self.get_health(player_id)
+        return health is not None and health > 0
+
+    def is_respawning(self, player_id):
+        """
+        判断玩家是否处于复活倒计时中(读取游戏系统数据,不产生引擎调用)
+
+        Args:
+            player_id (str): 玩家ID
+
+        Returns:
+            bool: 是否正在复活
+        """
+        respawning = getattr(self.game_system, 'respawning', None)
+        return bool(respawning) and player_id in respawning
+
+    def is_eliminated(self, player_id):
+        """
+        判断玩家是否已被淘汰(读取游戏系统数据,不产生引擎调用)
+
+        Args:
+            player_id (str): 玩家ID
+
+        Returns:
+            bool: 是否已淘汰
+        """
+        eliminated = getattr(self.game_system, 'eliminated_players', None)
+        return bool(eliminated) and player_id in eliminated
+
+    def is_spectator(self, player_id):
+        """
+        判断玩家是否为旁观模式
+
+        Args:
+            player_id (str): 玩家ID
+
+        Returns:
+            bool: 是否为旁观者
+        """
+        game_type = self.get_game_type(player_id)
+        return game_type is not None and game_type == serverApi.GetMinecraftEnum().GameType.Spectator
+
+    def get_state(self, player_id):
+        """
+        获取玩家完整快照
+
+        Args:
+            player_id (str): 玩家ID
+
+        Returns:
+            dict: {
+                'foot_pos': tuple, 'dimension': int, 'game_type': int,
+                'health': float, 'alive': bool, 'respawning': bool
+            }
+        """
+        return {
+            FIELD_FOOT_POS: self.get_foot_pos(player_id),
+            FIELD_DIMENSION: self.get_dimension(player_id),
+            FIELD_GAME_TYPE: self.get_game_type(player_id),
+            FIELD_HEALTH: self.get_health(player_id),
+            'alive': self.is_alive(player_id),
+            'respawning': self.is_respawning(player_id),
+        }
+
+    def get_stats(self):
+        """
+        获取统计信息
+
+        Returns:
+            dict: 统计数据
+        """
+        total = self.engine_calls + self.saved_calls
+        return {
+            "tick_id": self.tick_id,
+            "cached_players": len(self._states),
+            "engine_calls": self.engine_calls,
+            "saved_calls": self.saved_calls,
+            "hit_rate": float(self.saved_calls) / total if total > 0 else 0.0
+        }
+
+    def reset_stats(self):
+        """重置统计计数"""
+        self.engine_calls = 0
+        self.saved_calls = 0
+
+    # ========== 内部方法 ==========
+
+    def _get(self, player_id, field):
+        """
+        读取快照字段,未命中时查询引擎并写入快照
+
+        Args:
+            player_id (str): 玩家ID
+            field (str): 字段名
+
+        Returns:
+            object: 字段值
+        """
+        state = self._states.get(player_id)
+        if state is None:
+            state = {}
+            self._states[player_id] = state
+        elif field in state:
+            self.saved_calls += 1
+            return state[field]
+
+        self.engine_calls += 1
+        try:
+            value = self._loaders[field](player_id)
+        except Exception:
+            value = None
+        state[field] = value
+        return value
+
+    def _load_foot_pos(self, player_id):
+        """查询玩家脚部位置"""
+        return self.comp_factory.CreatePos(player_id).GetFootPos()
+
+    def _load_dimension(self, player_id):
+        """查询玩家维度"""
+        return self.comp_factory.CreateDimension(player_id).GetPlayerDimensionId()
+
+    def _load_game_type(self, player_id):
+        """查询玩家游戏模式"""
+        comp_game = self.comp_factory.CreateGame(serverApi.GetLevelId())
+        return comp_game.GetPlayerGameType(player_id)
+
+    def _load_health(self, player_id):
+        """查询玩家生命值"""
+        attr_comp = self.comp_factory.CreateAttr(player_id)
+        return attr_comp.GetAttrValue(serverApi.GetMinecraftEnum().AttrType.HEALTH)
@@ -10,6 +10,8 @@ RoomConfigLoader - 房间配置加载器
 注意: 从JSON迁移到Python配置,避免文件系统路径问题
 """
 
+from .DimensionPool import get_stage_dimensions
+
 
 class RoomConfigLoader(object):
     """房间配置加载器 - 使用Python模块导入"""
@@ -145,14 +147,14 @@ class RoomConfigLoader(object):
         根据维度ID获取地图配置
 
         Args:
-            dimension_id (int): 维度ID
+            dimension_id (int): 维度ID(map_dimension或map_dimensions中的副本维度)
 
         Returns:
             dict: 地图配置,如果不存在返回None
         """
         stages = self.get_stages()
         for stage in stages:
-            if stage.get('map_dimension') == dimension_id:
+            if dimension_id in get_stage_dimensions(stage):
                 return stage
         return None
 
@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+"""
+SpatialIndex - 均匀网格空间索引
+
+功能:
+- SpatialGrid: 按维度划分、按区块(16x16水平格子)分桶的通用空间索引
+  支持插入/移动/移除、半径查询、方形区域查询、K近邻查询、按标签(队伍)过滤
+- PlayerSpatialIndex: 对局内玩家索引,数据来源于PlayerStateSnapshot
+  快照版本变化(新Tick/失效)后在第一次查询时惰性重建
+
+使用方法:
+    index = PlayerSpatialIndex(game_system)
+
+    # 半径查询(只返回指定队伍)
+    for player_id, dist_sq in index.query_radius(dim, pos, 8, tag=team_id):
+        pass
+
+    # 最近的敌人(排除本队)
+    result = index.nearest(dim, pos, k=1, exclude_tag=team_id)
+
+说明:
+- 格子只在水平面(x, z)上划分,起床地图高度跨度小,按区块分桶即可
+- 查询只访问与查询范围相交的格子,代价与范围内实体数相关,与总实体数无关
+"""
+
+import math
+
+
+def _distance_squared(pos1, pos2):
+    """计算两点间距离的平方"""
+    dx = pos1[0] - pos2[0]
+    dy = pos1[1] - pos2[1]
+    dz = pos1[2] - pos2[2]
+    return dx * dx + dy * dy + dz * dz
+
+
+class SpatialGrid(object):
+    """
+    按维度划分的均匀网格
+
+    数据结构:
+    - _cells: {dimension: {(cx, cz): {key: (pos, tag)}}}
+    - _entries: {key: (dimension, (cx, cz), pos, tag)}
+    """
+
+    def __init__(self, cell_size=16):
+        """
+        初始化网格
+
+        Args:
+            cell_size (int): 格子边长(默认16,与区块对齐)
+        """
+        self.cell_size = cell_size
+        self._cells = {}
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    # ========== 写入接口 ==========
+
+    def clear(self):
+        """清空索引"""
+        self._cells = {}
+        self._entries = {}
+
+    def insert(self, key, dimension, pos, tag=None):
+        """
+        插入或移动实体
+
+        Args:
+            key: 实体键(玩家ID/实体ID)
+            dimension (int): 维度ID
+            pos (tuple): 位置 (x, y, z)
+            tag: 标签(通常为队伍ID),用于过滤查询
+        """
+        cell = self._cell_of(pos)
+        old = self._entries.get(key)
+        if old is not None:
+            if old[0] == dimension and old[1] == cell:
+                # 同一格子内移动,只更新数据
+                self._cells[dimension][cell][key] = (pos, tag)
+                self._entries[key] = (dimension, cell, pos, tag)
+                return
+            self._remove_from_cell(key, old[0], old[1])
+
+        dim_cells = self._cells.get(dimension)
+        if dim_cells is None:
+            dim_cells = self._cells[dimension] = {}
+        bucket = dim_cells.get(cell)
+        if bucket is None:
+            bucket = dim_cells[cell] = {}
+        bucket[key] = (pos, tag)
+        self._entries[key] = (dimension, cell, pos, tag)
+
+    def remove(self, key):
+        """
+        移除实体
+
+        Args:
+            key: 实体键
+
+        Returns:
+            bool: 是否存在并被移除
+        """
+        old = self._entries.pop(key, None)
+        if old is None:
+            return False
+        self._remove_from_cell(key, old[0], old[1])
+        return True
+
+    def get(self, key):
+        """
+        获取实体数据
+
+        Args:
+            key: 实体键
+
+        Returns:
+            tuple: (dimension, pos, tag),不存在返回None
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return entry[0], entry[2], entry[3]
+
+    # ========== 查询接口 ==========
+
+    def query_radius(self, dimension, center, radius, tag=None, exclude_tag=None, inclusive=True):
+        """
+        半径查询
+
+        Args:
+            dimension (int): 维度ID
+            center (tuple): 中心位置 (x, y, z)
+            radius (float): 半径
+            tag: 只返回该标签的实体(None表示不过滤)
+            exclude_tag: 排除该标签的实体
+            inclusive (bool): True时距离等于半径也算在内(<=),False时严格小于(<)
+
+        Returns:
+            list: [(key, dist_sq), ...]
+        """
+        dim_cells = self._cells.get(dimension)
+        if not dim_cells or center is None:
+            return []
+
+        radius_sq = radius * radius
+        result = []
+        for bucket in self._buckets_in_range(dim_cells, center[0] - radius, center[2] - radius,
+                                             center[0] + radius, center[2] + radius):
+            for key, (pos, entry_tag) in bucket.items():
+                if tag is not None and entry_tag != tag:
+                    continue
+                if exclude_tag is not None and entry_tag == exclude_tag:
+                    continue
+                dist_sq = _distance_squared(pos, center)
+                if dist_sq < radius_sq or (inclusive and dist_sq == radius_sq):
+                    result.append((key, dist_sq))
+        return result
+
+    def query_box(self, dimension, min_pos, max_pos, tag=None, exclude_tag=None):
+        """
+        方形区域查询(包含边界,语义同GetEntitiesInSquareArea)
+
+        Args:
+            dimension (int): 维度ID
+            min_pos (tuple): 最小角 (x, y, z)
+            max_pos (tuple): 最大角 (x, y, z)
+            tag: 只返回该标签的实体
+            exclude_tag: 排除该标签的实体
+
+        Returns:
+            list: 实体键列表
+        """
+        dim_cells = self._cells.get(dimension)
+        if not dim_cells:
+            return []
+
+        result = []
+        for bucket in self._buckets_in_range(dim_cells, min_pos[0], min_pos[2], max_pos[0], max_pos[2]):
+            for key, (pos, entry_tag) in bucket.items():
+                if tag is not None and entry_tag != tag:
+                    continue
+                if exclude_tag is not None and entry_tag == exclude_tag:
+                    continue
+                if (min_pos[0] <= pos[0] <= max_pos[0] and
+                        min_pos[1] <= pos[1] <= max_pos[1] and
+                        min_pos[2] <= pos[2] <= max_pos[2]):
+                    result.append(key)
+        return result
+
+    def nearest(self, dimension, center, k=1, max_radius=None, tag=None, exclude_tag=None, predicate=None):
+        """
+        K近邻查询
+
+        从中心格子开始逐圈向外扩展,当已找到k个结果且其最远距离不超过
+        下一圈格子的最近可能距离时提前结束
+
+        Args:
+            dimension (int): 维度ID
+            center (tuple): 中心位置 (x, y, z)
+            k (int): 返回数量
+            max_radius (float): 最大搜索半径(None表示不限)
+            tag: 只返回该标签的实体
+            exclude_tag: 排除该标签的实体
+            predicate (callable): 额外过滤函数 predicate(key) -> bool
+
+        Returns:
+            list: 按距离升序排列的 [(key, dist_sq), ...]
+        """
+        dim_cells = self._cells.get(dimension)
+        if not dim_cells or center is None or k <= 0:
+            return []
+
+        cell_size = self.cell_size
+        ccx, ccz = self._cell_of(center)
+        max_radius_sq = max_radius * max_radius if max_radius is not None else None
+
+        # 最大圈数: 覆盖到最远的已占用格子(或max_radius)
+        max_ring = 0
+        for (cx, cz) in dim_cells:
+            ring = max(abs(cx - ccx), abs(cz - ccz))
+            if ring > max_ring:
+                max_ring = ring
+        if max_radius is not None:
+            max_ring = min(max_ring, int(math.ceil(float(max_radius) / cell_size)))
+
+        found = []
+        ring = 0
+        while ring <= max_ring:
+            for cell in self._ring_cells(ccx, ccz, ring):
+                bucket = dim_cells.get(cell)
+                if not bucket:
+                    continue
+                for key, (pos, entry_tag) in bucket.items():
+                    if tag is not None and entry_tag != tag:
+                        continue
+                    if exclude_tag is not None and entry_tag == exclude_tag:
+                        continue
+                    dist_sq = _distance_squared(pos, center)
+                    if max_radius_sq is not None and dist_sq > max_radius_sq:
+                        continue
+                    if predicate is not None and not predicate(key):
+                        continue
+                    found.append((key, dist_sq))
+
+            # 下一圈中的任意点与中心的水平距离至少为 ring * cell_size
+            if len(found) >= k:
+                found.sort(key=lambda item: item[1])
+                bound = ring * cell_size
+                if found[k - 1][1] <= bound * bound:
+                    return found[:k]
+            ring += 1
+
+        found.sort(key=lambda item: item[1])
+        return found[:k]
+
+    # ========== 内部方法 ==========
+
+    def _cell_of(self, pos):
+        """计算位置所在的格子坐标"""
+        size = self.cell_size
+        return int(math.floor(pos[0] / size)), int(math.floor(pos[2] / size))
+
+    def _remove_from_cell(self, key, dimension, cell):
+        """从格子中移除实体(并回收空格子)"""
+        dim_cells = self._cells.get(dimension)
+        if not dim_cells:
+            return
+        bucket = dim_cells.get(cell)
+        if bucket is None:
+            return
+        bucket.pop(key, None)
+        if not bucket:
+            del dim_cells[cell]
+            if not dim_cells:
+                del self._cells[dimension]
+
+    def _buckets_in_range(self, dim_cells, min_x, min_z, max_x, max_z):
+        """遍历与水平矩形相交的非空格子"""
+        size = self.cell_size
+        min_cx = int(math.floor(min_x / size))
+        max_cx = int(math.floor(max_x / size))
+        min_cz = int(math.floor(min_z / size))
+        max_cz = int(math.floor(max_z / size))
+
+        # 查询范围覆盖的格子数多于已占用格子数时,直接遍历已占用格子
+        if (max_cx - min_cx + 1) * (max_cz - min_cz + 1) > len(dim_cells):
+            for (cx, cz), bucket in dim_cells.items():
+                if min_cx <= cx <= max_cx and min_cz <= cz <= max_cz:
+                    yield bucket
+            return
+
+        for cx in range(min_cx, max_cx + 1):
+            for cz in range(min_cz, max_cz + 1):
+                bucket = dim_cells.get((cx, cz))
+                if bucket:
+                    yield bucket
+
+    @staticmethod
+    def _ring_cells(ccx, ccz, ring):
+        """生成与中心格子切比雪夫距离为ring的所有格子"""
+        if ring == 0:
+            yield (ccx, ccz)
+            return
+        for cx in range(ccx - ring, ccx + ring + 1):
+            yield (cx, ccz - ring)
+            yield (cx, ccz + ring)
+        for cz in range(ccz - ring + 1, ccz + ring):
+            yield (ccx - ring, cz)
+            yield (ccx + ring, cz)
+
+
+class PlayerSpatialIndex(object):
+    """
+    对局玩家空间索引
+
+    - 标签为玩家所在队伍ID
+    - 数据来自PlayerStateSnapshot,快照版本变化后惰性重建
+    """
+
+    def __init__(self, game_system, cell_size=16):
+        """
+        初始化玩家空间索引
+
+        Args:
+            game_system: BedWarsGameSystem实例
+            cell_size (int): 格子边长
+        """
+        self.game_system = game_system
+        self.grid = SpatialGrid(cell_size)
+        self._built_version = None  # 上次重建时的快照版本
+
+        # 统计数据
+        self.rebuild_count = 0
+        self.query_count = 0
+
+    def refresh(self):
+        """从玩家状态快照重建索引"""
+        game_system = self.game_system
+        snapshot = game_system.player_snapshot
+        self.grid.clear()
+        self._built_version = snapshot.version
+        self.rebuild_count += 1
+
+        team_module = game_system.team_module
+        if not team_module:
+            return
+
+        for team_id, players in team_module.get_all_team_players().items():
+            for player_id in players:
+                pos = snapshot.get_foot_pos(player_id)
+                if pos is None:
+                    continue
+                self.grid.insert(player_id, snapshot.get_dimension(player_id), pos, team_id)
+
+        # 重建本身读取快照不应使索引失效
+        self._built_version = snapshot.version
+
+    def invalidate(self):
+        """强制下次查询时重建索引"""
+        self._built_version = None
+
+    def query_radius(self, dimension, center, radius, tag=None, exclude_tag=None, inclusive=True):
+        """半径查询,参数见SpatialGrid.query_radius"""
+        self._ensure_fresh()
+        return self.grid.query_radius(dimension, center, radius, tag, exclude_tag, inclusive)
+
+    def query_box(self, dimension, min_pos, max_pos, tag=None, exclude_tag=None):
+        """方形区域查询,参数见SpatialGrid.query_box"""
+        self._ensure_fresh()
+        return self.grid.query_box(dimension, min_pos, max_pos, tag, exclude_tag)
+
+    def nearest(self, dimension, center, k=1, max_radius=None, tag=None, exclude_tag=None, predicate=None):
+        """K近邻查询,参数见SpatialGrid.nearest"""
+        self._ensure_fresh()
+        return self.grid.nearest(dimension, center, k, max_radius, tag, exclude_tag, predicate)
+
+    def get_stats(self):
+        """
+        获取统计信息
+
+        Returns:
+            dict: 统计数据
+        """
+        return {
+            "indexed_players": len(self.grid),
+            "rebuild_count": self.rebuild_count,
+            "query_count": self.query_count
+        }
+
+    def _ensure_fresh(self):
+        """快照版本变化时重建索引"""
+        self.query_count += 1
+        if self._built_version != self.game_system.player_snapshot.version:
+            self.refresh()
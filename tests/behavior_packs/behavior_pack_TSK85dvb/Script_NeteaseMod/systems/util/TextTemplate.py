@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+"""
+TextTemplate - 预编译文本模板
+
+功能:
+- 解析模板中的 {占位符} 一次,编译为片段列表
+- 颜色/图标占位符在编译时直接替换为常量文本,{var} 变量在渲染时填充
+- 编译结果保存在有界LRU缓存中,渲染只需一次join
+- 输出与旧版逐项str.replace实现逐字节一致(见tools/check_format_text.py)
+
+使用方法:
+    from Script_NeteaseMod.systems.util.TextTemplate import render_text
+
+    text = render_text(u"{icon-ec-time} {red}{name}", name=u"玩家")
+
+说明:
+- 与旧实现一致: 先处理占位符表,再处理变量;变量值不会再被当作占位符表解析
+- 变量值非str时先调用str()转换(与旧实现一致)
+- 变量值含有花括号、或模板中有未配对的花括号时,旧实现的逐项替换可能产生级联替换,
+  此时回退为逐项替换以保证结果一致
+"""
+
+from collections import OrderedDict
+
+
+# 占位符表 {名称: 替换文本}
+PLACEHOLDERS = {
+    # 基础格式
+    "enter": "\n",
+    # 颜色代码
+    "black": u"\u00A70",
+    "dark-blue": u"\u00A71",
+    "dark-green": u"\u00A72",
+    "dark-aqua": u"\u00A73",
+    "dark-red": u"\u00A74",
+    "dark-purple": u"\u00A75",
+    "gold": u"\u00A76",
+    "gray": u"\u00A77",
+    "dark-gray": u"\u00A78",
+    "blue": u"\u00A79",
+    "green": u"\u00A7a",
+    "aqua": u"\u00A7b",
+    "red": u"\u00A7c",
+    "light-purple": u"\u00A7d",
+    "yellow": u"\u00A7e",
+    "white": u"\u00A7f",
+    "obfuscated": u"\u00A7k",
+    "bold": u"\u00A7l",
+    "italic": u"\u00A7o",
+    "reset": u"\u00A7r",
+
+    # ========== 图标占位符映射 (从老项目迁移) ==========
+    # 通用图标
+    "icon-heart": u"\uE110",
+    # 游戏手柄图标
+    "icon-gamepad-a": u"\uE000",
+    "icon-gamepad-b": u"\uE001",
+    "icon-gamepad-x": u"\uE002",
+    "icon-gamepad-y": u"\uE003",
+    "icon-gamepad-lb": u"\uE004",
+    "icon-gamepad-rb": u"\uE005",
+    "icon-gamepad-lt": u"\uE006",
+    "icon-gamepad-rt": u"\uE007",
+    # EC系统图标
+    "icon-ec-lobby": u"\uE0B0",
+    "icon-ec-room": u"\uE0B1",
+    "icon-ec-buglet": u"\uE0B2",
+    "icon-ec-admin": u"\uE0B3",
+    "icon-ec-mission": u"\uE0B4",
+    "icon-ec-prefix-vip3": u"\uE0B6",
+    "icon-ec-prefix-vip4": u"\uE0B7",
+    "icon-ec-buglet-red": u"\uE0B8",
+    # EC UI图标
+    "icon-ec-players": u"\uE180",
+    "icon-ec-rooms": u"\uE181",
+    "icon-ec-time": u"\uE182",
+    "icon-ec-crystal-destroy": u"\uE183",
+    "icon-ec-sword0": u"\uE184",
+    "icon-ec-death": u"\uE185",
+    "icon-ec-sword1": u"\uE186",
+    "icon-ec-sword2": u"\uE187",
+    "icon-ec-heart": u"\uE188",
+    "icon-ec-mm-villager": u"\uE189",
+    "icon-ec-mm-killer": u"\uE18A",
+    "icon-ec-mm-spy": u"\uE18B",
+    "icon-ec-mm-bow": u"\uE18C",
+    # EC水晶图标（队伍标识-红黄绿蓝）
+    "icon-ec-crystal-red": u"\uE190",
+    "icon-ec-crystal-red-died": u"\uE1A0",
+    "icon-ec-crystal-yellow": u"\uE191",
+    "icon-ec-crystal-yellow-died": u"\uE1A1",
+    "icon-ec-crystal-green": u"\uE192",
+    "icon-ec-crystal-green-died": u"\uE1A2",
+    "icon-ec-crystal-blue": u"\uE193",
+    "icon-ec-crystal-blue-died": u"\uE1A3",
+    # EC羊毛图标（队伍标识-8色）
+    "icon-ec-wool-red": u"\uE194",
+    "icon-ec-wool-red-died": u"\uE1A4",
+    "icon-ec-wool-yellow": u"\uE195",
+    "icon-ec-wool-yellow-died": u"\uE1A5",
+    "icon-ec-wool-green": u"\uE196",
+    "icon-ec-wool-green-died": u"\uE1A6",
+    "icon-ec-wool-blue": u"\uE197",
+    "icon-ec-wool-blue-died": u"\uE1A7",
+    "icon-ec-wool-aqua": u"\uE1B4",
+    "icon-ec-wool-aqua-died": u"\uE1C4",
+    "icon-ec-wool-white": u"\uE1B5",
+    "icon-ec-wool-white-died": u"\uE1C5",
+    "icon-ec-wool-light-purple": u"\uE1B6",
+    "icon-ec-wool-light-purple-died": u"\uE1C6",
+    "icon-ec-wool-gray": u"\uE1B7",
+    "icon-ec-wool-gray-died": u"\uE1C7",
+    "icon-ec-wool-dark-purple": u"\uE1B8",
+    "icon-ec-wool-dark-purple-died": u"\uE1C8",
+    "icon-ec-wool-gold": u"\uE1B9",
+    "icon-ec-wool-gold-died": u"\uE1C9",
+    "icon-ec-wool-dark-green": u"\uE1BA",
+    "icon-ec-wool-dark-green-died": u"\uE1CA",
+    "icon-ec-wool-dark-blue": u"\uE1BB",
+    "icon-ec-wool-dark-blue-died": u"\uE1CB",
+    # EC游戏道具图标
+    "icon-ec-sword3": u"\uE198",
+    "icon-ec-chest": u"\uE199",
+    "icon-ec-potion": u"\uE19A",
+    "icon-ec-magnify": u"\uE19B",
+    "icon-ec-block": u"\uE19C",
+    "icon-ec-key": u"\uE19D",
+    "icon-ec-diamond": u"\uE19E",
+    # EC货币图标
+    "icon-ec-coin": u"\uE19F",
+    "icon-ec-coin-mw": u"\uE18D",
+    "icon-ec-coin-mm": u"\uE18E",
+    "icon-ec-coin-ruby": u"\uE18F",
+    # EC其他UI图标
+    "icon-ec-ball": u"\uE1A8",
+    "icon-ec-star": u"\uE1A9",
+    "icon-ec-star-empty": u"\uE1AA",
+    # EC资源图标
+    "icon-ec-res-copper": u"\uE1AB",
+    "icon-ec-res-iron": u"\uE1AC",
+    "icon-ec-res-gold": u"\uE1AD",
+    "icon-ec-res-diamond": u"\uE1AE",
+    "icon-ec-res-emerald": u"\uE1AF",
+    "icon-ec-res-snowflake": u"\uE1C0",
+    # EC资源图标别名（简化版）
+    "icon-ec-iron": u"\uE1AC",
+    "icon-ec-gold": u"\uE1AD",
+    "icon-ec-diamond": u"\uE1AE",
+    "icon-ec-emerald": u"\uE1AF",
+    # EC状态图标
+    "icon-ec-ok": u"\uE1B0",
+    "icon-ec-fail": u"\uE1B1",
+    "icon-ec-up": u"\uE1B2",
+    "icon-ec-credits": u"\uE1B3",
+    # EC数字图标
+    "icon-ec-0": u"\uE1F0",
+    "icon-ec-1": u"\uE1F1",
+    "icon-ec-2": u"\uE1F2",
+    "icon-ec-3": u"\uE1F3",
+    "icon-ec-4": u"\uE1F4",
+    "icon-ec-5": u"\uE1F5",
+    "icon-ec-6": u"\uE1F6",
+    "icon-ec-7": u"\uE1F7",
+    "icon-ec-8": u"\uE1F8",
+    "icon-ec-9": u"\uE1F9",
+    "icon-ec-percent": u"\uE1FA",
+    "icon-ec-percent-black": u"\uE1FB",
+    # 特殊字符
+    "|": u"\u00A6",
+    u"»": u"\u226B",
+    u"«": u"\u226A"
+}
+
+# 编译模板缓存容量
+TEMPLATE_CACHE_SIZE = 512
+
+try:
+    _text_type = unicode
+except NameError:
+    _text_type = str
+
+
+class CompiledTemplate(object):
+    """
+    编译后的模板
+
+    - parts: 文本片段列表,变量位置预先填入原始的 "{name}" 文本(未提供变量时原样保留)
+    - variables: [(片段下标, 变量名), ...]
+    - constant: 不提供变量时的渲染结果
+    - stray_braces: 常量文本中是否含有未配对的花括号
+    """
+
+    __slots__ = ('parts', 'variables', 'constant', 'stray_braces')
+
+    def __init__(self, parts, variables, stray_braces):
+        self.parts = parts
+        self.variables = variables
+        self.constant = u"".join(parts)
+        self.stray_braces = stray_braces
+
+    def render(self, args):
+        """
+        渲染模板
+
+        Args:
+            args (dict): 变量字典
+
+        Returns:
+            unicode: 渲染结果
+        """
+        if not args or not self.variables:
+            return self.constant
+
+        if self.stray_braces:
+            # 变量值可能与未配对的花括号拼接出新的变量,回退为逐项替换
+            return _apply_args_sequential(self.constant, args)
+
+        parts = list(self.parts)
+        for index, name in self.variables:
+            if name not in args:
+                continue
+            value = args[name]
+            if not isinstance(value, str):
+                value = str(value)
+            if '{' in value or '}' in value:
+                # 变量值本身含有变量,旧实现会级联替换,回退为逐项替换
+                return _apply_args_sequential(self.constant, args)
+            parts[index] = value
+        return u"".join(parts)
+
+
+def _compile(raw_msg):
+    """
+    编译模板
+
+    Args:
+        raw_msg (str): 原始模板
+
+    Returns:
+        CompiledTemplate: 编译结果
+    """
+    if not isinstance(raw_msg, _text_type):
+        raw_msg = _text_type(raw_msg)
+
+    parts = []  # 常量片段与变量片段交替
+    variables = []
+    constant = []  # 当前累积的常量片段
+    literal_start = 0
+    pos = raw_msg.find(u'{')
+    while pos != -1:
+        end = raw_msg.find(u'}', pos + 1)
+        if end == -1:
+            break
+
+        name = raw_msg[pos + 1:end]
+        if u'{' in name:
+            # 形如 "{{red}" 的情况,从下一个 "{" 重新匹配
+            pos = raw_msg.find(u'{', pos + 1)
+            continue
+
+        if pos > literal_start:
+            constant.append(raw_msg[literal_start:pos])
+
+        replacement = PLACEHOLDERS.get(name)
+        if replacement is not None:
+            constant.append(replacement)
+        else:
+            if constant:
+                parts.append(u"".join(constant))
+                constant = []
+            variables.append((len(parts), name))
+            parts.append(raw_msg[pos:end + 1])
+
+        literal_start = end + 1
+        pos = raw_msg.find(u'{', literal_start)
+
+    if literal_start < len(raw_msg):
+        constant.append(raw_msg[literal_start:])
+    if constant:
+        parts.append(u"".join(constant))
+
+    # 常量片段中残留的花括号只可能来自原始文本(占位符替换文本不含花括号)
+    variable_indexes = set(index for index, _ in variables)
+    stray_braces = any(
+        u'{' in part or u'}' in part
+        for index, part in enumerate(parts) if index not in variable_indexes
+    )
+
+    return CompiledTemplate(parts, variables, stray_braces)
+
+
+def _apply_args_sequential(text, args):
+    """
+    逐项替换变量(旧实现的变量替换逻辑)
+
+    Args:
+        text (unicode): 已替换占位符表的文本
+        args (dict): 变量字典
+
+    Returns:
+        unicode: 替换结果
+    """
+    for arg in args:
+        arg_str = args[arg]
+        if not isinstance(arg_str, str):
+            arg_str = str(arg_str)
+        text = text.replace("{" + arg + "}", arg_str)
+    return text
+
+
+# 编译模板LRU缓存 {raw_msg: CompiledTemplate}
+_template_cache = OrderedDict()
+_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def compile_template(raw_msg):
+    """
+    获取编译后的模板(带LRU缓存)
+
+    Args:
+        raw_msg (str): 原始模板
+
+    Returns:
+        CompiledTemplate: 编译结果
+    """
+    template = _template_cache.pop(raw_msg, None)
+    if template is None:
+        _cache_stats["misses"] += 1
+        template = _compile(raw_msg)
+        if len(_template_cache) >= TEMPLATE_CACHE_SIZE:
+            _template_cache.popitem(last=False)
+            _cache_stats["evictions"] += 1
+    else:
+        _cache_stats["hits"] += 1
+    _template_cache[raw_msg] = template
+    return template
+
+
+def render_text(raw_msg, **args):
+    """
+    渲染模板文本
+
+    Args:
+        raw_msg (str): 原始模板
+        **args: 变量参数
+
+    Returns:
+        unicode: 渲染结果
+    """
+    return compile_template(raw_msg).render(args)
+
+
+def get_cache_stats():
+    """
+    获取模板缓存统计
+
+    Returns:
+        dict: {'size', 'hits', 'misses', 'evictions'}
+    """
+    stats = dict(_cache_stats)
+    stats["size"] = len(_template_cache)
+    return stats
+
+
+def clear_cache():
+    """清空模板缓存"""
+    _template_cache.clear()
+    for key in _cache_stats:
+        _cache_stats[key] = 0
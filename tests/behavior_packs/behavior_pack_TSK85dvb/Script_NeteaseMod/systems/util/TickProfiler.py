@@ -0,0 +1,464 @@
+# -*- coding: utf-8 -*-
+"""
+TickProfiler - 层级Tick分析器
+
+功能:
+- 按调用层级统计GamingState.tick、tick回调、预设on_tick、ServerSystem.Update的耗时
+- 每个节点记录调用次数、总耗时(total)与自身耗时(self = total - 子节点耗时)
+- 每个节点保留最近N次调用的耗时环形缓冲,用于计算p50/p99
+- 导出collapsed-stack格式(flamegraph.pl / speedscope可直接读取)
+- 输出最慢的状态、预设、系统Top-N报告
+
+使用方法:
+    from Script_NeteaseMod.systems.util.TickProfiler import get_tick_profiler
+
+    profiler = get_tick_profiler()
+    profiler.install(system_classes, preset_classes)  # 打补丁并开始统计
+    ...
+    profiler.print_report(top_n=10)
+    profiler.dump_collapsed("tick_profile.folded")
+    profiler.uninstall()  # 还原原始方法
+
+说明:
+- 默认不安装,由modConfig.TICK_PROFILER_ENABLED开启;未安装时没有任何额外开销
+- 安装时以类属性替换的方式包装方法,uninstall时原样还原
+- GamingState.tick只包装不重写;tick回调在with_tick注册时包装,因此安装前注册的回调只计入所属状态
+- 计时使用高精度时钟,不受time.time被替换的影响
+"""
+
+from __future__ import print_function
+
+import codecs
+import time
+import timeit
+from collections import deque
+
+# 高精度时钟(Python 2没有perf_counter)
+_clock = getattr(time, 'perf_counter', None) or timeit.default_timer
+
+# 节点类别
+KIND_SYSTEM = "system"
+KIND_STATE = "state"
+KIND_CALLBACK = "callback"
+KIND_PRESET = "preset"
+
+# 默认环形缓冲长度(每个节点保留的最近调用次数)
+DEFAULT_RING_SIZE = 600
+
+
+class ProfileNode(object):
+    """
+    调用树节点
+
+    以从根到该节点的名称路径(tuple)唯一标识
+    """
+
+    __slots__ = ('path', 'name', 'kind', 'calls', 'total_time', 'self_time', 'max_time', 'samples')
+
+    def __init__(self, path, kind, ring_size):
+        self.path = path
+        self.name = path[-1]
+        self.kind = kind
+        self.calls = 0
+        self.total_time = 0.0
+        self.self_time = 0.0
+        self.max_time = 0.0
+        self.samples = deque(maxlen=ring_size)  # 最近调用的total耗时(秒)
+
+    def record(self, elapsed, self_elapsed):
+        self.calls += 1
+        self.total_time += elapsed
+        self.self_time += self_elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+        self.samples.append(elapsed)
+
+
+class TickProfiler(object):
+    """
+    层级Tick分析器
+
+    调用栈中每一帧为[path, 开始时间, 子节点累计耗时]
+    """
+
+    def __init__(self, ring_size=DEFAULT_RING_SIZE):
+        """
+        Args:
+            ring_size (int): 每个节点保留的最近调用次数
+        """
+        self.ring_size = ring_size
+        self.nodes = {}  # {path: ProfileNode}
+        self.installed = False
+        self.started_at = _clock()
+
+        # 定期报告
+        self.report_interval = 0  # 秒,0表示不自动报告
+        self.report_top_n = 10
+        self.dump_path = None
+        self._last_report = _clock()
+
+        self._stack = []
+        self._patches = []  # [(owner, attr_name, original, had_own_attr)]
+
+    # ========== 计时 ==========
+
+    def push(self, name, kind):
+        """
+        进入一个节点
+
+        Args:
+            name (str): 节点名
+            kind (str): 节点类别(KIND_*)
+        """
+        stack = self._stack
+        path = (stack[-1][0] + (name,)) if stack else (name,)
+        if path not in self.nodes:
+            self.nodes[path] = ProfileNode(path, kind, self.ring_size)
+        stack.append([path, _clock(), 0.0])
+
+    def pop(self):
+        """离开当前节点,记录耗时并累加到父节点的子耗时"""
+        now = _clock()
+        path, start, child_time = self._stack.pop()
+        elapsed = now - start
+        self.nodes[path].record(elapsed, elapsed - child_time)
+        if self._stack:
+            self._stack[-1][2] += elapsed
+        elif self.report_interval and now - self._last_report >= self.report_interval:
+            self._last_report = now
+            self._periodic_report()
+
+    def call(self, name, kind, func, *args, **kwargs):
+        """在节点内调用函数"""
+        self.push(name, kind)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.pop()
+
+    def reset(self):
+        """清空统计数据(不影响已安装的补丁)"""
+        self.nodes = {}
+        self._stack = []
+        self.started_at = _clock()
+        self._last_report = self.started_at
+
+    # ========== 安装/卸载 ==========
+
+    def install(self, system_classes=(), preset_classes=()):
+        """
+        安装包装器
+
+        Args:
+            system_classes (list): ServerSystem子类列表,包装其Update
+            preset_classes (list): 预设定义类列表,包装其on_tick
+        """
+        if self.installed:
+            return
+        from Script_NeteaseMod.systems.state.GamingState import GamingState
+
+        self._patch(GamingState, 'tick', _make_state_tick(self, GamingState.__dict__['tick']))
+        self._patch(GamingState, 'with_tick', _make_with_tick(self, GamingState.__dict__['with_tick']))
+        for system_cls in system_classes:
+            original = getattr(system_cls, 'Update', None)
+            if original is not None:
+                self._patch(system_cls, 'Update', _make_wrapper(self, system_cls.__name__, KIND_SYSTEM, original))
+        for preset_cls in preset_classes:
+            original = getattr(preset_cls, 'on_tick', None)
+            if original is not None:
+                self._patch(preset_cls, 'on_tick', _make_wrapper(self, preset_cls.__name__, KIND_PRESET, original))
+
+        self.installed = True
+        self.reset()
+        print("[INFO] [TickProfiler] 已安装: {}个系统, {}个预设类型".format(
+            len(system_classes), len(preset_classes)))
+
+    def uninstall(self):
+        """还原所有被包装的方法"""
+        for owner, attr_name, original, had_own_attr in reversed(self._patches):
+            if had_own_attr:
+                setattr(owner, attr_name, original)
+            else:
+                delattr(owner, attr_name)
+        self._patches = []
+        self.installed = False
+        print("[INFO] [TickProfiler] 已卸载")
+
+    def _patch(self, owner, attr_name, replacement):
+        had_own_attr = attr_name in owner.__dict__
+        original = owner.__dict__.get(attr_name)
+        self._patches.append((owner, attr_name, original, had_own_attr))
+        setattr(owner, attr_name, replacement)
+
+    # ========== 报告 ==========
+
+    def get_top(self, top_n=10, kind=None, key='total_time'):
+        """
+        按类别与名称聚合后的Top-N
+
+        同名节点(例如同一预设类型的多个实例、出现在多个路径下的状态)合并统计
+
+        Args:
+            top_n (int): 条目数
+            kind (str): 只统计该类别,None表示全部
+            key (str): 排序字段(total_time/self_time/max_time/calls/p99)
+
+        Returns:
+            list: [dict(name, kind, calls, total_ms, self_ms, mean_ms, p50_ms, p99_ms, max_ms)]
+        """
+        merged = {}
+        for node in self.nodes.values():
+            if kind is not None and node.kind != kind:
+                continue
+            entry = merged.get((node.kind, node.name))
+            if entry is None:
+                entry = merged[(node.kind, node.name)] = {
+                    'name': node.name, 'kind': node.kind, 'calls': 0,
+                    'total_time': 0.0, 'self_time': 0.0, 'max_time': 0.0, 'samples': [],
+                }
+            entry['calls'] += node.calls
+            entry['total_time'] += node.total_time
+            entry['self_time'] += node.self_time
+            entry['max_time'] = max(entry['max_time'], node.max_time)
+            entry['samples'].extend(node.samples)
+
+        rows = []
+        for entry in merged.values():
+            samples = sorted(entry.pop('samples'))
+            entry['p50'] = _percentile(samples, 0.50)
+            entry['p99'] = _percentile(samples, 0.99)
+            rows.append(entry)
+        rows.sort(key=lambda row: row[key], reverse=True)
+
+        result = []
+        for row in rows[:top_n]:
+            calls = row['calls']
+            result.append({
+                'name': row['name'],
+                'kind': row['kind'],
+                'calls': calls,
+                'total_ms': row['total_time'] * 1000.0,
+                'self_ms': row['self_time'] * 1000.0,
+                'mean_ms': row['total_time'] * 1000.0 / calls if calls else 0.0,
+                'p50_ms': row['p50'] * 1000.0,
+                'p99_ms': row['p99'] * 1000.0,
+                'max_ms': row['max_time'] * 1000.0,
+            })
+        return result
+
+    def build_report(self, top_n=10):
+        """
+        生成Top-N报告
+
+        Returns:
+            dict: {elapsed_seconds, states, callbacks, presets, systems}
+        """
+        return {
+            'elapsed_seconds': _clock() - self.started_at,
+            'states': self.get_top(top_n, KIND_STATE),
+            'callbacks': self.get_top(top_n, KIND_CALLBACK),
+            'presets': self.get_top(top_n, KIND_PRESET),
+            'systems': self.get_top(top_n, KIND_SYSTEM),
+        }
+
+    def print_report(self, top_n=10):
+        """输出Top-N报告到控制台"""
+        report = self.build_report(top_n)
+        print("=" * 60)
+        print("[TickProfiler] ===== Tick分析报告 ({:.1f}秒) =====".format(report['elapsed_seconds']))
+        for title, key in ((u"最慢状态", 'states'), (u"最慢tick回调", 'callbacks'),
+                           (u"最慢预设", 'presets'), (u"系统Update", 'systems')):
+            rows = report[key]
+            if not rows:
+                continue
+            print(u"{} (Top {}):".format(title, len(rows)))
+            print(u"  {:<48} {:>8} {:>10} {:>10} {:>8} {:>8} {:>8}".format(
+                u"名称", "calls", "total_ms", "self_ms", "p50", "p99", "max"))
+            for row in rows:
+                print(u"  {:<48} {:>8} {:>10.2f} {:>10.2f} {:>8.3f} {:>8.3f} {:>8.3f}".format(
+                    row['name'][:48], row['calls'], row['total_ms'], row['self_ms'],
+                    row['p50_ms'], row['p99_ms'], row['max_ms']))
+        print("=" * 60)
+        return report
+
+    def collapsed_stacks(self):
+        """
+        生成collapsed-stack文本行
+
+        每行"根;子;孙 权重",权重为该路径的自身耗时(微秒)
+
+        Returns:
+            list: 文本行
+        """
+        lines = []
+        for path, node in sorted(self.nodes.items()):
+            weight = int(node.self_time * 1000000)
+            if weight > 0:
+                lines.append(u"{} {}".format(u";".join(_frame_name(name) for name in path), weight))
+        return lines
+
+    def dump_collapsed(self, filename):
+        """
+        导出collapsed-stack文件
+
+        Args:
+            filename (str): 输出文件路径
+
+        Returns:
+            bool: 是否成功
+        """
+        try:
+            with codecs.open(filename, 'w', encoding='utf-8') as f:
+                for line in self.collapsed_stacks():
+                    f.write(line + u"\n")
+            print("[INFO] [TickProfiler] collapsed-stack已导出: {}".format(filename))
+            return True
+        except Exception as e:
+            print("[ERROR] [TickProfiler] 导出collapsed-stack失败: {}".format(str(e)))
+            return False
+
+    def _periodic_report(self):
+        self.print_report(self.report_top_n)
+        if self.dump_path:
+            self.dump_collapsed(self.dump_path)
+
+
+# ========== 包装器 ==========
+
+def _make_wrapper(profiler, name, kind, original):
+    """包装实例方法(Update/on_tick),original为类上的原始属性"""
+    def wrapper(self, *args, **kwargs):
+        profiler.push(name, kind)
+        try:
+            return original(self, *args, **kwargs)
+        finally:
+            profiler.pop()
+    wrapper.__name__ = getattr(original, '__name__', name)
+    return wrapper
+
+
+def _make_state_tick(profiler, original):
+    """包装GamingState.tick: 为状态本身建立节点(子状态与tick回调仍由原方法执行)"""
+    def tick(self):
+        profiler.push(_state_name(self), KIND_STATE)
+        try:
+            return original(self)
+        finally:
+            profiler.pop()
+    tick.__name__ = 'tick'
+    return tick
+
+
+def _make_with_tick(profiler, original):
+    """包装GamingState.with_tick: 注册tick回调时包装回调,为每个回调建立节点"""
+    def with_tick(self, callback):
+        return original(self, _wrap_tick_callback(profiler, callback))
+    with_tick.__name__ = 'with_tick'
+    return with_tick
+
+
+def _wrap_tick_callback(profiler, callback):
+    """带计时的tick回调(卸载后直接调用原回调;异常照常抛给GamingState.tick处理)"""
+    name = _callback_name(callback)
+
+    def wrapped():
+        if not profiler.installed:
+            return callback()
+        profiler.push(name, KIND_CALLBACK)
+        try:
+            return callback()
+        finally:
+            profiler.pop()
+    return wrapped
+
+
+def _state_name(state):
+    """状态节点名: 类名;子状态附带其在父状态中的注册名,根状态附带所属系统类名"""
+    name = state.__class__.__name__
+    parent = state.parent
+    if parent is None:
+        system = getattr(state, 'system', None)
+        return "{}@{}".format(name, system.__class__.__name__) if system is not None else name
+    if parent is not None and getattr(parent, 'current_sub_state', None) is state:
+        sub_name = getattr(parent, 'current_sub_state_name', None)
+        if sub_name:
+            return "{}[{}]".format(name, sub_name)
+    return name
+
+
+def _callback_name(callback):
+    """回调节点名: 绑定方法为"类名.方法名",其余为函数名"""
+    func_name = getattr(callback, '__name__', None) or callback.__class__.__name__
+    owner = getattr(callback, '__self__', None) or getattr(callback, 'im_self', None)
+    if owner is not None:
+        return "{}.{}".format(owner.__class__.__name__, func_name)
+    return func_name
+
+
+def _frame_name(name):
+    """collapsed-stack帧名中不能出现分号与空格"""
+    return name.replace(u";", u":").replace(u" ", u"_")
+
+
+def _percentile(sorted_values, ratio):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(ratio * len(sorted_values)))
+    return sorted_values[index]
+
+
+def _import_attr(module_path, attr_name):
+    module = __import__(module_path, fromlist=[attr_name])
+    return getattr(module, attr_name)
+
+
+def install_from_mod_config(profiler=None):
+    """
+    按modConfig安装: 包装SERVER_SYSTEMS中的系统与SERVER_PRESET_IMPORTS中的预设定义
+
+    Args:
+        profiler (TickProfiler): 分析器,None表示使用全局实例
+
+    Returns:
+        TickProfiler: 已安装的分析器
+    """
+    from modConfig import SERVER_SYSTEMS, SERVER_PRESET_IMPORTS
+    from modConfig import TICK_PROFILER_REPORT_INTERVAL, TICK_PROFILER_DUMP_PATH
+
+    profiler = profiler or get_tick_profiler()
+    system_classes = []
+    for _, class_path in SERVER_SYSTEMS:
+        module_path, class_name = class_path.rsplit('.', 1)
+        try:
+            system_classes.append(_import_attr(module_path, class_name))
+        except Exception as e:
+            print("[WARN] [TickProfiler] 导入系统失败: {} - {}".format(class_path, str(e)))
+    preset_classes = []
+    for class_name, module_path in SERVER_PRESET_IMPORTS:
+        try:
+            preset_classes.append(_import_attr(module_path, class_name))
+        except Exception as e:
+            print("[WARN] [TickProfiler] 导入预设失败: {} - {}".format(module_path, str(e)))
+
+    profiler.report_interval = TICK_PROFILER_REPORT_INTERVAL
+    profiler.dump_path = TICK_PROFILER_DUMP_PATH
+    profiler.install(system_classes, preset_classes)
+    return profiler
+
+
+# ========== 全局实例 ==========
+
+_profiler = None
+
+
+def get_tick_profiler():
+    """
+    获取全局TickProfiler实例
+
+    Returns:
+        TickProfiler: 全局实例(首次调用时创建,不会自动安装)
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = TickProfiler()
+    return _profiler
@@ -0,0 +1,493 @@
+# -*- coding: utf-8 -*-
+"""
+TickScheduler - 共享Tick调度器
+
+功能:
+- 基于最小堆的定时器,添加O(log n),取消O(1)(惰性删除)
+- 每Tick只弹出已到期的定时器,不再逐个扫描所有定时器
+- 到期回调在Tick边界上执行,同一Tick内按到期时间、添加顺序依次执行
+- 支持一次性定时器与重复定时器
+- 支持按Tick计数的定时器: 按到期Tick分桶,每Tick只取出当前Tick的桶
+- 支持按owner批量取消(状态退出、道具处理器销毁时使用)
+
+使用方法:
+    scheduler = TickScheduler()
+
+    # 一次性定时器(回调参数按原样传入)
+    handle = scheduler.add(2.0, self._trigger_explosion, entity_id, owner=self)
+
+    # 重复定时器
+    scheduler.add_repeating(1.0, self._update_all_golems, owner=self)
+
+    # 按Tick计数的定时器(第N次update时执行,与时钟无关)
+    scheduler.add_tick_timer(20, self._refresh, owner=self)
+    scheduler.add_repeating_tick_timer(5, self._poll, owner=self)
+
+    # 取消
+    scheduler.cancel(handle)
+    scheduler.cancel_owner(self)
+
+    # 由GamingStateSystem.Update每Tick调用
+    scheduler.update()
+
+说明:
+- 时间基准为time.time(),与原先各模块的time.time()轮询语义一致
+- Tick定时器以update调用次数计数,同一Tick内先执行Tick定时器,再执行按时间到期的定时器
+- 回调异常会被捕获并打印,不影响其他定时器
+"""
+
+from __future__ import print_function
+
+import heapq
+import time
+import traceback
+
+
+# 已取消定时器占堆比例超过该值时重建堆
+COMPACT_RATIO = 0.5
+# 堆较小时不重建
+COMPACT_MIN_SIZE = 64
+
+
+class TimerHandle(object):
+    """
+    定时器句柄
+
+    作为堆元素使用,按(due_time, seq)排序;Tick定时器放在Tick桶中,due_tick为到期Tick
+    """
+
+    __slots__ = ('due_time', 'due_tick', 'seq', 'interval', 'callback', 'args', 'owner', 'cancelled')
+
+    def __init__(self, due_time, seq, interval, callback, args, owner, due_tick=None):
+        self.due_time = due_time
+        self.due_tick = due_tick  # 到期Tick,按时间到期的定时器为None
+        self.seq = seq
+        self.interval = interval  # 重复间隔(秒或Tick数),一次性定时器为None
+        self.callback = callback
+        self.args = args
+        self.owner = owner
+        self.cancelled = False
+
+    def __lt__(self, other):
+        if self.due_time != other.due_time:
+            return self.due_time < other.due_time
+        return self.seq < other.seq
+
+    def is_active(self):
+        """
+        定时器是否仍有效
+
+        Returns:
+            bool: 未取消且未执行完毕
+        """
+        return not self.cancelled
+
+
+class TickScheduler(object):
+    """
+    共享Tick调度器
+
+    数据结构:
+    - _heap: [TimerHandle, ...] 最小堆
+    - _buckets: {tick: [TimerHandle, ...]} Tick定时器按到期Tick分桶
+    - _owners: {owner: set(TimerHandle)} 用于按owner取消
+    """
+
+    def __init__(self, time_func=None):
+        """
+        初始化调度器
+
+        Args:
+            time_func (function): 时间函数,默认time.time(测试时可注入)
+        """
+        self._time_func = time_func or time.time
+        self._heap = []
+        self._buckets = {}
+        self._owners = {}
+        self._seq = 0
+        self._active_count = 0
+        self._tick_active_count = 0
+        self.tick_index = 0  # update调用次数
+
+        # 统计数据
+        self.fired_count = 0  # 已执行的回调数
+        self.cancelled_count = 0  # 已取消的定时器数
+        self.error_count = 0  # 回调异常数
+
+    # ========== 添加/取消 ==========
+
+    def add(self, delay, callback, *args, **kwargs):
+        """
+        添加一次性定时器
+
+        Args:
+            delay (float): 延迟时间(秒)
+            callback (function): 回调函数
+            *args: 回调参数
+            owner: (关键字参数) 所属对象,用于cancel_owner
+
+        Returns:
+            TimerHandle: 定时器句柄
+        """
+        return self._push(delay, None, callback, args, kwargs.get('owner'))
+
+    def add_repeating(self, interval, callback, *args, **kwargs):
+        """
+        添加重复定时器
+
+        Args:
+            interval (float): 重复间隔(秒)
+            callback (function): 回调函数
+            *args: 回调参数
+            owner: (关键字参数) 所属对象,用于cancel_owner
+            delay (float): (关键字参数) 首次执行延迟,默认等于interval
+
+        Returns:
+            TimerHandle: 定时器句柄
+        """
+        delay = kwargs.get('delay')
+        if delay is None:
+            delay = interval
+        return self._push(delay, interval, callback, args, kwargs.get('owner'))
+
+    def add_tick_timer(self, ticks, callback, *args, **kwargs):
+        """
+        添加按Tick计数的一次性定时器
+
+        Args:
+            ticks (int): 延迟Tick数(至少为1,即下一次update)
+            callback (function): 回调函数
+            *args: 回调参数
+            owner: (关键字参数) 所属对象,用于cancel_owner
+
+        Returns:
+            TimerHandle: 定时器句柄
+        """
+        return self._push_tick(ticks, None, callback, args, kwargs.get('owner'))
+
+    def add_repeating_tick_timer(self, interval_ticks, callback, *args, **kwargs):
+        """
+        添加按Tick计数的重复定时器
+
+        Args:
+            interval_ticks (int): 重复间隔Tick数(至少为1)
+            callback (function): 回调函数
+            *args: 回调参数
+            owner: (关键字参数) 所属对象,用于cancel_owner
+            delay_ticks (int): (关键字参数) 首次执行延迟Tick数,默认等于interval_ticks
+
+        Returns:
+            TimerHandle: 定时器句柄
+        """
+        interval_ticks = max(1, int(interval_ticks))
+        delay_ticks = kwargs.get('delay_ticks')
+        if delay_ticks is None:
+            delay_ticks = interval_ticks
+        return self._push_tick(delay_ticks, interval_ticks, callback, args, kwargs.get('owner'))
+
+    def cancel(self, handle):
+        """
+        取消定时器(惰性删除,到期弹出时丢弃)
+
+        Args:
+            handle (TimerHandle): 定时器句柄
+
+        Returns:
+            bool: 是否取消成功
+        """
+        if handle is None or handle.cancelled:
+            return False
+        handle.cancelled = True
+        self._active_count -= 1
+        if handle.due_tick is not None:
+            self._tick_active_count -= 1
+        self.cancelled_count += 1
+        self._detach_owner(handle)
+        self._maybe_compact()
+        return True
+
+    def cancel_owner(self, owner):
+        """
+        取消指定owner的所有定时器
+
+        Args:
+            owner: 所属对象
+
+        Returns:
+            int: 取消的定时器数量
+        """
+        handles = self._owners.pop(owner, None)
+        if not handles:
+            return 0
+        for handle in handles:
+            if not handle.cancelled:
+                handle.cancelled = True
+                self._active_count -= 1
+                if handle.due_tick is not None:
+                    self._tick_active_count -= 1
+                self.cancelled_count += 1
+        self._maybe_compact()
+        return len(handles)
+
+    def clear(self):
+        """清空所有定时器"""
+        for handle in self._heap:
+            handle.cancelled = True
+        for bucket in self._buckets.values():
+            for handle in bucket:
+                handle.cancelled = True
+        self._heap = []
+        self._buckets = {}
+        self._owners = {}
+        self._active_count = 0
+        self._tick_active_count = 0
+
+    # ========== 驱动 ==========
+
+    def update(self, now=None):
+        """
+        执行所有已到期的定时器(每Tick调用一次)
+
+        Args:
+            now (float): 当前时间,默认调用time_func
+
+        Returns:
+            int: 本次执行的回调数
+        """
+        self.tick_index += 1
+        fired = self._fire_tick_bucket() if self._buckets else 0
+
+        heap = self._heap
+        if heap:
+            if now is None:
+                now = self._time_func()
+            fired += self._fire_due_timers(now)
+
+        self.fired_count += fired
+        return fired
+
+    def _fire_due_timers(self, now):
+        """执行按时间到期的定时器,返回执行的回调数"""
+        heap = self._heap
+        fired = 0
+        # 本Tick内新添加的零延迟定时器在下一Tick执行,避免回调链无限循环
+        seq_limit = self._seq
+        while heap and heap[0].due_time <= now and heap[0].seq <= seq_limit:
+            handle = heapq.heappop(heap)
+            if handle.cancelled:
+                continue
+
+            if handle.interval is None:
+                handle.cancelled = True
+                self._active_count -= 1
+                self._detach_owner(handle)
+            else:
+                # 重复定时器按固定节奏推进,落后过多时从当前时间重新计时
+                next_time = handle.due_time + handle.interval
+                if next_time <= now:
+                    next_time = now + handle.interval
+                handle.due_time = next_time
+                self._seq += 1
+                handle.seq = self._seq
+                heapq.heappush(heap, handle)
+
+            fired += 1
+            self._run(handle)
+        return fired
+
+    def _fire_tick_bucket(self):
+        """执行当前Tick的桶中的定时器,返回执行的回调数"""
+        bucket = self._buckets.pop(self.tick_index, None)
+        if not bucket:
+            return 0
+        fired = 0
+        for handle in bucket:
+            if handle.cancelled:
+                continue
+            if handle.interval is None:
+                handle.cancelled = True
+                self._active_count -= 1
+                self._tick_active_count -= 1
+                self._detach_owner(handle)
+            else:
+                handle.due_tick = self.tick_index + handle.interval
+                self._buckets.setdefault(handle.due_tick, []).append(handle)
+            fired += 1
+            self._run(handle)
+        return fired
+
+    def _run(self, handle):
+        """执行定时器回调(捕获异常)"""
+        try:
+            handle.callback(*handle.args)
+        except Exception as e:
+            self.error_count += 1
+            print("[ERROR] [TickScheduler] 定时器回调执行失败: {}".format(str(e)))
+            traceback.print_exc()
+
+    # ========== 查询 ==========
+
+    def get_pending_count(self, owner=None):
+        """
+        获取待执行的定时器数量
+
+        Args:
+            owner: 所属对象,为None时统计全部
+
+        Returns:
+            int: 定时器数量
+        """
+        if owner is None:
+            return self._active_count
+        return len(self._owners.get(owner, ()))
+
+    def get_next_due_time(self):
+        """
+        获取最近的到期时间
+
+        Returns:
+            float: 到期时间,无定时器时返回None
+        """
+        heap = self._heap
+        while heap and heap[0].cancelled:
+            heapq.heappop(heap)
+        return heap[0].due_time if heap else None
+
+    def get_stats(self):
+        """
+        获取统计信息
+
+        Returns:
+            dict: 统计数据
+        """
+        return {
+            "pending": self._active_count,
+            "tick_pending": self._tick_active_count,
+            "heap_size": len(self._heap),
+            "tick_buckets": len(self._buckets),
+            "tick": self.tick_index,
+            "owners": len(self._owners),
+            "fired": self.fired_count,
+            "cancelled": self.cancelled_count,
+            "errors": self.error_count
+        }
+
+    # ========== 内部方法 ==========
+
+    def _push(self, delay, interval, callback, args, owner):
+        """创建定时器并入堆"""
+        self._seq += 1
+        handle = TimerHandle(self._time_func() + max(0.0, delay), self._seq,
+                             interval, callback, args, owner)
+        heapq.heappush(self._heap, handle)
+        self._active_count += 1
+        self._track_owner(handle)
+        return handle
+
+    def _push_tick(self, ticks, interval, callback, args, owner):
+        """创建Tick定时器并放入到期Tick的桶"""
+        self._seq += 1
+        due_tick = self.tick_index + max(1, int(ticks))
+        handle = TimerHandle(None, self._seq, interval, callback, args, owner, due_tick=due_tick)
+        self._buckets.setdefault(due_tick, []).append(handle)
+        self._active_count += 1
+        self._tick_active_count += 1
+        self._track_owner(handle)
+        return handle
+
+    def _track_owner(self, handle):
+        """登记到owner索引"""
+        if handle.owner is None:
+            return
+        handles = self._owners.get(handle.owner)
+        if handles is None:
+            handles = self._owners[handle.owner] = set()
+        handles.add(handle)
+
+    def _detach_owner(self, handle):
+        """从owner索引中移除定时器"""
+        if handle.owner is None:
+            return
+        handles = self._owners.get(handle.owner)
+        if handles is not None:
+            handles.discard(handle)
+            if not handles:
+                del self._owners[handle.owner]
+
+    def _maybe_compact(self):
+        """已取消的定时器过多时重建堆,防止堆无限增长"""
+        size = len(self._heap)
+        if size < COMPACT_MIN_SIZE:
+            return
+        if size - (self._active_count - self._tick_active_count) > size * COMPACT_RATIO:
+            self._heap = [handle for handle in self._heap if not handle.cancelled]
+            heapq.heapify(self._heap)
+
+
+class TimerGroup(object):
+    """
+    挂载在TickScheduler上的具名定时器组
+
+    兼容原EffectTimer接口(add_timer(timer_id, delay, callback),回调接收timer_id),
+    组内定时器以自身为owner,clear_all时一次性取消
+    """
+
+    def __init__(self, scheduler, prefix="timer"):
+        """
+        初始化定时器组
+
+        Args:
+            scheduler (TickScheduler): 共享调度器
+            prefix (str): 自动生成定时器ID的前缀
+        """
+        self.scheduler = scheduler
+        self.prefix = prefix
+        self.handles = {}  # {timer_id: TimerHandle}
+        self.timer_counter = 0
+
+    def add_timer(self, timer_id, delay, callback):
+        """
+        添加定时器(同ID定时器会被替换)
+
+        Args:
+            timer_id (str): 定时器ID
+            delay (float): 延迟时间(秒)
+            callback (callable): 回调函数,参数为timer_id
+        """
+        self.clear_timer(timer_id)
+        self.handles[timer_id] = self.scheduler.add(delay, self._fire, timer_id, callback, owner=self)
+
+    def clear_timer(self, timer_id):
+        """
+        清除指定定时器
+
+        Args:
+            timer_id (str): 定时器ID
+        """
+        handle = self.handles.pop(timer_id, None)
+        if handle is not None:
+            self.scheduler.cancel(handle)
+
+    def clear_all(self):
+        """清除所有定时器"""
+        self.handles = {}
+        self.scheduler.cancel_owner(self)
+
+    def get_next_timer_id(self):
+        """生成下一个定时器ID"""
+        self.timer_counter += 1
+        return "{}_{}".format(self.prefix, self.timer_counter)
+
+    def get_pending_count(self):
+        """
+        获取待执行的定时器数量
+
+        Returns:
+            int: 定时器数量
+        """
+        return len(self.handles)
+
+    def _fire(self, timer_id, callback):
+        """定时器到期"""
+        self.handles.pop(timer_id, None)
+        callback(timer_id)
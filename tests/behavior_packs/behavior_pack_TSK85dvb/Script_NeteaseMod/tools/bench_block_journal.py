@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+方块变更记录内存基准 - BlockChangeJournal对比原先的dict-of-dicts
+
+用法(Python 2.7):
+    python tools/bench_block_journal.py
+    python tools/bench_block_journal.py --blocks 40000 --dimensions 4
+
+内容:
+- 按对局中的放置模式生成方块变更(部分位置重复放置),分别写入
+  legacy: {(x,y,z): {'old': {...}, 'new': {...}}}(原DimensionBackup.record逻辑)
+  journal: BlockChangeJournal
+- 输出深度内存占用(sys.getsizeof递归,共享对象只计一次)、GC跟踪对象增量、记录耗时
+- 校验两者的变更数与old/new状态一致
+"""
+
+from __future__ import print_function
+
+import argparse
+import gc
+import os
+import random
+import sys
+
+if sys.version_info[0] == 2:
+    reload(sys)  # noqa: F821
+    sys.setdefaultencoding('utf-8')
+
+SCRIPT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(SCRIPT_ROOT, '..'))
+sys.path.insert(0, SCRIPT_ROOT)
+
+from Script_NeteaseMod.tools.headless import install  # noqa: E402
+from Script_NeteaseMod.tools.headless.engine import real_clock  # noqa: E402
+
+LOAD_RANGE = ((-76, 0, -76), (76, 140, 76))
+# 玩家常放的方块
+BLOCK_STATES = ([('minecraft:wool', aux) for aux in range(16)] +
+                [('minecraft:end_stone', 0), ('minecraft:planks', 0), ('minecraft:glass', 0),
+                 ('minecraft:obsidian', 0), ('minecraft:air', 0)])
+# 重复放置(同一位置再次记录)的比例
+RERECORD_RATIO = 0.1
+
+
+def legacy_record(block_changes, pos, name, aux):
+    """原DimensionBackup.record的存储逻辑"""
+    current_block_info = {'name': name, 'aux': aux}
+    if pos not in block_changes:
+        block_changes[pos] = {
+            'old': dict(current_block_info),
+            'new': dict(current_block_info)
+        }
+    else:
+        block_changes[pos]['new'] = dict(current_block_info)
+
+
+def deep_sizeof(obj, seen=None):
+    """递归统计对象占用(字节),同一对象只计一次"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_sizeof(key, seen) + deep_sizeof(value, seen)
+    elif isinstance(obj, (list, tuple, set)):
+        for item in obj:
+            size += deep_sizeof(item, seen)
+    elif hasattr(obj, '__dict__'):
+        size += deep_sizeof(obj.__dict__, seen)
+    return size
+
+
+def generate_events(block_count, seed):
+    """生成[(pos, name, aux), ...]"""
+    rng = random.Random(seed)
+    events = []
+    positions = []
+    while len(events) < block_count:
+        if positions and rng.random() < RERECORD_RATIO:
+            pos = rng.choice(positions)
+        else:
+            pos = (rng.randint(LOAD_RANGE[0][0], LOAD_RANGE[1][0]), rng.randint(60, 100),
+                   rng.randint(LOAD_RANGE[0][2], LOAD_RANGE[1][2]))
+            positions.append(pos)
+        name, aux = rng.choice(BLOCK_STATES)
+        events.append((pos, name, aux))
+    return events
+
+
+def measure(factory, record, events_by_dimension):
+    """
+    记录全部事件并统计
+
+    Returns:
+        tuple: (存储列表, 深度字节数, GC对象增量, 每次记录微秒)
+    """
+    gc.collect()
+    objects_before = len(gc.get_objects())
+    stores = []
+    elapsed = 0.0
+    for events in events_by_dimension:
+        store = factory()
+        begin = real_clock()
+        for pos, name, aux in events:
+            record(store, pos, name, aux)
+        elapsed += real_clock() - begin
+        stores.append(store)
+    gc.collect()
+    objects_delta = len(gc.get_objects()) - objects_before
+    total_events = sum(len(events) for events in events_by_dimension)
+    size = deep_sizeof(stores)
+    return stores, size, objects_delta, elapsed * 1000000.0 / max(1, total_events)
+
+
+def _journal_factory():
+    # systems.util包依赖引擎模块,需在install()之后导入
+    from Script_NeteaseMod.systems.util.BlockChangeJournal import BlockChangeJournal
+    journal = BlockChangeJournal()
+    journal.set_frame(LOAD_RANGE)
+    return journal
+
+
+def _journal_record(journal, pos, name, aux):
+    journal.record(pos, name, aux)
+
+
+def verify(legacy_stores, journal_stores):
+    """校验两种结构记录的内容一致"""
+    for legacy, journal in zip(legacy_stores, journal_stores):
+        if len(legacy) != len(journal):
+            return False
+        for pos, change in legacy.items():
+            if journal[pos] != change:
+                return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=u"方块变更记录内存基准")
+    parser.add_argument("--blocks", type=int, default=20000, help=u"每个维度的放置次数")
+    parser.add_argument("--dimensions", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    install()
+    events_by_dimension = [generate_events(args.blocks, args.seed + index) for index in range(args.dimensions)]
+    legacy = measure(dict, legacy_record, events_by_dimension)
+    journal = measure(_journal_factory, _journal_record, events_by_dimension)
+    consistent = verify(legacy[0], journal[0])
+
+    entries = sum(len(store) for store in legacy[0])
+    print("=" * 72)
+    print(u"方块变更记录 维度数={} 每维度放置={} 变更位置={}".format(args.dimensions, args.blocks, entries))
+    print(u"  {:<10} {:>14} {:>12} {:>12} {:>12}".format(u"结构", u"内存(KB)", u"字节/位置", u"GC对象", u"记录us"))
+    for name, result in (("legacy", legacy), ("journal", journal)):
+        print(u"  {:<10} {:>14.1f} {:>12.1f} {:>12} {:>12.2f}".format(
+            name, result[1] / 1024.0, float(result[1]) / max(1, entries), result[2], result[3]))
+    print(u"  内存比例 {:.1%}, 结果一致: {}".format(float(journal[1]) / max(1, legacy[1]), consistent))
+    print("=" * 72)
+    return 0 if consistent else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
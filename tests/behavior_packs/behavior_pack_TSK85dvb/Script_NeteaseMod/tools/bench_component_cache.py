@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+组件句柄缓存基准 - 量化ComponentCache节省的组件创建
+
+用法(Python 2.7):
+    python tools/bench_component_cache.py              # 默认种子
+    python tools/bench_component_cache.py --seed 3 --rounds 200
+
+内容:
+1. 整局统计: 用simulate_match跑完一局8队对局,输出
+   - 实际创建组件次数(Factory.CreateX)与命中缓存次数,折算为每Tick
+   - 命中次数即迁移到缓存后每Tick少创建的组件数
+2. 热点模式微基准(无头引擎,时间只反映Python侧开销,真实引擎中组件创建更贵):
+   - 地图还原: 每个方块CreateChunkSource + CreateBlockInfo(关卡组件)
+   - 爆炸击退: 每个实体CreatePos + CreateActorMotion + CreateHurt
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+
+SCRIPT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(SCRIPT_ROOT, '..'))
+sys.path.insert(0, SCRIPT_ROOT)
+
+from Script_NeteaseMod.tools.simulate_match import MatchSimulator, run_match  # noqa: E402
+from Script_NeteaseMod.tools.headless.engine import real_clock  # noqa: E402
+
+# 微基准规模
+RESTORE_BLOCKS = 20000
+KNOCKBACK_ENTITIES = 64
+
+
+def bench_match(seed):
+    """
+    跑完一局并统计组件创建/命中
+
+    Returns:
+        tuple: (MatchSimulator, dict)
+    """
+    simulator = run_match(MatchSimulator(seed=seed))
+    from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
+
+    ticks = max(1, simulator.engine.tick_count)
+    created = sum(count for api, count in simulator.engine.api_calls.items() if api.startswith("Factory.Create"))
+    stats = get_component_cache().get_stats()
+    return simulator, {
+        'finished': simulator.finished,
+        'ticks': ticks,
+        'factory_creates': created,
+        'factory_creates_per_tick': float(created) / ticks,
+        'cache_hits': stats['hit_count'],
+        'cache_hits_per_tick': float(stats['hit_count']) / ticks,
+        'cache_creates': stats['create_count'],
+        'hit_rate': stats['hit_rate'],
+        'evictions': stats['evict_count'],
+        'cached_targets_at_end': stats['cached_targets'],
+    }
+
+
+def _time_loop(func, rounds):
+    begin = real_clock()
+    for _ in range(rounds):
+        func()
+    return (real_clock() - begin) / rounds
+
+
+def bench_patterns(engine, rounds):
+    """
+    热点模式微基准
+
+    Returns:
+        list: [(名称, 直接创建耗时ms, 缓存耗时ms, 每轮节省的组件创建数)]
+    """
+    import mod.server.extraServerApi as serverApi
+    from Script_NeteaseMod.systems.util.ComponentCache import ComponentCache
+
+    factory = serverApi.GetEngineCompFactory()
+    cache = ComponentCache()
+    level_id = serverApi.GetLevelId()
+    positions = [(x % 100, 64 + (x // 10000), x // 100 % 100) for x in range(RESTORE_BLOCKS)]
+    entities = [engine.spawn_entity("minecraft:zombie", (i, 64, i), None, 0).entity_id
+                for i in range(KNOCKBACK_ENTITIES)]
+
+    def restore_direct():
+        for pos in positions:
+            factory.CreateChunkSource(level_id).CheckChunkState(0, pos)
+            factory.CreateBlockInfo(level_id).GetBlockNew(pos, 0)
+
+    def restore_cached():
+        for pos in positions:
+            cache.CreateChunkSource(level_id).CheckChunkState(0, pos)
+            cache.CreateBlockInfo(level_id).GetBlockNew(pos, 0)
+
+    def knockback_direct():
+        for entity_id in entities:
+            factory.CreatePos(entity_id).GetFootPos()
+            factory.CreateActorMotion(entity_id).SetMotion((0, 0.4, 0))
+            factory.CreateHurt(entity_id)
+
+    def knockback_cached():
+        for entity_id in entities:
+            cache.CreatePos(entity_id).GetFootPos()
+            cache.CreateActorMotion(entity_id).SetMotion((0, 0.4, 0))
+            cache.CreateHurt(entity_id)
+
+    restore_rounds = max(1, rounds // 50)
+    return [
+        (u"地图还原({}方块)".format(RESTORE_BLOCKS),
+         _time_loop(restore_direct, restore_rounds) * 1000.0,
+         _time_loop(restore_cached, restore_rounds) * 1000.0,
+         RESTORE_BLOCKS * 2),
+        (u"爆炸击退({}实体)".format(KNOCKBACK_ENTITIES),
+         _time_loop(knockback_direct, rounds) * 1000.0,
+         _time_loop(knockback_cached, rounds) * 1000.0,
+         KNOCKBACK_ENTITIES * 3),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=u"组件句柄缓存基准")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rounds", type=int, default=100)
+    args = parser.parse_args()
+
+    simulator, match = bench_match(args.seed)
+    print("=" * 72)
+    print(u"整局统计 seed={} 结果={}".format(args.seed, u"完成" if match['finished'] else u"未完成"))
+    print(u"  Tick数                    {}".format(match['ticks']))
+    print(u"  实际创建组件              {} ({:.2f}/Tick)".format(
+        match['factory_creates'], match['factory_creates_per_tick']))
+    print(u"  命中缓存(节省的创建)      {} ({:.2f}/Tick)".format(
+        match['cache_hits'], match['cache_hits_per_tick']))
+    print(u"  缓存命中率                {:.1%}".format(match['hit_rate']))
+    print(u"  淘汰目标数                {}, 结束时缓存目标数 {}".format(
+        match['evictions'], match['cached_targets_at_end']))
+    print("-" * 72)
+    print(u"热点模式(每轮耗时ms,无头引擎)    直接创建      缓存    节省创建/轮")
+    for name, direct_ms, cached_ms, saved in bench_patterns(simulator.engine, args.rounds):
+        print(u"  {:<28} {:>10.3f} {:>9.3f} {:>12}".format(name, direct_ms, cached_ms, saved))
+    print("=" * 72)
+    return 0 if match['finished'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
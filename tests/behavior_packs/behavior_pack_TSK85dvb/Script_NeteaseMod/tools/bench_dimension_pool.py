@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+地图维度副本池基准 - 对比单副本与多副本时大厅等待地图还原的时间
+
+用法(Python 2.7):
+    python tools/bench_dimension_pool.py
+    python tools/bench_dimension_pool.py --copies 1 2 3 --matches 6 --blocks 30000 --lobby 5
+
+内容:
+- 同一张地图连续进行多局,每局在所用副本中放置N个方块(记录到DimensionBackup)
+- 对局结束后归还副本(DimensionPool.release在后台按预算还原),经过大厅间隔后开始下一局
+- 下一局开始时没有干净副本则等待,统计等待Tick数
+- 输出总等待时间、取副本失败次数、还原耗时与积压峰值,并校验各副本最终全部还原
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import random
+import sys
+
+if sys.version_info[0] == 2:
+    reload(sys)  # noqa: F821
+    sys.setdefaultencoding('utf-8')
+
+SCRIPT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(SCRIPT_ROOT, '..'))
+sys.path.insert(0, SCRIPT_ROOT)
+
+from Script_NeteaseMod.tools.headless import install  # noqa: E402
+from Script_NeteaseMod.tools.headless.engine import TICKS_PER_SECOND  # noqa: E402
+
+MAP_ID = "bench_map"
+BASE_DIMENSION = 9100
+LOAD_RANGE = ((-76, 0, -76), (76, 140, 76))
+# 单局对局时长(Tick)
+MATCH_TICKS = 10 * TICKS_PER_SECOND
+# 等待干净副本的最长Tick数
+MAX_WAIT_TICKS = 120 * TICKS_PER_SECOND
+
+
+class BenchRoom(object):
+    """提供DimensionPool所需接口的最小房间系统"""
+
+    def __init__(self):
+        from Script_NeteaseMod.systems.util.TickScheduler import TickScheduler
+        self.scheduler = TickScheduler()
+        self.map_backup_handlers = {}
+        self.restored = []
+
+    def get_backup_handler(self, dimension_id):
+        from Script_NeteaseMod.systems.util.DimensionBackupHandler import DimensionBackupHandler
+        if dimension_id not in self.map_backup_handlers:
+            self.map_backup_handlers[dimension_id] = DimensionBackupHandler(self, dimension_id)
+        return self.map_backup_handlers[dimension_id]
+
+    def on_map_copy_restored(self, map_id, dimension):
+        self.restored.append(dimension)
+
+
+def _tick(engine, room, pool, stats):
+    engine.advance()
+    room.scheduler.update()
+    stats['max_backlog'] = max(stats['max_backlog'], pool.get_metrics()['restore_backlog'])
+
+
+def run(engine, copies, matches, blocks, lobby_ticks, seed):
+    """
+    连续进行matches局
+
+    Returns:
+        dict: 统计结果
+    """
+    from Script_NeteaseMod.systems.util.DimensionPool import DimensionPool
+
+    dimensions = [BASE_DIMENSION + index for index in range(copies)]
+    for dimension in dimensions:
+        engine.blocks[dimension] = {}
+    engine.ticking_areas.clear()
+
+    room = BenchRoom()
+    stage = {'id': MAP_ID, 'map_dimension': dimensions[0], 'map_dimensions': dimensions}
+    pool = DimensionPool(room, [stage])
+    pool.start()
+    rng = random.Random(seed)
+    stats = {'wait_ticks': 0, 'max_backlog': 0}
+
+    for _ in range(matches):
+        dimension = pool.acquire(MAP_ID)
+        waited = 0
+        while dimension is None and waited < MAX_WAIT_TICKS:
+            _tick(engine, room, pool, stats)
+            waited += 1
+            dimension = pool.acquire(MAP_ID) if pool.has_clean_copy(MAP_ID) else None
+        stats['wait_ticks'] += waited
+        if dimension is None:
+            break
+
+        handler = room.get_backup_handler(dimension)
+        handler.save_initial_state(LOAD_RANGE)
+        placed = 0
+        while placed < blocks:
+            pos = (rng.randint(LOAD_RANGE[0][0], LOAD_RANGE[1][0]), rng.randint(60, 90),
+                   rng.randint(LOAD_RANGE[0][2], LOAD_RANGE[1][2]))
+            if pos in engine.blocks[dimension]:
+                continue
+            handler.backup.record(pos)
+            engine.set_block(pos, {'name': 'minecraft:wool', 'aux': 0}, dimension)
+            placed += 1
+        for _ in range(MATCH_TICKS):
+            _tick(engine, room, pool, stats)
+
+        pool.release(MAP_ID, dimension)
+        for _ in range(lobby_ticks):
+            _tick(engine, room, pool, stats)
+
+    drain = 0
+    while pool.get_metrics()['restore_backlog'] and drain < MAX_WAIT_TICKS:
+        _tick(engine, room, pool, stats)
+        drain += 1
+    pool.stop()
+
+    metrics = pool.get_metrics()
+    leftover = sum(1 for dimension in dimensions for block in engine.blocks[dimension].values()
+                   if block.get('name') != 'minecraft:air')
+    return {
+        'copies': copies,
+        'wait_seconds': stats['wait_ticks'] / float(TICKS_PER_SECOND),
+        'acquire_misses': metrics['acquire_misses'],
+        'restore_count': metrics['restore_count'],
+        'avg_restore': metrics['avg_restore_seconds'],
+        'max_backlog': stats['max_backlog'],
+        'leftover': leftover,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=u"地图维度副本池基准")
+    parser.add_argument("--copies", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--matches", type=int, default=4)
+    parser.add_argument("--blocks", type=int, default=20000, help=u"每局放置的方块数")
+    parser.add_argument("--lobby", type=float, default=3.0, help=u"对局间的大厅间隔(秒)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = install()
+    # 副本池与调度器按time.time计时,使用虚拟时钟
+    engine.install_clock()
+    lobby_ticks = int(args.lobby * TICKS_PER_SECOND)
+    results = [run(engine, copies, args.matches, args.blocks, lobby_ticks, args.seed) for copies in args.copies]
+
+    print("=" * 80)
+    print(u"地图维度副本池 对局数={} 每局放置={} 大厅间隔={}秒".format(args.matches, args.blocks, args.lobby))
+    print(u"  {:>6} {:>12} {:>12} {:>10} {:>12} {:>10} {:>8}".format(
+        u"副本数", u"等待(秒)", u"取副本失败", u"还原次数", u"平均还原(秒)", u"积压峰值", u"残留"))
+    for result in results:
+        print(u"  {:>6} {:>12.2f} {:>12} {:>10} {:>12.2f} {:>10} {:>8}".format(
+            result['copies'], result['wait_seconds'], result['acquire_misses'], result['restore_count'],
+            result['avg_restore'], result['max_backlog'], result['leftover']))
+    print("=" * 80)
+    engine.uninstall_clock()
+    return 0 if all(not result['leftover'] and result['restore_count'] == args.matches for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+爆炸射线追踪基准 - 对比逐步GetBlockNew的原实现与预计算射线+方块缓存的实现
+
+用法(Python 2.7):
+    python tools/bench_explosion.py
+    python tools/bench_explosion.py --explosions 200 --density 0.6 --size 4
+    python tools/bench_explosion.py --rounds 20 --per-tick 6
+
+内容:
+- 在无头引擎中随机搭建防御方块(羊毛/木板/末地石/黑曜石/染色玻璃/空气)
+- legacy: 原BedWarsExplosion.explode_a(每0.3格步进调用一次GetBlockNew,列表查重)
+- cached: BedWarsExplosion.explode_a(启动时建立ExplosionResistanceRegistry,不计入统计)
+- 每次爆炸前用相同种子重置random,校验受影响方块(含顺序)与之后的随机数状态完全一致
+- 输出每次爆炸的引擎调用数与耗时
+- 同Tick多次爆炸: 逐个explode()对比ExplosionQueue合并结算,
+  输出引擎调用数、破坏方块数,并校验每个玩家受到的总伤害一致
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import random
+import sys
+
+if sys.version_info[0] == 2:
+    reload(sys)  # noqa: F821
+    sys.setdefaultencoding('utf-8')
+
+SCRIPT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(SCRIPT_ROOT, '..'))
+sys.path.insert(0, SCRIPT_ROOT)
+
+from Script_NeteaseMod.tools.headless import install  # noqa: E402
+from Script_NeteaseMod.tools.headless.engine import real_clock  # noqa: E402
+
+DIMENSION = 9008
+# 防御方块分布区域半径
+AREA_RADIUS = 10
+BLOCK_CHOICES = ('minecraft:wool', 'minecraft:wool', 'minecraft:planks', 'minecraft:end_stone',
+                 'minecraft:obsidian', 'minecraft:stained_glass', 'minecraft:hardened_clay')
+# 原火球/TNT的配置(染色玻璃抗性6000,legacy使用)
+RESISTANCE_MAP = {"minecraft:stained_glass": 6000}
+READ_APIS = ("CreateBlockInfo.GetBlockNew", "CreateBlockInfo.GetBlockBasicInfo")
+BATCH_APIS = ("CreateBlockInfo.GetBlockNew", "CreateBlockInfo.SetBlockNew", "CreateGame.GetEntitiesInSquareArea",
+              "CreatePos.GetFootPos", "CreateActorMotion.SetPlayerMotion", "CreateHurt.Hurt")
+# 同Tick爆炸的分布半径(围绕同一点)
+CLUSTER_RADIUS = 3.0
+# 爆炸范围内的玩家数
+PLAYER_COUNT = 6
+# 玩家初始血量(足够高,避免死亡影响统计)
+PLAYER_HEALTH = 1000000.0
+
+
+def build_scene(engine, density, seed):
+    """随机放置防御方块"""
+    rng = random.Random(seed)
+    blocks = engine.blocks[DIMENSION] = {}
+    for x in range(-AREA_RADIUS, AREA_RADIUS + 1):
+        for y in range(60, 60 + AREA_RADIUS):
+            for z in range(-AREA_RADIUS, AREA_RADIUS + 1):
+                if rng.random() < density:
+                    blocks[(x, y, z)] = {'name': rng.choice(BLOCK_CHOICES), 'aux': 0}
+
+
+def legacy_explode_a(explosion):
+    """原BedWarsExplosion.explode_a"""
+    import mod.server.extraServerApi as serverApi
+    from Script_NeteaseMod.systems.util.BedWarsExplosion import Vector3
+    from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
+
+    if explosion.size < 0.1:
+        return False
+    comp_block_info = get_component_cache().CreateBlockInfo(serverApi.GetLevelId())
+    affected_blocks = explosion.affected_blocks = []
+    rays = 8
+    m_rays = rays - 1
+    vector = Vector3(0, 0, 0)
+    for i in range(rays):
+        for j in range(rays):
+            for k in range(rays):
+                if i == 0 or i == m_rays or j == 0 or j == m_rays or k == 0 or k == m_rays:
+                    vector.set_components(
+                        float(i) / float(m_rays) * 2 - 1,
+                        float(j) / float(m_rays) * 2 - 1,
+                        float(k) / float(m_rays) * 2 - 1
+                    )
+                    length = vector.length()
+                    step_len = 0.3
+                    vector.set_components(
+                        (vector.x / length) * step_len,
+                        (vector.y / length) * step_len,
+                        (vector.z / length) * step_len
+                    )
+                    pointer_x, pointer_y, pointer_z = explosion.source_pos
+                    blast_force = explosion.size * (random.randint(700, 1301) / 1000.0)
+                    while blast_force > 0:
+                        x, y, z = int(pointer_x), int(pointer_y), int(pointer_z)
+                        block_dict = comp_block_info.GetBlockNew((x, y, z), explosion.dimension)
+                        if 'name' in block_dict and block_dict['name'] != 'minecraft:air':
+                            if 'stained_glass' in block_dict['name']:
+                                pass
+                            else:
+                                if block_dict['name'] in explosion.explosion_resistance_map:
+                                    explosion_resistance = explosion.explosion_resistance_map[block_dict['name']]
+                                else:
+                                    block_info = comp_block_info.GetBlockBasicInfo(block_dict['name'])
+                                    explosion_resistance = block_info.get('explosionResistance', 0)
+                                blast_force -= (explosion_resistance / 5 + 0.3) * step_len
+                                if blast_force > 0 and (x, y, z) not in affected_blocks:
+                                    affected_blocks.append((x, y, z))
+                        pointer_x += vector.x
+                        pointer_y += vector.y
+                        pointer_z += vector.z
+                        blast_force -= step_len * 0.75
+    return True
+
+
+def run(engine, mode, centers, size):
+    """
+    依次执行爆炸阶段A
+
+    Returns:
+        dict: {'results': [(affected, random_state), ...], 'calls', 'ms'}
+    """
+    from Script_NeteaseMod.systems.util.BedWarsExplosion import BedWarsExplosion
+    from Script_NeteaseMod.systems.util.ExplosionResistanceRegistry import get_explosion_resistance_registry
+
+    registry = get_explosion_resistance_registry()
+    registry.reset()
+    if mode != 'legacy':
+        registry.build()
+    engine.reset_stats()
+    results = []
+    elapsed = 0.0
+    for index, center in enumerate(centers):
+        explosion = BedWarsExplosion(DIMENSION, center, size, "-1", resistance_registry=registry)
+        if mode == 'legacy':
+            explosion.explosion_resistance_map = RESISTANCE_MAP
+        random.seed(index)
+        begin = real_clock()
+        if mode == 'legacy':
+            legacy_explode_a(explosion)
+        else:
+            explosion.explode_a()
+        elapsed += real_clock() - begin
+        results.append((list(explosion.affected_blocks), random.random()))
+    return {
+        'results': results,
+        'calls': dict((api, engine.api_calls.get(api, 0)) for api in READ_APIS),
+        'ms': elapsed * 1000.0,
+        'misses': registry.miss_count,
+    }
+
+
+def run_batch(engine, mode, rounds, per_tick, size, density, seed):
+    """
+    每轮在同一Tick内引爆per_tick次爆炸
+
+    Returns:
+        dict: {'calls', 'destroyed', 'damage': {player_id: 总伤害}, 'ms'}
+    """
+    from Script_NeteaseMod.systems.util.BedWarsExplosion import BedWarsExplosion
+    from Script_NeteaseMod.systems.util.ExplosionQueue import ExplosionQueue
+
+    build_scene(engine, density, seed)
+    initial = set(pos for pos, block in engine.blocks[DIMENSION].items() if block['name'] != 'minecraft:air')
+    rng = random.Random(seed)
+    players = []
+    for index in range(PLAYER_COUNT):
+        pos = (rng.uniform(-4, 4), rng.uniform(62, 66), rng.uniform(-4, 4))
+        player_id = engine.add_player("bench_{}_{}".format(mode, index), pos=pos, dimension=DIMENSION)
+        engine.get_entity(player_id).attrs['HEALTH'] = PLAYER_HEALTH
+        players.append(player_id)
+
+    queue = ExplosionQueue(None)
+    engine.reset_stats()
+    elapsed = 0.0
+    for round_index in range(rounds):
+        anchor = (rng.uniform(-4, 4), rng.uniform(62, 66), rng.uniform(-4, 4))
+        explosions = []
+        for _ in range(per_tick):
+            center = tuple(anchor[axis] + rng.uniform(-CLUSTER_RADIUS, CLUSTER_RADIUS) for axis in range(3))
+            explosions.append(BedWarsExplosion(DIMENSION, center, size, "-1"))
+        random.seed(round_index)
+        begin = real_clock()
+        if mode == 'separate':
+            for explosion in explosions:
+                explosion.explode()
+        else:
+            for explosion in explosions:
+                queue.submit(explosion)
+            queue.flush()
+        elapsed += real_clock() - begin
+
+    damage = dict((player_id, PLAYER_HEALTH - engine.get_entity(player_id).attrs['HEALTH']) for player_id in players)
+    for player_id in players:
+        engine.destroy_entity(player_id)
+    destroyed = sum(1 for pos in initial if engine.blocks[DIMENSION].get(pos, {}).get('name', 'minecraft:air') ==
+                    'minecraft:air')
+    return {
+        'calls': dict((api, engine.api_calls.get(api, 0)) for api in BATCH_APIS),
+        'destroyed': destroyed,
+        'damage': damage,
+        'ms': elapsed * 1000.0,
+    }
+
+
+def report_batch(engine, args):
+    """输出同Tick多次爆炸的对比,返回总伤害是否一致"""
+    separate = run_batch(engine, 'separate', args.rounds, args.per_tick, args.size, args.density, args.seed)
+    batched = run_batch(engine, 'batched', args.rounds, args.per_tick, args.size, args.density, args.seed)
+    same_damage = sorted(separate['damage'].values()) == sorted(batched['damage'].values())
+
+    print(u"同Tick多次爆炸 轮数={} 每Tick爆炸={} 玩家={}".format(args.rounds, args.per_tick, PLAYER_COUNT))
+    print(u"  {:<38} {:>12} {:>12}".format(u"指标", u"separate", u"batched"))
+    for api in BATCH_APIS:
+        print(u"  {:<38} {:>12} {:>12}".format(api, separate['calls'][api], batched['calls'][api]))
+    print(u"  {:<38} {:>12} {:>12}".format(u"破坏方块数", separate['destroyed'], batched['destroyed']))
+    print(u"  {:<38} {:>12.1f} {:>12.1f}".format(u"耗时ms", separate['ms'], batched['ms']))
+    print(u"  每个玩家受到的总伤害一致: {}".format(same_damage))
+    print("=" * 76)
+    return same_damage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=u"爆炸射线追踪基准")
+    parser.add_argument("--explosions", type=int, default=100)
+    parser.add_argument("--density", type=float, default=0.5, help=u"防御方块密度")
+    parser.add_argument("--size", type=float, default=4, help=u"爆炸半径(火球/TNT为4)")
+    parser.add_argument("--rounds", type=int, default=20, help=u"同Tick多次爆炸的轮数")
+    parser.add_argument("--per-tick", dest="per_tick", type=int, default=5, help=u"每Tick爆炸次数")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = install()
+    build_scene(engine, args.density, args.seed)
+    rng = random.Random(args.seed)
+    centers = [(rng.uniform(-AREA_RADIUS, AREA_RADIUS), rng.uniform(60, 60 + AREA_RADIUS),
+                rng.uniform(-AREA_RADIUS, AREA_RADIUS)) for _ in range(args.explosions)]
+
+    legacy = run(engine, 'legacy', centers, args.size)
+    cached = run(engine, 'cached', centers, args.size)
+    identical = legacy['results'] == cached['results']
+    affected = sum(len(result[0]) for result in legacy['results'])
+
+    count = float(max(1, args.explosions))
+    print("=" * 76)
+    print(u"爆炸射线追踪 爆炸次数={} 半径={} 方块密度={} 平均受影响方块={:.1f}".format(
+        args.explosions, args.size, args.density, affected / count))
+    print(u"  {:<8} {:>16} {:>20} {:>14}".format(u"实现", u"GetBlockNew/次", u"GetBlockBasicInfo/次", u"耗时ms/次"))
+    for name, result in (("legacy", legacy), ("cached", cached)):
+        print(u"  {:<8} {:>16.1f} {:>20.2f} {:>14.3f}".format(
+            name, result['calls'][READ_APIS[0]] / count, result['calls'][READ_APIS[1]] / count, result['ms'] / count))
+    print(u"  抗性表未登记方块: {}".format(cached['misses']))
+    print(u"  受影响方块与随机数状态一致: {}".format(identical))
+    print("=" * 76)
+    same_damage = report_batch(engine, args)
+    return 0 if identical and same_damage else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
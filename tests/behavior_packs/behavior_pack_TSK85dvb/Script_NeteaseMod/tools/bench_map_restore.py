@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+地图还原基准 - 对比单Tick整图还原与按区块分批、按预算分片的还原
+
+用法(Python 2.7):
+    python tools/bench_map_restore.py                    # 默认6000个方块
+    python tools/bench_map_restore.py --blocks 20000 --budget-ms 2 --budget-blocks 256
+
+内容:
+- 在无头引擎中随机放置方块并记录到DimensionBackup(与对局中的记录方式一致)
+- legacy: 注册整图常加载区域,一个Tick内逐方块CheckChunkState + GetBlockNew + SetBlockNew
+- sliced: DimensionBackup.restore_map_by_set_block(按批次加载区块,每Tick预算内还原)
+- 输出总Tick数、单Tick最大/p99耗时(真实时间)、各API调用次数,并校验方块全部还原
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import random
+import sys
+
+if sys.version_info[0] == 2:
+    reload(sys)  # noqa: F821
+    sys.setdefaultencoding('utf-8')
+
+SCRIPT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(SCRIPT_ROOT, '..'))
+sys.path.insert(0, SCRIPT_ROOT)
+
+from Script_NeteaseMod.tools.headless import install  # noqa: E402
+from Script_NeteaseMod.tools.headless.engine import real_clock, TICKS_PER_SECOND  # noqa: E402
+
+DIMENSION = 9008
+LOAD_RANGE = ((-76, 0, -76), (76, 140, 76))
+# 还原最多等待的Tick数
+MAX_TICKS = 30 * TICKS_PER_SECOND
+COUNTED_APIS = ("CreateChunkSource.CheckChunkState", "CreateBlockInfo.GetBlockNew", "CreateBlockInfo.SetBlockNew")
+
+
+def _fill(engine, backup, block_count, seed):
+    """随机放置方块并记录(记录发生在放置前,与ServerEntityTryPlaceBlockEvent一致)"""
+    rng = random.Random(seed)
+    placed = set()
+    while len(placed) < block_count:
+        pos = (rng.randint(LOAD_RANGE[0][0], LOAD_RANGE[1][0]), rng.randint(60, 90),
+               rng.randint(LOAD_RANGE[0][2], LOAD_RANGE[1][2]))
+        if pos in placed:
+            continue
+        backup.record(pos)
+        engine.set_block(pos, {'name': 'minecraft:wool', 'aux': rng.randint(0, 15)}, DIMENSION)
+        placed.add(pos)
+
+
+def _restore_legacy(backup, callback):
+    """原实现: 整图常加载区域,1秒后单个协程步内还原全部方块"""
+    import mod.server.extraServerApi as serverApi
+    from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
+
+    chunk_comp = get_component_cache().CreateChunkSource(serverApi.GetLevelId())
+    chunk_comp.SetAddArea('restore_area_{}'.format(backup.dimension), backup.dimension,
+                          (LOAD_RANGE[0][0] - 100, LOAD_RANGE[0][1], LOAD_RANGE[0][2] - 100),
+                          (LOAD_RANGE[1][0] + 100, LOAD_RANGE[1][1], LOAD_RANGE[1][2] + 100))
+
+    def _start_restore():
+        for pos in backup.block_changes:
+            if not backup.set_block(pos) and pos not in backup.store_block_dict:
+                backup.store_block_dict[pos] = backup.block_changes[pos]['old']
+        yield
+
+    def _on_timer_end():
+        serverApi.StartCoroutine(_start_restore, callback)
+
+    get_component_cache().CreateGame(serverApi.GetLevelId()).AddTimer(1.0, _on_timer_end)
+
+
+def run(engine, mode, block_count, seed, budget_ms, budget_blocks):
+    """
+    执行一次还原
+
+    Returns:
+        dict: 统计结果
+    """
+    engine.blocks[DIMENSION].clear()
+    engine.ticking_areas.clear()
+    from Script_NeteaseMod.systems.util.DimensionBackup import DimensionBackup
+    from Script_NeteaseMod.systems.util.ComponentCache import get_component_cache
+
+    get_component_cache().clear(include_level=True)
+    backup = DimensionBackup(DIMENSION)
+    backup.budget_ms = budget_ms
+    backup.budget_blocks = budget_blocks
+    backup.backup_initial_state(LOAD_RANGE)
+    _fill(engine, backup, block_count, seed)
+    engine.reset_stats()
+
+    done = []
+    progress = []
+    if mode == 'legacy':
+        _restore_legacy(backup, lambda: done.append(True))
+    else:
+        backup.restore_map_by_set_block(lambda: done.append(True), progress.append)
+
+    tick_times = []
+    while not done and len(tick_times) < MAX_TICKS:
+        begin = real_clock()
+        engine.advance()
+        tick_times.append((real_clock() - begin) * 1000.0)
+
+    busy = sorted(t for t in tick_times if t > 0.05) or [0.0]
+    return {
+        'mode': mode,
+        'finished': bool(done),
+        'ticks': len(tick_times),
+        'busy_ticks': len(busy),
+        'max_ms': busy[-1],
+        'p99_ms': busy[min(len(busy) - 1, int(len(busy) * 0.99))],
+        'total_ms': sum(tick_times),
+        'remaining': len(engine.blocks[DIMENSION]),
+        'api_calls': dict((api, engine.api_calls.get(api, 0)) for api in COUNTED_APIS),
+        'progress_reports': len(progress),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=u"地图还原基准")
+    parser.add_argument("--blocks", type=int, default=6000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget-ms", type=float, default=4.0)
+    parser.add_argument("--budget-blocks", type=int, default=512)
+    args = parser.parse_args()
+
+    engine = install()
+    results = [run(engine, mode, args.blocks, args.seed, args.budget_ms, args.budget_blocks)
+               for mode in ('legacy', 'sliced')]
+
+    print("=" * 78)
+    print(u"地图还原基准 方块数={} 预算={}ms/{}方块".format(args.blocks, args.budget_ms, args.budget_blocks))
+    print(u"  {:<8} {:>6} {:>7} {:>8} {:>9} {:>9} {:>9} {:>6}".format(
+        u"模式", u"完成", u"Tick", u"工作Tick", u"最大ms", u"p99ms", u"总ms", u"残留"))
+    for result in results:
+        print(u"  {:<8} {:>6} {:>7} {:>8} {:>9.2f} {:>9.2f} {:>9.1f} {:>6}".format(
+            result['mode'], u"是" if result['finished'] else u"否", result['ticks'], result['busy_ticks'],
+            result['max_ms'], result['p99_ms'], result['total_ms'], result['remaining']))
+    print("-" * 78)
+    print(u"  {:<36} {:>12} {:>12}".format(u"API调用", "legacy", "sliced"))
+    for api in COUNTED_APIS:
+        print(u"  {:<36} {:>12} {:>12}".format(api, results[0]['api_calls'][api], results[1]['api_calls'][api]))
+    print("=" * 78)
+    return 0 if all(result['finished'] and not result['remaining'] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
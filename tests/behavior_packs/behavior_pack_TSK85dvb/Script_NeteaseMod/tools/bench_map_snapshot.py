@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+快照模式地图重置基准 - 对比逐方块还原与按区段快照还原
+
+用法(Python 2.7):
+    python tools/bench_map_snapshot.py
+    python tools/bench_map_snapshot.py --changes 500 5000 20000 --breaks 300
+
+内容:
+- 在无头引擎中搭建8个岛屿与中岛的地形,用快照模式抓取一次(写入关卡ExtraData)
+- 每个场景: 放置N个方块(记录到变更记录)并破坏M个地形方块(记录到快照脏区段)
+- per_block: DimensionBackup.restore_map_by_set_block(只能把放置的方块清为空气)
+- snapshot: MapSnapshot.restore(脏区段或全部区段整段写回)
+- 输出Tick数、单Tick最大耗时、写入API调用数,以及还原后与初始地形不一致的方块数
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import random
+import sys
+
+if sys.version_info[0] == 2:
+    reload(sys)  # noqa: F821
+    sys.setdefaultencoding('utf-8')
+
+SCRIPT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(SCRIPT_ROOT, '..'))
+sys.path.insert(0, SCRIPT_ROOT)
+
+from Script_NeteaseMod.tools.headless import install  # noqa: E402
+from Script_NeteaseMod.tools.headless.engine import real_clock, TICKS_PER_SECOND  # noqa: E402
+
+DIMENSION = 9008
+LOAD_RANGE = ((-76, 40, -76), (76, 110, 76))
+MAX_TICKS = 120 * TICKS_PER_SECOND
+WRITE_APIS = ("CreateBlockInfo.SetBlockNew", "CreateBlock.SetBlockByBlockPalette")
+
+
+def build_terrain():
+    """8个岛屿 + 中岛,返回{(x, y, z): block_dict}"""
+    terrain = {}
+    centers = [(0, 0)] + [(int(56 * dx), int(56 * dz)) for dx, dz in
+                          ((1, 0), (-1, 0), (0, 1), (0, -1), (0.7, 0.7), (-0.7, 0.7), (0.7, -0.7), (-0.7, -0.7))]
+    for index, (cx, cz) in enumerate(centers):
+        radius = 10 if index == 0 else 7
+        for x in range(cx - radius, cx + radius + 1):
+            for z in range(cz - radius, cz + radius + 1):
+                for y in range(60, 64):
+                    name = 'minecraft:end_stone' if y < 63 else 'minecraft:wool'
+                    terrain[(x, y, z)] = {'name': name, 'aux': index}
+    return terrain
+
+
+def _advance_until(engine, done):
+    """推进Tick直到done非空,返回每Tick耗时(ms)"""
+    tick_times = []
+    while not done and len(tick_times) < MAX_TICKS:
+        begin = real_clock()
+        engine.advance()
+        tick_times.append((real_clock() - begin) * 1000.0)
+    return tick_times
+
+
+def capture_snapshot(engine, terrain):
+    """抓取快照,返回(Tick数, 快照信息)"""
+    from Script_NeteaseMod.systems.util.DimensionBackupHandler import DimensionBackupHandler
+
+    engine.blocks[DIMENSION] = dict((pos, dict(block)) for pos, block in terrain.items())
+    handler = DimensionBackupHandler(None, DIMENSION)
+    done = []
+    handler.capture_snapshot(LOAD_RANGE, lambda success: done.append(success))
+    ticks = _advance_until(engine, done)
+    return len(ticks), handler.snapshot.get_info()
+
+
+def run_scenario(engine, terrain, mode, changes, breaks, seed):
+    """
+    执行一个场景
+
+    Returns:
+        dict: 统计结果
+    """
+    from Script_NeteaseMod.systems.util.DimensionBackupHandler import DimensionBackupHandler
+
+    blocks = engine.blocks[DIMENSION] = dict((pos, dict(block)) for pos, block in terrain.items())
+    engine.ticking_areas.clear()
+    handler = DimensionBackupHandler(None, DIMENSION)
+    handler.save_initial_state(LOAD_RANGE, use_snapshot=(mode == 'snapshot'))
+
+    rng = random.Random(seed)
+    placed = 0
+    while placed < changes:
+        pos = (rng.randint(LOAD_RANGE[0][0], LOAD_RANGE[1][0]), rng.randint(64, 100),
+               rng.randint(LOAD_RANGE[0][2], LOAD_RANGE[1][2]))
+        if pos in blocks:
+            continue
+        handler.backup.record(pos)
+        engine.set_block(pos, {'name': 'minecraft:wool', 'aux': rng.randint(0, 15)}, DIMENSION)
+        placed += 1
+    for pos in rng.sample(sorted(terrain), breaks):
+        handler.record_block_break(pos)
+        engine.set_block(pos, {'name': 'minecraft:air', 'aux': 0}, DIMENSION)
+
+    engine.reset_stats()
+    done = []
+    handler.restore(lambda: done.append(True))
+    ticks = _advance_until(engine, done)
+
+    current = engine.blocks[DIMENSION]
+    mismatched = sum(1 for pos in set(current) | set(terrain) if current.get(pos) != terrain.get(pos))
+    return {
+        'mode': mode,
+        'restore_mode': handler.snapshot.last_restore_mode if handler.snapshot else 'blocks',
+        'finished': bool(done),
+        'ticks': len(ticks),
+        'max_ms': max(ticks) if ticks else 0.0,
+        'total_ms': sum(ticks),
+        'writes': sum(engine.api_calls.get(api, 0) for api in WRITE_APIS),
+        'mismatched': mismatched,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=u"快照模式地图重置基准")
+    parser.add_argument("--changes", type=int, nargs="+", default=[500, 5000, 20000])
+    parser.add_argument("--breaks", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = install()
+    terrain = build_terrain()
+    capture_ticks, info = capture_snapshot(engine, terrain)
+
+    results = []
+    for changes in args.changes:
+        for mode in ('per_block', 'snapshot'):
+            results.append((changes, run_scenario(engine, terrain, mode, changes, args.breaks, args.seed)))
+
+    print("=" * 84)
+    print(u"快照模式地图重置 地形方块={} 破坏={}".format(len(terrain), args.breaks))
+    print(u"  快照抓取 {} Tick, 区段数 {}, 压缩后 {}KB".format(capture_ticks, info['section_count'], info['bytes'] // 1024))
+    print(u"  {:>7} {:<10} {:<8} {:>6} {:>8} {:>10} {:>9} {:>8}".format(
+        u"放置", u"模式", u"区段", u"Tick", u"最大ms", u"总ms", u"写入调用", u"不一致"))
+    for changes, result in results:
+        print(u"  {:>7} {:<10} {:<8} {:>6} {:>8.2f} {:>10.1f} {:>9} {:>8}".format(
+            changes, result['mode'], result['restore_mode'], result['ticks'], result['max_ms'],
+            result['total_ms'], result['writes'], result['mismatched']))
+    print("=" * 84)
+    snapshot_ok = all(result['finished'] and not result['mismatched']
+                      for _, result in results if result['mode'] == 'snapshot')
+    return 0 if snapshot_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+"""
+商店购买压力基准 - 以每秒1000次的速率向ShopServerSystem发送购买请求
+
+用法(Python 2.7):
+    python tools/bench_purchase.py
+    python tools/bench_purchase.py --rate 2000 --seconds 10 --dup 0.2 --seed 3
+    python tools/bench_purchase.py --no-limit  # 关闭令牌桶与队列上限,只测处理能力
+
+内容:
+- 用simulate_match的8队对局推进到running阶段,之后停止机器人行为,只发送购买请求
+- 每Tick按速率发送BedWarsShopTryBuy(方块/护甲/剑/镐斧升级/队伍升级/陷阱混合),
+  按--dup比例在同一Tick内重复发送同一请求(模拟双击)
+- 请求进入购买队列(PurchaseRequestQueue),在下一Tick的ShopServerSystem.Update中按预算处理
+- 每Tick补充货币,每秒清理背包中的方块(保留背包满导致发放失败的情况)
+- 校验:
+  1. 货币守恒: 每个玩家每Tick扣除的货币恰好等于成功购买的价格之和
+  2. 同一Tick内重复的请求(未被限速拒绝的)全部合并到本Tick该商品的条目(购买N次)
+  3. 购买N次的条目: 部分成功时按成功发送结果,消息带成功次数(xK)与停止原因
+     (压力阶段结束后另做一次确定性检查: 同一Tick内3次购买羊毛,铁锭只够2次)
+  4. 每秒一次在购买队列处理后校验背包镜像与实际背包一致
+- 输出队列统计(限速拒绝/队列已满/合并为购买N次)、每Tick处理耗时、每次购买的引擎调用数与背包镜像重新加载次数
+  (替身引擎的背包变化事件在下一Tick派发,购买写穿后的事件与镜像一致时不失效)
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import random
+import sys
+
+if sys.version_info[0] == 2:
+    reload(sys)  # noqa: F821
+    sys.setdefaultencoding('utf-8')
+
+SCRIPT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(SCRIPT_ROOT, '..'))
+sys.path.insert(0, SCRIPT_ROOT)
+
+from Script_NeteaseMod.tools.simulate_match import MatchSimulator, _Sink, _percentiles  # noqa: E402
+from Script_NeteaseMod.tools.headless.engine import TICKS_PER_SECOND, real_clock  # noqa: E402
+
+# 购买的商品及权重
+BENCH_GOODS = [
+    ("block.wool", 30), ("block.clay", 10), ("block.plank", 10), ("block.end-stone", 5),
+    ("block.obsidian", 3), ("prop.golden-apple", 5), ("prop.tnt", 3), ("arrow.arrow", 5),
+    ("armor.chain", 3), ("armor.iron", 3), ("armor.diamond.r", 2),
+    ("sword.stone", 3), ("sword.iron", 3), ("sword.diamond", 2),
+    ("tool.pickaxe-upgrade", 4), ("tool.axe-upgrade", 4),
+    ("upgrade.sword", 1), ("upgrade.armor", 1), ("trap.slowness", 1), ("trap.alert", 1),
+]
+# 每Tick补充到的货币数量
+CURRENCY_TOPUP = [
+    ("minecraft:iron_ingot", 128),
+    ("minecraft:gold_ingot", 64),
+    ("minecraft:diamond", 32),
+    ("minecraft:emerald", 32),
+]
+CURRENCY_NAMES = dict((name, True) for name, _ in CURRENCY_TOPUP)
+# 统计每次购买调用数的引擎API
+REPORT_APIS = ("CreateItem.GetPlayerAllItems", "CreateItem.SetPlayerAllItems", "CreateItem.GetPlayerItem",
+               "CreateItem.SpawnItemToPlayerInv", "CreateItem.SetInvItemNum", "CreateItem.SetEntityItem")
+
+
+def prepare(seed):
+    """
+    推进对局到running阶段
+
+    Returns:
+        MatchSimulator: 模拟器
+    """
+    simulator = MatchSimulator(seed=seed)
+    simulator.setup()
+    simulator.join_bots()
+    while simulator.phase != "running/running":
+        if simulator.engine.tick_count > 20 * 60 * TICKS_PER_SECOND:
+            raise RuntimeError("match did not reach running state")
+        simulator.tick()
+    return simulator
+
+
+def idle_tick(simulator, stats=None, paid=None):
+    """
+    推进一个Tick(不驱动机器人)
+
+    Args:
+        stats (dict): 不为None时记录商店Update(处理购买队列)的耗时与引擎调用,并校验货币守恒
+        paid (dict): {player_id: [price, ...]} 成功购买的价格(校验后清空)
+    """
+    engine = simulator.engine
+    engine.advance()
+    for system in simulator.systems:
+        if stats is None or system is not simulator.shop:
+            engine._safe_call(system.Update)
+            continue
+        # 只在商店Update前后对比货币(其他系统的Update中机器人可能拾取资源)
+        bots = simulator._alive_bots()
+        before = dict((player_id, currency_counts(engine, player_id)) for player_id in bots)
+        paid.clear()
+        calls_before = dict(engine.api_calls)
+        begin = real_clock()
+        engine._safe_call(system.Update)
+        stats['drain_times'].append(real_clock() - begin)
+        count_calls(engine, calls_before, stats)
+        check_conservation(engine, bots, before, paid, stats)
+    engine.preset_system.tick()
+
+
+def count_calls(engine, calls_before, stats):
+    """累计引擎调用数"""
+    for api, count in engine.api_calls.items():
+        delta = count - calls_before.get(api, 0)
+        stats['api_total'] += delta
+        if api in stats['api_calls']:
+            stats['api_calls'][api] += delta
+
+
+def top_up(engine, player_id):
+    """补充货币"""
+    for item_name, target in CURRENCY_TOPUP:
+        have = engine.count_item(player_id, item_name)
+        if have < target:
+            engine.give_item(player_id, {'newItemName': item_name, 'count': target - have})
+
+
+def clear_blocks(engine, player_id):
+    """清理背包中可堆叠的非货币物品(方块/道具)"""
+    from Script_NeteaseMod.systems.util.InventoryMirror import get_inventory_mirror
+    slots = engine.get_slots(player_id, 'INVENTORY') or []
+    for slot, item in enumerate(slots):
+        if item and item['newItemName'] not in CURRENCY_NAMES and item['count'] > 1:
+            slots[slot] = None
+    get_inventory_mirror().invalidate(player_id)
+
+
+def currency_counts(engine, player_id):
+    """直接读取替身背包中的货币数量(不计入API调用)"""
+    return dict((name, engine.count_item(player_id, name)) for name, _ in CURRENCY_TOPUP)
+
+
+def check_conservation(engine, bots, before, paid, stats):
+    """每个玩家扣除的货币等于成功购买的价格之和"""
+    from Script_NeteaseMod.systems.shop.PurchaseTransaction import normalize_prices
+    from Script_NeteaseMod.systems.util.CurrencyManager import CurrencyManager
+
+    for player_id in bots:
+        expected = dict(before[player_id])
+        for price in paid.get(player_id, []):
+            for currency, amount in normalize_prices(price):
+                item_id = CurrencyManager.CURRENCY_ITEMS.get(currency)
+                expected[item_id] = expected.get(item_id, 0) - amount
+        if currency_counts(engine, player_id) != expected:
+            stats['conservation_errors'] += 1
+
+
+def stress(simulator, rate, seconds, dup_rate, rng, no_limit=False):
+    """
+    以固定速率发送购买请求
+
+    Returns:
+        dict: 统计结果
+    """
+    from Script_NeteaseMod.systems.util.InventoryMirror import get_inventory_mirror
+
+    engine = simulator.engine
+    shop = simulator.shop
+    queue = shop.purchase_queue
+    mirror = get_inventory_mirror()
+    bots = simulator._alive_bots()
+    goods_keys = [key for key, weight in BENCH_GOODS for _ in range(weight)]
+    if no_limit:
+        queue.capacity = queue.queue_limit = 1 << 30
+        queue.refill_per_tick = float(1 << 30)
+
+    # 记录成功购买的价格与购买结果
+    paid = {}
+    results = []
+    entry_bought = [0]
+    original_broadcast = shop._broadcast_purchase_event
+    original_send_result = shop._send_buy_result
+    original_process = shop._process_purchase
+
+    def record_price(player_id, goods_config, price):
+        paid.setdefault(player_id, []).append(price)
+        entry_bought[0] += 1
+        return original_broadcast(player_id, goods_config, price)
+
+    def record_result(player_id, success, message):
+        results.append((success, message))
+        return original_send_result(player_id, success, message)
+
+    def record_entry(player_id, goods_key, count):
+        # 校验购买N次条目的结果消息
+        entry_bought[0] = 0
+        results_before = len(results)
+        original_process(player_id, goods_key, count)
+        bought = entry_bought[0]
+        if count <= 1 or len(results) != results_before + 1:
+            return
+        stats['multi_entries'] += 1
+        success, message = results[-1]
+        if bought == count:
+            stats['multi_full'] += 1
+            ok = success and u"x{}".format(bought) in message
+        elif bought > 0:
+            stats['multi_partial'] += 1
+            ok = success and u"x{} (".format(bought) in message
+        else:
+            stats['multi_failed'] += 1
+            ok = not success
+        if not ok:
+            stats['result_errors'] += 1
+
+    shop._broadcast_purchase_event = record_price
+    shop._send_buy_result = record_result
+    shop._process_purchase = record_entry
+
+    for player_id in bots:
+        shop.handle_player_open_shop(player_id, simulator._team_of(player_id), "items")
+
+    stats = {
+        'requests': 0, 'duplicates': 0, 'expected_folded': 0, 'success': 0, 'failed': 0,
+        'reasons': {}, 'conservation_errors': 0, 'mirror_mismatches': 0, 'fold_errors': 0,
+        'multi_entries': 0, 'multi_full': 0, 'multi_partial': 0, 'multi_failed': 0, 'result_errors': 0,
+        'request_times': [], 'drain_times': [], 'api_calls': dict((api, 0) for api in REPORT_APIS), 'api_total': 0,
+    }
+    queue_before = queue.get_stats()
+    mirror_before = mirror.get_stats()
+    budget = 0.0
+    ticks = int(seconds * TICKS_PER_SECOND)
+
+    tick = 0
+    while tick < ticks or queue.has_pending():
+        # 处理上一Tick的购买队列
+        idle_tick(simulator, stats, paid)
+
+        # 每秒校验一次背包镜像(背包变化事件已在本Tick开始时派发,此后只有购买的写穿)
+        if tick % TICKS_PER_SECOND == TICKS_PER_SECOND - 1:
+            for player_id in bots:
+                mirror._get_counts(player_id)
+                if mirror.verify(player_id):
+                    stats['mirror_mismatches'] += 1
+        for player_id in bots:
+            top_up(engine, player_id)
+        if tick % TICKS_PER_SECOND == 0:
+            for player_id in bots:
+                clear_blocks(engine, player_id)
+
+        if tick < ticks:
+            budget += float(rate) / TICKS_PER_SECOND
+        seen = set()
+        while tick < ticks and budget >= 1.0:
+            budget -= 1.0
+            player_id = rng.choice(bots)
+            goods_key = rng.choice(goods_keys)
+            repeats = 2 if rng.random() < dup_rate else 1
+            for _ in range(repeats):
+                stats['requests'] += 1
+                if repeats > 1:
+                    stats['duplicates'] += 1
+                key = (player_id, goods_key)
+                rejected_before = queue.rate_limited_count + queue.queue_full_count
+                folded_before = queue.folded_count
+
+                calls_before = dict(engine.api_calls)
+                begin = real_clock()
+                engine.fire(simulator.mod_name, "ShopClientSystem", "BedWarsShopTryBuy",
+                            {'player_id': player_id, 'goods_key': goods_key, 'category_index': 0})
+                stats['request_times'].append(real_clock() - begin)
+                count_calls(engine, calls_before, stats)
+
+                # 本Tick已入队过的请求应合并到该条目(被限速拒绝的除外)
+                if queue.rate_limited_count + queue.queue_full_count != rejected_before:
+                    continue
+                if key in seen:
+                    stats['expected_folded'] += 1
+                    if queue.folded_count != folded_before + 1:
+                        stats['fold_errors'] += 1
+                seen.add(key)
+        tick += 1
+
+
+    for success, message in results:
+        if success:
+            stats['success'] += 1
+        else:
+            stats['failed'] += 1
+            stats['reasons'][message] = stats['reasons'].get(message, 0) + 1
+
+    shop._broadcast_purchase_event = original_broadcast
+    shop._send_buy_result = original_send_result
+    shop._process_purchase = original_process
+    queue_after = queue.get_stats()
+    stats['queue'] = dict((name, queue_after[name] - queue_before[name])
+                          for name in ('requests', 'merged', 'folded', 'rate_limited', 'queue_full', 'popped'))
+    stats['queue']['max_pending'] = queue_after['max_pending']
+    mirror_after = mirror.get_stats()
+    stats['mirror'] = dict((name, mirror_after[name] - mirror_before[name]) for name in ('load_count', 'invalidate_count'))
+    stats['players'] = len(bots)
+    return stats
+
+
+def check_partial_fold(simulator):
+    """
+    确定性检查购买N次的部分成功: 同一Tick内发送3次购买羊毛(铁锭只够2次)
+
+    Returns:
+        str|None: 错误描述,通过时为None
+    """
+    from Script_NeteaseMod.systems.util.InventoryMirror import get_inventory_mirror
+
+    engine = simulator.engine
+    shop = simulator.shop
+    player_id = simulator._alive_bots()[0]
+    # 等待令牌补满
+    for _ in range(2 * TICKS_PER_SECOND):
+        idle_tick(simulator)
+
+    # 清理背包,只留2次购买的铁锭
+    clear_blocks(engine, player_id)
+    slots = engine.get_slots(player_id, 'INVENTORY')
+    for slot, item in enumerate(slots):
+        if item and item['newItemName'] == "minecraft:iron_ingot":
+            slots[slot] = None
+    engine.give_item(player_id, {'newItemName': "minecraft:iron_ingot", 'count': 8})
+    get_inventory_mirror().invalidate(player_id)
+
+    results = []
+    original_send_result = shop._send_buy_result
+
+    def record_result(target_id, success, message):
+        if target_id == player_id:
+            results.append((success, message))
+        return original_send_result(target_id, success, message)
+
+    shop._send_buy_result = record_result
+    folded_before = shop.purchase_queue.folded_count
+    try:
+        for _ in range(3):
+            engine.fire(simulator.mod_name, "ShopClientSystem", "BedWarsShopTryBuy",
+                        {'player_id': player_id, 'goods_key': "block.wool", 'category_index': 0})
+        idle_tick(simulator)
+    finally:
+        shop._send_buy_result = original_send_result
+
+    if shop.purchase_queue.folded_count - folded_before != 2:
+        return u"同一Tick的重复请求未合并: {}".format(shop.purchase_queue.folded_count - folded_before)
+    if len(results) != 1 or not results[0][0] or u"x2 (" not in results[0][1]:
+        return u"部分成功的结果不正确: {}".format(results)
+    if engine.count_item(player_id, "minecraft:iron_ingot") != 0:
+        return u"铁锭未按2次购买扣除"
+    return None
+
+
+def print_report(stats, rate, seconds):
+    queue = stats['queue']
+    handled = max(1, queue['popped'])
+    print("=" * 76)
+    print(u"商店购买压力基准 速率={}/s 时长={}s 玩家={}".format(rate, seconds, stats['players']))
+    print(u"  请求 {} (双击重复 {}), 同一Tick合并 {} (应合并 {})".format(
+        stats['requests'], stats['duplicates'], queue['folded'], stats['expected_folded']))
+    print(u"  队列: 限速拒绝 {}, 队列已满 {}, 合并为购买N次 {}, 处理 {} 次购买, 单玩家待处理峰值 {}".format(
+        queue['rate_limited'], queue['queue_full'], queue['merged'], queue['popped'], queue['max_pending']))
+    print(u"  购买N次条目 {}: 全部成功 {}, 部分成功 {}, 全部失败 {}, 结果消息错误 {}".format(
+        stats['multi_entries'], stats['multi_full'], stats['multi_partial'], stats['multi_failed'],
+        stats['result_errors']))
+    print(u"  结果消息 {}: 成功 {}, 失败 {}".format(stats['success'] + stats['failed'], stats['success'], stats['failed']))
+    for reason, count in sorted(stats['reasons'].items(), key=lambda item: -item[1]):
+        print(u"    {:>6}  {}".format(count, reason))
+    request = _percentiles(stats['request_times'])
+    drain = _percentiles(stats['drain_times'])
+    print(u"  {:<16} {:>9} {:>9} {:>9} {:>9}".format(u"耗时(ms)", "p50", "p90", "p99", "max"))
+    print(u"  {:<16} {:>9} {:>9} {:>9} {:>9}".format(u"每次请求(入队)", request['p50'], request['p90'],
+                                                       request['p99'], request['max']))
+    print(u"  {:<16} {:>9} {:>9} {:>9} {:>9}".format(u"每Tick队列处理", drain['p50'], drain['p90'], drain['p99'],
+                                                       drain['max']))
+    print(u"  引擎调用/次购买: {:.2f}".format(stats['api_total'] / float(handled)))
+    for api in REPORT_APIS:
+        print(u"    {:<34} {:>8.3f}".format(api, stats['api_calls'][api] / float(handled)))
+    print(u"  背包镜像: 重新加载 {} 次, 失效 {} 次".format(stats['mirror']['load_count'],
+                                                    stats['mirror']['invalidate_count']))
+    print(u"  货币守恒错误: {}".format(stats['conservation_errors']))
+    print(u"  背包镜像不一致: {}".format(stats['mirror_mismatches']))
+    print("=" * 76)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=u"商店购买压力基准")
+    parser.add_argument("--rate", type=int, default=1000, help=u"每秒购买请求数")
+    parser.add_argument("--seconds", type=float, default=5.0, help=u"虚拟时长(秒)")
+    parser.add_argument("--dup", type=float, default=0.1, help=u"同一Tick内重复发送(双击)的比例")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-limit", action="store_true", help=u"关闭令牌桶限速与队列上限")
+    args = parser.parse_args()
+
+    stdout, stderr = sys.stdout, sys.stderr
+    sys.stdout = sys.stderr = _Sink()
+    simulator = None
+    try:
+        simulator = prepare(args.seed)
+        stats = stress(simulator, args.rate, args.seconds, args.dup, random.Random(args.seed), args.no_limit)
+        partial_error = check_partial_fold(simulator)
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+        if simulator is not None and simulator.engine is not None:
+            simulator.engine.uninstall_clock()
+
+    print_report(stats, args.rate, args.seconds)
+    print(u"购买N次部分成功检查: {}".format(partial_error or u"通过"))
+    ok = stats['conservation_errors'] == 0 and stats['mirror_mismatches'] == 0 and \
+        stats['fold_errors'] == 0 and stats['result_errors'] == 0 and partial_error is None
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
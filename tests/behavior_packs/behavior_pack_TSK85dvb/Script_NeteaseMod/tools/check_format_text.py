@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+format_text 模板引擎校验与基准测试脚本
+
+用法(Python 2.7,与游戏运行环境一致):
+    python tools/check_format_text.py          # 黄金对比
+    python tools/check_format_text.py --bench  # 对比旧实现与新实现的性能
+
+黄金对比:
+- LEGACY_REPLACEMENTS / legacy_format_text 为旧版GamingStateSystem.format_text的冻结副本
+- 覆盖所有占位符、项目中实际使用的模板、变量类型、花括号边界情况及随机模板
+- 要求新实现输出与旧实现逐字节一致(包括返回值类型)
+
+说明:
+- 游戏运行环境的默认编码为utf-8,旧实现依赖该设置(占位符表含非ASCII字节串键),
+  脚本启动时做同样设置
+"""
+
+from __future__ import print_function
+import os
+import random
+import sys
+import timeit
+
+if sys.version_info[0] == 2:
+    reload(sys)
+    sys.setdefaultencoding('utf-8')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'systems', 'util'))
+import TextTemplate  # noqa: E402
+
+
+# ========== 旧实现(冻结副本,请勿修改) ==========
+
+LEGACY_REPLACEMENTS = {
+    # 基础格式
+    "enter": "\n",
+    # 颜色代码
+    "black": u"\u00A70",
+    "dark-blue": u"\u00A71",
+    "dark-green": u"\u00A72",
+    "dark-aqua": u"\u00A73",
+    "dark-red": u"\u00A74",
+    "dark-purple": u"\u00A75",
+    "gold": u"\u00A76",
+    "gray": u"\u00A77",
+    "dark-gray": u"\u00A78",
+    "blue": u"\u00A79",
+    "green": u"\u00A7a",
+    "aqua": u"\u00A7b",
+    "red": u"\u00A7c",
+    "light-purple": u"\u00A7d",
+    "yellow": u"\u00A7e",
+    "white": u"\u00A7f",
+    "obfuscated": u"\u00A7k",
+    "bold": u"\u00A7l",
+    "italic": u"\u00A7o",
+    "reset": u"\u00A7r",
+
+    # ========== 图标占位符映射 (从老项目迁移) ==========
+    # 通用图标
+    "icon-heart": u"\uE110",
+    # 游戏手柄图标
+    "icon-gamepad-a": u"\uE000",
+    "icon-gamepad-b": u"\uE001",
+    "icon-gamepad-x": u"\uE002",
+    "icon-gamepad-y": u"\uE003",
+    "icon-gamepad-lb": u"\uE004",
+    "icon-gamepad-rb": u"\uE005",
+    "icon-gamepad-lt": u"\uE006",
+    "icon-gamepad-rt": u"\uE007",
+    # EC系统图标
+    "icon-ec-lobby": u"\uE0B0",
+    "icon-ec-room": u"\uE0B1",
+    "icon-ec-buglet": u"\uE0B2",
+    "icon-ec-admin": u"\uE0B3",
+    "icon-ec-mission": u"\uE0B4",
+    "icon-ec-prefix-vip3": u"\uE0B6",
+    "icon-ec-prefix-vip4": u"\uE0B7",
+    "icon-ec-buglet-red": u"\uE0B8",
+    # EC UI图标
+    "icon-ec-players": u"\uE180",
+    "icon-ec-rooms": u"\uE181",
+    "icon-ec-time": u"\uE182",
+    "icon-ec-crystal-destroy": u"\uE183",
+    "icon-ec-sword0": u"\uE184",
+    "icon-ec-death": u"\uE185",
+    "icon-ec-sword1": u"\uE186",
+    "icon-ec-sword2": u"\uE187",
+    "icon-ec-heart": u"\uE188",
+    "icon-ec-mm-villager": u"\uE189",
+    "icon-ec-mm-killer": u"\uE18A",
+    "icon-ec-mm-spy": u"\uE18B",
+    "icon-ec-mm-bow": u"\uE18C",
+    # EC水晶图标（队伍标识-红黄绿蓝）
+    "icon-ec-crystal-red": u"\uE190",
+    "icon-ec-crystal-red-died": u"\uE1A0",
+    "icon-ec-crystal-yellow": u"\uE191",
+    "icon-ec-crystal-yellow-died": u"\uE1A1",
+    "icon-ec-crystal-green": u"\uE192",
+    "icon-ec-crystal-green-died": u"\uE1A2",
+    "icon-ec-crystal-blue": u"\uE193",
+    "icon-ec-crystal-blue-died": u"\uE1A3",
+    # EC羊毛图标（队伍标识-8色）
+    "icon-ec-wool-red": u"\uE194",
+    "icon-ec-wool-red-died": u"\uE1A4",
+    "icon-ec-wool-yellow": u"\uE195",
+    "icon-ec-wool-yellow-died": u"\uE1A5",
+    "icon-ec-wool-green": u"\uE196",
+    "icon-ec-wool-green-died": u"\uE1A6",
+    "icon-ec-wool-blue": u"\uE197",
+    "icon-ec-wool-blue-died": u"\uE1A7",
+    "icon-ec-wool-aqua": u"\uE1B4",
+    "icon-ec-wool-aqua-died": u"\uE1C4",
+    "icon-ec-wool-white": u"\uE1B5",
+    "icon-ec-wool-white-died": u"\uE1C5",
+    "icon-ec-wool-light-purple": u"\uE1B6",
+    "icon-ec-wool-light-purple-died": u"\uE1C6",
+    "icon-ec-wool-gray": u"\uE1B7",
+    "icon-ec-wool-gray-died": u"\uE1C7",
+    "icon-ec-wool-dark-purple": u"\uE1B8",
+    "icon-ec-wool-dark-purple-died": u"\uE1C8",
+    "icon-ec-wool-gold": u"\uE1B9",
+    "icon-ec-wool-gold-died": u"\uE1C9",
+    "icon-ec-wool-dark-green": u"\uE1BA",
+    "icon-ec-wool-dark-green-died": u"\uE1CA",
+    "icon-ec-wool-dark-blue": u"\uE1BB",
+    "icon-ec-wool-dark-blue-died": u"\uE1CB",
+    # EC游戏道具图标
+    "icon-ec-sword3": u"\uE198",
+    "icon-ec-chest": u"\uE199",
+    "icon-ec-potion": u"\uE19A",
+    "icon-ec-magnify": u"\uE19B",
+    "icon-ec-block": u"\uE19C",
+    "icon-ec-key": u"\uE19D",
+    "icon-ec-diamond": u"\uE19E",
+    # EC货币图标
+    "icon-ec-coin": u"\uE19F",
+    "icon-ec-coin-mw": u"\uE18D",
+    "icon-ec-coin-mm": u"\uE18E",
+    "icon-ec-coin-ruby": u"\uE18F",
+    # EC其他UI图标
+    "icon-ec-ball": u"\uE1A8",
+    "icon-ec-star": u"\uE1A9",
+    "icon-ec-star-empty": u"\uE1AA",
+    # EC资源图标
+    "icon-ec-res-copper": u"\uE1AB",
+    "icon-ec-res-iron": u"\uE1AC",
+    "icon-ec-res-gold": u"\uE1AD",
+    "icon-ec-res-diamond": u"\uE1AE",
+    "icon-ec-res-emerald": u"\uE1AF",
+    "icon-ec-res-snowflake": u"\uE1C0",
+    # EC资源图标别名（简化版）
+    "icon-ec-iron": u"\uE1AC",
+    "icon-ec-gold": u"\uE1AD",
+    "icon-ec-diamond": u"\uE1AE",
+    "icon-ec-emerald": u"\uE1AF",
+    # EC状态图标
+    "icon-ec-ok": u"\uE1B0",
+    "icon-ec-fail": u"\uE1B1",
+    "icon-ec-up": u"\uE1B2",
+    "icon-ec-credits": u"\uE1B3",
+    # EC数字图标
+    "icon-ec-0": u"\uE1F0",
+    "icon-ec-1": u"\uE1F1",
+    "icon-ec-2": u"\uE1F2",
+    "icon-ec-3": u"\uE1F3",
+    "icon-ec-4": u"\uE1F4",
+    "icon-ec-5": u"\uE1F5",
+    "icon-ec-6": u"\uE1F6",
+    "icon-ec-7": u"\uE1F7",
+    "icon-ec-8": u"\uE1F8",
+    "icon-ec-9": u"\uE1F9",
+    "icon-ec-percent": u"\uE1FA",
+    "icon-ec-percent-black": u"\uE1FB",
+    # 特殊字符
+    "|": u"\u00A6",
+    "»": u"\u226B",
+    "«": u"\u226A"
+}
+
+
+def legacy_format_text(raw_msg, **args):
+    """旧版GamingStateSystem.format_text"""
+    replacements = LEGACY_REPLACEMENTS
+
+    for arg in replacements:
+        replacement_str = replacements[arg]
+        raw_msg = raw_msg.replace("{" + arg + "}", replacement_str)
+
+    for arg in args:
+        arg_str = args[arg]
+        if not isinstance(arg_str, str):
+            arg_str = str(arg_str)
+        raw_msg = raw_msg.replace("{" + arg + "}", arg_str)
+
+    return raw_msg
+
+
+# ========== 测试数据 ==========
+
+# 项目中实际使用的模板(节选)
+PROJECT_TEMPLATES = [
+    u"{icon-ec-time}",
+    u"{icon-ec-iron}",
+    u"{icon-ec-gold}",
+    u"{icon-ec-diamond}",
+    u"{icon-ec-emerald}",
+    u"{icon-ec-sword0}",
+    u"{icon-ec-crystal-destroy}",
+    u"{icon-ec-crystal-red} {white}2",
+    u"{gray}请稍等，地图正在载入...",
+    u"{yellow}{player} {gray}破坏了 {team} {gray}的床！",
+    u"{green}+{count} {gold}金币{enter}{gray}原因: {reason}",
+    u"{bold}{red}起床战争 {reset}{|} {aqua}{»} {name} {«}",
+]
+
+# 边界情况 [(模板, 变量)]
+EDGE_CASES = [
+    (u"", {}),
+    (u"plain text", {}),
+    ("byte {red}text", {}),
+    ("\xe4\xb8\xad\xe6\x96\x87{red}", {}),
+    (u"{}", {}),
+    (u"{", {}),
+    (u"}", {}),
+    (u"}{", {}),
+    (u"{{red}}", {}),
+    (u"{{red}", {}),
+    (u"{re{red}d}", {}),
+    (u"{unknown}", {}),
+    (u"{red}{unknown}", {"other": 1}),
+    (u"{a}{a}{b}", {"a": 1, "b": u"中文"}),
+    (u"{a}", {"a": "\xe4\xb8\xad"}),
+    (u"{a}", {"a": None}),
+    (u"{a}", {"a": 1.5}),
+    (u"{a}", {"a": ""}),
+    (u"{a}", {"a": "{red}"}),
+    (u"{a}", {"a": "{b}", "b": "X"}),
+    (u"{b}{a}", {"a": "{b}", "b": "{a}"}),
+    (u"{{a}}", {"a": "x", "x": "Y"}),
+    (u"{x{a}}", {"a": "", "x": "Y"}),
+    (u"{ab{c}d}", {"c": "x", "abxd": "Z"}),
+    (u"{red}", {"red": "not used"}),
+    (u"{enter}", {}),
+]
+
+
+def build_cases():
+    """生成全部对比用例 [(模板, 变量)]"""
+    cases = []
+
+    # 所有占位符单独出现、连续出现
+    keys = list(LEGACY_REPLACEMENTS.keys())
+    for key in keys:
+        if isinstance(key, str) and sys.version_info[0] == 2:
+            key = key.decode('utf-8')
+        cases.append((u"{" + key + u"}", {}))
+        cases.append((u"x{" + key + u"}y{" + key + u"}", {}))
+
+    for template in PROJECT_TEMPLATES:
+        cases.append((template, {}))
+        cases.append((template, {"player": u"玩家A", "team": u"\u00A7c红队", "count": 5,
+                                 "reason": u"击杀", "name": "Steve"}))
+
+    cases.extend(EDGE_CASES)
+
+    # 随机模板
+    rng = random.Random(20251017)
+    alphabet = [u"{", u"}", u"a", u"b", u"x", u"中", u" ", u"red", u"icon-ec-time", u"|", u"»"]
+    arg_values = [u"", u"v", u"{", u"}", u"{a}", u"{b}", u"{red}", 7, u"中文", "bytes"]
+    for _ in range(5000):
+        template = u"".join(rng.choice(alphabet) for _ in range(rng.randint(0, 16)))
+        args = {}
+        for name in (u"a", u"b", u"x", u"ax"):
+            if rng.random() < 0.4:
+                args[str(name)] = rng.choice(arg_values)
+        cases.append((template, args))
+
+    return cases
+
+
+# ========== 黄金对比 ==========
+
+def run_golden():
+    """对比新旧实现,返回不一致的用例数"""
+    failures = 0
+    cases = build_cases()
+    for template, args in cases:
+        expected = legacy_format_text(template, **args)
+        # 第一次编译、第二次命中缓存,两次都要一致
+        for _ in range(2):
+            actual = TextTemplate.render_text(template, **args)
+            if actual != expected or type(actual) is not type(expected):
+                failures += 1
+                print("[FAIL] template={!r} args={!r} expected={!r} actual={!r}".format(
+                    template, args, expected, actual))
+                break
+
+    print("[INFO] 黄金对比完成: cases={}, failures={}, cache={}".format(
+        len(cases), failures, TextTemplate.get_cache_stats()))
+    return failures
+
+
+# ========== 基准测试 ==========
+
+BENCH_CASES = [
+    (u"{icon-ec-iron}", {}),
+    (u"{icon-ec-time} {state} {time}", {"state": u"钻石II级", "time": u"04:59"}),
+    (u"{yellow}{player} {gray}破坏了 {team} {gray}的床！", {"player": u"玩家A", "team": u"红队"}),
+]
+
+
+def run_bench(number=20000):
+    """对比旧实现与新实现的单次调用耗时"""
+    for template, args in BENCH_CASES:
+        legacy = timeit.timeit(lambda: legacy_format_text(template, **args), number=number)
+        compiled = timeit.timeit(lambda: TextTemplate.render_text(template, **args), number=number)
+        print("[BENCH] {!r}: legacy={:.2f}us, compiled={:.2f}us, speedup={:.1f}x".format(
+            template, legacy / number * 1e6, compiled / number * 1e6, legacy / compiled))
+
+
+if __name__ == '__main__':
+    if '--bench' in sys.argv:
+        run_bench()
+    else:
+        sys.exit(1 if run_golden() else 0)
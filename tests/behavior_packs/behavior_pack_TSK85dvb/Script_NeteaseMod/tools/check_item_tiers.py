@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+ItemTierRegistry 一致性校验与基准测试脚本
+
+用法(Python 2.7,与游戏运行环境一致):
+    python tools/check_item_tiers.py          # 与旧实现对比
+    python tools/check_item_tiers.py --bench  # 对比list.index与查表的耗时
+
+对比内容:
+- LEGACY_* 为旧版排序列表/降级表与比较逻辑的冻结副本
+- shop_config中的排序列表与冻结副本一致(等级表由这些列表建立)
+- 护甲比较: 所有(当前物品, 目标物品)组合与旧实现结果一致;
+  旧实现对未登记的当前物品抛出ValueError,新实现返回False(单独计数,不算不一致)
+- 剑/升级路径: 每个物品的等级与list.index一致,随机背包的最高等级与旧的逐项比较一致
+- 降级表: 每个游戏模式death_item_demotion得到的降级表与旧版硬编码的降级表一致
+
+说明:
+- shop_config依赖引擎模块,脚本先安装无头引擎替身
+"""
+
+from __future__ import print_function
+
+import os
+import random
+import sys
+import timeit
+
+if sys.version_info[0] == 2:
+    reload(sys)  # noqa: F821
+    sys.setdefaultencoding('utf-8')
+
+SCRIPT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(SCRIPT_ROOT, '..'))
+sys.path.insert(0, SCRIPT_ROOT)
+
+from Script_NeteaseMod.tools.headless import install  # noqa: E402
+
+install()
+
+from Script_NeteaseMod.config import shop_config  # noqa: E402
+from Script_NeteaseMod.systems.shop.ItemTierRegistry import (  # noqa: E402
+    get_item_tier_registry, FAMILY_CHESTPLATE, FAMILY_LEGGINGS, FAMILY_SWORD)
+
+# 对比的游戏模式
+GAME_MODES = ("team2", "team4", "team8")
+# 随机背包的数量
+RANDOM_INVENTORIES = 2000
+
+
+# ========== 旧实现(冻结副本,请勿修改) ==========
+
+LEGACY_ORDERED_ARMOR_CHESTPLATE = [
+    "minecraft:leather_chestplate",
+    "minecraft:chainmail_chestplate",
+    "minecraft:iron_chestplate",
+    "minecraft:gold_chestplate",
+    "minecraft:diamond_chestplate",
+    "minecraft:netherite_chestplate",
+]
+
+LEGACY_ORDERED_LEGGINGS = [
+    "minecraft:leather_leggings",
+    "minecraft:chainmail_leggings",
+    "minecraft:iron_leggings",
+    "minecraft:gold_leggings",
+    "minecraft:diamond_leggings",
+    "minecraft:netherite_leggings",
+]
+
+LEGACY_ORDERED_SWORDS = [
+    "minecraft:wooden_sword",
+    "minecraft:stone_sword",
+    "minecraft:iron_sword",
+    "minecraft:diamond_sword",
+    "minecraft:netherite_sword",
+]
+
+LEGACY_DEMOTION_MAP = {
+    'minecraft:diamond_pickaxe': 'minecraft:iron_pickaxe',
+    'minecraft:iron_pickaxe': 'minecraft:stone_pickaxe',
+    'minecraft:stone_pickaxe': 'minecraft:wooden_pickaxe',
+    'minecraft:wooden_pickaxe': 'minecraft:wooden_pickaxe',
+    'minecraft:diamond_axe': 'minecraft:iron_axe',
+    'minecraft:iron_axe': 'minecraft:stone_axe',
+    'minecraft:stone_axe': 'minecraft:wooden_axe',
+    'minecraft:wooden_axe': 'minecraft:wooden_axe',
+}
+
+
+def legacy_is_better(ordered, current_name, target_name):
+    """旧版is_player_chestplate_better_than/is_player_leggings_better_than的比较部分"""
+    if target_name not in ordered:
+        return False
+    current_index = ordered.index(current_name)
+    new_index = ordered.index(target_name)
+    return new_index <= current_index
+
+
+def legacy_highest_sword(inv_names):
+    """旧版is_player_sword_better_than的背包最高品质部分"""
+    highest = 0
+    for name in inv_names:
+        if name in LEGACY_ORDERED_SWORDS:
+            quality = LEGACY_ORDERED_SWORDS.index(name)
+            if quality > highest:
+                highest = quality
+    return highest
+
+
+# ========== 一致性对比 ==========
+
+# 不属于任何系列(或属于其他系列)的物品名称
+EXTRA_NAMES = [
+    "minecraft:golden_chestplate",
+    "minecraft:golden_leggings",
+    "minecraft:leather_boots",
+    "minecraft:wool",
+    "minecraft:air",
+    "",
+]
+
+
+def check_orderings(failures):
+    for name, legacy, current in (
+            ("ORDERED_ARMOR_CHESTPLATE", LEGACY_ORDERED_ARMOR_CHESTPLATE, shop_config.ORDERED_ARMOR_CHESTPLATE),
+            ("ORDERED_LEGGINGS", LEGACY_ORDERED_LEGGINGS, shop_config.ORDERED_LEGGINGS),
+            ("ORDERED_SWORDS", LEGACY_ORDERED_SWORDS, shop_config.ORDERED_SWORDS)):
+        if list(current) != legacy:
+            failures.append("[FAIL] shop_config.{} 与冻结副本不一致: {}".format(name, current))
+
+
+def check_armor(registry, failures):
+    """护甲比较,返回(组合数, 旧实现抛出异常的组合数)"""
+    pairs = 0
+    raised = 0
+    for family, ordered in ((FAMILY_CHESTPLATE, LEGACY_ORDERED_ARMOR_CHESTPLATE),
+                            (FAMILY_LEGGINGS, LEGACY_ORDERED_LEGGINGS)):
+        names = ordered + LEGACY_ORDERED_ARMOR_CHESTPLATE + LEGACY_ORDERED_LEGGINGS + EXTRA_NAMES
+        for current_name in names:
+            for target_name in names:
+                pairs += 1
+                actual = registry.is_at_least(current_name, target_name, family)
+                try:
+                    expected = legacy_is_better(ordered, current_name, target_name)
+                except ValueError:
+                    raised += 1
+                    expected = False
+                if actual != expected:
+                    failures.append("[FAIL] family={} current={} target={} expected={} actual={}".format(
+                        family, current_name, target_name, expected, actual))
+    return pairs, raised
+
+
+def check_tiers(registry, failures, rng):
+    """等级与list.index一致,返回对比的背包数"""
+    families = [(FAMILY_SWORD, LEGACY_ORDERED_SWORDS),
+                (FAMILY_CHESTPLATE, LEGACY_ORDERED_ARMOR_CHESTPLATE),
+                (FAMILY_LEGGINGS, LEGACY_ORDERED_LEGGINGS)]
+    for goods_config in shop_config.GOODS_POOL:
+        if goods_config.get("type") == "item_upgrade" and goods_config.get("upgrade_path"):
+            families.append((goods_config.get("id"), goods_config.get("upgrade_path")))
+
+    for family, ordered in families:
+        if list(registry.get_family_items(family)) != list(ordered):
+            failures.append("[FAIL] family={} 物品顺序不一致".format(family))
+        for name in ordered + EXTRA_NAMES:
+            expected = ordered.index(name) if name in ordered else None
+            actual = registry.get_tier(name, family)
+            if actual != expected:
+                failures.append("[FAIL] family={} item={} expected={} actual={}".format(family, name, expected, actual))
+
+    # 随机背包中的最高品质剑
+    pool = LEGACY_ORDERED_SWORDS + EXTRA_NAMES
+    for _ in range(RANDOM_INVENTORIES):
+        inv_names = [rng.choice(pool) for _ in range(rng.randint(0, 36))]
+        expected = legacy_highest_sword(inv_names)
+        actual = registry.get_highest_tier(FAMILY_SWORD, inv_names, default=0)
+        if actual != expected:
+            failures.append("[FAIL] 最高品质剑不一致: inv={} expected={} actual={}".format(inv_names, expected, actual))
+    return RANDOM_INVENTORIES
+
+
+def check_demotion(registry, failures):
+    for mode in GAME_MODES:
+        module = __import__("Script_NeteaseMod.config.game_modes." + mode, fromlist=["MODE_CONFIG"])
+        demotion_configs = module.MODE_CONFIG.get("death_item_demotion", [])
+        actual = registry.get_demotion_map(demotion_configs)
+        if actual != LEGACY_DEMOTION_MAP:
+            failures.append("[FAIL] mode={} 降级表不一致: {}".format(mode, actual))
+
+
+def run_check():
+    """对比新旧实现,返回不一致的数量"""
+    registry = get_item_tier_registry()
+    failures = []
+    check_orderings(failures)
+    pairs, raised = check_armor(registry, failures)
+    inventories = check_tiers(registry, failures, random.Random(0))
+    check_demotion(registry, failures)
+
+    for line in failures[:50]:
+        print(line)
+    print("[INFO] 对比完成: armor_pairs={} (旧实现抛出异常 {}), inventories={}, modes={}, failures={}".format(
+        pairs, raised, inventories, len(GAME_MODES), len(failures)))
+    return len(failures)
+
+
+# ========== 基准测试 ==========
+
+def run_bench(number=200000):
+    """对比list.index与查表的单次比较耗时"""
+    registry = get_item_tier_registry()
+    ordered = LEGACY_ORDERED_ARMOR_CHESTPLATE
+    current_name, target_name = ordered[-1], ordered[-2]
+    legacy = timeit.timeit(lambda: legacy_is_better(ordered, current_name, target_name), number=number)
+    table = timeit.timeit(lambda: registry.is_at_least(current_name, target_name, FAMILY_CHESTPLATE), number=number)
+    print("[BENCH] armor compare: legacy={:.3f}us, registry={:.3f}us, speedup={:.1f}x".format(
+        legacy / number * 1e6, table / number * 1e6, legacy / table))
+
+    inv_names = ["minecraft:wool"] * 30 + LEGACY_ORDERED_SWORDS[:2] + ["minecraft:iron_ingot"] * 4
+    number //= 20
+    legacy = timeit.timeit(lambda: legacy_highest_sword(inv_names), number=number)
+    table = timeit.timeit(lambda: registry.get_highest_tier(FAMILY_SWORD, inv_names, default=0), number=number)
+    print("[BENCH] highest sword (36 slots): legacy={:.3f}us, registry={:.3f}us, speedup={:.1f}x".format(
+        legacy / number * 1e6, table / number * 1e6, legacy / table))
+
+
+if __name__ == '__main__':
+    if '--bench' in sys.argv:
+        run_bench()
+    else:
+        sys.exit(1 if run_check() else 0)
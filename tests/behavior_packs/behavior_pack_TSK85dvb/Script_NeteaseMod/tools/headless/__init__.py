@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+headless - 无头引擎替身
+
+在普通Linux环境下运行服务端逻辑,用于性能基准与回归对比。
+
+用法:
+    from Script_NeteaseMod.tools.headless import install
+    engine = install()
+
+    import mod.server.extraServerApi as serverApi  # 此时得到的是替身
+    ...
+    engine.advance()  # 推进一个Tick
+
+说明:
+- install()把替身模块注册到sys.modules:
+  mod / mod.server.extraServerApi / mod.client.extraClientApi /
+  mod.common.minecraftEnum / mod.common.mod /
+  ECPresetServerScripts(.framework.server.PresetDefinitionServer) /
+  framework.server.PresetManager / ECPresetClientScripts
+- 必须在导入任何游戏模块之前调用
+- 未实现的API返回None,按名称计入engine.unimplemented,可据此判断模拟覆盖度
+"""
+
+from __future__ import print_function
+
+import sys
+import types
+
+from Script_NeteaseMod.tools.headless.engine import HeadlessEngine
+from Script_NeteaseMod.tools.headless.minecraft_enum import MINECRAFT_ENUM
+
+
+class HeadlessModule(types.ModuleType):
+    """替身模块: 未定义的驼峰命名函数回退为计数的空操作"""
+
+    def __getattr__(self, name):
+        if not name or not name[0].isupper():
+            raise AttributeError(name)
+        engine = self.__dict__.get('_engine')
+        api = self.__name__.rsplit('.', 1)[-1] + "." + name
+
+        def noop(*args, **kwargs):
+            if engine is not None:
+                engine.count(api, implemented=False)
+            return None
+        return noop
+
+
+def _register(name, module):
+    """注册模块,并挂到父模块属性上(支持import a.b.c as x)"""
+    sys.modules[name] = module
+    if '.' in name:
+        parent_name, child = name.rsplit('.', 1)
+        parent = sys.modules.get(parent_name)
+        if parent is None:
+            parent = _register(parent_name, HeadlessModule(parent_name))
+        setattr(parent, child, module)
+    return module
+
+
+def _mod_binding_decorator(*args, **kwargs):
+    """Mod.Binding/InitServer等装饰器: 原样返回被装饰对象"""
+    return lambda target: target
+
+
+class _Mod(object):
+    """mod.common.mod.Mod替身"""
+
+    Binding = staticmethod(_mod_binding_decorator)
+    InitServer = staticmethod(_mod_binding_decorator)
+    DestroyServer = staticmethod(_mod_binding_decorator)
+    InitClient = staticmethod(_mod_binding_decorator)
+    DestroyClient = staticmethod(_mod_binding_decorator)
+
+
+def install(engine=None):
+    """
+    安装无头引擎替身
+
+    Args:
+        engine (HeadlessEngine): 引擎实例,为None时新建
+
+    Returns:
+        HeadlessEngine: 引擎实例
+    """
+    from Script_NeteaseMod.tools.headless.server_api import build_server_api
+    from Script_NeteaseMod.tools.headless.client_api import build_client_api
+    from Script_NeteaseMod.tools.headless import ecpreset
+
+    engine = engine or HeadlessEngine()
+
+    # mod.*
+    server_api = HeadlessModule("mod.server.extraServerApi")
+    server_api._engine = engine
+    build_server_api(engine, server_api)
+    _register("mod.server.extraServerApi", server_api)
+
+    client_api = HeadlessModule("mod.client.extraClientApi")
+    client_api._engine = engine
+    build_client_api(engine, client_api)
+    _register("mod.client.extraClientApi", client_api)
+
+    enum_module = HeadlessModule("mod.common.minecraftEnum")
+    _register("mod.common.minecraftEnum", enum_module)
+    for enum_name in ('GameType', 'ItemPosType', 'AttrType', 'ItemColor', 'EnchantType',
+                      'EffectType', 'ActorDamageCause', 'EntityType', 'Facing'):
+        setattr(enum_module, enum_name, getattr(MINECRAFT_ENUM, enum_name))
+
+    mod_module = HeadlessModule("mod.common.mod")
+    mod_module.Mod = _Mod
+    _register("mod.common.mod", mod_module)
+
+    # ECPreset框架
+    preset_system = ecpreset.PresetSystem(engine)
+    engine.preset_system = preset_system
+
+    preset_scripts = HeadlessModule("ECPresetServerScripts")
+    preset_scripts.PresetDefinitionServer = ecpreset.PresetDefinitionServer
+    preset_scripts.get_server_system = lambda: preset_system
+    preset_scripts.get_preset_system = lambda: preset_system
+    preset_scripts.get_server_mgr = preset_system.GetPresetManager
+    preset_scripts.get_client_mgr = lambda: None
+    _register("ECPresetServerScripts", preset_scripts)
+
+    definition_module = HeadlessModule("ECPresetServerScripts.framework.server.PresetDefinitionServer")
+    definition_module.PresetDefinitionServer = ecpreset.PresetDefinitionServer
+    _register("ECPresetServerScripts.framework.server.PresetDefinitionServer", definition_module)
+
+    manager_module = HeadlessModule("framework.server.PresetManager")
+    manager_module.PresetManager = ecpreset.PresetManager
+    _register("framework.server.PresetManager", manager_module)
+
+    client_scripts = HeadlessModule("ECPresetClientScripts")
+    client_scripts.get_client_mgr = lambda: None
+    _register("ECPresetClientScripts", client_scripts)
+
+    return engine
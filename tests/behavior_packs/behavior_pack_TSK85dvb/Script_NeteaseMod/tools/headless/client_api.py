@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+extraClientApi替身
+
+功能:
+- 只提供服务端模块导入时需要的类(ClientSystem/ScreenNode/ViewBinder/ViewRequest),
+  保证共享模块可以在无头环境下导入
+- 客户端逻辑不在模拟范围内,其余函数为空操作
+"""
+
+from __future__ import print_function
+
+from Script_NeteaseMod.tools.headless.components import HeadlessCompFactory
+from Script_NeteaseMod.tools.headless.engine import ENGINE_NAMESPACE, ENGINE_SYSTEM_NAME
+from Script_NeteaseMod.tools.headless.minecraft_enum import MINECRAFT_ENUM
+
+
+class ClientSystem(object):
+    """客户端系统基类(无头环境下不实例化)"""
+
+    def __init__(self, namespace, systemName):
+        self._namespace = namespace
+        self._system_name = systemName
+
+    def __getattr__(self, name):
+        if not name or not name[0].isupper():
+            raise AttributeError(name)
+        return lambda *args, **kwargs: None
+
+
+class ScreenNode(ClientSystem):
+    """UI节点基类"""
+
+    def __init__(self, namespace, name, param=None):
+        super(ScreenNode, self).__init__(namespace, name)
+
+
+class ViewBinder(object):
+    """UI数据绑定装饰器"""
+
+    BF_BindBool = 1
+    BF_BindInt = 2
+    BF_BindFloat = 4
+    BF_BindString = 8
+    BF_ButtonClickUp = 16
+    BF_ToggleChanged = 32
+
+    @staticmethod
+    def binding(flags, name=None):
+        return lambda func: func
+
+    @staticmethod
+    def binding_collection(flags, collection_name, name=None):
+        return lambda func: func
+
+
+class ViewRequest(object):
+    """UI刷新请求"""
+
+    Nothing = 0
+    Refresh = 1
+    PointerHeldEventsRequest = 2
+    PointerHeldEventsCancel = 4
+
+
+def build_client_api(engine, module):
+    """
+    填充extraClientApi模块
+
+    Args:
+        engine (HeadlessEngine): 无头引擎
+        module: 要填充的模块对象
+    """
+    factory = HeadlessCompFactory(engine)
+    functions = {
+        'GetEngineCompFactory': lambda: factory,
+        'GetClientCompFactory': lambda: factory,
+        'GetLevelId': lambda: engine.level_id,
+        'GetLocalPlayerId': lambda: None,
+        'GetMinecraftEnum': lambda: MINECRAFT_ENUM,
+        'GetEngineNamespace': lambda: ENGINE_NAMESPACE,
+        'GetEngineSystemName': lambda: ENGINE_SYSTEM_NAME,
+        'GetClientSystemCls': lambda: ClientSystem,
+        'GetScreenNodeCls': lambda: ScreenNode,
+        'GetViewBinderCls': lambda: ViewBinder,
+        'GetViewViewRequestCls': lambda: ViewRequest,
+        'GetSystem': lambda namespace, system_name: engine.client_systems.get((namespace, system_name)),
+    }
+    for name, func in functions.items():
+        setattr(module, name, func)
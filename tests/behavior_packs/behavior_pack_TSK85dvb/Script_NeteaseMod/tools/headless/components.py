@@ -0,0 +1,540 @@
+# -*- coding: utf-8 -*-
+"""
+HeadlessComponents - 组件工厂替身
+
+功能:
+- GetEngineCompFactory()返回的工厂,CreateXxx(target_id)返回组件
+- 常用组件方法(位置/方块/背包/属性/定时器/消息等)读写HeadlessEngine状态
+- 未实现的方法返回空操作(返回None),按"CreateXxx.Method"计入unimplemented
+- 所有调用按"CreateXxx.Method"计数,用于对比优化前后的API调用量
+
+说明:
+- 只有驼峰命名(首字母大写)的属性才会回退到空操作,
+  hasattr(comp, 'some_attr')等对小写属性的探测仍然返回False
+"""
+
+from __future__ import print_function
+
+from Script_NeteaseMod.tools.headless.engine import INVENTORY_SIZE, normalize_item
+
+# 玩家眼睛高度(GetPos返回眼睛位置,GetFootPos返回脚底位置)
+PLAYER_EYE_HEIGHT = 1.62
+# GetBlockBasicInfo返回的爆炸抗性(常见方块,其余为0)
+BLOCK_EXPLOSION_RESISTANCE = {
+    'minecraft:wool': 0.8,
+    'minecraft:glass': 0.3,
+    'minecraft:stained_glass': 0.3,
+    'minecraft:planks': 3.0,
+    'minecraft:ladder': 0.4,
+    'minecraft:hardened_clay': 4.2,
+    'minecraft:stained_hardened_clay': 4.2,
+    'minecraft:end_stone': 9.0,
+    'minecraft:obsidian': 1200.0,
+    'minecraft:bed': 0.2,
+}
+
+
+def _api(func):
+    """组件方法装饰器: 调用时计数"""
+    name = func.__name__
+
+    def wrapper(self, *args, **kwargs):
+        self._engine.count(self._comp_name + "." + name)
+        return func(self, *args, **kwargs)
+    wrapper.__name__ = name
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+
+
+class HeadlessComponent(object):
+    """
+    通用组件
+
+    所有组件共用一个类,方法按名称分派到引擎状态;
+    真实引擎中同名方法在不同组件上的语义一致,因此无需区分组件类型
+    """
+
+    def __init__(self, engine, comp_name, target_id):
+        self._engine = engine
+        self._comp_name = comp_name
+        self._target = target_id
+
+    def __getattr__(self, name):
+        if not name or not name[0].isupper():
+            raise AttributeError(name)
+        engine = self._engine
+        api = self._comp_name + "." + name
+
+        def noop(*args, **kwargs):
+            engine.count(api, implemented=False)
+            return None
+        return noop
+
+    # ========== 内部方法 ==========
+
+    def _entity(self, entity_id=None):
+        return self._engine.get_entity(entity_id or self._target)
+
+    # ========== 位置/朝向/维度 ==========
+
+    @_api
+    def GetPos(self):
+        entity = self._entity()
+        if entity is None:
+            return None
+        if entity.is_player:
+            return (entity.pos[0], entity.pos[1] + PLAYER_EYE_HEIGHT, entity.pos[2])
+        return entity.pos
+
+    @_api
+    def GetFootPos(self):
+        entity = self._entity()
+        return entity.pos if entity else None
+
+    @_api
+    def SetPos(self, pos):
+        entity = self._entity()
+        if entity is None:
+            return False
+        if entity.is_player:
+            pos = (pos[0], pos[1] - PLAYER_EYE_HEIGHT, pos[2])
+        return self._engine.move_player(entity.entity_id, pos)
+
+    @_api
+    def SetFootPos(self, pos):
+        return self._engine.move_player(self._target, pos)
+
+    @_api
+    def GetRot(self):
+        entity = self._entity()
+        return entity.rot if entity else None
+
+    @_api
+    def SetRot(self, rot):
+        entity = self._entity()
+        if entity is None:
+            return False
+        entity.rot = tuple(rot)
+        return True
+
+    @_api
+    def GetDimensionId(self):
+        entity = self._entity()
+        return entity.dimension if entity else -1
+
+    @_api
+    def GetPlayerDimensionId(self, player_id=None):
+        entity = self._entity(player_id)
+        return entity.dimension if entity else -1
+
+    @_api
+    def ChangePlayerDimension(self, dimension_id, pos=None):
+        entity = self._entity()
+        if entity is None:
+            return False
+        return self._engine.move_player(entity.entity_id, pos or entity.pos, dimension_id)
+
+    # ========== 实体信息 ==========
+
+    @_api
+    def GetEngineTypeStr(self):
+        entity = self._entity()
+        return entity.type_str if entity else None
+
+    @_api
+    def GetName(self):
+        entity = self._entity()
+        if entity is None:
+            return None
+        return entity.name or entity.type_str
+
+    @_api
+    def SetName(self, name):
+        entity = self._entity()
+        if entity is not None:
+            entity.name = name
+        return entity is not None
+
+    @_api
+    def IsPlayer(self, entity_id=None):
+        entity = self._entity(entity_id)
+        return bool(entity and entity.is_player)
+
+    @_api
+    def GetExtraData(self, key):
+        if self._target == self._engine.level_id:
+            return self._engine.level_extra_data.get(key)
+        entity = self._entity()
+        return entity.extra_data.get(key) if entity else None
+
+    @_api
+    def SetExtraData(self, key, value, auto_save=True):
+        if self._target == self._engine.level_id:
+            self._engine.level_extra_data[key] = value
+            return True
+        entity = self._entity()
+        if entity is not None:
+            entity.extra_data[key] = value
+        return entity is not None
+
+    @_api
+    def SaveExtraData(self):
+        return True
+
+    @_api
+    def GetEntityOwner(self):
+        entity = self._entity()
+        return entity.owner_id if entity else None
+
+    # ========== 属性/伤害 ==========
+
+    @_api
+    def GetAttrValue(self, attr_type):
+        entity = self._entity()
+        if entity is None:
+            return 0
+        return entity.attrs.get(_attr_key(attr_type), 0)
+
+    @_api
+    def GetAttrMaxValue(self, attr_type):
+        entity = self._entity()
+        if entity is None:
+            return 0
+        return entity.max_attrs.get(_attr_key(attr_type), 20.0)
+
+    @_api
+    def SetAttrValue(self, attr_type, value):
+        entity = self._entity()
+        if entity is None:
+            return False
+        entity.attrs[_attr_key(attr_type)] = value
+        return True
+
+    @_api
+    def SetAttrMaxValue(self, attr_type, value):
+        entity = self._entity()
+        if entity is None:
+            return False
+        entity.max_attrs[_attr_key(attr_type)] = value
+        return True
+
+    @_api
+    def ImmuneDamage(self, immune):
+        entity = self._entity()
+        if entity is not None:
+            entity.immune = bool(immune)
+        return entity is not None
+
+    @_api
+    def Hurt(self, damage, cause=None, attackerId=None, childAttackerId=None, knocked=True, customTag=None):
+        """造成伤害,血量归零时触发死亡事件"""
+        return self._engine.hurt_entity(self._target, damage, cause, attackerId)
+
+    @_api
+    def KillEntity(self, entity_id):
+        return self._engine.hurt_entity(entity_id, 10000, None, None)
+
+    # ========== 玩家 ==========
+
+    @_api
+    def SetPlayerGameType(self, game_type):
+        entity = self._entity()
+        if entity is None:
+            return False
+        entity.game_type = game_type
+        return True
+
+    @_api
+    def GetPlayerGameType(self, player_id=None):
+        entity = self._entity(player_id)
+        return entity.game_type if entity else 0
+
+    @_api
+    def GetPlayerLevel(self):
+        entity = self._entity()
+        return entity.level if entity else 0
+
+    @_api
+    def AddPlayerLevel(self, level):
+        entity = self._entity()
+        if entity is not None:
+            entity.level = max(0, entity.level + level)
+        return entity is not None
+
+    @_api
+    def SetPlayerLevel(self, level):
+        entity = self._entity()
+        if entity is not None:
+            entity.level = level
+        return entity is not None
+
+    @_api
+    def GetPlayerUid(self, player_id=None):
+        return hash(player_id if player_id is not None else self._target) & 0x7fffffff
+
+    # ========== 背包/物品 ==========
+
+    @_api
+    def SpawnItemToPlayerInv(self, item_dict, player_id, slot=-1):
+        return self._engine.give_item(player_id, item_dict, slot)
+
+    @_api
+    def GetPlayerItem(self, pos_type, slot=0, get_user_data=False):
+        slots = self._engine.get_slots(self._target, pos_type)
+        if not slots or slot < 0 or slot >= len(slots):
+            return None
+        item = slots[slot]
+        return dict(item) if item else None
+
+    @_api
+    def GetPlayerAllItems(self, pos_type, get_user_data=False):
+        slots = self._engine.get_slots(self._target, pos_type)
+        if slots is None:
+            return []
+        return [dict(item) if item else None for item in slots]
+
+    @_api
+    def SetPlayerAllItems(self, items_dict_map):
+        """items_dict_map: {(pos_type, slot): item_dict},背包槽位变化时触发InventoryItemChangedServerEvent"""
+        inventory = self._engine.get_slots(self._target, 'INVENTORY')
+        for key, item in (items_dict_map or {}).items():
+            pos_type, slot = key
+            slots = self._engine.get_slots(self._target, pos_type)
+            if slots is not None and 0 <= slot < len(slots):
+                old_item = slots[slot]
+                slots[slot] = normalize_item(item) if item else None
+                if slots is inventory and slots[slot] != old_item:
+                    self._engine._notify_inventory_changed(self._target, slot, old_item)
+        return True
+
+    @_api
+    def SetInvItemNum(self, slot, num):
+        slots = self._engine.get_slots(self._target, 'INVENTORY')
+        if not slots or slot < 0 or slot >= INVENTORY_SIZE or not slots[slot]:
+            return False
+        if num <= 0:
+            slots[slot] = None
+        else:
+            slots[slot]['count'] = num
+        self._engine._notify_inventory_changed(self._target, slot)
+        return True
+
+    @_api
+    def SetEntityItem(self, pos_type, item_dict, slot=0):
+        slots = self._engine.get_slots(self._target, pos_type)
+        if slots is None or slot < 0 or slot >= len(slots):
+            return False
+        slots[slot] = normalize_item(item_dict) if item_dict else None
+        return True
+
+    @_api
+    def GetSelectSlotId(self):
+        entity = self._entity()
+        return entity.selected_slot if entity else 0
+
+    @_api
+    def GetDroppedItem(self, item_entity_id, get_user_data=False):
+        entity = self._entity(item_entity_id)
+        return dict(entity.item) if entity and entity.item else None
+
+    @_api
+    def SpawnItemToLevel(self, item_dict, dimension_id=0, pos=(0, 0, 0)):
+        return self._engine.spawn_item_entity(item_dict, dimension_id, pos) is not None
+
+    @_api
+    def GetItemBasicInfo(self, item_name, aux_value=0, is_enchanted=False):
+        return {'itemName': item_name, 'maxStackSize': 64, 'id_aux': 0, 'itemType': 'item'}
+
+    # ========== 方块 ==========
+
+    @_api
+    def GetBlockNew(self, pos, dimension_id=0):
+        return self._engine.get_block(pos, dimension_id)
+
+    @_api
+    def SetBlockNew(self, pos, block_dict, old_block_handling=0, dimension_id=0, *args, **kwargs):
+        return self._engine.set_block(pos, block_dict, dimension_id)
+
+    @_api
+    def GetBlockBasicInfo(self, block_name):
+        return {'name': block_name, 'explosionResistance': BLOCK_EXPLOSION_RESISTANCE.get(block_name, 0.0)}
+
+    @_api
+    def CheckChunkState(self, dimension_id, pos):
+        return self._engine.is_chunk_loaded(dimension_id, pos)
+
+    @_api
+    def SetAddArea(self, key, dimension_id, min_pos, max_pos):
+        return self._engine.add_ticking_area(key, dimension_id, min_pos, max_pos)
+
+    @_api
+    def DeleteArea(self, key):
+        return self._engine.remove_ticking_area(key)
+
+    @_api
+    def GetBlockPaletteBetweenPos(self, dimension_id, start_pos, end_pos, *args):
+        return HeadlessBlockPalette.capture(self._engine, dimension_id, start_pos, end_pos)
+
+    @_api
+    def GetBlankBlockPalette(self):
+        return HeadlessBlockPalette()
+
+    @_api
+    def SetBlockByBlockPalette(self, palette, dimension_id, pos, rotation=0, *args):
+        return palette.place(self._engine, dimension_id, pos)
+
+    @_api
+    def DoTaskOnChunkAsync(self, dimension_id, pos_min, pos_max, callback):
+        self._engine.add_timer(0.0, callback, ({'code': 1},), {})
+        return True
+
+    # ========== 世界/实体管理 ==========
+
+    @_api
+    def GetEntitiesInSquareArea(self, entity_id, start_pos, end_pos, dimension_id=-1):
+        return self._engine.entities_in_box(dimension_id, start_pos, end_pos)
+
+    @_api
+    def DestroyEntity(self, entity_id=None):
+        return self._engine.destroy_entity(entity_id or self._target)
+
+    @_api
+    def SpawnEntity(self, identifier, pos, rot=None, dimension_id=0, is_npc=False, is_global=False):
+        return self._engine.spawn_entity(identifier, pos, rot, dimension_id).entity_id
+
+    @_api
+    def CreateEngineEntityByTypeStr(self, type_str, pos, rot=None, dimension_id=0, is_npc=False, is_global=False):
+        return self._engine.spawn_entity(type_str, pos, rot, dimension_id).entity_id
+
+    # ========== 定时器 ==========
+
+    @_api
+    def AddTimer(self, delay, func, *args, **kwargs):
+        return self._engine.add_timer(delay, func, args, kwargs)
+
+    @_api
+    def AddRepeatedTimer(self, delay, func, *args, **kwargs):
+        return self._engine.add_timer(delay, func, args, kwargs, repeat=True)
+
+    @_api
+    def CancelTimer(self, timer):
+        self._engine.cancel_timer(timer)
+
+    # ========== 命令/消息 ==========
+
+    @_api
+    def SetCommand(self, command, player_id=None, show_output=False):
+        self._engine.commands_count += 1
+        return True
+
+    @_api
+    def NotifyOneMessage(self, player_id, message, color=u"§f"):
+        self._engine.capture_client_message(player_id, "Minecraft", "Engine", "NotifyOneMessage", message)
+
+    # ========== 大厅存储 ==========
+
+    @_api
+    def LobbyGetStorage(self, callback, uid, keys):
+        storage = self._engine.storage.get(uid, {})
+        entity = [{'key': key, 'value': storage.get(key)} for key in keys]
+        self._engine.add_timer(0.0, callback, ({'code': 0, 'entity': {'data': entity}},), {})
+        return True
+
+    @_api
+    def LobbySetStorageAndUserItem(self, callback, uid, order_id=None, entities_getter=None, *args, **kwargs):
+        if entities_getter is not None:
+            storage = self._engine.storage.setdefault(uid, {})
+            for entry in entities_getter() or []:
+                storage[entry.get('key')] = entry.get('value')
+        if callback is not None:
+            self._engine.add_timer(0.0, callback, ({'code': 0},), {})
+        return True
+
+
+class HeadlessBlockPalette(object):
+    """
+    方块调色板(GetBlockPaletteBetweenPos/SetBlockByBlockPalette)
+
+    序列化结果: {'volume': (dx, dy, dz), 'blocks': {(x, y, z): (name, aux)}}(只记录非空气方块,
+    写回时区域内其余位置置为空气)
+    """
+
+    def __init__(self):
+        self.volume = (0, 0, 0)
+        self.blocks = {}
+
+    @classmethod
+    def capture(cls, engine, dimension, start_pos, end_pos):
+        if not engine.is_chunk_loaded(dimension, start_pos):
+            return None
+        palette = cls()
+        start = tuple(int(value) for value in start_pos)
+        end = tuple(int(value) for value in end_pos)
+        palette.volume = tuple(end[axis] - start[axis] + 1 for axis in range(3))
+        blocks = engine.blocks[dimension]
+        for x in range(start[0], end[0] + 1):
+            for y in range(start[1], end[1] + 1):
+                for z in range(start[2], end[2] + 1):
+                    block = blocks.get((x, y, z))
+                    if block is not None:
+                        palette.blocks[(x - start[0], y - start[1], z - start[2])] = (block['name'], block.get('aux', 0))
+        return palette
+
+    def SerializeBlockPalette(self):
+        return {'volume': self.volume, 'blocks': dict(self.blocks)}
+
+    def GetBlockCountDict(self):
+        counts = {}
+        for key in self.blocks.values():
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def DeserializeBlockPalette(self, data):
+        if not data or 'volume' not in data:
+            return False
+        self.volume = tuple(data['volume'])
+        self.blocks = dict(data.get('blocks', {}))
+        return True
+
+    def place(self, engine, dimension, pos):
+        if not engine.is_chunk_loaded(dimension, pos):
+            return False
+        origin = tuple(int(value) for value in pos)
+        blocks = engine.blocks[dimension]
+        for x in range(origin[0], origin[0] + self.volume[0]):
+            for y in range(origin[1], origin[1] + self.volume[1]):
+                for z in range(origin[2], origin[2] + self.volume[2]):
+                    blocks.pop((x, y, z), None)
+        for (dx, dy, dz), (name, aux) in self.blocks.items():
+            blocks[(origin[0] + dx, origin[1] + dy, origin[2] + dz)] = {'name': name, 'aux': aux}
+        return True
+
+
+class HeadlessCompFactory(object):
+    """组件工厂: CreateXxx(target_id)返回组件"""
+
+    def __init__(self, engine):
+        self._engine = engine
+        self._cache = {}
+
+    def __getattr__(self, name):
+        if not name.startswith("Create"):
+            raise AttributeError(name)
+        engine = self._engine
+        cache = self._cache
+
+        def create(target_id=None, *args):
+            key = (name, target_id)
+            comp = cache.get(key)
+            if comp is None:
+                comp = cache[key] = HeadlessComponent(engine, name, target_id)
+            engine.count("Factory." + name)
+            return comp
+        return create
+
+
+def _attr_key(attr_type):
+    """属性枚举值 -> 引擎属性键(HEALTH的枚举值为0)"""
+    if attr_type in (0, 'HEALTH'):
+        return 'HEALTH'
+    return attr_type
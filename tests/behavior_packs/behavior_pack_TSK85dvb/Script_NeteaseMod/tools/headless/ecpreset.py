@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+ECPreset框架替身
+
+ECPresetServerScripts不随本仓库发布,无头环境下按仓库内实际使用的接口提供最小实现:
+- PresetDefinitionServer: on_init/on_start/on_tick/on_stop/on_destroy钩子,enable_tick开关
+- PresetInstance: get_config/set_data/subscribe_event/send_to_client/get_dimension等
+- PresetManager: 按上下文(context_id)管理实例,create_presets_from_config/destroy_preset
+- EventBus: publish分发给subscribe_event订阅者,同时转发给("Minecraft", "preset")的系统监听者
+  (GamingState.listen_preset_event监听该命名空间)
+- PresetSystem: RegisterPresetType/GetPresetManager/ListenForEvent
+"""
+
+from __future__ import print_function
+
+import inspect
+import traceback
+
+from Script_NeteaseMod.tools.headless.engine import TICKS_PER_SECOND
+
+# 预设事件转发的系统命名空间(与GamingState.listen_preset_event一致)
+PRESET_EVENT_NAMESPACE = "Minecraft"
+PRESET_EVENT_SYSTEM = "preset"
+
+
+class PresetDefinitionServer(object):
+    """服务端预设定义基类"""
+
+    enable_tick = False
+
+    def __init__(self):
+        self.preset_id = None
+        self.preset_type = None
+
+    def on_init(self, instance):
+        pass
+
+    def on_start(self, instance):
+        pass
+
+    def on_tick(self, instance):
+        pass
+
+    def on_stop(self, instance):
+        pass
+
+    def on_destroy(self, instance):
+        pass
+
+
+class EventBus(object):
+    """预设事件总线"""
+
+    def __init__(self, engine):
+        self._engine = engine
+        self._subscribers = {}  # {event_name: [callback(event_name, event_data)]}
+
+    def subscribe(self, event_name, callback):
+        handlers = self._subscribers.setdefault(event_name, [])
+        if callback not in handlers:
+            handlers.append(callback)
+
+    def unsubscribe(self, event_name, callback):
+        handlers = self._subscribers.get(event_name)
+        if handlers and callback in handlers:
+            handlers.remove(callback)
+
+    def publish(self, event_name, event_data):
+        """发布事件给订阅者,并转发给预设事件命名空间的系统监听者"""
+        self._engine.count("EventBus.publish")
+        for callback in list(self._subscribers.get(event_name, ())):
+            self._engine._safe_call(callback, event_name, event_data)
+        self._engine.fire(PRESET_EVENT_NAMESPACE, PRESET_EVENT_SYSTEM, event_name, event_data)
+
+    def emit_event(self, event_name, event_data, target_player=None):
+        """发送到客户端"""
+        self._engine.count("EventBus.emit_event")
+        self._engine.capture_client_message(target_player, "ECPreset", "PresetSystem", event_name, event_data)
+
+    def clear_callbacks(self, callbacks):
+        """移除指定回调(实例销毁时使用)"""
+        for handlers in self._subscribers.values():
+            handlers[:] = [cb for cb in handlers if cb not in callbacks]
+
+
+class PresetInstance(object):
+    """预设实例"""
+
+    def __init__(self, manager, preset_type, preset_id, config, definition):
+        self.manager = manager
+        self.instance_id = preset_id
+        self.preset_id = preset_id
+        self.preset_type = preset_type
+        self.config = config or {}
+        self.data = {}
+        self.preset_def = definition
+        self.definition = definition
+        self.started = False
+        self._subscriptions = []
+        self._tick_takes_dt = _tick_takes_dt(definition)
+
+    def get_config(self, key, default=None):
+        return self.config.get(key, default)
+
+    def set_data(self, key, value):
+        self.data[key] = value
+
+    def get_data(self, key, default=None):
+        return self.data.get(key, default)
+
+    def get_position(self):
+        pos = self.config.get("pos")
+        return tuple(pos) if pos else None
+
+    def get_dimension(self):
+        dimension = self.config.get("dimension_id")
+        if dimension is None:
+            room = self.manager.engine.systems.get(("ECBedWars", "RoomManagementSystem"))
+            dimension = getattr(room, 'current_dimension', None)
+        return dimension if dimension is not None else 0
+
+    def subscribe_event(self, event_name, callback):
+        self.manager.event_bus.subscribe(event_name, callback)
+        self._subscriptions.append((event_name, callback))
+
+    def publish_event(self, event_name, event_data):
+        self.manager.event_bus.publish(event_name, event_data)
+
+    def listen_event(self, event_name, callback):
+        self.subscribe_event(event_name, callback)
+
+    def unlisten_event(self, event_name, callback):
+        self.manager.event_bus.unsubscribe(event_name, callback)
+
+    def emit_event(self, event_name, event_data):
+        self.manager.event_bus.publish(event_name, event_data)
+
+    def send_to_client(self, event_name, event_data, target_player=None):
+        self.manager.engine.count("PresetInstance.send_to_client")
+        self.manager.engine.capture_client_message(
+            target_player, "ECPreset", self.instance_id, event_name, event_data)
+
+    def start(self):
+        if not self.started:
+            self.started = True
+            self.preset_def.on_start(self)
+
+    def tick(self, dt):
+        if self._tick_takes_dt:
+            self.preset_def.on_tick(self, dt)
+        else:
+            self.preset_def.on_tick(self)
+
+    def to_ui_dict(self):
+        return {'instance_id': self.instance_id, 'preset_type': self.preset_type, 'data': self.data}
+
+
+class PresetManager(object):
+    """预设管理器(每个context_id一个)"""
+
+    _default = None
+
+    def __init__(self, system, context_id):
+        self.system = system
+        self.engine = system.engine
+        self.context_id = context_id
+        self.event_bus = EventBus(system.engine)
+        self.presets = {}  # {instance_id: PresetInstance}
+        self.server_api = None  # 由模拟器设置为BedWarsGameSystem
+        self.client_api = None
+        if PresetManager._default is None:
+            PresetManager._default = self
+
+    @classmethod
+    def get_instance(cls):
+        return cls._default
+
+    def register_preset_type(self, preset_type, definition_cls):
+        self.system.preset_types[preset_type] = definition_cls
+
+    def get_all_presets(self):
+        return dict(self.presets)
+
+    def get_preset(self, instance_id):
+        return self.presets.get(instance_id)
+
+    def create_preset(self, preset_type, preset_id, config, auto_start=True):
+        """
+        创建预设实例
+
+        Returns:
+            PresetInstance: 预设实例
+        """
+        definition_cls = self.system.preset_types.get(preset_type)
+        if definition_cls is None:
+            raise ValueError("unknown preset type: {}".format(preset_type))
+        definition = definition_cls()
+        definition.preset_id = preset_id
+        definition.preset_type = preset_type
+        instance = PresetInstance(self, preset_type, preset_id, config, definition)
+        self.presets[preset_id] = instance
+        definition.on_init(instance)
+        if auto_start:
+            instance.start()
+        return instance
+
+    def create_presets_from_config(self, presets_list, auto_start=True):
+        """
+        批量创建预设
+
+        Returns:
+            dict: {"success": {instance_id: instance}, "failed": [{id, type, error}]}
+        """
+        result = {"success": {}, "failed": []}
+        for entry in presets_list:
+            preset_id = entry.get("id")
+            preset_type = entry.get("type")
+            try:
+                instance = self.create_preset(preset_type, preset_id, dict(entry.get("config", {})), auto_start)
+                result["success"][preset_id] = instance
+            except Exception as e:
+                traceback.print_exc()
+                result["failed"].append({"id": preset_id, "type": preset_type, "error": str(e)})
+        return result
+
+    def destroy_preset(self, instance_id):
+        instance = self.presets.pop(instance_id, None)
+        if instance is None:
+            return False
+        definition = instance.preset_def
+        if instance.started:
+            definition.on_stop(instance)
+        definition.on_destroy(instance)
+        self.event_bus.clear_callbacks([cb for _, cb in instance._subscriptions])
+        return True
+
+    def tick(self):
+        """驱动启用了tick的预设"""
+        dt = 1.0 / TICKS_PER_SECOND
+        for instance in list(self.presets.values()):
+            if instance.started and getattr(instance.preset_def, 'enable_tick', False):
+                self.engine._safe_call(instance.tick, dt)
+
+
+class PresetSystem(object):
+    """ECPreset服务端系统"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.preset_types = {}
+        self.managers = {}  # {context_id: PresetManager}
+
+    def RegisterPresetType(self, preset_type, definition_cls):
+        self.preset_types[preset_type] = definition_cls
+
+    def GetPresetManager(self, context_id):
+        manager = self.managers.get(context_id)
+        if manager is None:
+            manager = self.managers[context_id] = PresetManager(self, context_id)
+        return manager
+
+    def ListenForEvent(self, namespace, system_name, event_name, instance, func):
+        self.engine.listen(namespace, system_name, event_name, instance, func)
+
+    def UnListenForEvent(self, namespace, system_name, event_name, instance, func):
+        self.engine.unlisten(namespace, system_name, event_name, instance, func)
+
+    def NotifyToClient(self, target_id, event_name, event_data):
+        self.engine.capture_client_message(target_id, "ECPreset", "PresetSystem", event_name, event_data)
+
+    def BroadcastToAllClient(self, except_id, event_name, event_data):
+        self.engine.capture_client_message(None, "ECPreset", "PresetSystem", event_name, event_data)
+
+    def tick(self):
+        for manager in list(self.managers.values()):
+            manager.tick()
+
+
+def _tick_takes_dt(definition):
+    """on_tick签名是否包含dt参数"""
+    getargspec = getattr(inspect, 'getfullargspec', None) or inspect.getargspec
+    try:
+        args = getargspec(definition.on_tick).args
+    except (TypeError, ValueError):
+        return False
+    return len(args) >= 3
@@ -0,0 +1,740 @@
+# -*- coding: utf-8 -*-
+"""
+HeadlessEngine - 无头引擎世界状态
+
+功能:
+- 虚拟时钟(每Tick固定步长推进,time.time被替换为虚拟时间)
+- 方块存储 {dimension: {(x, y, z): block_dict}}
+- 区块加载模拟(玩家附近或常加载区域内的区块,注册若干Tick后视为已加载)
+- 实体注册表(玩家/生物/掉落物),位置、朝向、维度、血量、属性
+- 玩家背包(36格背包 + 4格盔甲 + 主手/副手)
+- 引擎定时器(AddTimer/AddRepeatedTimer)
+- 事件总线(引擎事件、系统自定义事件、C2S事件)
+- NotifyToClient/BroadcastToAllClient捕获
+- API调用计数(按"组件.方法"统计)
+"""
+
+from __future__ import print_function
+
+import heapq
+import itertools
+import time
+import traceback
+from collections import defaultdict
+
+
+# 服务端Tick频率(与网易引擎一致)
+TICKS_PER_SECOND = 30
+
+# 引擎事件命名空间
+ENGINE_NAMESPACE = "Minecraft"
+ENGINE_SYSTEM_NAME = "Engine"
+
+# 玩家周围视为已加载的水平半径(方块)
+PLAYER_LOAD_RADIUS = 64
+# 常加载区域注册后区块完成加载所需Tick数
+AREA_LOAD_TICKS = 3
+
+# 背包结构
+INVENTORY_SIZE = 36
+ARMOR_SIZE = 4
+
+# 真实时钟(虚拟时钟安装前保存,用于统计Tick耗时)
+try:
+    from time import perf_counter as real_clock
+except ImportError:
+    import timeit
+    real_clock = timeit.default_timer
+_real_time = time.time
+
+
+class Entity(object):
+    """实体记录"""
+
+    def __init__(self, entity_id, type_str, pos, rot, dimension, is_player=False):
+        self.entity_id = entity_id
+        self.type_str = type_str
+        self.pos = tuple(pos) if pos else (0.0, 0.0, 0.0)
+        self.rot = tuple(rot) if rot else (0.0, 0.0)
+        self.dimension = dimension
+        self.is_player = is_player
+        self.alive = True
+        self.attrs = {}  # {attr_type: value}
+        self.max_attrs = {}  # {attr_type: max_value}
+        self.name = None
+        self.game_type = 0
+        self.immune = False
+        self.effects = {}
+        self.extra_data = {}
+        self.item = None  # 掉落物实体携带的物品
+        self.owner_id = None
+        self.motion = (0.0, 0.0, 0.0)
+        self.level = 0  # 玩家经验等级
+        self.selected_slot = 0
+
+
+class HeadlessEngine(object):
+    """
+    无头引擎
+
+    提供extraServerApi/extraClientApi替身所依赖的世界状态
+    """
+
+    def __init__(self, seed=0):
+        """
+        初始化引擎
+
+        Args:
+            seed (int): 随机种子(实体ID等确定性生成)
+        """
+        self.seed = seed
+        self.level_id = "-1"
+        self.tick_count = 0
+        self.now = 1700000000.0  # 虚拟时间(秒)
+
+        # 世界状态
+        self.blocks = defaultdict(dict)  # {dimension: {(x, y, z): block_dict}}
+        self.ticking_areas = {}  # {key: (dimension, min_pos, max_pos, added_tick)}
+        self.entities = {}  # {entity_id: Entity}
+        self.inventories = {}  # {player_id: {pos_type: [item_dict|None, ...]}}
+        self.player_order = []  # 在线玩家(按加入顺序)
+        self.storage = {}  # {uid: {key: value}} 模拟Lobby存储
+        self.level_extra_data = {}  # 关卡ExtraData(快照等持久化数据)
+        self._entity_seq = itertools.count(1)
+
+        # 定时器
+        self._timers = []  # 最小堆 [(due, seq, timer)]
+        self._timer_seq = itertools.count()
+
+        # 事件
+        self.listeners = defaultdict(list)  # {(namespace, system, event): [(instance, func)]}
+        self._deferred_events = []  # [(event_name, args)] 下一Tick开始时派发的引擎事件(背包变化)
+        self.client_messages = []  # [(player_id|None, namespace, system, event, data)]
+        self.keep_client_messages = 2000  # 只保留最近N条,其余只计数
+        self.client_message_count = 0
+        self.commands_count = 0
+
+        # 系统注册表
+        self.systems = {}  # {(namespace, system_name): system}
+        self.client_systems = {}
+
+        # 统计
+        self.api_calls = defaultdict(int)  # {"CreatePos.GetFootPos": n}
+        self.unimplemented = defaultdict(int)  # 走默认实现(返回None)的API
+        self.event_counts = defaultdict(int)
+        self.callback_errors = 0
+
+    # ========== 时钟 ==========
+
+    def time(self):
+        """虚拟时间(替换time.time)"""
+        return self.now
+
+    def install_clock(self):
+        """把time.time替换为虚拟时钟(游戏代码普遍使用time.time计时)"""
+        time.time = self.time
+
+    def uninstall_clock(self):
+        """恢复真实time.time"""
+        time.time = _real_time
+
+    def advance(self, seconds=None):
+        """
+        推进一个Tick并执行到期定时器
+
+        Args:
+            seconds (float): 推进时长,默认1/TICKS_PER_SECOND
+        """
+        self.tick_count += 1
+        self.now += seconds if seconds is not None else 1.0 / TICKS_PER_SECOND
+        self._fire_deferred_events()
+        self._run_timers()
+
+    # ========== 计数 ==========
+
+    def count(self, api, implemented=True):
+        """
+        记录一次API调用
+
+        Args:
+            api (str): API名称 ("CreatePos.GetFootPos")
+            implemented (bool): 是否有真实实现
+        """
+        self.api_calls[api] += 1
+        if not implemented:
+            self.unimplemented[api] += 1
+
+    def reset_stats(self):
+        """清空调用统计"""
+        self.api_calls.clear()
+        self.unimplemented.clear()
+        self.event_counts.clear()
+        self.client_message_count = 0
+        del self.client_messages[:]
+
+    # ========== 实体 ==========
+
+    def new_entity_id(self):
+        """生成实体ID(与引擎一样为数字字符串)"""
+        return str(next(self._entity_seq) + 100000)
+
+    def spawn_entity(self, type_str, pos, rot=None, dimension=0, is_player=False, entity_id=None):
+        """
+        生成实体
+
+        Args:
+            type_str (str): 实体类型
+            pos (tuple): 位置
+            rot (tuple): 朝向
+            dimension (int): 维度
+            is_player (bool): 是否玩家
+            entity_id (str): 指定实体ID
+
+        Returns:
+            Entity: 实体记录
+        """
+        entity_id = entity_id or self.new_entity_id()
+        entity = Entity(entity_id, type_str, pos, rot, dimension, is_player)
+        entity.attrs['HEALTH'] = 20.0
+        entity.max_attrs['HEALTH'] = 20.0
+        self.entities[entity_id] = entity
+        if not is_player:
+            self.fire_engine_event('AddEntityServerEvent', {
+                'id': entity_id, 'entityId': entity_id, 'engineTypeStr': type_str,
+                'posX': entity.pos[0], 'posY': entity.pos[1], 'posZ': entity.pos[2],
+                'dimensionId': dimension, 'isBaby': False, 'itemName': None, 'auxValue': 0
+            })
+        return entity
+
+    def destroy_entity(self, entity_id):
+        """
+        移除实体
+
+        Args:
+            entity_id (str): 实体ID
+
+        Returns:
+            bool: 是否存在并已移除
+        """
+        entity = self.entities.pop(entity_id, None)
+        if entity is None:
+            return False
+        entity.alive = False
+        self.fire_engine_event('RemoveEntityServerEvent', {
+            'id': entity_id, 'entityId': entity_id, 'engineTypeStr': entity.type_str,
+            'dimensionId': entity.dimension
+        })
+        return True
+
+    def get_entity(self, entity_id):
+        """获取实体记录"""
+        return self.entities.get(entity_id)
+
+    def entities_in_box(self, dimension, start, end, players_only=False):
+        """
+        查询长方体内的实体
+
+        Args:
+            dimension (int): 维度
+            start (tuple): 最小角
+            end (tuple): 最大角
+            players_only (bool): 只返回玩家
+
+        Returns:
+            list: 实体ID列表
+        """
+        x0, x1 = min(start[0], end[0]), max(start[0], end[0])
+        y0, y1 = min(start[1], end[1]), max(start[1], end[1])
+        z0, z1 = min(start[2], end[2]), max(start[2], end[2])
+        result = []
+        for entity in self.entities.values():
+            if entity.dimension != dimension or (players_only and not entity.is_player):
+                continue
+            x, y, z = entity.pos
+            if x0 <= x <= x1 and y0 <= y <= y1 and z0 <= z <= z1:
+                result.append(entity.entity_id)
+        return result
+
+    def spawn_item_entity(self, item_dict, dimension, pos):
+        """
+        生成掉落物实体
+
+        Args:
+            item_dict (dict): 物品字典
+            dimension (int): 维度
+            pos (tuple): 位置
+
+        Returns:
+            str: 实体ID
+        """
+        entity = self.spawn_entity("minecraft:item", pos, None, dimension)
+        entity.item = normalize_item(item_dict)
+        return entity.entity_id
+
+    def hurt_entity(self, entity_id, damage, cause=None, attacker_id=None):
+        """
+        造成伤害(DamageEvent -> ActuallyHurtServerEvent -> 死亡)
+
+        Args:
+            entity_id (str): 受害者ID
+            damage (float): 伤害值
+            cause: 伤害原因
+            attacker_id (str): 攻击者ID
+
+        Returns:
+            bool: 伤害是否生效
+        """
+        entity = self.entities.get(entity_id)
+        if entity is None or entity.immune:
+            return False
+        args = self.fire_engine_event('DamageEvent', {
+            'entityId': entity_id, 'srcId': attacker_id, 'projectileId': None,
+            'damage': int(damage), 'absorption': 0, 'cause': cause,
+            'knock': True, 'ignite': False
+        })
+        if args.get('cancel') or args.get('damage', 0) <= 0:
+            return False
+        args = self.fire_engine_event('ActuallyHurtServerEvent', {
+            'entityId': entity_id, 'srcId': attacker_id, 'projectileId': None,
+            'damage': args['damage'], 'damage_f': float(args['damage']), 'cause': cause,
+            'invulnerableTime': 0, 'lastHurt': 0.0
+        })
+        if args.get('damage_f', 0) <= 0:
+            return False
+        if attacker_id is not None:
+            self.fire_engine_event('ActorHurtEvent', {
+                'id': entity_id, 'attacker': attacker_id, 'cause': cause, 'damage': args['damage_f']
+            })
+        health = entity.attrs.get('HEALTH', 20.0) - args['damage_f']
+        entity.attrs['HEALTH'] = health
+        if health > 0:
+            return True
+
+        if entity.is_player:
+            entity.attrs['HEALTH'] = entity.max_attrs.get('HEALTH', 20.0)
+            self.fire_engine_event('ServerPlayerDieEvent', {
+                'id': entity_id, 'attacker': attacker_id, 'damageCause': cause
+            })
+            # 引擎中玩家点击重生后触发,这里在下一Tick自动重生
+            self.add_timer(1.0 / TICKS_PER_SECOND, self._on_player_respawned, (entity_id,), {})
+        else:
+            self.destroy_entity(entity_id)
+        return True
+
+    def _on_player_respawned(self, player_id):
+        """玩家重生完成"""
+        if player_id in self.entities:
+            self.fire_engine_event('PlayerRespawnFinishServerEvent', {'playerId': player_id})
+
+    def break_block(self, player_id, pos, dimension):
+        """
+        玩家破坏方块(ServerPlayerTryDestroyBlockEvent,未取消时移除方块)
+
+        Args:
+            player_id (str): 玩家ID
+            pos (tuple): 方块坐标
+            dimension (int): 维度
+
+        Returns:
+            bool: 是否破坏成功
+        """
+        block = self.get_block(pos, dimension)
+        args = self.fire_engine_event('ServerPlayerTryDestroyBlockEvent', {
+            'x': pos[0], 'y': pos[1], 'z': pos[2], 'face': 1, 'fullName': block['name'],
+            'auxData': block['aux'], 'playerId': player_id, 'dimensionId': dimension,
+            'cancel': False, 'spawnResources': True
+        })
+        if args.get('cancel'):
+            return False
+        self.set_block(pos, {'name': 'minecraft:air'}, dimension)
+        self.fire_engine_event('DestroyBlockEvent', {
+            'x': pos[0], 'y': pos[1], 'z': pos[2], 'face': 1, 'fullName': block['name'],
+            'auxData': block['aux'], 'playerId': player_id, 'dimensionId': dimension
+        })
+        return True
+
+    def place_block(self, player_id, pos, block_name, dimension):
+        """
+        玩家放置方块(ServerEntityTryPlaceBlockEvent,未取消时放置)
+
+        Returns:
+            bool: 是否放置成功
+        """
+        args = self.fire_engine_event('ServerEntityTryPlaceBlockEvent', {
+            'x': pos[0], 'y': pos[1], 'z': pos[2], 'fullName': block_name, 'blockName': block_name,
+            'auxData': 0, 'entityId': player_id, 'dimensionId': dimension, 'face': 1, 'cancel': False
+        })
+        if args.get('cancel'):
+            return False
+        self.set_block(pos, {'name': block_name, 'aux': 0}, dimension)
+        self.fire_engine_event('ServerPlaceBlockEvent', {
+            'x': pos[0], 'y': pos[1], 'z': pos[2], 'fullName': block_name, 'blockName': block_name,
+            'auxData': 0, 'entityId': player_id, 'dimensionId': dimension
+        })
+        return True
+
+    # ========== 玩家 ==========
+
+    def add_player(self, player_id=None, name=None, pos=(0.0, 100.0, 0.0), dimension=0):
+        """
+        玩家加入服务器(触发AddServerPlayerEvent)
+
+        Args:
+            player_id (str): 玩家ID
+            name (str): 玩家名
+            pos (tuple): 出生位置
+            dimension (int): 维度
+
+        Returns:
+            str: 玩家ID
+        """
+        entity = self.spawn_entity("minecraft:player", pos, (0.0, 0.0), dimension,
+                                   is_player=True, entity_id=player_id)
+        entity.name = name or "Bot{}".format(len(self.player_order) + 1)
+        entity.game_type = 0
+        self.inventories[entity.entity_id] = {
+            'INVENTORY': [None] * INVENTORY_SIZE,
+            'ARMOR': [None] * ARMOR_SIZE,
+            'CARRIED': [None],
+            'OFFHAND': [None],
+        }
+        self.player_order.append(entity.entity_id)
+        self.fire_engine_event('AddServerPlayerEvent', {
+            'id': entity.entity_id, 'isTransfer': False, 'isReconnect': False,
+            'isPeUser': True, 'transferParam': '', 'uid': hash(entity.entity_id) & 0x7fffffff,
+            'proxyId': 0
+        })
+        return entity.entity_id
+
+    def remove_player(self, player_id):
+        """
+        玩家离开服务器(触发PlayerIntendLeaveServerEvent/DelServerPlayerEvent)
+
+        Args:
+            player_id (str): 玩家ID
+        """
+        if player_id not in self.entities:
+            return
+        self.fire_engine_event('PlayerIntendLeaveServerEvent', {'playerId': player_id})
+        self.fire_engine_event('DelServerPlayerEvent', {'id': player_id, 'isTransfer': False, 'uid': 0})
+        self.entities.pop(player_id, None)
+        self.inventories.pop(player_id, None)
+        if player_id in self.player_order:
+            self.player_order.remove(player_id)
+
+    def get_player_list(self):
+        """在线玩家ID列表"""
+        return list(self.player_order)
+
+    def move_player(self, player_id, pos, dimension=None):
+        """
+        移动玩家(维度变化时触发DimensionChangeFinishServerEvent)
+
+        Args:
+            player_id (str): 玩家ID
+            pos (tuple): 目标位置
+            dimension (int): 目标维度,None表示不变
+        """
+        entity = self.entities.get(player_id)
+        if entity is None:
+            return False
+        from_dim = entity.dimension
+        entity.pos = tuple(pos)
+        if dimension is not None and dimension != from_dim:
+            entity.dimension = dimension
+            self.fire_engine_event('DimensionChangeFinishServerEvent', {
+                'playerId': player_id, 'fromDimensionId': from_dim, 'toDimensionId': dimension,
+                'toPos': tuple(pos)
+            })
+        return True
+
+    # ========== 背包 ==========
+
+    def get_slots(self, player_id, pos_type):
+        """
+        获取玩家某类槽位列表
+
+        Args:
+            player_id (str): 玩家ID
+            pos_type: ItemPosType枚举值
+
+        Returns:
+            list: 槽位列表(可修改),玩家不存在时返回None
+        """
+        inventory = self.inventories.get(player_id)
+        if inventory is None:
+            return None
+        return inventory.get(_POS_TYPE_KEYS.get(pos_type, 'INVENTORY'))
+
+    def give_item(self, player_id, item_dict, slot=-1):
+        """
+        物品放入背包(先合并同类堆叠,再放入空槽位)
+
+        Args:
+            player_id (str): 玩家ID
+            item_dict (dict): 物品字典
+            slot (int): 指定槽位,-1为自动
+
+        Returns:
+            bool: 是否成功
+        """
+        slots = self.get_slots(player_id, 'INVENTORY')
+        if slots is None or not item_dict:
+            return False
+        item = normalize_item(item_dict)
+        if 0 <= slot < len(slots):
+            slots[slot] = item
+            self._notify_inventory_changed(player_id, slot)
+            return True
+
+        name = item['newItemName']
+        remain = item['count']
+        stack = 64 if _stackable(name) else 1
+        for index, existing in enumerate(slots):
+            if remain <= 0:
+                break
+            if existing and existing['newItemName'] == name and existing['count'] < stack:
+                add = min(stack - existing['count'], remain)
+                existing['count'] += add
+                remain -= add
+                self._notify_inventory_changed(player_id, index)
+        for index, existing in enumerate(slots):
+            if remain <= 0:
+                break
+            if existing is None:
+                placed = dict(item)
+                placed['count'] = min(stack, remain)
+                slots[index] = placed
+                remain -= placed['count']
+                self._notify_inventory_changed(player_id, index)
+        return remain <= 0
+
+    def count_item(self, player_id, item_name):
+        """统计玩家背包中某物品数量"""
+        slots = self.get_slots(player_id, 'INVENTORY') or []
+        return sum(item['count'] for item in slots if item and item['newItemName'] == item_name)
+
+    def _notify_inventory_changed(self, player_id, slot, old_item=None):
+        """
+        背包变化事件(newItemDict为槽位当前物品,空槽位为None)
+
+        与真实引擎一致,事件不在修改背包的调用中同步派发,而是在下一Tick开始时派发
+        """
+        slots = self.get_slots(player_id, 'INVENTORY') or []
+        new_item = slots[slot] if 0 <= slot < len(slots) else None
+        self._deferred_events.append(('InventoryItemChangedServerEvent', {
+            'playerId': player_id, 'slot': slot, 'oldItemDict': old_item,
+            'newItemDict': dict(new_item) if new_item else None
+        }))
+
+    def _fire_deferred_events(self):
+        """派发上一Tick延迟的引擎事件"""
+        events, self._deferred_events = self._deferred_events, []
+        for event_name, args in events:
+            self.fire_engine_event(event_name, args)
+
+    # ========== 方块 ==========
+
+    def get_block(self, pos, dimension):
+        """
+        获取方块
+
+        Args:
+            pos (tuple): 方块坐标
+            dimension (int): 维度
+
+        Returns:
+            dict: {'name': str, 'aux': int}
+        """
+        key = (int(pos[0]), int(pos[1]), int(pos[2]))
+        block = self.blocks[dimension].get(key)
+        if block is None:
+            return {'name': 'minecraft:air', 'aux': 0}
+        return dict(block)
+
+    def set_block(self, pos, block_dict, dimension):
+        """
+        设置方块
+
+        Args:
+            pos (tuple): 方块坐标
+            block_dict (dict): {'name': str, 'aux': int}
+            dimension (int): 维度
+        """
+        key = (int(pos[0]), int(pos[1]), int(pos[2]))
+        name = (block_dict or {}).get('name', 'minecraft:air')
+        if name == 'minecraft:air':
+            self.blocks[dimension].pop(key, None)
+        else:
+            self.blocks[dimension][key] = {'name': name, 'aux': block_dict.get('aux', 0)}
+        return True
+
+    def add_ticking_area(self, key, dimension, min_pos, max_pos):
+        """
+        注册常加载区域(SetAddArea)
+
+        Returns:
+            bool: key已存在时失败
+        """
+        if key in self.ticking_areas:
+            return False
+        self.ticking_areas[key] = (dimension, tuple(min_pos), tuple(max_pos), self.tick_count)
+        return True
+
+    def remove_ticking_area(self, key):
+        """删除常加载区域(DeleteArea)"""
+        return self.ticking_areas.pop(key, None) is not None
+
+    def is_chunk_loaded(self, dimension, pos):
+        """
+        区块是否已加载
+
+        Args:
+            dimension (int): 维度
+            pos (tuple): 区块内任一方块坐标
+
+        Returns:
+            bool: 玩家附近,或位于注册满AREA_LOAD_TICKS的常加载区域内
+        """
+        x, z = pos[0], pos[2]
+        for area_dimension, min_pos, max_pos, added_tick in self.ticking_areas.values():
+            if area_dimension == dimension and self.tick_count - added_tick >= AREA_LOAD_TICKS and \
+                    min_pos[0] <= x <= max_pos[0] and min_pos[2] <= z <= max_pos[2]:
+                return True
+        for player_id in self.player_order:
+            entity = self.entities.get(player_id)
+            if entity and entity.dimension == dimension and \
+                    abs(entity.pos[0] - x) <= PLAYER_LOAD_RADIUS and abs(entity.pos[2] - z) <= PLAYER_LOAD_RADIUS:
+                return True
+        return False
+
+    # ========== 定时器 ==========
+
+    def add_timer(self, delay, func, args, kwargs, repeat=False):
+        """
+        添加引擎定时器
+
+        Returns:
+            EngineTimer: 定时器对象(CancelTimer参数)
+        """
+        timer = EngineTimer(max(0.0, float(delay)), func, args, kwargs, repeat)
+        heapq.heappush(self._timers, (self.now + timer.delay, next(self._timer_seq), timer))
+        return timer
+
+    def cancel_timer(self, timer):
+        """取消引擎定时器"""
+        if isinstance(timer, EngineTimer):
+            timer.cancelled = True
+
+    def _run_timers(self):
+        """执行到期定时器"""
+        timers = self._timers
+        while timers and timers[0][0] <= self.now:
+            _, _, timer = heapq.heappop(timers)
+            if timer.cancelled:
+                continue
+            if timer.repeat:
+                heapq.heappush(timers, (self.now + max(timer.delay, 1e-3), next(self._timer_seq), timer))
+            self._safe_call(timer.func, *timer.args, **timer.kwargs)
+
+    # ========== 事件 ==========
+
+    def listen(self, namespace, system_name, event_name, instance, func):
+        """注册事件监听"""
+        key = (namespace, system_name, event_name)
+        entry = (instance, func)
+        if entry not in self.listeners[key]:
+            self.listeners[key].append(entry)
+
+    def unlisten(self, namespace, system_name, event_name, instance, func):
+        """取消事件监听"""
+        key = (namespace, system_name, event_name)
+        handlers = self.listeners.get(key)
+        if not handlers:
+            return
+        for entry in list(handlers):
+            if entry[1] == func:
+                handlers.remove(entry)
+
+    def fire(self, namespace, system_name, event_name, args):
+        """
+        派发事件
+
+        Args:
+            namespace (str): 发送方命名空间
+            system_name (str): 发送方系统名
+            event_name (str): 事件名
+            args (dict): 事件参数(回调可修改,如cancel/ret)
+
+        Returns:
+            dict: 事件参数
+        """
+        self.event_counts[event_name] += 1
+        for instance, func in list(self.listeners.get((namespace, system_name, event_name), ())):
+            self._safe_call(func, args)
+        return args
+
+    def fire_engine_event(self, event_name, args):
+        """派发引擎事件"""
+        return self.fire(ENGINE_NAMESPACE, ENGINE_SYSTEM_NAME, event_name, args)
+
+    def capture_client_message(self, player_id, namespace, system_name, event_name, data):
+        """记录发往客户端的消息"""
+        self.client_message_count += 1
+        self.event_counts["S2C:" + event_name] += 1
+        if len(self.client_messages) < self.keep_client_messages:
+            self.client_messages.append((player_id, namespace, system_name, event_name, data))
+
+    def _safe_call(self, func, *args, **kwargs):
+        """调用回调并捕获异常(与引擎一致,异常不中断派发)"""
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            self.callback_errors += 1
+            traceback.print_exc()
+            return None
+
+
+class EngineTimer(object):
+    """引擎定时器"""
+
+    def __init__(self, delay, func, args, kwargs, repeat):
+        self.delay = delay
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.repeat = repeat
+        self.cancelled = False
+
+
+# ItemPosType -> 背包分区
+_POS_TYPE_KEYS = {
+    0: 'INVENTORY', 'INVENTORY': 'INVENTORY',
+    1: 'OFFHAND', 'OFFHAND': 'OFFHAND',
+    2: 'CARRIED', 'CARRIED': 'CARRIED',
+    3: 'ARMOR', 'ARMOR': 'ARMOR',
+}
+
+
+def normalize_item(item_dict):
+    """补全物品字典字段"""
+    item = dict(item_dict)
+    name = item.get('newItemName') or item.get('itemName') or 'minecraft:air'
+    item['itemName'] = name
+    item['newItemName'] = name
+    item['count'] = int(item.get('count', 1))
+    item.setdefault('auxValue', 0)
+    item.setdefault('newAuxValue', item['auxValue'])
+    item.setdefault('enchantData', [])
+    item.setdefault('customTips', '')
+    item.setdefault('extraId', '')
+    return item
+
+
+def _stackable(item_name):
+    """是否可堆叠(工具、盔甲、武器不可堆叠)"""
+    for keyword in ('sword', 'pickaxe', 'axe', 'shears', 'helmet', 'chestplate', 'leggings',
+                    'boots', 'bow', 'shield', 'potion'):
+        if keyword in item_name:
+            return False
+    return True
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+MinecraftEnum替身
+
+功能:
+- GetMinecraftEnum()返回的枚举集合
+- 常用枚举使用与引擎一致的取值(GameType/ItemPosType/AttrType)
+- 其他枚举成员按首次访问顺序分配稳定的整数值,保证同一次运行内唯一
+"""
+
+
+# 与引擎取值一致的枚举
+KNOWN_ENUMS = {
+    'GameType': {
+        'Survival': 0, 'Creative': 1, 'Adventure': 2, 'Spectator': 6,
+        'SURVIVAL': 0, 'CREATIVE': 1, 'ADVENTURE': 2, 'SPECTATOR': 6,
+    },
+    'ItemPosType': {
+        'INVENTORY': 0, 'OFFHAND': 1, 'CARRIED': 2, 'ARMOR': 3,
+    },
+    'AttrType': {
+        'HEALTH': 0, 'SPEED': 1, 'DAMAGE': 2, 'UNDERWATER_SPEED': 3, 'HUNGER': 4,
+        'SATURATION': 5, 'ABSORPTION': 6, 'LAVA_SPEED': 7, 'LUCK': 8, 'FOLLOW_RANGE': 9,
+        'KNOCKBACK_RESISTANCE': 10, 'JUMP_STRENGTH': 11, 'ARMOR': 12, 'TOUGHNESS': 13,
+        'ATTACK_TARGET': 14,
+    },
+}
+
+# 自动分配值的起点(避开已知枚举的取值范围)
+AUTO_VALUE_START = 1000
+
+
+class HeadlessEnum(object):
+    """单个枚举: 未知成员按访问顺序分配整数值"""
+
+    def __init__(self, name, values=None):
+        self._name = name
+        self._values = dict(values or {})
+        self._next = AUTO_VALUE_START
+
+    def __getattr__(self, member):
+        if member.startswith('_'):
+            raise AttributeError(member)
+        value = self._values.get(member)
+        if value is None:
+            value = self._values[member] = self._next
+            self._next += 1
+        return value
+
+    def __repr__(self):
+        return "<HeadlessEnum {}>".format(self._name)
+
+
+class HeadlessMinecraftEnum(object):
+    """枚举集合: GetMinecraftEnum().GameType.Survival"""
+
+    def __init__(self):
+        self._enums = {}
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        enum = self._enums.get(name)
+        if enum is None:
+            enum = self._enums[name] = HeadlessEnum(name, KNOWN_ENUMS.get(name))
+        return enum
+
+
+# 进程内唯一实例(mod.common.minecraftEnum模块级枚举与GetMinecraftEnum()共用)
+MINECRAFT_ENUM = HeadlessMinecraftEnum()
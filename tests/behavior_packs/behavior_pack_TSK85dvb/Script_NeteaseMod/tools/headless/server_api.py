@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+extraServerApi替身
+
+功能:
+- ServerSystem基类(事件监听、NotifyToClient、实体创建)
+- 模块级函数(GetEngineCompFactory/GetSystem/GetPlayerList/RegisterSystem等)
+- 所有调用计入HeadlessEngine.api_calls,未实现的函数计入unimplemented
+"""
+
+from __future__ import print_function
+
+from Script_NeteaseMod.tools.headless.components import HeadlessCompFactory
+from Script_NeteaseMod.tools.headless.engine import ENGINE_NAMESPACE, ENGINE_SYSTEM_NAME, TICKS_PER_SECOND
+from Script_NeteaseMod.tools.headless.minecraft_enum import MINECRAFT_ENUM
+
+
+def make_server_system_cls(engine):
+    """
+    创建绑定到引擎的ServerSystem基类
+
+    Args:
+        engine (HeadlessEngine): 无头引擎
+
+    Returns:
+        type: ServerSystem类
+    """
+
+    class ServerSystem(object):
+        """服务端系统基类"""
+
+        def __init__(self, namespace, systemName):
+            self._namespace = namespace
+            self._system_name = systemName
+            engine.systems[(namespace, systemName)] = self
+
+        def __getattr__(self, name):
+            if not name or not name[0].isupper():
+                raise AttributeError(name)
+            api = "ServerSystem." + name
+
+            def noop(*args, **kwargs):
+                engine.count(api, implemented=False)
+                return None
+            return noop
+
+        # ========== 生命周期 ==========
+
+        def Create(self):
+            pass
+
+        def Update(self):
+            pass
+
+        def Destroy(self):
+            pass
+
+        def GetNamespace(self):
+            return self._namespace
+
+        def GetSystemName(self):
+            return self._system_name
+
+        # ========== 事件 ==========
+
+        def ListenForEvent(self, namespace, systemName, eventName, instance, func):
+            engine.count("ServerSystem.ListenForEvent")
+            engine.listen(namespace, systemName, eventName, instance, func)
+
+        def UnListenForEvent(self, namespace, systemName, eventName, instance, func):
+            engine.count("ServerSystem.UnListenForEvent")
+            engine.unlisten(namespace, systemName, eventName, instance, func)
+
+        def UnListenAllEvents(self):
+            for handlers in engine.listeners.values():
+                handlers[:] = [entry for entry in handlers if getattr(entry[1], '__self__', None) is not self]
+
+        def BroadcastEvent(self, eventName, eventData):
+            engine.count("ServerSystem.BroadcastEvent")
+            engine.fire(self._namespace, self._system_name, eventName, eventData)
+
+        def CreateEventData(self):
+            return {}
+
+        def NotifyToClient(self, targetId, eventName, eventData):
+            engine.count("ServerSystem.NotifyToClient")
+            engine.capture_client_message(targetId, self._namespace, self._system_name, eventName, eventData)
+
+        def NotifyToMultiClients(self, targetIdList, eventName, eventData):
+            engine.count("ServerSystem.NotifyToMultiClients")
+            for target_id in targetIdList or []:
+                engine.capture_client_message(target_id, self._namespace, self._system_name, eventName, eventData)
+
+        def BroadcastToAllClient(self, exceptEntityId, eventName, eventData=None):
+            engine.count("ServerSystem.BroadcastToAllClient")
+            if eventData is None and not isinstance(eventName, str):
+                # 兼容省略exceptEntityId的调用: BroadcastToAllClient(eventName, eventData)
+                exceptEntityId, eventName, eventData = None, exceptEntityId, eventName
+            engine.capture_client_message(None, self._namespace, self._system_name, eventName, eventData)
+
+        # ========== 实体 ==========
+
+        def CreateEngineEntityByTypeStr(self, engineTypeStr, pos, rot=None, dimensionId=0, isNpc=False, isGlobal=False):
+            engine.count("ServerSystem.CreateEngineEntityByTypeStr")
+            return engine.spawn_entity(engineTypeStr, pos, rot, dimensionId).entity_id
+
+        def CreateEngineItemEntity(self, itemDict, dimensionId=0, pos=(0, 0, 0)):
+            engine.count("ServerSystem.CreateEngineItemEntity")
+            return engine.spawn_item_entity(itemDict, dimensionId, pos)
+
+        def DestroyEntity(self, entityId):
+            engine.count("ServerSystem.DestroyEntity")
+            return engine.destroy_entity(entityId)
+
+    return ServerSystem
+
+
+def _import_class(path):
+    """按"包.模块.类"路径导入类"""
+    module_path, class_name = path.rsplit('.', 1)
+    module = __import__(module_path, fromlist=[class_name])
+    return getattr(module, class_name)
+
+
+def build_server_api(engine, module):
+    """
+    填充extraServerApi模块
+
+    Args:
+        engine (HeadlessEngine): 无头引擎
+        module: 要填充的模块对象
+    """
+    factory = HeadlessCompFactory(engine)
+    server_system_cls = make_server_system_cls(engine)
+
+    def counted(name, func):
+        def wrapper(*args, **kwargs):
+            engine.count("serverApi." + name)
+            return func(*args, **kwargs)
+        wrapper.__name__ = name
+        return wrapper
+
+    def register_system(namespace, system_name, cls_path):
+        system_cls = _import_class(cls_path)
+        return system_cls(namespace, system_name)
+
+    def get_engine_actor():
+        return dict((entity_id, {'dimensionId': entity.dimension, 'identifier': entity.type_str})
+                    for entity_id, entity in engine.entities.items() if not entity.is_player)
+
+    def start_coroutine(iter_or_func, callback=None):
+        generator = iter_or_func() if callable(iter_or_func) else iter_or_func
+
+        def step():
+            try:
+                delay = next(generator)
+            except StopIteration:
+                if callback:
+                    callback()
+                return
+            # yield的值为等待的帧数,默认下一帧(减半帧避免浮点误差多等一帧)
+            frames = delay if isinstance(delay, (int, float)) and delay > 0 else 1
+            engine.add_timer((frames - 0.5) / TICKS_PER_SECOND, step, (), {})
+        step()
+        return generator
+
+    functions = {
+        'GetEngineCompFactory': lambda: factory,
+        'GetServerCompFactory': lambda: factory,
+        'GetLevelId': lambda: engine.level_id,
+        'GetMinecraftEnum': lambda: MINECRAFT_ENUM,
+        'GetEngineNamespace': lambda: ENGINE_NAMESPACE,
+        'GetEngineSystemName': lambda: ENGINE_SYSTEM_NAME,
+        'GetServerSystemCls': lambda: server_system_cls,
+        'GetSystem': lambda namespace, system_name: engine.systems.get((namespace, system_name)),
+        'GetPlayerList': engine.get_player_list,
+        'GetEngineActor': get_engine_actor,
+        'RegisterSystem': register_system,
+        'StartCoroutine': start_coroutine,
+    }
+    for name, func in functions.items():
+        setattr(module, name, counted(name, func))
+    module.ServerSystem = server_system_cls
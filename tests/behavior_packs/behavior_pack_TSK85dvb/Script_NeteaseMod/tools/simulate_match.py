@@ -0,0 +1,521 @@
+# -*- coding: utf-8 -*-
+"""
+无头对局模拟器 - 在普通Linux环境下跑完一局8队起床战争并输出性能报告
+
+用法(Python 2.7,与游戏运行环境一致):
+    python tools/simulate_match.py                    # 默认种子,输出报告
+    python tools/simulate_match.py --seed 7 --top 40  # 指定种子,显示前40个API
+    python tools/simulate_match.py --json out.json    # 额外输出JSON报告(便于对比两次提交)
+    python tools/simulate_match.py --verbose          # 显示游戏日志
+    python tools/simulate_match.py --profile out.folded  # 启用TickProfiler,输出Top-N并导出collapsed-stack
+    python tools/simulate_match.py --api-sites        # 启用EngineApiAccounting,输出调用点与循环内调用排行
+
+流程:
+1. 安装无头引擎替身(tools/headless),time.time替换为虚拟时钟
+2. 执行modMain服务端初始化(注册预设类型、创建SERVER_SYSTEMS)
+3. 生成8岛环形测试地图(床/出生点/资源点/商店),作为唯一可选地图
+4. 8个机器人加入 -> StageWaitingState倒计时 -> BedWarsRunningState
+5. 机器人购物、依次破坏所有床、逐个击杀直到只剩一队
+6. BedWarsEndingState -> StageBroadcastScoreState -> 回到等待状态后结束
+
+报告:
+- 各阶段进入时间与Tick数
+- Tick耗时分位数(p50/p90/p99/max,真实时钟,毫秒)
+- 按"组件.方法"统计的API调用次数,以及落到空实现的API
+- 发往客户端的消息数量
+
+说明:
+- 仓库内没有8队地图,模拟器按team8模式生成环形地图并注入RoomConfigLoader缓存
+- 机器人行为完全由种子决定,同一提交两次运行的API计数一致,可直接对比
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+
+if sys.version_info[0] == 2:
+    reload(sys)
+    sys.setdefaultencoding('utf-8')
+
+SCRIPT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(SCRIPT_ROOT, '..'))  # Script_NeteaseMod包
+sys.path.insert(0, SCRIPT_ROOT)  # modMain使用的顶层导入(from modConfig import ...)
+
+from Script_NeteaseMod.tools.headless import install  # noqa: E402
+from Script_NeteaseMod.tools.headless.engine import TICKS_PER_SECOND, real_clock  # noqa: E402
+
+# 测试地图
+MAP_ID = "team8_headless"
+MAP_DIMENSION = 9008
+MAP_ISLAND_RADIUS = 60
+MAP_BASE_Y = 88
+MAP_MODE = "team8"
+
+# 机器人剧本(虚拟时间,秒)
+BOT_COUNT = 8
+SHOP_DELAY = 5.0  # 进入running后开始购物
+BED_BREAK_DELAY = 15.0  # 进入running后开始破坏床
+BED_BREAK_INTERVAL = 3.0
+KILL_INTERVAL = 2.0
+MAX_MATCH_SECONDS = 1800.0  # 超过该虚拟时长视为卡住
+SHOP_GOODS = ["block.wool", "block.hay", "block.clay", "block.planks"]
+
+
+# ========== 输出控制 ==========
+
+class _Sink(object):
+    """吞掉游戏日志,只统计行数"""
+
+    def __init__(self):
+        self.lines = 0
+
+    def write(self, text):
+        self.lines += text.count('\n')
+
+    def flush(self):
+        pass
+
+
+# ========== 测试地图 ==========
+
+def build_ring_map(teams):
+    """
+    生成环形8岛地图
+
+    Args:
+        teams (list): 队伍ID列表
+
+    Returns:
+        tuple: (stage_config, preset_config, islands, blocks)
+            islands: {team: {'bed': (x, y, z), 'spawn': (x, y, z)}}
+            blocks: [((x, y, z), block_name)] 地形方块
+    """
+    presets = []
+    islands = {}
+    blocks = []
+
+    def rotation(yaw):
+        return {"pitch": 0, "yaw": yaw, "roll": 0}
+
+    def add_platform(cx, cz, half, name):
+        for dx in range(-half, half + 1):
+            for dz in range(-half, half + 1):
+                blocks.append(((cx + dx, MAP_BASE_Y - 1, cz + dz), name))
+
+    for index, team in enumerate(teams):
+        angle = 2.0 * math.pi * index / len(teams)
+        cx = int(round(MAP_ISLAND_RADIUS * math.cos(angle)))
+        cz = int(round(MAP_ISLAND_RADIUS * math.sin(angle)))
+        # 朝向地图中心
+        yaw = (math.degrees(math.atan2(-cx, cz)) + 360.0) % 360.0
+        out_x = int(round(math.cos(angle) * 6))
+        out_z = int(round(math.sin(angle) * 6))
+
+        bed = (cx, MAP_BASE_Y, cz)
+        spawn = (cx + out_x + 0.5, MAP_BASE_Y + 1, cz + out_z + 0.5)
+        islands[team] = {'bed': bed, 'spawn': spawn}
+        add_platform(cx, cz, 7, "minecraft:stone")
+
+        presets.append({"type": "bedwars:bed", "id": "bed_" + team, "config": {
+            "runtime_block_id": "minecraft:bed", "pos": list(bed), "rotation": rotation(yaw), "team": team}})
+        presets.append({"type": "bedwars:spawn", "id": "spawn_" + team, "config": {
+            "runtime_entity_id": "ecbedwars:entity", "pos": list(spawn), "rotation": rotation(yaw), "team": team}})
+        for offset, resource in ((1, "iron"), (-1, "gold")):
+            presets.append({"type": "bedwars:generator", "id": "gen_{}_{}".format(resource, team), "config": {
+                "runtime_entity_id": "ecbedwars:entity",
+                "pos": [cx + out_x * 1.5 + offset + 0.5, MAP_BASE_Y + 1, cz + out_z * 1.5 + 0.5],
+                "rotation": rotation(0), "display_floating": False, "everybody": True,
+                "resource_type_id": resource, "team": team}})
+        presets.append({"type": "bedwars:shop", "id": "shop_items_" + team, "config": {
+            "runtime_entity_id": "ecbedwars:shop",
+            "pos": [cx - out_z + 0.5, MAP_BASE_Y + 1, cz + out_x + 0.5], "rotation": rotation(yaw)}})
+        presets.append({"type": "bedwars:shop", "id": "shop_upgrade_" + team, "config": {
+            "runtime_entity_id": "ecbedwars:shop",
+            "pos": [cx + out_z + 0.5, MAP_BASE_Y + 1, cz - out_x + 0.5], "rotation": rotation(yaw),
+            "shop_type": "upgrade"}})
+
+    for index in range(4):
+        angle = math.pi / 4 + math.pi / 2 * index
+        x = int(round(30 * math.cos(angle)))
+        z = int(round(30 * math.sin(angle)))
+        add_platform(x, z, 2, "minecraft:stone")
+        presets.append({"type": "bedwars:generator", "id": "gen_diamond_{}".format(index), "config": {
+            "runtime_entity_id": "ecbedwars:entity", "pos": [x + 0.5, MAP_BASE_Y, z + 0.5],
+            "rotation": rotation(0), "resource_type_id": "diamond"}})
+    add_platform(0, 0, 5, "minecraft:stone")
+    for index in range(2):
+        presets.append({"type": "bedwars:generator", "id": "gen_emerald_{}".format(index), "config": {
+            "runtime_entity_id": "ecbedwars:entity", "pos": [index * 4 - 1.5, MAP_BASE_Y, 0.5],
+            "rotation": rotation(0), "resource_type_id": "emerald"}})
+
+    stage_config = {
+        "id": MAP_ID,
+        "name": u"无头测试环岛",
+        "image": "",
+        "map_dimension": MAP_DIMENSION,
+        "mode": MAP_MODE,
+        "spawn_pos": {"x": 0.0, "y": MAP_BASE_Y + 40.0, "z": 0.0},
+        "center_pos": {"x": 0, "y": MAP_BASE_Y, "z": 0},
+        "backup_radius": MAP_ISLAND_RADIUS + 16,
+    }
+    preset_config = {"dimension_id": MAP_DIMENSION, "preset_count": len(presets), "presets": presets}
+    return stage_config, preset_config, islands, blocks
+
+
+# ========== 模拟器 ==========
+
+class MatchSimulator(object):
+    """8队对局模拟器"""
+
+    def __init__(self, seed=0, verbose=False, profile=False, api_sites=False):
+        self.seed = seed
+        self.verbose = verbose
+        self.profile = profile
+        self.profiler = None
+        self.api_sites = api_sites
+        self.api_accounting = None
+        self.rng = random.Random(seed)
+        self.engine = None
+        self.room = None
+        self.game = None
+        self.shop = None
+        self.systems = []
+        self.bots = []
+        self.islands = {}
+        self.teams = []
+
+        self.tick_times = []  # [(phase, seconds)]
+        self.phases = []  # [(phase, virtual_time, tick)]
+        self.phase = None
+        self.running_since = None
+        self.next_bed_time = None
+        self.next_kill_time = None
+        self.beds_left = []
+        self.shopped = False
+        self.finished = False
+        self.log_lines = 0
+
+    # ---------- 初始化 ----------
+
+    def setup(self):
+        """安装替身并初始化Mod服务端"""
+        random.seed(self.seed)
+        self.engine = install()
+        self.engine.install_clock()
+
+        import mod.server.extraServerApi as serverApi
+        from Script_NeteaseMod.modConfig import MOD_NAME, SERVER_SYSTEMS
+        from Script_NeteaseMod.config.game_modes.team8 import MODE_CONFIG
+        import modMain
+
+        if self.api_sites:
+            # 与modMain一致: 在注册系统之前安装
+            from Script_NeteaseMod.systems.util.EngineApiAccounting import get_engine_api_accounting
+            self.api_accounting = get_engine_api_accounting()
+            self.api_accounting.install(serverApi)
+        modMain.Script_NeteaseMod().Script_NeteaseModServerInit()
+        if self.profile:
+            from Script_NeteaseMod.systems.util.TickProfiler import install_from_mod_config
+            self.profiler = install_from_mod_config()
+            self.profiler.report_interval = 0  # 对局结束后统一输出
+        self.systems = [serverApi.GetSystem(MOD_NAME, name) for name, _ in SERVER_SYSTEMS]
+        self.room = serverApi.GetSystem(MOD_NAME, "RoomManagementSystem")
+        self.game = serverApi.GetSystem(MOD_NAME, "BedWarsGameSystem")
+        self.shop = serverApi.GetSystem(MOD_NAME, "ShopServerSystem")
+        self.mod_name = MOD_NAME
+        if self.room.performance_monitor is not None:
+            self.room.performance_monitor.report_interval = float('inf')  # 对局结束后统一输出
+
+        # 预设通过instance.manager.server_api注册引擎事件
+        preset_manager = self.engine.preset_system.GetPresetManager("bedwars_room")
+        preset_manager.server_api = self.game
+
+        # 注入测试地图
+        self.teams = list(MODE_CONFIG["teams"])
+        stage, preset_config, self.islands, blocks = build_ring_map(self.teams)
+        for pos, name in blocks:
+            self.engine.set_block(pos, {'name': name, 'aux': 0}, MAP_DIMENSION)
+        self.room.set_stages([stage])
+        self.room.config_loader.preset_configs[MAP_DIMENSION] = preset_config
+        self.room.create_map_vote()
+
+    def join_bots(self):
+        """机器人加入并完成客户端加载"""
+        spawn = self.room.waiting_spawn
+        spawn_pos = (spawn['x'], spawn['y'], spawn['z']) if isinstance(spawn, dict) else tuple(spawn)
+        for index in range(BOT_COUNT):
+            player_id = self.engine.add_player(
+                player_id=str(-4294967295 + index), name="Bot{}".format(index + 1),
+                pos=spawn_pos, dimension=self.room.lobby_dimension)
+            self.bots.append(player_id)
+            self.engine.fire(self.mod_name, "RoomManagementClientSystem", "C2SOnLocalPlayerStopLoading",
+                             {'playerId': player_id})
+            self.engine.fire_engine_event('ClientLoadAddonsFinishServerEvent', {'playerId': player_id})
+
+    # ---------- 主循环 ----------
+
+    def run(self):
+        """
+        运行直到回到等待状态或超时
+
+        Returns:
+            bool: 是否完整跑完一局
+        """
+        start_time = self.engine.now
+        while not self.finished:
+            if self.engine.now - start_time > MAX_MATCH_SECONDS:
+                break
+            self.tick()
+        return self.finished
+
+    def tick(self):
+        """推进一个Tick(计时包含引擎定时器、系统Update、预设Tick与机器人触发的事件)"""
+        begin = real_clock()
+        self.engine.advance()
+        for system in self.systems:
+            self.engine._safe_call(system.Update)
+        self.engine.preset_system.tick()
+        self._drive_bots()
+        elapsed = real_clock() - begin
+
+        phase = self._current_phase()
+        self.tick_times.append((phase, elapsed))
+        if phase != self.phase:
+            self._on_phase_changed(self.phase, phase)
+
+    def _current_phase(self):
+        room_state = getattr(self.room.root_state, 'current_sub_state_name', None)
+        game_root = getattr(self.game, 'root_state', None)
+        game_state = getattr(game_root, 'current_sub_state_name', None) if game_root else None
+        if room_state == "running" and game_state:
+            return "running/" + game_state
+        return room_state or "none"
+
+    def _on_phase_changed(self, old_phase, new_phase):
+        self.phase = new_phase
+        self.phases.append((new_phase, self.engine.now, self.engine.tick_count))
+        if new_phase == "running/running":
+            self.running_since = self.engine.now
+            self.next_bed_time = self.engine.now + BED_BREAK_DELAY
+            self.beds_left = list(self.teams)
+        if old_phase == "broadcast_score" and new_phase == "waiting":
+            self.finished = True
+
+    # ---------- 机器人 ----------
+
+    def _drive_bots(self):
+        if self.phase != "running/running" or self.running_since is None:
+            return
+        now = self.engine.now
+        self._wander()
+        if not self.shopped and now - self.running_since >= SHOP_DELAY:
+            self.shopped = True
+            self._shop_round()
+        if self.beds_left and now >= self.next_bed_time:
+            self.next_bed_time = now + BED_BREAK_INTERVAL
+            self._break_next_bed()
+        elif not self.beds_left and self.next_kill_time is None:
+            self.next_kill_time = now + KILL_INTERVAL
+        if self.next_kill_time is not None and now >= self.next_kill_time:
+            self.next_kill_time = now + KILL_INTERVAL
+            self._kill_next()
+
+    def _team_of(self, player_id):
+        team_module = getattr(self.game, 'team_module', None)
+        return team_module.get_player_team(player_id) if team_module else None
+
+    def _alive_bots(self):
+        eliminated = set(getattr(self.game, 'eliminated_players', []) or [])
+        return [pid for pid in self.bots if pid not in eliminated and self._team_of(pid)]
+
+    def _wander(self):
+        """存活机器人在出生点附近小范围移动(驱动位置相关逻辑)"""
+        for player_id in self._alive_bots():
+            entity = self.engine.get_entity(player_id)
+            island = self.islands.get(self._team_of(player_id))
+            if entity is None or island is None or entity.dimension != MAP_DIMENSION:
+                continue
+            sx, sy, sz = island['spawn']
+            entity.pos = (sx + self.rng.uniform(-3, 3), sy, sz + self.rng.uniform(-3, 3))
+
+    def _shop_round(self):
+        """每个机器人打开商店并购买几件方块"""
+        for player_id in self._alive_bots():
+            self.engine.give_item(player_id, {'newItemName': 'minecraft:iron_ingot', 'count': 64})
+            self.engine.give_item(player_id, {'newItemName': 'minecraft:gold_ingot', 'count': 16})
+            self.shop.handle_player_open_shop(player_id, self._team_of(player_id), "items")
+            for goods_key in SHOP_GOODS:
+                self.engine.fire(self.mod_name, "ShopClientSystem", "BedWarsShopTryBuy",
+                                 {'player_id': player_id, 'goods_key': goods_key, 'category_index': 0})
+
+    def _break_next_bed(self):
+        victim_team = self.beds_left.pop(0)
+        attackers = [pid for pid in self._alive_bots() if self._team_of(pid) != victim_team]
+        if not attackers:
+            return
+        attacker = self.rng.choice(attackers)
+        self.engine.break_block(attacker, self.islands[victim_team]['bed'], MAP_DIMENSION)
+
+    def _kill_next(self):
+        alive = self._alive_bots()
+        if len(alive) < 2:
+            return
+        killer = alive[0]
+        victims = [pid for pid in alive if self._team_of(pid) != self._team_of(killer)]
+        if not victims:
+            return
+        victim = self.rng.choice(victims)
+        enum = sys.modules['mod.server.extraServerApi'].GetMinecraftEnum()
+        self.engine.hurt_entity(victim, 1000, enum.ActorDamageCause.EntityAttack, killer)
+
+    # ---------- 报告 ----------
+
+    def build_report(self, top):
+        """
+        生成报告
+
+        Args:
+            top (int): API排行显示数量
+
+        Returns:
+            dict: 报告数据
+        """
+        all_times = [t for _, t in self.tick_times]
+        by_phase = {}
+        for phase, elapsed in self.tick_times:
+            by_phase.setdefault(phase, []).append(elapsed)
+
+        api_calls = sorted(self.engine.api_calls.items(), key=lambda item: (-item[1], item[0]))
+        unimplemented = sorted(self.engine.unimplemented.items(), key=lambda item: (-item[1], item[0]))
+        s2c = sorted(((name[4:], count) for name, count in self.engine.event_counts.items()
+                      if name.startswith("S2C:")), key=lambda item: (-item[1], item[0]))
+        return {
+            "seed": self.seed,
+            "finished": self.finished,
+            "virtual_seconds": round(self.engine.now - self.phases[0][1], 3) if self.phases else 0.0,
+            "ticks": len(all_times),
+            "phases": [{"phase": phase, "enter_time": round(t - self.phases[0][1], 3), "enter_tick": tick}
+                       for phase, t, tick in self.phases],
+            "tick_ms": _percentiles(all_times),
+            "tick_ms_by_phase": dict((phase, _percentiles(times)) for phase, times in by_phase.items()),
+            "api_total": sum(self.engine.api_calls.values()),
+            "api_calls": api_calls[:top],
+            "unimplemented": unimplemented[:top],
+            "client_messages": self.engine.client_message_count,
+            "client_events": s2c[:top],
+            "callback_errors": self.engine.callback_errors,
+            "log_lines": self.log_lines,
+        }
+
+
+def _percentiles(times):
+    """Tick耗时分位数(毫秒)"""
+    if not times:
+        return {}
+    ordered = sorted(times)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000.0, 4)
+    return {
+        "p50": pick(0.50), "p90": pick(0.90), "p99": pick(0.99),
+        "max": round(ordered[-1] * 1000.0, 4),
+        "mean": round(sum(ordered) / len(ordered) * 1000.0, 4),
+        "total": round(sum(ordered) * 1000.0, 2),
+    }
+
+
+def print_report(report):
+    """打印文本报告"""
+    print("=" * 72)
+    print("无头对局模拟报告 seed={} 结果={}".format(
+        report["seed"], "完成" if report["finished"] else "未完成(超时)"))
+    print("虚拟时长 {:.1f}s, Tick数 {}, 回调异常 {}, 游戏日志 {} 行".format(
+        report["virtual_seconds"], report["ticks"], report["callback_errors"], report["log_lines"]))
+    print("-" * 72)
+    print("阶段:")
+    for entry in report["phases"]:
+        print("  {:>8.2f}s  tick {:>6}  {}".format(entry["enter_time"], entry["enter_tick"], entry["phase"]))
+    print("-" * 72)
+    header = "  {:<28} {:>9} {:>9} {:>9} {:>9} {:>10}"
+    print(header.format("Tick耗时(ms)", "p50", "p90", "p99", "max", "total"))
+    rows = [("all", report["tick_ms"])] + sorted(report["tick_ms_by_phase"].items())
+    for name, stats in rows:
+        print(header.format(name, stats["p50"], stats["p90"], stats["p99"], stats["max"], stats["total"]))
+    print("-" * 72)
+    print("API调用 (共 {} 次):".format(report["api_total"]))
+    for name, count in report["api_calls"]:
+        print("  {:>8}  {}".format(count, name))
+    if report["unimplemented"]:
+        print("-" * 72)
+        print("空实现API:")
+        for name, count in report["unimplemented"]:
+            print("  {:>8}  {}".format(count, name))
+    print("-" * 72)
+    print("客户端消息 (共 {} 条):".format(report["client_messages"]))
+    for name, count in report["client_events"]:
+        print("  {:>8}  {}".format(count, name))
+    print("=" * 72)
+
+
+def run_match(simulator):
+    """
+    跑完一局(非verbose时吞掉游戏日志),供本脚本与tools下的基准测试共用
+
+    Args:
+        simulator (MatchSimulator): 模拟器
+
+    Returns:
+        MatchSimulator: 同一个模拟器(已运行)
+    """
+    stdout, stderr = sys.stdout, sys.stderr
+    sink = _Sink()
+    if not simulator.verbose:
+        sys.stdout = sys.stderr = sink
+    try:
+        simulator.setup()
+        simulator.join_bots()
+        simulator.run()
+    finally:
+        sys.stdout, sys.stderr = stdout, stderr
+        if simulator.engine is not None:
+            simulator.engine.uninstall_clock()
+    simulator.log_lines = sink.lines
+    return simulator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=u"无头8队对局模拟")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=30)
+    parser.add_argument("--json", dest="json_path", default=None)
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument("--profile", dest="profile_path", default=None,
+                        help=u"启用TickProfiler,并把collapsed-stack导出到该路径")
+    parser.add_argument("--api-sites", dest="api_sites", action="store_true",
+                        help=u"启用EngineApiAccounting,输出调用点与循环内调用排行")
+    args = parser.parse_args()
+
+    simulator = run_match(MatchSimulator(seed=args.seed, verbose=args.verbose, profile=bool(args.profile_path),
+                                         api_sites=args.api_sites))
+    report = simulator.build_report(args.top)
+    print_report(report)
+    if simulator.profiler is not None:
+        simulator.profiler.print_report(top_n=10)
+        simulator.profiler.dump_collapsed(args.profile_path)
+        simulator.profiler.uninstall()
+    if simulator.api_accounting is not None:
+        simulator.room.performance_monitor._output_api_report(simulator.api_accounting.build_report(args.top))
+        simulator.api_accounting.uninstall()
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    return 0 if report["finished"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())